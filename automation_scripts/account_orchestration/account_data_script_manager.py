@@ -2,7 +2,7 @@ import typing
 import concurrent.futures
 
 
-from automation_scripts.account_orchestration.accounts_data import CompleteAccountData , AccountData , ScriptType
+from automation_scripts.account_orchestration.accounts_data import CompleteAccountData , AccountData , AccountLoadReport , ScriptType
 from connection_sessions.standard_request_session import StandardRequestsSession
 from the_west_inner.game_classes import Game_classes
 from the_west_inner.login import Game_login
@@ -46,9 +46,9 @@ class AccountDataScriptManager:
                       account_script : ScriptType ,
                       session_builder_func : SessionBuilderFuncType | None = None,
                       unload_account_data_flag : bool = True
-                      ) :
+                      ) -> AccountLoadReport :
 
-        self.account_data.load_all_async(
+        report = self.account_data.load_all_async(
             session_builder_func = session_builder_func,
             callback_func = account_script,
             batch_size= 10
@@ -57,6 +57,8 @@ class AccountDataScriptManager:
         if unload_account_data_flag:
         
             self.account_data.unload_all()
+        
+        return report
     
     def execute(self ,
                 account_script : ScriptType,
@@ -1,5 +1,11 @@
+import heapq
+import math
+import queue
+import threading
+import time
 import typing
-import concurrent.futures
+from collections import Counter
+from dataclasses import dataclass, field
 
 from the_west_inner.login import Game_login
 from the_west_inner.game_classes import Game_classes
@@ -28,6 +34,10 @@ def update_dict(target_dict : ExchangeDictType , extension_dict : ExchangeDictTy
 
 
 SessionBuilderFuncType = typing.Callable[[Game_login],StandardRequestsSession]
+
+DEFAULT_MAX_LOGIN_ATTEMPTS = 3
+DEFAULT_LOGIN_BACKOFF = 2.0
+DEFAULT_MAX_LOGIN_BACKOFF = 60.0
 class AccountData:
     
     def __init__(self ,
@@ -67,16 +77,21 @@ class AccountData:
         
         
     def load(self,
-             session_builder_func : SessionBuilderFuncType| None = None
+             session_builder_func : SessionBuilderFuncType| None = None,
+             claim : typing.Callable[[],bool] = lambda: True
              ) -> typing.Generator[tuple[Game_classes,Game_login],None,None]:
-        
+        """
+        Logs in, yields the game classes and the login, then loads the account data.
+
+        Args:
+            claim: Called once the data is ready. The account is only updated when it returns True
+                (False for a load that was given up on in the meantime).
+        """
         login = self._login_by_func(session_builder_func = session_builder_func)
         game_classes = login.login()
         
         yield game_classes , login
 
-        self.bag = game_classes.bag
-        self.currency = game_classes.currency
         if game_classes.currency.cash is None:
             town_list = MapLoader(
                 handler= game_classes.handler,
@@ -92,9 +107,13 @@ class AccountData:
             game_classes.currency.update_raw_oup(
                 handler= game_classes.handler)
         
-        self.current_equipment = game_classes.equipment_manager.current_equipment
         if isinstance(game_classes.handler.session, StandardRequestsSession):
             game_classes.handler.session.force_change_connection()
+        if not claim():
+            return
+        self.bag = game_classes.bag
+        self.currency = game_classes.currency
+        self.current_equipment = game_classes.equipment_manager.current_equipment
     
     def get_item_number(self, item_id : int , count_equipped : bool = True) -> int:
         additional = 0
@@ -111,6 +130,235 @@ class AccountData:
         return self.currency.total_money
 
 
+def percentile(values: list[float], percent: float) -> float:
+    """
+    The nearest rank percentile of the values, 0 when there is none.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+@dataclass
+class AccountLoadReport:
+    """
+    The outcome of `CompleteAccountData.load_all_async`.
+
+    Attributes:
+        loaded: The accounts loaded, in the order they got ready.
+        failed: The accounts that ran out of attempts.
+        failures: The reason of every failed attempt ("<exception type>: <message>", a "TimeoutError" for a login
+            past its timeout), per account.
+        callback_errors: The exceptions raised by the callback, per account (the account stays loaded).
+        login_latencies: The seconds every successful login and load took.
+        attempts: The number of attempts started.
+    """
+    loaded: list[AccountData] = field(default_factory=list)
+    failed: list[AccountData] = field(default_factory=list)
+    failures: dict[AccountData, list[str]] = field(default_factory=dict)
+    callback_errors: dict[AccountData, BaseException] = field(default_factory=dict)
+    login_latencies: list[float] = field(default_factory=list)
+    attempts: int = 0
+
+    @property
+    def failure_reasons(self) -> Counter:
+        """
+        The number of failed attempts per exception type.
+        """
+        return Counter(reason.partition(":")[0] for reasons in self.failures.values() for reason in reasons)
+
+    def latency_percentiles(self, percents: typing.Iterable[float] = (50, 90, 99)) -> dict[float, float]:
+        return {percent: percentile(self.login_latencies, percent) for percent in percents}
+
+
+class AccountLoadAttempt:
+    """
+    One attempt at loading an account, shared by the pipeline and the thread loading it.
+
+    The attempt is loading until either the thread claims it (the account data is ready, it can no longer
+    time out) or the pipeline abandons it (past its timeout, the account must not be updated anymore).
+    """
+    def __init__(self, account: AccountData, number: int, started_at: float, deadline: float | None, lock: threading.Lock):
+        self.account = account
+        self.number = number
+        self.started_at = started_at
+        self.deadline = deadline
+        self.retry_at: float | None = None
+        self._state = "loading"
+        self._lock = lock
+
+    @property
+    def abandoned(self) -> bool:
+        return self._state == "abandoned"
+
+    @property
+    def claimed(self) -> bool:
+        return self._state == "claimed"
+
+    def claim(self) -> bool:
+        """
+        Returns False when the attempt was abandoned, otherwise makes it impossible to abandon and returns True.
+        """
+        with self._lock:
+            if self._state == "abandoned":
+                return False
+            self._state = "claimed"
+            return True
+
+    def abandon_if_late(self, now: float) -> bool:
+        """
+        Abandons the attempt if it is still loading past its deadline. Returns whether it was abandoned.
+        """
+        with self._lock:
+            if self._state != "loading" or self.deadline is None or self.deadline > now:
+                return False
+            self._state = "abandoned"
+            return True
+
+
+class AccountLoadPipeline:
+    """
+    Keeps up to `max_in_flight` accounts loading, starting the next one as soon as one ends.
+
+    Every attempt runs in its own daemon thread : an attempt past its timeout is abandoned and frees its slot
+    right away. Its thread can't be stopped, so it is left to end on its own, without updating the account nor
+    running the callback, and the account is only tried again once that thread ended. A failed attempt is tried
+    again after `backoff * 2 ** (attempt - 1)` seconds, capped at `max_backoff`. An account loaded in the
+    meantime is not tried again.
+
+    Iterating the pipeline runs it and yields every account as soon as it is loaded, while the callbacks run
+    in the loading threads. `report` holds the outcome.
+
+    Args:
+        accounts (list[AccountData]): The accounts to load.
+        load_func (Callable[[AccountData, AccountLoadAttempt], tuple[Game_classes, Game_login] | None]): Loads an
+            account. It must only update the account once `attempt.claim()` returned True, and returns None
+            when it did not.
+        callback_func (ScriptType | None): Called with the game classes and the login of every loaded account.
+    """
+    def __init__(self,
+                 accounts: list[AccountData],
+                 load_func: typing.Callable[[AccountData, AccountLoadAttempt], tuple[Game_classes, Game_login] | None],
+                 callback_func: ScriptType | None = None,
+                 max_in_flight: int = 1,
+                 max_attempts: int = DEFAULT_MAX_LOGIN_ATTEMPTS,
+                 timeout: float | None = None,
+                 backoff: float = DEFAULT_LOGIN_BACKOFF,
+                 max_backoff: float = DEFAULT_MAX_LOGIN_BACKOFF):
+        if max_in_flight < 1:
+            raise ValueError(f"max_in_flight must be at least 1, got {max_in_flight}")
+        if max_attempts < 1:
+            raise ValueError(f"max_attempts must be at least 1, got {max_attempts}")
+        self.accounts = accounts
+        self.load_func = load_func
+        self.callback_func = callback_func
+        self.max_in_flight = max_in_flight
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.report = AccountLoadReport()
+        self._lock = threading.Lock()
+        self._events: queue.Queue[tuple[str, AccountLoadAttempt, typing.Any]] = queue.Queue()
+
+    def _worker(self, attempt: AccountLoadAttempt) -> None:
+        failure = None
+        callback_error = None
+        try:
+            loaded = self.load_func(attempt.account, attempt)
+            if loaded is not None and attempt.claim():
+                self._events.put(("loaded", attempt, time.monotonic() - attempt.started_at))
+                if self.callback_func is not None:
+                    try:
+                        self.callback_func(*loaded)
+                    except Exception as error:
+                        callback_error = error
+        except Exception as error:
+            failure = f"{type(error).__name__}: {error}"
+        finally:
+            self._events.put(("exited", attempt, (failure, callback_error)))
+
+    def _retry_delay(self, attempt_number: int) -> float:
+        return min(self.max_backoff, self.backoff * 2 ** (attempt_number - 1))
+
+    def __iter__(self) -> typing.Generator[AccountData, None, None]:
+        now = time.monotonic()
+        # (start time, order, account, attempt number)
+        waiting = [(now, order, account, 1) for order, account in enumerate(self.accounts)]
+        order = len(waiting)
+        in_flight: set[AccountLoadAttempt] = set()
+        # The abandoned attempts whose thread still runs, their account is tried again once it ended
+        lingering: set[AccountLoadAttempt] = set()
+
+        def schedule_retry(attempt: AccountLoadAttempt, start_at: float) -> None:
+            nonlocal order
+            heapq.heappush(waiting, (start_at, order, attempt.account, attempt.number + 1))
+            order += 1
+
+        def attempt_failed(attempt: AccountLoadAttempt, reason: str) -> bool:
+            """
+            Records the failure. Returns whether the account is tried again.
+            """
+            self.report.failures.setdefault(attempt.account, []).append(reason)
+            if attempt.number >= self.max_attempts:
+                self.report.failed.append(attempt.account)
+                return False
+            attempt.retry_at = time.monotonic() + self._retry_delay(attempt.number)
+            return True
+
+        while waiting or in_flight or lingering:
+            now = time.monotonic()
+            while waiting and waiting[0][0] <= now and len(in_flight) < self.max_in_flight:
+                _, _, account, number = heapq.heappop(waiting)
+                if account.is_loaded:
+                    continue
+                attempt = AccountLoadAttempt(account=account,
+                                             number=number,
+                                             started_at=now,
+                                             deadline=None if self.timeout is None else now + self.timeout,
+                                             lock=self._lock)
+                in_flight.add(attempt)
+                self.report.attempts += 1
+                threading.Thread(target=self._worker, args=(attempt,), daemon=True).start()
+
+            # Wakes up for an event, the next retry or the next login deadline (a claimed attempt can't time out)
+            wake_times = [attempt.deadline for attempt in in_flight if attempt.deadline is not None and not attempt.claimed]
+            if waiting and len(in_flight) < self.max_in_flight:
+                wake_times.append(waiting[0][0])
+            try:
+                event, attempt, value = self._events.get(timeout=max(0.0, min(wake_times) - now) if wake_times else None)
+            except queue.Empty:
+                event = None
+
+            if event == "loaded":
+                self.report.login_latencies.append(value)
+                self.report.loaded.append(attempt.account)
+                yield attempt.account
+            elif event == "exited" and attempt in lingering:
+                lingering.discard(attempt)
+                schedule_retry(attempt, start_at=max(attempt.retry_at, time.monotonic()))
+            elif event == "exited" and attempt in in_flight:
+                in_flight.discard(attempt)
+                failure, callback_error = value
+                if callback_error is not None:
+                    self.report.callback_errors[attempt.account] = callback_error
+                if failure is not None and attempt_failed(attempt, failure):
+                    schedule_retry(attempt, start_at=attempt.retry_at)
+
+            now = time.monotonic()
+            for attempt in list(in_flight):
+                if attempt.abandon_if_late(now):
+                    in_flight.discard(attempt)
+                    if attempt_failed(attempt, f"TimeoutError: not loaded after {self.timeout} seconds"):
+                        lingering.add(attempt)
+
+    def run(self) -> AccountLoadReport:
+        for _ in self:
+            pass
+        return self.report
+
+
 class CompleteAccountData:
     def __init__(self , accounts : list[Game_login]):
         
@@ -133,6 +381,31 @@ class CompleteAccountData:
         if self._sets is None:
             sets = get_item_sets(requests_handler = game_classes.handler)
             self._sets = sets
+    def _load_account(self,
+                      account_data: AccountData,
+                      session_builder_func: SessionBuilderFuncType | None = None,
+                      attempt: AccountLoadAttempt | None = None
+                      ) -> tuple[Game_classes, Game_login] | None:
+        """
+        Logs the account in and loads its data. Returns None, leaving the account as it was, when the attempt
+        was abandoned before its data was ready.
+        """
+        load_generator = account_data.load(session_builder_func=session_builder_func,
+                                           claim=attempt.claim if attempt is not None else lambda: True)
+
+        game_classes , login = next(load_generator)
+        if attempt is not None and attempt.abandoned:
+            load_generator.close()
+            return None
+
+        self._load_sets(game_classes = game_classes)
+
+        #consume the rest of the generator
+        for _ in load_generator:
+            pass
+        if attempt is not None and attempt.abandoned:
+            return None
+        return game_classes , login
     def _load_account_async(self,
                             account_data: AccountData,
                             session_builder_func: SessionBuilderFuncType,
@@ -141,15 +414,8 @@ class CompleteAccountData:
         """
         Helper function to load an account asynchronously. 
         """
-        load_generator = account_data.load(session_builder_func=session_builder_func)
-        
-        game_classes , login = next(load_generator)
-            
-        self._load_sets(game_classes = game_classes)
-        
-        #consume the rest of the generator
-        for _ in load_generator:
-            pass
+        game_classes , login = self._load_account(account_data = account_data ,
+                                                  session_builder_func = session_builder_func)
         if callback_func:
             callback_func(game_classes,login)
     def load_all(self, 
@@ -163,60 +429,77 @@ class CompleteAccountData:
                 session_builder_func=session_builder_func,
                 callback_func= callback_func
             )
-    def _load_all_async_recursive(self,
-                                  session_builder_func: SessionBuilderFuncType,
-                                  callback_func: ScriptType | None = None,
-                                  batch_size: int | None = None):
-        """
-        Recursively loads accounts asynchronously until all are loaded.
-        """
-        # Check which accounts are not yet loaded
+    def _load_pipeline(self,
+                       session_builder_func: SessionBuilderFuncType | None = None,
+                       callback_func: ScriptType | None = None,
+                       batch_size: int | None = None,
+                       max_attempts: int = DEFAULT_MAX_LOGIN_ATTEMPTS,
+                       timeout: float | None = None,
+                       backoff: float = DEFAULT_LOGIN_BACKOFF,
+                       max_backoff: float = DEFAULT_MAX_LOGIN_BACKOFF) -> AccountLoadPipeline:
         unloaded_accounts = [account for account in self.accounts if not account.is_loaded]
+        return AccountLoadPipeline(
+            accounts = unloaded_accounts,
+            load_func = lambda account_data , attempt: self._load_account(account_data = account_data,
+                                                                         session_builder_func = session_builder_func,
+                                                                         attempt = attempt),
+            callback_func = callback_func,
+            max_in_flight = batch_size or max(1, len(unloaded_accounts)),
+            max_attempts = max_attempts,
+            timeout = timeout,
+            backoff = backoff,
+            max_backoff = max_backoff
+        )
 
-        if not unloaded_accounts:
-            # All accounts are loaded, end recursion
-            return
-
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            if batch_size is None:
-                # If batch_size is None, load all unloaded accounts at once
-                futures = [
-                    executor.submit(self._load_account_async, account_data, session_builder_func, callback_func)
-                    for account_data in unloaded_accounts
-                ]
-            else:
-                # Split the unloaded accounts into batches
-                batches = [unloaded_accounts[i:i+batch_size] for i in range(0, len(unloaded_accounts), batch_size)]
-
-                for batch in batches:
-                    # Create a list of future tasks for each batch
-                    futures = [
-                        executor.submit(self._load_account_async, account_data, session_builder_func, callback_func)
-                        for account_data in batch
-                    ]
-
-            # Wait for all futures to complete
-            done, not_done = concurrent.futures.wait(futures)
-
-            # Check for exceptions and raise them
-            #for future in done:
-            #    future.result()
-
-        # Recurse until all accounts are loaded
-        self._load_all_async_recursive(session_builder_func=session_builder_func,
-                                       callback_func=callback_func,
-                                       batch_size=batch_size)
+    def iter_load_all_async(self,
+                            session_builder_func: SessionBuilderFuncType | None = None,
+                            callback_func: ScriptType | None = None,
+                            batch_size: int | None = None,
+                            max_attempts: int = DEFAULT_MAX_LOGIN_ATTEMPTS,
+                            timeout: float | None = None,
+                            backoff: float = DEFAULT_LOGIN_BACKOFF,
+                            max_backoff: float = DEFAULT_MAX_LOGIN_BACKOFF
+                            ) -> typing.Generator[AccountData, None, AccountLoadReport]:
+        """
+        Loads the unloaded accounts, `batch_size` at a time (all at once by default), and yields every account
+        as soon as it is loaded. The generator returns the `AccountLoadReport`.
+        """
+        pipeline = self._load_pipeline(session_builder_func = session_builder_func,
+                                       callback_func = callback_func,
+                                       batch_size = batch_size,
+                                       max_attempts = max_attempts,
+                                       timeout = timeout,
+                                       backoff = backoff,
+                                       max_backoff = max_backoff)
+        yield from pipeline
+        return pipeline.report
 
     def load_all_async(self,
                        session_builder_func: SessionBuilderFuncType,
                        callback_func: ScriptType | None = None,
-                       batch_size: int | None = None):
+                       batch_size: int | None = None,
+                       max_attempts: int = DEFAULT_MAX_LOGIN_ATTEMPTS,
+                       timeout: float | None = None,
+                       backoff: float = DEFAULT_LOGIN_BACKOFF,
+                       max_backoff: float = DEFAULT_MAX_LOGIN_BACKOFF) -> AccountLoadReport:
         """
-        Public method to initiate recursive async loading.
+        Loads the unloaded accounts, keeping `batch_size` of them (all by default) loading at any time.
+
+        A new login starts as soon as one ends. A failed or timed out login is tried again after an exponential
+        backoff, at most `max_attempts` times per account. `callback_func` runs in the loading thread right
+        after its account is loaded.
+
+        Returns:
+            AccountLoadReport: The loaded and failed accounts, the login latencies and the failure reasons.
         """
-        self._load_all_async_recursive(session_builder_func=session_builder_func,
-                                       callback_func=callback_func,
-                                       batch_size=batch_size)
+        pipeline = self._load_pipeline(session_builder_func = session_builder_func,
+                                       callback_func = callback_func,
+                                       batch_size = batch_size,
+                                       max_attempts = max_attempts,
+                                       timeout = timeout,
+                                       backoff = backoff,
+                                       max_backoff = max_backoff)
+        return pipeline.run()
     def get_money(self) -> int:
         return sum([x.get_money() for x in self.accounts])
     
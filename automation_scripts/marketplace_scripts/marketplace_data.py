@@ -1,13 +1,50 @@
-from sqlalchemy import create_engine, Column, Integer, Float, DateTime, func , extract
+"""
+This module stores the marketplace offers seen by the observers and analyses their prices.
+
+Every observation batch is written with one bulk insert. An offer is stored once per price, keyed by its market
+offer id, price per unit and count : seeing it again unchanged only moves its `last_seen` time, seeing it with
+another price stores the new price as a new observation. An observer with a change feed only writes the offers that
+changed, and the last time the removed or repriced ones were listed. The offers are indexed by (item_id, timestamp),
+and the hourly and daily price rollups (count, min, max, average and 10th percentile per item) are updated with the
+offers each batch adds, so the analyses read buckets instead of every offer. The prices of the buckets written
+recently are kept sorted in memory, so a batch inserts its prices instead of sorting its buckets again.
+
+Classes:
+
+    MarketplaceOffer: An observed offer.
+    MarketplacePriceRollup: The price statistics of an item over an hour or a day.
+    PriceRollupData: A rollup, as returned by `MarketplaceDataAnalyser.price_history`.
+    MarketplaceDataAnalyser: Writes the offers and runs the analyses.
+    OfferSnapshotWriter: Writes offer batches from a background thread.
+"""
+import bisect
+import math
+import queue
+import threading
+import typing
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from sqlalchemy import (create_engine, Column, Integer, Float, DateTime, String, Index, func, extract,
+                        insert, update, delete, select, bindparam, inspect, text)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from datetime import datetime
 import matplotlib.pyplot as plt
 
-from the_west_inner.marketplace_buy import Marketplace_offer_list
+from the_west_inner.marketplace_buy import Marketplace_offer, Marketplace_offer_list
 
 Base = declarative_base()
 
+HOUR = 'hour'
+DAY = 'day'
+ROLLUP_GRANULARITIES = {HOUR: timedelta(hours=1), DAY: timedelta(days=1)}
+# The number of offer ids looked up in one IN clause
+OFFER_ID_CHUNK_SIZE = 500
+# The number of (item, granularity, bucket) whose sorted prices are kept in memory
+PRICE_BUCKET_CACHE_SIZE = 1024
+
+
 class MarketplaceOffer(Base):
     __tablename__ = 'marketplace_offers'
 
@@ -15,70 +52,461 @@ class MarketplaceOffer(Base):
     item_id = Column(Integer)
     item_price_per_unit = Column(Float)
     timestamp = Column(DateTime, default=datetime.utcnow)
+    offer_id = Column(Integer)
+    item_count = Column(Integer)
+    seller_id = Column(Integer)
+    town_id = Column(Integer)
+    last_seen = Column(DateTime)
+
+    __table_args__ = (Index('ix_marketplace_offers_item_id_timestamp', 'item_id', 'timestamp'),
+                      Index('ux_marketplace_offers_offer_price', 'offer_id', 'item_price_per_unit', 'item_count', unique=True))
+
+
+class MarketplacePriceRollup(Base):
+    __tablename__ = 'marketplace_price_rollups'
+
+    item_id = Column(Integer, primary_key=True)
+    granularity = Column(String, primary_key=True)
+    bucket_start = Column(DateTime, primary_key=True)
+    offer_count = Column(Integer, nullable=False)
+    price_sum = Column(Float, nullable=False)
+    min_price = Column(Float, nullable=False)
+    max_price = Column(Float, nullable=False)
+    p10_price = Column(Float, nullable=False)
+
+
+@dataclass
+class PriceRollupData:
+    item_id: int
+    granularity: str
+    bucket_start: datetime
+    offer_count: int
+    min_price: float
+    max_price: float
+    average_price: float
+    p10_price: float
+
+
+def bucket_start(timestamp: datetime, granularity: str) -> datetime:
+    if granularity == HOUR:
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def percentile_10(sorted_prices: list[float]) -> float:
+    """
+    The 10th percentile of sorted prices, by nearest rank.
+    """
+    return sorted_prices[max(0, math.ceil(0.1 * len(sorted_prices)) - 1)]
+
 
 class MarketplaceDataAnalyser:
     def __init__(self, database_url: str):
         self.engine = create_engine(database_url)
+        had_rollups = inspect(self.engine).has_table(MarketplacePriceRollup.__tablename__)
         Base.metadata.create_all(self.engine)
+        self._migrate()
         self.Session = sessionmaker(bind=self.engine)
+        # The sorted prices of the buckets written recently, least recently written first
+        self._bucket_prices: OrderedDict[tuple[int, str, datetime], list[float]] = OrderedDict()
+        if not had_rollups:
+            self.rebuild_rollups()
+
+    def _migrate(self) -> None:
+        """
+        Adds the columns and indexes missing from a database created by an older version.
+        """
+        table = MarketplaceOffer.__table__
+        inspector = inspect(self.engine)
+        existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+        with self.engine.begin() as connection:
+            for column in table.columns:
+                if column.name not in existing_columns:
+                    connection.execute(text(
+                        f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(self.engine.dialect)}'
+                    ))
+        for index in table.indexes:
+            index.create(self.engine, checkfirst=True)
+
+    def _known_offer_keys(self, session, offer_ids: list[int]) -> set[tuple]:
+        """
+        Returns the (offer_id, item_price_per_unit, item_count) stored for the offer ids.
+        """
+        known = set()
+        for start in range(0, len(offer_ids), OFFER_ID_CHUNK_SIZE):
+            known.update(tuple(row) for row in session.execute(
+                select(MarketplaceOffer.offer_id, MarketplaceOffer.item_price_per_unit, MarketplaceOffer.item_count)
+                .where(MarketplaceOffer.offer_id.in_(offer_ids[start:start + OFFER_ID_CHUNK_SIZE]))
+            ))
+        return known
+
+    def _refresh_rollups(self, session, buckets: typing.Iterable[tuple[int, str, datetime]]) -> None:
+        """
+        Recomputes the rollups of the given (item_id, granularity, bucket_start) from the offers of their bucket.
+        """
+        for item_id, granularity, start in buckets:
+            prices = sorted(session.scalars(
+                select(MarketplaceOffer.item_price_per_unit).where(
+                    MarketplaceOffer.item_id == item_id,
+                    MarketplaceOffer.timestamp >= start,
+                    MarketplaceOffer.timestamp < start + ROLLUP_GRANULARITIES[granularity],
+                    MarketplaceOffer.item_price_per_unit.is_not(None)
+                )
+            ))
+            if not prices:
+                session.execute(delete(MarketplacePriceRollup).where(
+                    MarketplacePriceRollup.item_id == item_id,
+                    MarketplacePriceRollup.granularity == granularity,
+                    MarketplacePriceRollup.bucket_start == start
+                ))
+                continue
+            session.merge(MarketplacePriceRollup(
+                item_id=item_id,
+                granularity=granularity,
+                bucket_start=start,
+                offer_count=len(prices),
+                price_sum=sum(prices),
+                min_price=prices[0],
+                max_price=prices[-1],
+                p10_price=percentile_10(prices)
+            ))
+
+    def _sorted_bucket_prices(self, session, bucket: tuple[int, str, datetime], new_prices: list[float]) -> list[float]:
+        """
+        The sorted prices of a bucket, with the new prices of the batch : inserted into the prices kept in memory, or
+        read with them from the database when the bucket isn't kept.
+        """
+        prices = self._bucket_prices.get(bucket)
+        if prices is not None:
+            self._bucket_prices.move_to_end(bucket)
+            for price in new_prices:
+                bisect.insort(prices, price)
+            return prices
+        item_id, granularity, start = bucket
+        prices = sorted(session.scalars(
+            select(MarketplaceOffer.item_price_per_unit).where(
+                MarketplaceOffer.item_id == item_id,
+                MarketplaceOffer.timestamp >= start,
+                MarketplaceOffer.timestamp < start + ROLLUP_GRANULARITIES[granularity],
+                MarketplaceOffer.item_price_per_unit.is_not(None)
+            )
+        ))
+        self._bucket_prices[bucket] = prices
+        if len(self._bucket_prices) > PRICE_BUCKET_CACHE_SIZE:
+            self._bucket_prices.popitem(last=False)
+        return prices
+
+    def _add_to_rollups(self, session, rows: list[dict]) -> None:
+        """
+        Adds newly stored offers to the rollups of their buckets : the count, sum, minimum and maximum are updated
+        from the new prices only, the 10th percentile is read from the sorted prices of the bucket, into which the
+        new prices are inserted.
+        """
+        batches: dict[tuple[int, str, datetime], list[float]] = {}
+        for row in rows:
+            if row['item_price_per_unit'] is None:
+                continue
+            for granularity in ROLLUP_GRANULARITIES:
+                batches.setdefault((row['item_id'], granularity, bucket_start(row['timestamp'], granularity)),
+                                   []).append(row['item_price_per_unit'])
+        for bucket, prices in batches.items():
+            bucket_prices = self._sorted_bucket_prices(session, bucket, prices)
+            rollup = session.get(MarketplacePriceRollup, bucket)
+            if rollup is None:
+                item_id, granularity, start = bucket
+                session.add(MarketplacePriceRollup(
+                    item_id=item_id,
+                    granularity=granularity,
+                    bucket_start=start,
+                    offer_count=len(prices),
+                    price_sum=sum(prices),
+                    min_price=min(prices),
+                    max_price=max(prices),
+                    p10_price=percentile_10(bucket_prices)
+                ))
+                continue
+            rollup.offer_count += len(prices)
+            rollup.price_sum += sum(prices)
+            rollup.min_price = min(rollup.min_price, min(prices))
+            rollup.max_price = max(rollup.max_price, max(prices))
+            rollup.p10_price = percentile_10(bucket_prices)
+
+    def save_offers_to_database(self,
+                                offers_list: Marketplace_offer_list | typing.Iterable[Marketplace_offer],
+                                timestamp: datetime | None = None,
+                                retired_offers: typing.Iterable[tuple[Marketplace_offer, datetime | None]] = ()) -> int:
+        """
+        Stores a batch of observed offers in one transaction.
+
+        Offers already stored with the same price and count (within the batch or from an earlier one) only get
+        their `last_seen` updated, an offer with a new price is stored again. The new offers are added to the
+        rollups of their buckets.
+
+        Args:
+            retired_offers: The offers no longer listed at their stored price (see `OfferDiff.retired_offers`),
+                with the last time they were seen. Their stored row gets that `last_seen`, unless the batch saw
+                them again.
+
+        Returns:
+            int: The number of new offers stored.
+        """
+        timestamp = timestamp or datetime.utcnow()
+        rows_by_key: dict[tuple, dict] = {}
+        rows_without_id: list[dict] = []
+        for offer in offers_list:
+            row = {
+                'item_id': offer.item_id,
+                'item_price_per_unit': offer.item_price_per_unit,
+                'timestamp': timestamp,
+                'offer_id': offer.dict_offer.get('market_offer_id'),
+                'item_count': offer.dict_offer.get('item_count'),
+                'seller_id': offer.dict_offer.get('seller_player_id'),
+                'town_id': offer.dict_offer.get('market_town_id'),
+                'last_seen': timestamp
+            }
+            if row['offer_id'] is None:
+                rows_without_id.append(row)
+            else:
+                rows_by_key.setdefault((row['offer_id'], row['item_price_per_unit'], row['item_count']), row)
 
-    def save_offers_to_database(self, offers_list : Marketplace_offer_list):
         with self.Session() as session:
-            for offer in offers_list:
-                marketplace_offer = MarketplaceOffer(
-                    item_id=offer.item_id,
-                    item_price_per_unit=offer.item_price_per_unit
+            known_keys = self._known_offer_keys(session, list({offer_id for offer_id, _, _ in rows_by_key}))
+            new_rows = rows_without_id + [row for key, row in rows_by_key.items() if key not in known_keys]
+            last_seen_rows = [{'seen_offer_id': offer_id, 'seen_price': price, 'seen_count': count, 'seen_at': timestamp}
+                              for offer_id, price, count in rows_by_key if (offer_id, price, count) in known_keys]
+            for offer, last_seen in retired_offers:
+                key = (offer.dict_offer.get('market_offer_id'), offer.item_price_per_unit, offer.dict_offer.get('item_count'))
+                if key[0] is not None and last_seen is not None and key not in rows_by_key:
+                    last_seen_rows.append({'seen_offer_id': key[0], 'seen_price': key[1], 'seen_count': key[2],
+                                           'seen_at': last_seen})
+            if new_rows:
+                session.execute(insert(MarketplaceOffer), new_rows)
+            if last_seen_rows:
+                offers_table = MarketplaceOffer.__table__
+                session.execute(
+                    update(offers_table)
+                    .where(offers_table.c.offer_id == bindparam('seen_offer_id'),
+                           offers_table.c.item_price_per_unit.is_not_distinct_from(bindparam('seen_price')),
+                           offers_table.c.item_count.is_not_distinct_from(bindparam('seen_count')))
+                    .values(last_seen=bindparam('seen_at')),
+                    last_seen_rows
                 )
-                session.add(marketplace_offer)
+            try:
+                self._add_to_rollups(session, new_rows)
+                session.commit()
+            except BaseException:
+                # The sorted prices may hold offers that were rolled back
+                self._bucket_prices.clear()
+                raise
+        return len(new_rows)
+
+    def rebuild_rollups(self, item_id: int | None = None) -> None:
+        """
+        Recomputes the rollups of an item (of every item by default) from the stored offers.
+        """
+        self._bucket_prices.clear()
+        with self.Session() as session:
+            offers = select(MarketplaceOffer.item_id, MarketplaceOffer.timestamp).distinct()
+            rollups = delete(MarketplacePriceRollup)
+            if item_id is not None:
+                offers = offers.where(MarketplaceOffer.item_id == item_id)
+                rollups = rollups.where(MarketplacePriceRollup.item_id == item_id)
+            session.execute(rollups)
+            buckets = {(offer_item_id, granularity, bucket_start(offer_timestamp, granularity))
+                       for offer_item_id, offer_timestamp in session.execute(offers)
+                       if offer_timestamp is not None
+                       for granularity in ROLLUP_GRANULARITIES}
+            self._refresh_rollups(session, buckets)
             session.commit()
 
+    def price_history(self,
+                      item_id: int,
+                      granularity: str = DAY,
+                      start_date: datetime | None = None,
+                      end_date: datetime | None = None) -> list[PriceRollupData]:
+        """
+        Returns the hourly or daily rollups of an item, oldest first.
+        """
+        query = select(MarketplacePriceRollup).where(MarketplacePriceRollup.item_id == item_id,
+                                                    MarketplacePriceRollup.granularity == granularity)
+        if start_date is not None:
+            query = query.where(MarketplacePriceRollup.bucket_start >= bucket_start(start_date, granularity))
+        if end_date is not None:
+            query = query.where(MarketplacePriceRollup.bucket_start <= end_date)
+        with self.Session() as session:
+            rollups = session.scalars(query.order_by(MarketplacePriceRollup.bucket_start)).all()
+        return [PriceRollupData(item_id=rollup.item_id,
+                                granularity=rollup.granularity,
+                                bucket_start=rollup.bucket_start,
+                                offer_count=rollup.offer_count,
+                                min_price=rollup.min_price,
+                                max_price=rollup.max_price,
+                                average_price=rollup.price_sum / rollup.offer_count,
+                                p10_price=rollup.p10_price) for rollup in rollups]
+
     def calculate_average_price(self, item_id):
         with self.Session() as session:
-            average_price = session.query(func.avg(MarketplaceOffer.item_price_per_unit)).filter_by(item_id=item_id).scalar()
-        return average_price
+            offer_count, price_sum = session.execute(
+                select(func.sum(MarketplacePriceRollup.offer_count), func.sum(MarketplacePriceRollup.price_sum)).where(
+                    MarketplacePriceRollup.item_id == item_id,
+                    MarketplacePriceRollup.granularity == DAY
+                )
+            ).one()
+        return price_sum / offer_count if offer_count else None
 
     def eliminate_outliers(self, item_id, threshold):
         average_price = self.calculate_average_price(item_id)
+        if average_price is None:
+            return
         upper_limit = average_price * threshold
         with self.Session() as session:
             session.query(MarketplaceOffer).filter(MarketplaceOffer.item_id == item_id, MarketplaceOffer.item_price_per_unit > upper_limit).delete()
+            session.commit()
+        self.rebuild_rollups(item_id=item_id)
 
-    def create_item_tendency_graph(self, item_id):
-        with self.Session() as session:
-            offers = session.query(MarketplaceOffer.timestamp, MarketplaceOffer.item_price_per_unit).filter_by(item_id=item_id).all()
-
-        timestamps, prices = zip(*offers)
+    def create_item_tendency_graph(self, item_id, granularity: str = HOUR):
+        history = self.price_history(item_id=item_id, granularity=granularity)
+        if not history:
+            print("No offers found for this item.")
+            return
 
-        plt.plot(timestamps, prices, label=f'Item {item_id} Prices')
+        timestamps = [rollup.bucket_start for rollup in history]
+        plt.plot(timestamps, [rollup.average_price for rollup in history], label=f'Item {item_id} average price')
+        plt.plot(timestamps, [rollup.p10_price for rollup in history], label=f'Item {item_id} 10th percentile')
         plt.xlabel('Timestamp')
         plt.ylabel('Price per Unit')
         plt.title('Item Tendency Graph')
         plt.legend()
         plt.show()
 
+    def _hourly_counts(self, session, item_id, start_date, end_date) -> list[tuple[datetime, int, float]]:
+        """
+        Returns (hour, offer count, price sum) over [start_date, end_date] : the whole hours come from the rollups,
+        the partial hours at both ends from the offers.
+        """
+        first_whole_hour = bucket_start(start_date, HOUR)
+        if first_whole_hour < start_date:
+            first_whole_hour += ROLLUP_GRANULARITIES[HOUR]
+        # The offers of end_date itself are included, so its hour is only whole when end_date is the last instant
+        end_hour = bucket_start(end_date, HOUR)
+
+        def offers_between(start, end, include_end) -> list[tuple[datetime, int, float]]:
+            hour = extract('hour', MarketplaceOffer.timestamp)
+            day = func.date(MarketplaceOffer.timestamp)
+            rows = session.execute(
+                select(day, hour, func.count(), func.sum(MarketplaceOffer.item_price_per_unit)).where(
+                    MarketplaceOffer.item_id == item_id,
+                    MarketplaceOffer.timestamp >= start,
+                    MarketplaceOffer.timestamp <= end if include_end else MarketplaceOffer.timestamp < end
+                ).group_by(day, hour)
+            ).all()
+            return [(datetime.fromisoformat(str(row_day)) + timedelta(hours=int(row_hour)), count, price_sum)
+                    for row_day, row_hour, count, price_sum in rows]
+
+        if first_whole_hour >= end_hour:
+            return offers_between(start_date, end_date, include_end=True)
+
+        hours = offers_between(start_date, first_whole_hour, include_end=False)
+        hours += [(rollup_start, offer_count, price_sum) for rollup_start, offer_count, price_sum in session.execute(
+            select(MarketplacePriceRollup.bucket_start, MarketplacePriceRollup.offer_count, MarketplacePriceRollup.price_sum).where(
+                MarketplacePriceRollup.item_id == item_id,
+                MarketplacePriceRollup.granularity == HOUR,
+                MarketplacePriceRollup.bucket_start >= first_whole_hour,
+                MarketplacePriceRollup.bucket_start < end_hour
+            )
+        )]
+        hours += offers_between(end_hour, end_date, include_end=True)
+        return hours
+
     def limited_time_analysis(self, item_id, start_date, end_date):
         with self.Session() as session:
-            offers = session.query(MarketplaceOffer).filter(
-                MarketplaceOffer.item_id == item_id,
-                MarketplaceOffer.timestamp >= start_date,
-                MarketplaceOffer.timestamp <= end_date
-            ).all()
+            hours = self._hourly_counts(session, item_id, start_date, end_date)
 
-        if not offers:
+        offer_count = sum(count for _, count, _ in hours)
+        if not offer_count:
             print("No offers found within the specified time range.")
             return
 
-        # Extract day, month, and year from the timestamp
-        days = [offer.timestamp.day for offer in offers]
-        months = [offer.timestamp.month for offer in offers]
-        years = [offer.timestamp.year for offer in offers]
+        # Count the offers by day, month, and year
+        days, months, years = {}, {}, {}
+        for hour, count, _ in hours:
+            for counter, key in ((days, hour.day), (months, hour.month), (years, hour.year)):
+                counter[key] = counter.get(key, 0) + count
 
         # Perform analysis based on your specific requirements
-        average_price = sum(offer.item_price_per_unit for offer in offers) / len(offers)
+        average_price = sum(price_sum or 0 for _, _, price_sum in hours) / offer_count
 
         print(f"Analysis for Item {item_id} within the time range:")
-        print(f"Number of offers: {len(offers)}")
+        print(f"Number of offers: {offer_count}")
         print(f"Average price per unit: {average_price}")
-        print(f"Day with the most offers: {max(set(days), key=days.count)}")
-        print(f"Month with the most offers: {max(set(months), key=months.count)}")
-        print(f"Year with the most offers: {max(set(years), key=years.count)}")
+        print(f"Day with the most offers: {max(days, key=days.get)}")
+        print(f"Month with the most offers: {max(months, key=months.get)}")
+        print(f"Year with the most offers: {max(years, key=years.get)}")
+
+
+class OfferSnapshotWriter:
+    """
+    Writes the offer batches of the observers to the database from a background thread, so that a search
+    never waits on the database.
+
+    Attributes:
+        marketplace_data_analyser (MarketplaceDataAnalyser): Where the batches are written.
+        max_queue_size (int): The batches waiting at most, `submit` blocks past it (0 for no limit).
+    """
+    def __init__(self, marketplace_data_analyser: MarketplaceDataAnalyser, max_queue_size: int = 0):
+        self.marketplace_data_analyser = marketplace_data_analyser
+        self._queue: queue.Queue[tuple[list[Marketplace_offer], datetime, list] | None] = queue.Queue(maxsize=max_queue_size)
+        self.written_batches = 0
+        self.stored_offers = 0
+        self.errors = 0
+        self.last_error: BaseException | None = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = self._queue.get()
+            try:
+                if batch is None:
+                    return
+                offers, timestamp, retired_offers = batch
+                self.stored_offers += self.marketplace_data_analyser.save_offers_to_database(offers, timestamp=timestamp,
+                                                                                             retired_offers=retired_offers)
+                self.written_batches += 1
+            except Exception as error:
+                # A failed batch is dropped, the next searches write new snapshots
+                self.errors += 1
+                self.last_error = error
+            finally:
+                self._queue.task_done()
+
+    def submit(self,
+               offers: typing.Iterable[Marketplace_offer],
+               timestamp: datetime | None = None,
+               retired_offers: typing.Iterable[tuple[Marketplace_offer, datetime | None]] = ()) -> None:
+        """
+        Queues a batch of offers, observed at `timestamp` (now by default), and the offers it retired
+        (see `MarketplaceDataAnalyser.save_offers_to_database`).
+        """
+        self._queue.put((list(offers), timestamp or datetime.utcnow(), list(retired_offers)))
+
+    def flush(self) -> None:
+        """
+        Waits until every queued batch is written.
+        """
+        self._queue.join()
+
+    def close(self, timeout: float | None = None) -> None:
+        """
+        Writes the queued batches and stops the thread. Closing a stopped writer does nothing.
+        """
+        if not self._thread.is_alive():
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def stats(self) -> dict[str, int]:
+        return {"queued_batches": self._queue.qsize(),
+                "written_batches": self.written_batches,
+                "stored_offers": self.stored_offers,
+                "errors": self.errors}
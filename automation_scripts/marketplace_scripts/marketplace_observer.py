@@ -1,59 +1,251 @@
+
+import atexit
+import threading
+import time
+import typing
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from the_west_inner.login import Game_login
 from the_west_inner.currency import Currency
 from the_west_inner.marketplace import build_marketplace_managers,Marketplace_managers
 from the_west_inner.marketplace_buy import Marketplace_buy_manager,Marketplace_offer,Marketplace_offer_list
 from the_west_inner.items import Items
+from the_west_inner.marketplace_feed import MarketplaceChangeFeed, OfferDiff
 
 from the_west_inner.game_classes import Game_classes
 
-from .marketplace_data import MarketplaceDataAnalyser
+from .marketplace_data import MarketplaceDataAnalyser, OfferSnapshotWriter
+
+DEFAULT_SEARCH_WORKERS = 4
 
 @dataclass
 class MarketBuyTarget:
     item_id : int
     item_price_per_unit : int
     item_max_price : int = None
+    priority : float = 1.0
+
+    def matches(self, offer: Marketplace_offer) -> bool:
+        """
+        Whether the offer is cheap enough to be bought.
+        """
+        if self.item_max_price is None:
+            return offer.item_price_per_unit <= self.item_price_per_unit
+        return offer.item_price_per_unit <= self.item_price_per_unit and offer.item_price < self.item_max_price
+
+@dataclass
+class OfferSearchResult:
+    """
+    The outcome of the search of one target.
+
+    Attributes:
+        offers: Every offer read.
+        matching: The number of offers the target matched.
+        bought: The number of those offers bought.
+        unaffordable: The number of matching offers skipped for lack of money.
+        failed_buys: The exceptions raised by the buys that failed (an offer sold meanwhile, a game error).
+        latency: The seconds the search and the buys took.
+        error: The exception that ended the search, if any.
+        diff: The changes since the previous search, when the observer has a change feed.
+    """
+    item_id : int
+    offers : list[Marketplace_offer] = field(default_factory=list)
+    matching : int = 0
+    bought : int = 0
+    unaffordable : int = 0
+    failed_buys : list[BaseException] = field(default_factory=list)
+    latency : float = 0.0
+    error : BaseException | None = None
+    diff : OfferDiff | None = None
+
+@dataclass
+class SweepReport:
+    """
+    The outcome of `MarketplaceProductObserver.search_all`.
+    """
+    started_at : datetime
+    latency : float
+    results : list[OfferSearchResult]
+
+    @property
+    def hits(self) -> int:
+        return sum(result.matching for result in self.results)
+
+    @property
+    def bought(self) -> int:
+        return sum(result.bought for result in self.results)
+
+    @property
+    def failed_buys(self) -> int:
+        return sum(len(result.failed_buys) for result in self.results)
+
+    @property
+    def errors(self) -> list[OfferSearchResult]:
+        return [result for result in self.results if result.error is not None]
+
+    def raise_errors(self) -> None:
+        """
+        Raises the error of the first failed search, if any (an expired session, a network error, ...).
+        The failed buys are per offer and are not raised.
+        """
+        errors = self.errors
+        if errors:
+            raise errors[0].error
 
 class MarketplaceProductObserver():
-    
+
     def __init__(self ,
                  marketplace_buy_manager : Marketplace_buy_manager,
                  currency : Currency ,
                  items : Items ,
                  marketplace_data_analyser : MarketplaceDataAnalyser,
-                 item_list : list[MarketBuyTarget]):
+                 item_list : list[MarketBuyTarget],
+                 stop_condition : typing.Callable[[MarketBuyTarget,Marketplace_offer],bool] | None = None,
+                 max_pages : int | None = None,
+                 snapshot_writer : OfferSnapshotWriter | None = None,
+                 change_feed : MarketplaceChangeFeed | None = None):
+        """
+        Args:
+            stop_condition: Ends the search of a target at the first offer it returns True for (that offer and the
+                pages after it are neither bought nor saved). By default every page is read.
+            max_pages: The maximum number of result pages read per target.
+            snapshot_writer: Saves the offers read in the background. By default they are saved before the
+                search returns.
+            change_feed: Compares every search with the previous one of the target. With a feed only the new
+                offers, the ones with a new price and the matching ones not bought yet are evaluated for buying,
+                and the feed's subscribers get the changes. Only the new and repriced offers are saved, along with
+                the last time the removed and repriced ones were seen : an offer listed unchanged isn't written again.
+        """
         self.marketplace_buy_manager = marketplace_buy_manager
         self.items = items
         self.currency = currency
         self.marketplace_data_analyser = marketplace_data_analyser
         self.item_list = item_list
         self.item_dict = {x.item_id : x for x in self.item_list}
+        self.stop_condition = stop_condition
+        self.max_pages = max_pages
+        self.snapshot_writer = snapshot_writer
+        self.change_feed = change_feed
+        # The matching offers not bought yet (unaffordable or failed buys) per target, evaluated again every search
+        self._unbought_offer_ids: dict[int, set[int]] = {}
+        # The money check and the buy happen together, concurrent searches can't spend the same money twice
+        self._buy_lock = threading.Lock()
     def _item_dict(self,item_id:int) -> dict:
         return self.items.get_item(item_id = item_id)
-        
-    def _search_for_item(self, item_target: MarketBuyTarget):
-        items_offers: Marketplace_offer_list = self.marketplace_buy_manager._search_item(item_id=item_target.item_id)
-        
-        def filter_func(offer: Marketplace_offer) -> bool:
-            if item_target.item_max_price is None:
-                return offer.item_price_per_unit <= item_target.item_price_per_unit
-            return offer.item_price_per_unit <= item_target.item_price_per_unit and offer.item_price < item_target.item_max_price
-        
-        filtered_item_offers = items_offers.filter(condition_func=filter_func)
-        filtered_item_offers.buy_all(player_currency=self.currency)
-
-        # Save all offers to the database
-        self.marketplace_data_analyser.save_offers_to_database(items_offers)
-    def search_item(self,item_id : int):
-        self._search_for_item(item_target = self.item_dict.get(item_id))
-    
-    def search_all(self):
-        for item_target in self.item_list:
-            self._search_for_item(item_target=item_target)
-    
+
+    def _buy(self, offer: Marketplace_offer) -> bool:
+        """
+        Buys the offer if the player can afford it. Returns whether it was bought.
+        """
+        with self._buy_lock:
+            if self.currency.total_money < offer.item_price:
+                return False
+            response = offer.buy_instantly(handler=self.marketplace_buy_manager.handler)
+            self.currency.modify_money(new_cash=response['money'], new_deposit=response['deposit'])
+            return True
+
+    def _search_for_item(self, item_target: MarketBuyTarget) -> OfferSearchResult:
+        """
+        Reads the offers of the target as their pages arrive and buys every matching offer as soon as it is read.
+        """
+        started = time.perf_counter()
+        observed_at = datetime.utcnow()
+        result = OfferSearchResult(item_id=item_target.item_id)
+        stop_when = None
+        if self.stop_condition is not None:
+            stop_when = lambda offer: self.stop_condition(item_target, offer)
+
+        unbought_offer_ids = self._unbought_offer_ids.setdefault(item_target.item_id, set())
+        for offer in self.marketplace_buy_manager.iter_offers(item_id=item_target.item_id,
+                                                              stop_when=stop_when,
+                                                              max_pages=self.max_pages):
+            result.offers.append(offer)
+            if (self.change_feed is not None and offer.offer_id not in unbought_offer_ids
+                    and not self.change_feed.has_changed(item_id=item_target.item_id, offer=offer)):
+                continue
+            unbought_offer_ids.discard(offer.offer_id)
+            if item_target.matches(offer):
+                result.matching += 1
+                unbought_offer_ids.add(offer.offer_id)
+                try:
+                    bought = self._buy(offer)
+                except Exception as error:
+                    # The other offers are still worth buying
+                    result.failed_buys.append(error)
+                    continue
+                if bought:
+                    unbought_offer_ids.discard(offer.offer_id)
+                    result.bought += 1
+                else:
+                    result.unaffordable += 1
+        if stop_when is None and self.max_pages is None:
+            # The offers no longer listed can't be bought anymore
+            unbought_offer_ids.intersection_update(offer.offer_id for offer in result.offers)
+
+        offers_to_save, retired_offers = result.offers, []
+        if self.change_feed is not None:
+            # A search cut short by the stop condition or the page limit can't report the removed offers
+            result.diff = self.change_feed.update(item_id=item_target.item_id,
+                                                  offers=result.offers,
+                                                  complete=stop_when is None and self.max_pages is None,
+                                                  observed_at=observed_at)
+            offers_to_save, retired_offers = result.diff.changed_offers, result.diff.retired_offers
+
+        # Save the offers to the database : without a feed every offer read (the unchanged ones only get their
+        # last seen time updated), with a feed only the changes
+        if (offers_to_save or retired_offers) and self.snapshot_writer is None:
+            self.marketplace_data_analyser.save_offers_to_database(offers_to_save, timestamp=observed_at,
+                                                                   retired_offers=retired_offers)
+        elif offers_to_save or retired_offers:
+            self.snapshot_writer.submit(offers_to_save, timestamp=observed_at, retired_offers=retired_offers)
+        result.latency = time.perf_counter() - started
+        return result
+
+    def search_target(self, item_target: MarketBuyTarget) -> OfferSearchResult:
+        """
+        Searches the target, reporting an error in the result instead of raising it.
+        """
+        started = time.perf_counter()
+        try:
+            return self._search_for_item(item_target=item_target)
+        except Exception as error:
+            return OfferSearchResult(item_id=item_target.item_id, latency=time.perf_counter() - started, error=error)
+
+    def search_item(self,item_id : int) -> OfferSearchResult:
+        return self._search_for_item(item_target = self.item_dict.get(item_id))
+
+    def search_all(self, max_workers : int = DEFAULT_SEARCH_WORKERS) -> SweepReport:
+        """
+        Searches every target once, the highest priorities first, `max_workers` targets at a time.
+
+        The requests still go through the rate limiter of the handler. A failed search is reported in the
+        result of its target and doesn't stop the others, `SweepReport.raise_errors` raises it. The offers
+        read are written to the database before returning.
+        """
+        started_at = datetime.utcnow()
+        started = time.perf_counter()
+        targets = sorted(self.item_list, key=lambda target: target.priority, reverse=True)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(self.search_target, targets))
+        if self.snapshot_writer is not None:
+            self.snapshot_writer.flush()
+        return SweepReport(started_at=started_at, latency=time.perf_counter() - started, results=results)
+
+    def close(self) -> None:
+        """
+        Writes the offers still queued by the snapshot writer and stops it.
+        """
+        if self.snapshot_writer is not None:
+            self.snapshot_writer.close()
+
+    def __enter__(self) -> "MarketplaceProductObserver":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
 def build_market_observer(game_data : Game_classes,item_list:list[MarketBuyTarget]) -> MarketplaceProductObserver:
     marketplace = build_marketplace_managers(
                         handler = game_data.handler,
@@ -63,11 +255,15 @@ def build_market_observer(game_data : Game_classes,item_list:list[MarketBuyTarge
                         bag=game_data.bag,
                         player_data=game_data.player_data
                     )
-    return MarketplaceProductObserver(
+    marketplace_data_analyser = MarketplaceDataAnalyser(database_url="sqlite:///marketplace_data.db")
+    observer = MarketplaceProductObserver(
         marketplace_buy_manager= marketplace.marketplace_buy_manager,
         currency=game_data.currency,
         items= game_data.items,
-        marketplace_data_analyser= MarketplaceDataAnalyser(database_url="sqlite:///marketplace_data.db"),
-        item_list=item_list
-        
-    )
\ No newline at end of file
+        marketplace_data_analyser= marketplace_data_analyser,
+        item_list=item_list,
+        snapshot_writer=OfferSnapshotWriter(marketplace_data_analyser=marketplace_data_analyser)
+    )
+    # The writer thread is a daemon : the queued offers are written before the interpreter exits
+    atexit.register(observer.close)
+    return observer
@@ -0,0 +1,200 @@
+"""
+This module keeps watching the marketplace for the targets of a `MarketplaceProductObserver`.
+
+Instead of sweeping the targets one after the other, every target is searched again after its own interval :
+the base interval divided by its priority and by how much its cheapest price has been moving. The due targets
+are searched concurrently (the handler's rate limiter still bounds the requests), matching offers are bought as
+soon as they are read, and the offers are saved by the observer's snapshot writer.
+
+Classes:
+
+    WatchedItem: The scheduling state of a target.
+    MarketplaceWatcher: The scheduler.
+"""
+import heapq
+import threading
+import time
+import typing
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .marketplace_observer import DEFAULT_SEARCH_WORKERS, MarketBuyTarget, MarketplaceProductObserver, OfferSearchResult
+
+DEFAULT_BASE_INTERVAL = 60.0
+DEFAULT_MIN_INTERVAL = 10.0
+DEFAULT_MAX_INTERVAL = 600.0
+DEFAULT_VOLATILITY_WEIGHT = 4.0
+# The weight of the last price move in the volatility
+VOLATILITY_SMOOTHING = 0.3
+# The number of search latencies kept for the percentiles
+LATENCY_WINDOW = 1000
+
+
+@dataclass
+class WatchedItem:
+    """
+    Attributes:
+        volatility: The smoothed relative change of the cheapest price per unit between two searches.
+        last_price: The cheapest price per unit of the last search that found offers.
+        last_searched_at: The monotonic time the last search ended.
+        revisit_intervals: The seconds between the ends of two searches of the target.
+    """
+    target: MarketBuyTarget
+    volatility: float = 0.0
+    last_price: float | None = None
+    last_searched_at: float | None = None
+    searches: int = 0
+    hits: int = 0
+    bought: int = 0
+    errors: int = 0
+    revisit_intervals: list[float] = field(default_factory=list)
+
+    def update(self, result: OfferSearchResult, now: float) -> None:
+        if self.last_searched_at is not None:
+            self.revisit_intervals.append(now - self.last_searched_at)
+            del self.revisit_intervals[:-LATENCY_WINDOW]
+        self.last_searched_at = now
+        self.searches += 1
+        self.hits += result.matching
+        self.bought += result.bought
+        if result.error is not None:
+            self.errors += 1
+            return
+        if not result.offers:
+            return
+        price = min(offer.item_price_per_unit for offer in result.offers)
+        if self.last_price:
+            change = abs(price - self.last_price) / self.last_price
+            self.volatility = (1 - VOLATILITY_SMOOTHING) * self.volatility + VOLATILITY_SMOOTHING * change
+        self.last_price = price
+
+
+class MarketplaceWatcher:
+    """
+    Searches the observer's targets again and again, the urgent ones more often.
+
+    A target is searched again `base_interval / (priority * (1 + volatility_weight * volatility))` seconds
+    after its last search, clamped to [min_interval, max_interval]. A target is never searched twice at once.
+
+    Attributes:
+        observer (MarketplaceProductObserver): Searches, buys and saves.
+        max_workers (int): The number of targets searched at the same time.
+    """
+    def __init__(self,
+                 observer: MarketplaceProductObserver,
+                 max_workers: int = DEFAULT_SEARCH_WORKERS,
+                 base_interval: float = DEFAULT_BASE_INTERVAL,
+                 min_interval: float = DEFAULT_MIN_INTERVAL,
+                 max_interval: float = DEFAULT_MAX_INTERVAL,
+                 volatility_weight: float = DEFAULT_VOLATILITY_WEIGHT):
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be at least 1, got {max_workers}")
+        self.observer = observer
+        self.max_workers = max_workers
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.volatility_weight = volatility_weight
+        self.watched = {target.item_id: WatchedItem(target=target) for target in observer.item_list}
+        self._latencies: list[float] = []
+        self._stop_event = threading.Event()
+
+    def interval(self, item_id: int) -> float:
+        """
+        The seconds between two searches of the target, given its priority and current volatility.
+        """
+        watched = self.watched[item_id]
+        urgency = max(watched.target.priority, 1e-9) * (1 + self.volatility_weight * watched.volatility)
+        return min(self.max_interval, max(self.min_interval, self.base_interval / urgency))
+
+    def _record(self, result: OfferSearchResult) -> None:
+        self.watched[result.item_id].update(result=result, now=time.monotonic())
+        self._latencies.append(result.latency)
+        del self._latencies[:-LATENCY_WINDOW]
+
+    def stop(self) -> None:
+        """
+        Makes `run` return once the searches in progress are done.
+        """
+        self._stop_event.set()
+
+    def run(self,
+            duration: float | None = None,
+            on_result: typing.Callable[[OfferSearchResult], None] | None = None) -> None:
+        """
+        Watches the targets for `duration` seconds, until `stop` is called by default.
+
+        Every target is due right away, the highest priorities first.
+
+        Args:
+            on_result: Called from this thread with every search result.
+        """
+        self._stop_event.clear()
+        deadline = None if duration is None else time.monotonic() + duration
+        now = time.monotonic()
+        # (due time, -priority, item id) : at equal due times the highest priority goes first
+        schedule = [(now, -watched.target.priority, item_id) for item_id, watched in self.watched.items()]
+        heapq.heapify(schedule)
+        in_flight: dict[Future, int] = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while True:
+                now = time.monotonic()
+                stopping = self._stop_event.is_set() or (deadline is not None and now >= deadline)
+                while not stopping and schedule and schedule[0][0] <= now and len(in_flight) < self.max_workers:
+                    _, _, item_id = heapq.heappop(schedule)
+                    in_flight[executor.submit(self.observer.search_target, self.watched[item_id].target)] = item_id
+                if stopping and not in_flight:
+                    return
+
+                timeout = None
+                if not stopping and len(in_flight) < self.max_workers and schedule:
+                    timeout = max(0.0, schedule[0][0] - now)
+                if deadline is not None and not stopping:
+                    timeout = deadline - now if timeout is None else min(timeout, deadline - now)
+                if not in_flight:
+                    # Nothing to wait for but the next due target, the deadline or a `stop`
+                    self._stop_event.wait(timeout)
+                    continue
+                # Wakes up for a finished search, the next due target, the deadline or a `stop` (polled)
+                done, _ = wait(in_flight, timeout=min(timeout, 1.0) if timeout is not None else 1.0,
+                               return_when=FIRST_COMPLETED)
+                for future in done:
+                    item_id = in_flight.pop(future)
+                    result = future.result()
+                    self._record(result)
+                    heapq.heappush(schedule, (time.monotonic() + self.interval(item_id),
+                                              -self.watched[item_id].target.priority,
+                                              item_id))
+                    if on_result is not None:
+                        on_result(result)
+
+    def stats(self) -> dict[str, typing.Any]:
+        """
+        The search latency percentiles, the revisit intervals (the time a target waits between two searches,
+        the sweep latency of a continuous watch) and the hits.
+        """
+        latencies = np.array(self._latencies) if self._latencies else np.zeros(1)
+        revisits = [interval for watched in self.watched.values() for interval in watched.revisit_intervals]
+        stats = {
+            "searches": sum(watched.searches for watched in self.watched.values()),
+            "hits": sum(watched.hits for watched in self.watched.values()),
+            "bought": sum(watched.bought for watched in self.watched.values()),
+            "errors": sum(watched.errors for watched in self.watched.values()),
+            "search_latency_p50": float(np.percentile(latencies, 50)),
+            "search_latency_p95": float(np.percentile(latencies, 95)),
+            "search_latency_max": float(latencies.max()),
+            "revisit_interval_mean": float(np.mean(revisits)) if revisits else 0.0,
+            "revisit_interval_max": float(np.max(revisits)) if revisits else 0.0,
+            "items": {item_id: {"searches": watched.searches,
+                                "hits": watched.hits,
+                                "bought": watched.bought,
+                                "volatility": watched.volatility,
+                                "interval": self.interval(item_id)}
+                      for item_id, watched in self.watched.items()}
+        }
+        if self.observer.snapshot_writer is not None:
+            stats["writer"] = self.observer.snapshot_writer.stats()
+        return stats
@@ -120,10 +120,13 @@ def check_marketplace_items(marketplace_observer: MarketplaceProductObserver) ->
     Args:
     - marketplace_observer (MarketplaceProductObserver): An instance of MarketplaceProductObserver.
 
+    Raises:
+    - The error of the first failed search (an expired session, a network error, ...), once every item was searched.
+
     Returns:
     None
     """
-    marketplace_observer.search_all()
+    marketplace_observer.search_all().raise_errors()
 
 def check_and_update_skills(handler:requests_handler,target_attribute_key : str , target_skill_key : str):
     skills = read_skill(handler=handler)
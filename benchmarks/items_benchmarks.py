@@ -0,0 +1,97 @@
+"""
+This module contains micro benchmarks of the item catalogue lookups.
+
+Run it as a script to print the timings :
+
+    python -m benchmarks.items_benchmarks
+
+The catalogue is synthetic, of the size of a world's catalogue : equipment and products, a recipe for
+some of them and droppable items over a range of prices.
+
+Functions:
+
+    synthetic_catalogue: Returns a list of item dictionaries shaped like the game's catalogue.
+    benchmark_item_lookups: Times the `Items` index lookups against the catalogue scans they replaced.
+"""
+import random
+import timeit
+import typing
+
+from the_west_inner.items import Items
+
+ITEM_TYPES = ('head', 'body', 'neck', 'right_arm', 'left_arm', 'foot', 'pants', 'belt', 'animal', 'yield')
+
+
+def synthetic_catalogue(size: int = 20_000, seed: int = 0) -> list[dict]:
+    """
+    Returns `size` item dictionaries, a tenth of them recipes crafting one of the other items.
+    """
+    rng = random.Random(seed)
+    items = []
+    for index in range(size):
+        item_id = (index + 1) * 1000
+        item = {'item_id': item_id,
+                'name': f'item_{index}',
+                'type': rng.choice(ITEM_TYPES),
+                'sub_type': rng.choice(('shot', 'hand', None)),
+                'price': rng.randint(1, 20_000),
+                'dropable': rng.random() < 0.4,
+                'craftitem': None,
+                'profession_id': None,
+                'speed': None,
+                'bonus': {'item': [], 'attributes': {}, 'skills': {}, 'fortbattle': {}, 'fortbattlesector': {}}}
+        if index % 10 == 9:
+            item.update(type='recipe', dropable=False, craftitem=rng.randint(1, index) * 1000,
+                        profession_id=rng.randint(1, 4))
+        items.append(item)
+    return items
+
+
+def _catalogue_find_item(items: Items, item_id: int) -> dict | None:
+    for item in items.items.values():
+        if item["item_id"] == item_id:
+            return item
+
+
+def _catalogue_is_craftable(items: Items, item_id: int) -> bool:
+    for item in items.items.values():
+        if "craftitem" in item and item["craftitem"] == item_id:
+            return True
+    return False
+
+
+def _catalogue_price_range(items: Items, min_price: int, max_price: int) -> list[dict]:
+    return [x for x in items.items.values() if x['dropable'] and min_price <= x['price'] <= max_price]
+
+
+def benchmark_item_lookups(size: int = 20_000, lookups: int = 200, repeat: int = 3) -> dict[str, dict[str, float]]:
+    """
+    Times `lookups` calls of `find_item`, `is_craftable` and of the droppable price range query on a catalogue
+    of `size` items, through the indexes and through a scan of the catalogue.
+
+    Returns:
+        dict[str, dict[str, float]]: The milliseconds for all the lookups, by lookup then implementation.
+    """
+    items = Items(synthetic_catalogue(size=size))
+    rng = random.Random(1)
+    item_ids = [rng.randint(1, size) * 1000 for _ in range(lookups)]
+    price_ranges = [(low, low + 500) for low in (rng.randint(1, 19_000) for _ in range(lookups))]
+
+    cases: dict[str, tuple[typing.Callable[[], typing.Any], typing.Callable[[], typing.Any]]] = {
+        'find_item': (lambda: [items.find_item(item_id) for item_id in item_ids],
+                      lambda: [_catalogue_find_item(items, item_id) for item_id in item_ids]),
+        'is_craftable': (lambda: [items.is_craftable(item_id) for item_id in item_ids],
+                         lambda: [_catalogue_is_craftable(items, item_id) for item_id in item_ids]),
+        'droppable_price_range': (lambda: [items.get_droppable_items_in_price_range(low, high)
+                                           for low, high in price_ranges],
+                                  lambda: [_catalogue_price_range(items, low, high) for low, high in price_ranges]),
+    }
+    return {name: {implementation: min(timeit.repeat(function, number=1, repeat=repeat)) * 1e3
+                   for implementation, function in zip(('indexed', 'catalogue_scan'), functions)}
+            for name, functions in cases.items()}
+
+
+if __name__ == '__main__':
+    for name, timings in benchmark_item_lookups().items():
+        for implementation, milliseconds in timings.items():
+            print(f'{name}, 200 lookups in 20k items, {implementation}: {milliseconds:.3f} ms')
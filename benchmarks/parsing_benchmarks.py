@@ -0,0 +1,194 @@
+"""
+This module contains micro benchmarks of the parsing of the game's pages.
+
+Run it as a script to print the timings :
+
+    python -m benchmarks.parsing_benchmarks
+
+The pages are fixtures of the shape the game sends : a job report body and its item drops, and an initialization
+page padded to the size of a real one.
+
+Functions:
+
+    job_report_response: Returns a `show_report` response of a job report.
+    benchmark_job_report_parsing: Times the regex job report parser against the BeautifulSoup one.
+    benchmark_job_rewards: Times reading and decrypting job reports one by one against `Job_rewards_batch_extractor`.
+    initialization_page: Returns an initialization page holding every blob `InitDataIndex` reads.
+    benchmark_init_data: Times reading the login values through the `return_*` functions against one `InitDataIndex`.
+"""
+import json
+import time
+import timeit
+import typing
+
+from the_west_inner.init_data import (InitDataIndex, get_wof_id_by_event_name, return_bag, return_buff_data,
+                                      return_cooldown, return_currency_data, return_current_event_data,
+                                      return_current_fair_data, return_premium_data, return_wear_data,
+                                      return_work_list)
+from the_west_inner.paginated_fetch import DEFAULT_MAX_WORKERS
+from the_west_inner.reports import (Job_rewards_batch_extractor, Report, extract_items, extract_job_xhtml_data,
+                                    extract_job_xhtml_data_fast)
+
+JOB_REPORT_ROW = ('<div class="rp_row_jobdata">'
+                  '<div class="rp_jobdata_label_icon"><img src="/images/window/report/{icon}.png" /></div>'
+                  '<div class="rp_jobdata_label">{label}</div>'
+                  '<div class="rp_jobdata_text">{value}</div>'
+                  '</div>')
+
+JOB_REPORT_XHTML = ('<div class="rp_jobdata">'
+                    + ''.join(JOB_REPORT_ROW.format(icon=icon, label=label, value=value) for icon, label, value in [
+                        ('clock', 'Duration:', '1 hour'),
+                        ('star', 'Experience:', '215 XP'),
+                        ('dollar', 'Wages:', '$ 1.045'),
+                        ('luck', 'Luck:', ' 12 '),
+                        ('upb', 'Bonus:', ' 3 ')])
+                    + '</div>')
+
+JOB_REPORT_JS = ("var item = new tw2widget.reward.ItemReward(ItemManager.get(2000000)).setCount(2);"
+                 "item.getMainDiv().appendTo('.rp_items');"
+                 "var item = new tw2widget.reward.ItemReward(ItemManager.get(748000)).setCount(1);"
+                 "item.getMainDiv().appendTo('.rp_items');")
+
+
+def _time_per_call(function: typing.Callable[[], typing.Any], number: int, repeat: int) -> float:
+    """
+    Returns the best time of one call, in microseconds.
+    """
+    return min(timeit.repeat(function, number=number, repeat=repeat)) / number * 1e6
+
+
+def job_report_response(report_id: int) -> dict:
+    """
+    Returns the `show_report` response of a one hour job report.
+    """
+    return {'report_id': report_id,
+            'reportType': 'job',
+            'date_received': '18.10.2026 11:00',
+            'isOwnReport': True,
+            'ownerId': 1,
+            'ownerName': 'player',
+            'publishHash': 'hash',
+            'publishMode': 0,
+            'title': 'Report: Picking cotton',
+            'js': JOB_REPORT_JS,
+            'page': '',
+            'xhtml': JOB_REPORT_XHTML,
+            'reportInfo': {}}
+
+
+class _JobReportsHandler():
+    """
+    Answers every `show_report` request with the job report fixture, after `latency` seconds.
+    """
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def post(self, window, action, action_name="action", payload=None, use_h=False) -> dict:
+        time.sleep(self.latency)
+        return job_report_response(report_id=int(payload['report_id']))
+
+
+def benchmark_job_report_parsing(number: int = 2000, repeat: int = 5) -> dict[str, float]:
+    """
+    Times the parsing of the job report body fixture by `extract_job_xhtml_data_fast` and by the
+    BeautifulSoup based `extract_job_xhtml_data`, both with the item drops read by `extract_items`.
+
+    Returns:
+        dict[str, float]: The microseconds per report, by parser.
+    """
+    def regex():
+        return extract_job_xhtml_data_fast(JOB_REPORT_XHTML), extract_items(JOB_REPORT_JS)
+
+    def beautifulsoup():
+        return extract_job_xhtml_data(JOB_REPORT_XHTML), extract_items(JOB_REPORT_JS)
+
+    return {function.__name__: _time_per_call(function, number=number, repeat=repeat)
+            for function in (regex, beautifulsoup)}
+
+
+def benchmark_job_rewards(report_count: int = 90,
+                          latency: float = 0.02,
+                          max_workers: int = DEFAULT_MAX_WORKERS) -> dict[str, float]:
+    """
+    Times reading and decrypting `report_count` job reports, each request taking `latency` seconds,
+    one report after the other and with `Job_rewards_batch_extractor`.
+
+    Returns:
+        dict[str, float]: The milliseconds for all the reports, by implementation.
+    """
+    handler = _JobReportsHandler(latency=latency)
+    reports = [Report(report_id=report_id, data_id=report_id, date_received='18.10.2026 11:00', hash='hash',
+                      popup_data='', read=False, title='Report: Picking cotton', publish_mode=0)
+               for report_id in range(report_count)]
+
+    def sequential():
+        return [report.read_report(handler=handler).decrypt_job_data() for report in reports]
+
+    def batched():
+        return Job_rewards_batch_extractor(handler=handler, max_workers=max_workers).rewards(reports)
+
+    return {function.__name__: min(timeit.repeat(function, number=1, repeat=3)) * 1e3
+            for function in (sequential, batched)}
+
+
+def initialization_page(size: int = 300_000) -> str:
+    """
+    Returns an initialization page of about `size` characters : the blobs `InitDataIndex` reads at their
+    positions, followed by other script lines and blobs up to the size.
+    """
+    blobs = [
+        {'config': {'world': 'en1'}},
+        {'towns': [{'town_id': town_id, 'x': town_id, 'y': town_id} for town_id in range(20)]},
+        {'jobs': {str(job_id): {'id': job_id, 'malus': job_id} for job_id in range(1, 200)},
+         'sesData': {'Octoberfest': {'counter': {'key': 'beer', 'value': 40}, 'currency_id': 'beer'}}},
+        {'character': {'level': 120}},
+        {'bag': {'weapon': [{'item_id': item_id * 1000, 'count': 1} for item_id in range(300)]},
+         'wear': {'head': 1000, 'body': 2000}},
+        {'premiumBoni': {'money': 0, 'character': 0, 'automation': 0}},
+        {'type': 'octoberwof', 'id': 21, 'name': 'Octoberfest'},
+        {'itemuseCooldown': 1792300000},
+        {'buffs': {'character': None, 'items': None}},
+        {'cash': 1500, 'deposit': 90000, 'upb': 40, 'nuggets': 12, 'veteranPoints': 300},
+    ]
+    lines = ['<script type="text/javascript">'] + [f'    Game.load({json.dumps(blob)});' for blob in blobs]
+    filler = 0
+    while sum(len(line) for line in lines) < size:
+        lines.append(f'    Translations.set({json.dumps({f"text_{filler}_{key}": "x" * 40 for key in range(20)})});')
+        lines.append(f'    $("#window_{filler}").addClass("hidden");')
+        filler += 1
+    return '\n'.join(lines + ['</script>'])
+
+
+def benchmark_init_data(size: int = 300_000, repeat: int = 5) -> dict[str, float]:
+    """
+    Times reading the values the login and the event loaders need from a page of about `size` characters,
+    through the `return_*` functions (one scan of the page each) and from a single `InitDataIndex`.
+
+    Returns:
+        dict[str, float]: The milliseconds per page, by implementation.
+    """
+    page = initialization_page(size=size)
+    page_functions = (return_work_list, return_bag, return_cooldown, return_premium_data, return_wear_data,
+                      return_buff_data, return_currency_data, return_current_event_data, return_current_fair_data)
+
+    def return_functions():
+        return ([function(page) for function in page_functions]
+                + [get_wof_id_by_event_name(page, event_name='Octoberfest')])
+
+    def shared_index():
+        init_data = InitDataIndex(page)
+        return [init_data.jobs, init_data.bag, init_data.itemuse_cooldown, init_data.premium_boni, init_data.wear,
+                init_data.buffs, init_data.cash, init_data.ses_data, init_data.wof_by_type('fairwof'),
+                init_data.wof_id_by_event_name('Octoberfest')]
+
+    return {function.__name__: min(timeit.repeat(function, number=1, repeat=repeat)) * 1e3
+            for function in (return_functions, shared_index)}
+
+
+if __name__ == '__main__':
+    for name, microseconds in benchmark_job_report_parsing().items():
+        print(f'Job report parsing, {name}: {microseconds:.3f} us')
+    for name, milliseconds in benchmark_job_rewards().items():
+        print(f'Job rewards, 90 reports, {name}: {milliseconds:.3f} ms')
+    for name, milliseconds in benchmark_init_data().items():
+        print(f'Initialization page, 300 KB, {name}: {milliseconds:.3f} ms')
@@ -0,0 +1,137 @@
+"""
+This module contains micro benchmarks of the simulation data structures.
+
+Run it as a script to print the timings :
+
+    python -m benchmarks.simul_benchmarks
+
+Functions:
+
+    benchmark_skills: Times the `Skills` operations the equipment simulators use the most.
+    benchmark_job_formulas: Times the NumPy job formulas against the game's JavaScript evaluated by js2py.
+"""
+import timeit
+import typing
+
+import numpy as np
+
+from the_west_inner.simulation_data_library.simul_skills import SKILL_LAYOUT, Skills
+from the_west_inner.simulation_data_library.simul_job_formulas import hourly_rates
+
+# The job formulas of the game client, as simul_job used to evaluate them through js2py
+JOB_FORMULAS_JS = """
+function calc(r1, r2, formula, points, malus, magic, mot, factor, freezeBronze) {
+    var step = Math.ceil((malus+1)/5), stars = Math.min(Math.floor(points/step), 15), dmot = Math.ceil(mot/25)*0.25;
+    return points < 5*step || points <= malus
+        ? Math[r1](({0:1,1:2,2:3,3:4,4:5,5:6.25})[freezeBronze ? 0 : stars] * magic * dmot * factor)
+        : Math[r2](formula(points - malus, stars) * magic * dmot * factor)
+};
+function calcWage(pts, mal, magic, mot, fac){
+    return calc('ceil', 'round', function(lp){ return 6.25*Math.pow(lp, 0.05) }, pts, mal, magic, mot, fac);
+};
+function calcExp(pts, mal, magic, mot, fac){
+    return calc('ceil', 'ceil', function(lp){ return 6.25 }, pts, mal, magic, mot, fac);
+};
+function calcLuck(pts, mal, magic, mot, fac){
+    return calc('floor', 'floor', function(lp){ return 6.25*Math.pow(lp, 0.2) }, pts, mal, (0.9*magic + 5)/1.25, 100, fac);
+};
+function calcProductRate(pts, mal, magic, mot, fac){
+    return calc('round', 'round', function(lp, stars){ return stars < 15 ? 6.25 : 9.375 }, pts, mal, magic, 100, fac);
+};
+function calcDanger(pts, mal, magic, mot, fac){
+    return calc('round', 'round', function(lp){ return Math.pow(lp, -0.2) }, pts, mal, magic, 100, fac, true);
+};
+function hourlyRates(sp, malus, motivation, dollar, experience, luck, danger) {
+    var mot = Math.min(Math.max(motivation || 0, 0), 100);
+    return [calcWage(sp, malus, dollar, mot, 1),
+            calcExp(sp, malus, experience, mot, 1),
+            calcLuck(sp, malus, luck, mot, 1),
+            calcLuck(sp, malus, luck, mot, 3),
+            calcDanger(sp, malus, danger, mot, 1)];
+}
+"""
+
+
+def _time_per_call(function: typing.Callable[[], typing.Any], number: int, repeat: int) -> float:
+    """
+    Returns the best time of one call, in microseconds.
+    """
+    return min(timeit.repeat(function, number=number, repeat=repeat)) / number * 1e6
+
+
+def benchmark_skills(item_count: int = 10, number: int = 20000, repeat: int = 5) -> dict[str, float]:
+    """
+    Times adding two `Skills`, summing the skills of `item_count` items (as `Item_list.status` does),
+    reading an effective skill and reading a skill through its attribute group.
+
+    Returns:
+        dict[str, float]: The microseconds per operation, by operation name.
+    """
+    item_skills = [Skills.from_values([(index + item) % 7 for index in range(len(SKILL_LAYOUT))])
+                   for item in range(item_count)]
+    first, second = item_skills[0], item_skills[1]
+
+    def add():
+        return first + second
+
+    def sum_items():
+        total = Skills.null_skill()
+        for skills in item_skills:
+            total += skills
+        return total
+
+    def effective_skill():
+        return first.effective_skills['aim']
+
+    def group_field():
+        return first.dexterity_based_skills.aim
+
+    return {function.__name__: _time_per_call(function, number=number, repeat=repeat)
+            for function in (add, sum_items, effective_skill, group_field)}
+
+
+def job_formula_grid(size: int = 1000, seed: int = 0) -> np.ndarray:
+    """
+    Returns a (size, 7) grid of random (work points, malus, motivation, dollar, experience, luck, danger) inputs.
+    """
+    rng = np.random.default_rng(seed)
+    malus = rng.integers(0, 800, size)
+    return np.column_stack([
+        malus + rng.integers(-50, 1500, size),
+        malus,
+        rng.integers(0, 101, size),
+        rng.integers(0, 101, size),
+        rng.integers(0, 101, size),
+        rng.integers(0, 101, size),
+        rng.integers(0, 101, size)
+    ]).astype(np.float64)
+
+
+def benchmark_job_formulas(size: int = 1000, repeat: int = 3) -> dict[str, float]:
+    """
+    Times the hourly rates of `size` jobs computed by `hourly_rates` in one call and, when js2py is
+    installed (it is not a dependency), through the JavaScript formulas one job at a time.
+
+    Returns:
+        dict[str, float]: The milliseconds per grid, by implementation.
+    """
+    grid = job_formula_grid(size=size)
+    timings = {'numpy': min(timeit.repeat(lambda: hourly_rates(*grid.T), number=1, repeat=repeat)) * 1e3}
+    try:
+        import js2py
+    except ImportError:
+        return timings
+    js_hourly_rates = js2py.eval_js(JOB_FORMULAS_JS + 'hourlyRates')
+
+    def js_grid():
+        return [js_hourly_rates(*row) for row in grid.tolist()]
+
+    timings['js2py'] = min(timeit.repeat(js_grid, number=1, repeat=repeat)) * 1e3
+    return timings
+
+
+if __name__ == '__main__':
+    for name, microseconds in benchmark_skills().items():
+        print(f'Skills {name}: {microseconds:.3f} us')
+    for name, milliseconds in benchmark_job_formulas().items():
+        print(f'Job formulas, 1000 jobs, {name}: {milliseconds:.3f} ms')
@@ -0,0 +1,70 @@
+"""
+Random equipment search spaces shared by the equipment simulation tests.
+"""
+import random
+
+import the_west_inner.simulation_data_library  # noqa: F401 (puts the simulation modules on sys.path)
+import simul_items as si
+import simul_sets as ss
+import simul_skills as sk
+from the_west_inner.simulation_data_library.simul_equipment import Equipment_simul
+from the_west_inner.simulation_data_library.simul_equip_fitnes import SimulFitnessRuleSet
+from the_west_inner.simulation_data_library.simul_equip_rules import (ExpSimulRule, LuckSimulRule,
+                                                                      TotalSkillPointsRule, WeaponDamageSimulRule,
+                                                                      WorkSkillDictSimulRule)
+from the_west_inner.simulation_data_library.simul_equip_rules.duel_equip_rule import AimShootAttackSimulRule
+from the_west_inner.skills import CharacterSkillsEnum
+
+ITEM_CLASSES = [si.Weapon, si.Headgear, si.Clothes, si.Pants, si.Boots,
+                si.Belt, si.Necklace, si.Fort_weapon, si.Animal, si.Produs]
+SETS = ['set_a', 'set_b', 'set_c']
+PLAYER_LEVEL = 37
+
+
+def random_equipment_space(seed: int,
+                           items_per_slot: int = 2,
+                           slots: int = 10) -> tuple[si.Item_model_list, ss.Item_set_list, Equipment_simul]:
+    """
+    Returns `items_per_slot` random items for each of the first `slots` item types, three sets with
+    bonuses at 2, 3 and 5 pieces and an empty equipment of a level 37 player.
+    """
+    rng = random.Random(seed)
+
+    def skills() -> sk.Skills:
+        skill_set = sk.Skills.null_skill()
+        for _ in range(3):
+            skill_set[rng.choice(list(map(str, sk.CharacterSkillsEnum)))] = rng.randint(1, 5) * rng.choice([1, 0.1])
+        return skill_set
+
+    def update_table() -> si.Item_update_table:
+        return si.Item_update_table(*[rng.random() < .3 for _ in range(8)])
+
+    items = []
+    for item_class in ITEM_CLASSES[:slots]:
+        for _ in range(items_per_slot):
+            item_id = len(items) + 1
+            item = item_class(f'item_{item_id}', item_id, 10, skills(), rng.choice(SETS + [None, '']),
+                              update_table(), 1, *[rng.randint(0, 3) for _ in range(7)], True, True, False, False)
+            if item_class is si.Weapon:
+                item.weapon_damage = si.Weapon_damage_range(rng.randint(1, 10), rng.randint(10, 30))
+            items.append(item)
+    item_set_list = ss.Item_set_list([
+        ss.Item_set(name, name, [], {pieces: ss.Item_set_item_model(update_table(), skills(),
+                                                                    *[rng.randint(0, 4) for _ in range(7)])
+                                     for pieces in ("2", "3", "5")})
+        for name in SETS])
+    equipment = Equipment_simul(*[None] * 10, item_set_list=item_set_list, player_level=PLAYER_LEVEL)
+    return si.Item_model_list(items), item_set_list, equipment
+
+
+def every_rule_set() -> SimulFitnessRuleSet:
+    """
+    A lexicographic rule set using the skill, duel, luck, weapon damage and experience rules.
+    """
+    return SimulFitnessRuleSet([
+        WorkSkillDictSimulRule({CharacterSkillsEnum.BUILD: 3, CharacterSkillsEnum.AIM: 1, CharacterSkillsEnum.STRENGTH: 2}),
+        TotalSkillPointsRule(),
+        AimShootAttackSimulRule(),
+        LuckSimulRule(),
+        WeaponDamageSimulRule(),
+        ExpSimulRule()])
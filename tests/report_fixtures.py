@@ -0,0 +1,39 @@
+"""
+A job report as the `show_report` window of the game sends it.
+"""
+JOB_REPORT_ROW = ('<div class="rp_row_jobdata">'
+                  '<div class="rp_jobdata_label_icon"><img src="/images/window/report/{icon}.png" /></div>'
+                  '<div class="rp_jobdata_label">{label}</div>'
+                  '<div class="rp_jobdata_text">{value}</div>'
+                  '</div>')
+
+JOB_REPORT_XHTML = ('<div class="rp_jobdata">'
+                    + ''.join(JOB_REPORT_ROW.format(icon=icon, label=label, value=value) for icon, label, value in [
+                        ('clock', 'Duration:', '1 hour'),
+                        ('star', 'Experience:', '215 XP'),
+                        ('dollar', 'Wages:', '$ 1.045'),
+                        ('luck', 'Luck:', ' 12 '),
+                        ('upb', 'Bonus:', ' 3 ')])
+                    + '</div>')
+
+JOB_REPORT_JS = ("var item = new tw2widget.reward.ItemReward(ItemManager.get(2000000)).setCount(2);"
+                 "item.getMainDiv().appendTo('.rp_items');")
+
+
+def job_report_response(report_id: int) -> dict:
+    """
+    Returns the `show_report` response of a one hour job report.
+    """
+    return {'report_id': report_id,
+            'reportType': 'job',
+            'date_received': '18.10.2026 11:00',
+            'isOwnReport': True,
+            'ownerId': 1,
+            'ownerName': 'player',
+            'publishHash': 'hash',
+            'publishMode': 0,
+            'title': 'Report: Picking cotton',
+            'js': JOB_REPORT_JS,
+            'page': '',
+            'xhtml': JOB_REPORT_XHTML,
+            'reportInfo': {}}
@@ -0,0 +1,107 @@
+import queue
+import threading
+import time
+
+from automation_scripts.account_orchestration.accounts_data import AccountData, AccountLoadPipeline
+
+
+def mark_loaded(account):
+    account.bag, account.currency, account.current_equipment = object(), object(), object()
+
+
+class CountingQueue(queue.Queue):
+    def __init__(self):
+        super().__init__()
+        self.gets = 0
+
+    def get(self, block=True, timeout=None):
+        self.gets += 1
+        return super().get(block=block, timeout=timeout)
+
+
+def test_failed_logins_are_retried_up_to_max_attempts():
+    flaky, broken = AccountData(login=None), AccountData(login=None)
+    calls = {flaky: 0, broken: 0}
+
+    def load(account, attempt):
+        calls[account] += 1
+        if account is broken or attempt.number < 3:
+            raise ConnectionError("login refused")
+        if attempt.claim():
+            mark_loaded(account)
+            return "game classes", "login"
+
+    pipeline = AccountLoadPipeline([flaky, broken], load_func=load, max_in_flight=2, max_attempts=3, backoff=0.01)
+    report = pipeline.run()
+
+    assert report.loaded == [flaky] and report.failed == [broken]
+    assert calls == {flaky: 3, broken: 3} and report.attempts == 6
+    assert report.failure_reasons == {"ConnectionError": 5}
+
+
+def test_timed_out_login_is_retried_once_its_thread_ended():
+    account = AccountData(login=None)
+    first_attempt_ended = threading.Event()
+    started_after_first_ended = []
+
+    def load(account, attempt):
+        if attempt.number == 1:
+            time.sleep(0.3)
+            first_attempt_ended.set()
+            # An abandoned attempt must not update the account
+            assert not attempt.claim()
+            return None
+        started_after_first_ended.append(first_attempt_ended.is_set())
+        if attempt.claim():
+            mark_loaded(account)
+            return "game classes", "login"
+
+    report = AccountLoadPipeline([account], load_func=load, timeout=0.05, backoff=0.01).run()
+
+    assert report.loaded == [account] and report.attempts == 2
+    assert report.failure_reasons == {"TimeoutError": 1}
+    assert started_after_first_ended == [True]
+
+
+def test_at_most_max_in_flight_logins_run_at_once():
+    accounts = [AccountData(login=None) for _ in range(6)]
+    lock = threading.Lock()
+    running = []
+    peak = []
+
+    def load(account, attempt):
+        with lock:
+            running.append(account)
+            peak.append(len(running))
+        time.sleep(0.05)
+        with lock:
+            running.remove(account)
+        if attempt.claim():
+            mark_loaded(account)
+            return "game classes", "login"
+
+    loaded = list(AccountLoadPipeline(accounts, load_func=load, max_in_flight=2))
+
+    assert sorted(map(id, loaded)) == sorted(map(id, accounts))
+    assert max(peak) == 2
+
+
+def test_pipeline_sleeps_while_a_claimed_attempt_outlives_its_deadline():
+    account = AccountData(login=None)
+    callbacks = []
+
+    def load(account, attempt):
+        if attempt.claim():
+            mark_loaded(account)
+            return "game classes", "login"
+
+    def callback(game_classes, login):
+        time.sleep(0.5)
+        callbacks.append(login)
+
+    pipeline = AccountLoadPipeline([account], load_func=load, callback_func=callback, timeout=0.05)
+    pipeline._events = CountingQueue()
+    report = pipeline.run()
+
+    assert report.loaded == [account] and callbacks == ["login"] and report.failures == {}
+    assert pipeline._events.gets < 10
@@ -0,0 +1,139 @@
+"""
+The async handler against a stub game server running in a thread of the test.
+"""
+import asyncio
+import gc
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+
+from the_west_inner.async_requests_handler import AsyncRequestsHandler
+from the_west_inner.requests_rate_limiter import TokenBucketRateLimiter
+
+RESPONSE_DELAY = 0.05
+
+
+class StubGameServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubGameRequestHandler)
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests: list[dict] = []
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/game.php"
+
+
+class StubGameRequestHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        server: StubGameServer = self.server
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode()
+        request = {"query": {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()},
+                   "payload": {key: values[0] for key, values in parse_qs(body).items()}}
+        with server.lock:
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            server.requests.append(request)
+        time.sleep(RESPONSE_DELAY)
+        with server.lock:
+            server.in_flight -= 1
+        response = json.dumps({"error": False, **request}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = StubGameServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def build_handler(server: StubGameServer, max_connections_per_host: int) -> AsyncRequestsHandler:
+    return AsyncRequestsHandler(session=requests.Session(),
+                                base_url=server.base_url,
+                                h="hash",
+                                rate_limiter=TokenBucketRateLimiter(burst=1000, refill_rate=1000),
+                                max_connections_per_host=max_connections_per_host)
+
+
+def test_post_sends_the_game_request(stub_server):
+    handler = build_handler(stub_server, max_connections_per_host=2)
+
+    async def post():
+        async with handler:
+            return await handler.post(window="building_market", action="search", payload={"page": "2"}, use_h=True)
+
+    response = asyncio.run(post())
+
+    assert response["query"] == {"window": "building_market", "action": "search", "h": "hash"}
+    assert response["payload"] == {"page": "2"}
+
+
+def test_accounts_of_one_host_share_its_connections(stub_server):
+    handlers = [AsyncRequestsHandler(session=requests.Session(),
+                                     base_url=stub_server.base_url,
+                                     h=f"hash_{account}",
+                                     rate_limiter=TokenBucketRateLimiter(burst=1000, refill_rate=1000),
+                                     max_connections_per_host=3)
+                for account in range(8)]
+
+    async def post_many(handler: AsyncRequestsHandler) -> list[dict]:
+        return await asyncio.gather(*(handler.post(window="map", action="get_minimap", payload={"n": str(n)},
+                                                   use_h=True)
+                                      for n in range(4)))
+
+    async def post_with_every_account():
+        return await asyncio.gather(*(post_many(handler) for handler in handlers))
+
+    responses = asyncio.run(post_with_every_account())
+
+    assert [{response["query"]["h"] for response in account_responses} for account_responses in responses] == \
+        [{f"hash_{account}"} for account in range(8)]
+    assert len(stub_server.requests) == 32
+    assert stub_server.max_in_flight == 3
+    executor = handlers[0]._connections.executor
+    assert all(handler._connections.executor is executor for handler in handlers)
+    assert len(executor._threads) <= 3
+    for handler in handlers:
+        handler.close()
+    assert executor._shutdown
+
+
+def test_handlers_of_one_host_must_agree_on_the_limit(stub_server):
+    handler = build_handler(stub_server, max_connections_per_host=2)
+
+    with pytest.raises(ValueError):
+        build_handler(stub_server, max_connections_per_host=4)
+
+    handler.close()
+    build_handler(stub_server, max_connections_per_host=4).close()
+
+
+def test_semaphores_are_dropped_with_their_loop(stub_server):
+    handler = build_handler(stub_server, max_connections_per_host=2)
+
+    for _ in range(3):
+        asyncio.run(handler.post(window="map", action="get_minimap"))
+    gc.collect()
+
+    assert len(handler._connections._semaphores) == 0
+    handler.close()
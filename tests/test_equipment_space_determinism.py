@@ -0,0 +1,88 @@
+"""
+The genetic equipment search with a fixed seed must give the same equipment whatever the hash seed of the
+interpreter, so every run is made in a subprocess with its own PYTHONHASHSEED.
+"""
+import json
+import os
+import pathlib
+import subprocess
+import sys
+
+REPO_ROOT = pathlib.Path(__file__).resolve().parents[1]
+
+SEARCH_SCRIPT = """
+import json
+import random
+
+import the_west_inner.simulation_data_library
+import simul_items as si
+import simul_sets as ss
+import simul_skills as sk
+from the_west_inner.simulation_data_library.simul_equipment import Equipment_simul
+from the_west_inner.simulation_data_library.simul_equip_fitnes import SimulFitnessRuleSet
+from the_west_inner.simulation_data_library.simul_equip_rules import TotalSkillPointsRule, WorkSkillDictSimulRule
+from the_west_inner.simulation_data_library.simul_vector_fitness import CompiledEquipmentSpace
+from the_west_inner.simulation_data_library.genetic_item_selection import GeneticAlgorithm
+from the_west_inner.skills import CharacterSkillsEnum
+
+rng = random.Random(5)
+SETS = ['set_a', 'set_b']
+
+def skills():
+    skill_set = sk.Skills.null_skill()
+    for _ in range(3):
+        skill_set[rng.choice(list(map(str, sk.CharacterSkillsEnum)))] = rng.randint(1, 5)
+    return skill_set
+
+def update_table():
+    return si.Item_update_table(*[rng.random() < .3 for _ in range(8)])
+
+items = []
+# Declared in reverse slot order, the search must not follow it
+for item_class in reversed([si.Weapon, si.Headgear, si.Clothes, si.Pants, si.Boots,
+                            si.Belt, si.Necklace, si.Fort_weapon, si.Animal, si.Produs]):
+    for _ in range(4):
+        item_id = len(items) + 1
+        item = item_class(f'item_{item_id}', item_id, 10, skills(), rng.choice(SETS + [None]), update_table(), 1,
+                          *[rng.randint(0, 3) for _ in range(7)], True, True, False, False)
+        if item_class is si.Weapon:
+            item.weapon_damage = si.Weapon_damage_range(rng.randint(1, 10), rng.randint(10, 30))
+        items.append(item)
+item_set_list = ss.Item_set_list([ss.Item_set(name, name, [], {"2": ss.Item_set_item_model(update_table(), skills(),
+                                                                                          *[rng.randint(0, 4) for _ in range(7)])})
+                                  for name in SETS])
+item_model_list = si.Item_model_list(items)
+equipment = Equipment_simul(*[None] * 10, item_set_list=item_set_list, player_level=37)
+rules = lambda: SimulFitnessRuleSet([WorkSkillDictSimulRule({CharacterSkillsEnum.BUILD: 3, CharacterSkillsEnum.AIM: 1}),
+                                     TotalSkillPointsRule()])
+
+space = CompiledEquipmentSpace(item_model_list=item_model_list, item_set_list=item_set_list, player_level=37)
+best = GeneticAlgorithm(item_model_list, item_set_list, equipment, rules(), population_size=40, generations=10,
+                        mutation_rate=0.1, seed=7, islands=2, max_workers=1).run()
+print(json.dumps({"slots": list(space.slots),
+                  "best": [best.permutation[slot].item_id if best.permutation.get(slot) is not None else None
+                           for slot in si.EQUIPMENT_SLOTS]}))
+"""
+
+
+def run_search(hash_seed: str) -> dict:
+    completed = subprocess.run([sys.executable, "-c", SEARCH_SCRIPT],
+                               cwd=REPO_ROOT,
+                               env={**os.environ, "PYTHONHASHSEED": hash_seed},
+                               capture_output=True,
+                               text=True,
+                               check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def test_search_does_not_depend_on_the_hash_seed():
+    first, second = run_search("0"), run_search("1")
+
+    assert first == second
+
+
+def test_slots_follow_the_equipment_slot_order():
+    result = run_search("2")
+
+    assert result["slots"] == ['weapon', 'headgear', 'clothes', 'pants', 'boots',
+                               'belt', 'necklace', 'fort_weapon', 'animal', 'produs']
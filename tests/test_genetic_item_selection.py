@@ -0,0 +1,22 @@
+from equipment_fixtures import every_rule_set, random_equipment_space
+from the_west_inner.simulation_data_library.genetic_item_selection import GeneticAlgorithm
+from the_west_inner.simulation_data_library.simul_equip_fitnes import SimulFitnessRuleSet
+
+
+def test_single_population_is_scored_once_per_generation():
+    item_model_list, item_set_list, equipment = random_equipment_space(seed=1, items_per_slot=3)
+    rule_set = SimulFitnessRuleSet(every_rule_set().fitness_rule_list, percent_coefficient=0.05)
+    algorithm = GeneticAlgorithm(item_model_list, item_set_list, equipment, rule_set,
+                                 population_size=20, generations=6, mutation_rate=0.1, seed=3)
+    scored_populations = []
+    population_fitness = algorithm.population_fitness
+
+    def counting_population_fitness(population):
+        scored_populations.append(len(population))
+        return population_fitness(population)
+
+    algorithm.population_fitness = counting_population_fitness
+    best = algorithm.run()
+
+    assert scored_populations == [20] * 7
+    assert best is not None and len(best.permutation) == 10
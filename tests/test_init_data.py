@@ -0,0 +1,9 @@
+from the_west_inner.init_data import build_init_data_index, return_wear_data
+
+PAGE = '\n'.join(['{"a": 1}', '{"b": 2}', '{"jobs": {}}', '{"c": 3}', '{"bag": {}, "wear": {"head": 5}}'])
+
+
+def test_index_is_not_shared_between_calls():
+    assert build_init_data_index(PAGE) is not build_init_data_index(PAGE)
+    return_wear_data(PAGE)["head"] = 6
+    assert return_wear_data(PAGE) == {"head": 5}
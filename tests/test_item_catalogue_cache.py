@@ -0,0 +1,67 @@
+import os
+import types
+
+import pytest
+
+from the_west_inner.item_catalogue_cache import ItemCatalogueCache, ItemCatalogueKey
+
+ITEMS = [{"item_id": 1, "name": "Hat"}, {"item_id": 2, "name": "Boots"}]
+KEY = ItemCatalogueKey(server="the-west.ro", world="ro1", language="ro_RO")
+
+
+def test_catalogue_is_downloaded_once(tmp_path):
+    cache = ItemCatalogueCache(directory=str(tmp_path))
+    downloads = []
+
+    def loader():
+        downloads.append(1)
+        return ITEMS
+
+    assert cache.get(KEY, loader) == ITEMS
+    assert ItemCatalogueCache(directory=str(tmp_path)).get(KEY, loader) == ITEMS
+    assert len(downloads) == 1
+
+
+@pytest.mark.parametrize("response", [{"error": True, "msg": "Not logged in"}, [], [{"name": "no id"}], None])
+def test_invalid_download_is_not_cached(tmp_path, response):
+    cache = ItemCatalogueCache(directory=str(tmp_path))
+
+    with pytest.raises(ValueError):
+        cache.get(KEY, lambda: response)
+
+    assert os.listdir(tmp_path) == []
+    assert cache.get(KEY, lambda: ITEMS) == ITEMS
+
+
+def test_relative_directory_is_made_absolute(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    cache = ItemCatalogueCache(directory="catalogues")
+
+    assert cache.directory == str(tmp_path / "catalogues")
+
+
+@pytest.mark.parametrize("base_url, key", [
+    ("https://ro1.the-west.ro", ItemCatalogueKey(server="the-west.ro", world="ro1", language="ro_RO")),
+    ("https://en7.the-west.net:443", ItemCatalogueKey(server="the-west.net", world="en7", language="en_DK")),
+    ("https://xx1.west.net", ItemCatalogueKey(server="west.net", world="xx1", language="")),
+])
+def test_key_of_a_handler(base_url, key):
+    handler = types.SimpleNamespace(base_url=base_url)
+
+    assert ItemCatalogueKey.from_handler(handler=handler) == key
+
+
+def test_every_world_has_its_own_directory(tmp_path):
+    other_world = ItemCatalogueKey(server="the-west.ro", world="ro2", language="ro_RO")
+    other_items = [{"item_id": 3, "name": "Gun"}]
+    cache = ItemCatalogueCache(directory=str(tmp_path))
+
+    cache.get(KEY, lambda: ITEMS)
+    cache.get(other_world, lambda: other_items)
+
+    assert sorted(os.listdir(tmp_path / "the-west.ro")) == ["ro1", "ro2"]
+    assert os.listdir(tmp_path / "the-west.ro" / "ro1") == ["ro_RO.pickle"]
+    restarted = ItemCatalogueCache(directory=str(tmp_path))
+    assert restarted.get(KEY, lambda: pytest.fail("downloaded again")) == ITEMS
+    assert restarted.get(other_world, lambda: pytest.fail("downloaded again")) == other_items
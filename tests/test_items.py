@@ -0,0 +1,72 @@
+"""
+The indexed `Items` lookups against the scans of the catalogue they replaced.
+"""
+import random
+
+import pytest
+
+from the_west_inner.items import Items
+
+
+def catalogue(seed: int, size: int = 300) -> list[dict]:
+    rng = random.Random(seed)
+    items = []
+    for index in range(size):
+        item = {'item_id': (index + 1) * 1000, 'name': f'item_{index}', 'type': rng.choice(('head', 'body', 'yield')),
+                'sub_type': rng.choice(('shot', 'hand', None)), 'price': rng.randint(1, 500),
+                'dropable': rng.random() < 0.5, 'craftitem': None, 'profession_id': None,
+                'speed': None, 'bonus': {'item': [], 'attributes': {'strength': 2}, 'skills': {'build': 3}}}
+        if index % 5 == 4:
+            # Several recipes may craft the same item : the first one in the catalogue is the answer
+            item.update(type='recipe', dropable=False, craftitem=rng.randint(1, 40) * 1000,
+                        profession_id=rng.randint(1, 4))
+        items.append(item)
+    return items
+
+
+def scan_find_item(items: Items, item_id: int) -> dict | None:
+    for item in items.items.values():
+        if item["item_id"] == item_id:
+            return item
+
+
+def scan_is_craftable_by_id(items: Items, item_id: int) -> int | None:
+    for item in items.items.values():
+        if item["craftitem"] == item_id:
+            return item["profession_id"]
+
+
+@pytest.fixture(params=[1, 2, 3])
+def items(request) -> Items:
+    items = Items(catalogue(seed=request.param))
+    # Upgraded variants are indexed once materialised
+    for item_id in (1003, 5005, 12001):
+        assert item_id in items
+    return items
+
+
+def test_item_and_recipe_lookups_match_the_catalogue_scans(items):
+    for item_id in [*range(0, 310_000, 1000), 1003, 5005, 12001, 12002]:
+        assert items.find_item(item_id) is scan_find_item(items, item_id)
+        assert items.is_craftable_by_id(item_id) == scan_is_craftable_by_id(items, item_id)
+        assert items.is_craftable(item_id) == (scan_is_craftable_by_id(items, item_id) is not None)
+
+
+def test_type_lookups_match_the_catalogue_scans(items):
+    for item_type in ('head', 'body', 'yield', 'recipe', 'neck'):
+        assert items.get_items_by_type(item_type) == [x for x in items.items.values() if x['type'] == item_type]
+    for sub_type in ('shot', 'hand', 'melee'):
+        assert items.get_items_by_sub_type(sub_type) == [x for x in items.items.values()
+                                                         if x['sub_type'] == sub_type]
+
+
+def test_price_range_bisect_matches_the_droppable_filter(items):
+    assert items.get_droppable_items() == [x for x in items.items.values() if x['dropable']]
+    rng = random.Random(0)
+    for _ in range(200):
+        low = rng.randint(-10, 520)
+        high = low + rng.randint(-5, 200)
+        expected = [x for x in items.get_droppable_items() if low <= x['price'] <= high]
+        found = items.get_droppable_items_in_price_range(min_price=low, max_price=high)
+        assert sorted(x['item_id'] for x in found) == sorted(x['item_id'] for x in expected)
+        assert [x['price'] for x in found] == sorted(x['price'] for x in found)
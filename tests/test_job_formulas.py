@@ -0,0 +1,44 @@
+"""
+Parity of the NumPy job reward formulas with the game client.
+
+tests/data/job_formulas_client_values.json holds the rewards the client's JavaScript (calcWage, calcExp,
+calcLuck, calcDanger and calcProductRate, run in Node) returned for a grid of jobs. Every input row is
+(work points, malus, motivation, dollar, experience, luck, danger, product rate) and every expected row is
+(wage, exp, luck, luck x3, danger, product rate), a NaN reward being stored as null.
+"""
+import json
+import pathlib
+
+import numpy as np
+
+from the_west_inner.simulation_data_library.simul_job_formulas import hourly_rates
+
+CLIENT_VALUES = pathlib.Path(__file__).parent / "data" / "job_formulas_client_values.json"
+
+
+def load_client_values() -> tuple[np.ndarray, np.ndarray]:
+    rows = json.loads(CLIENT_VALUES.read_text())
+    inputs = np.array([row["input"] for row in rows], dtype=np.float64)
+    expected = np.array([[np.nan if value is None else value for value in row["expected"]] for row in rows],
+                        dtype=np.float64)
+    return inputs, expected
+
+
+def test_hourly_rates_match_the_client():
+    inputs, expected = load_client_values()
+
+    rates = hourly_rates(*inputs[:, :7].T, product_rate={0: inputs[:, 7]})
+    computed = np.column_stack([rates['wage'], rates['exp'], rates['luck_inferior'], rates['luck_superior'],
+                                rates['danger'], rates['product_rate'][0]])
+
+    np.testing.assert_array_equal(computed, expected)
+
+
+def test_hourly_rates_of_a_single_job_match_the_client():
+    inputs, expected = load_client_values()
+
+    for row, expected_row in zip(inputs, expected):
+        rates = hourly_rates(*row[:7], product_rate={0: row[7]})
+        computed = [rates['wage'], rates['exp'], rates['luck_inferior'], rates['luck_superior'],
+                    rates['danger'], rates['product_rate'][0]]
+        np.testing.assert_array_equal(np.array(computed, dtype=np.float64), expected_row)
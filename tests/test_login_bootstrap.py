@@ -0,0 +1,144 @@
+"""
+The login bootstrap : stage order, dependency results, concurrency and a failed login request.
+"""
+import threading
+
+import pytest
+
+from the_west_inner.login_bootstrap import BootstrapStage, LoginBootstrap
+
+
+class NotLoggedIn(Exception):
+    pass
+
+
+def login_stages(calls: list[str]) -> list[BootstrapStage]:
+    """
+    Stages shaped like the login : independent requests, then objects built from their results.
+    """
+    def request(name: str, result):
+        def func(**dependencies):
+            calls.append(name)
+            return result
+        return func
+
+    return [
+        BootstrapStage(name='character_variables', func=request('character_variables', {'level': 37})),
+        BootstrapStage(name='server_time', func=request('server_time', 1_700_000_000)),
+        BootstrapStage(name='items', func=request('items', [{'item_id': 1}])),
+        BootstrapStage(name='premium',
+                       func=lambda server_time: ('premium', server_time),
+                       depends_on=('server_time',)),
+        BootstrapStage(name='equipment',
+                       func=lambda items, character_variables: (len(items), character_variables['level']),
+                       depends_on=('items', 'character_variables')),
+    ]
+
+
+@pytest.mark.parametrize('parallel', [True, False])
+def test_every_stage_gets_the_results_of_its_dependencies(parallel):
+    calls = []
+    bootstrap = LoginBootstrap(stages=login_stages(calls), parallel=parallel)
+
+    results = bootstrap.run()
+
+    assert results == {'character_variables': {'level': 37}, 'server_time': 1_700_000_000,
+                       'items': [{'item_id': 1}], 'premium': ('premium', 1_700_000_000), 'equipment': (1, 37)}
+    assert set(bootstrap.stage_timings) == set(results)
+    assert bootstrap.total_time >= max(bootstrap.stage_timings.values())
+
+
+def test_sequential_mode_keeps_the_given_order():
+    calls = []
+
+    LoginBootstrap(stages=login_stages(calls), parallel=False).run()
+
+    assert calls == ['character_variables', 'server_time', 'items']
+
+
+def test_independent_requests_run_at_the_same_time():
+    # Every request waits for the two others : the bootstrap only finishes if they overlap
+    barrier = threading.Barrier(3, timeout=5)
+    stages = [BootstrapStage(name=name, func=barrier.wait) for name in ('movement', 'skills', 'items')]
+
+    results = LoginBootstrap(stages=stages, parallel=True, max_workers=3).run()
+
+    assert sorted(results.values()) == [0, 1, 2]
+
+
+def test_a_stage_starts_only_after_its_dependencies():
+    finished = []
+
+    def slow_request():
+        threading.Event().wait(0.05)
+        finished.append('items')
+        return 'items'
+
+    stages = [BootstrapStage(name='items', func=slow_request),
+              BootstrapStage(name='equipment', func=lambda items: list(finished), depends_on=('items',))]
+
+    assert LoginBootstrap(stages=stages, parallel=True).run()['equipment'] == ['items']
+
+
+@pytest.mark.parametrize('stages', [
+    [BootstrapStage(name='items', func=list), BootstrapStage(name='items', func=list)],
+    [BootstrapStage(name='equipment', func=list, depends_on=('items',)), BootstrapStage(name='items', func=list)],
+    [BootstrapStage(name='equipment', func=list, depends_on=('skills',))],
+])
+def test_invalid_dependencies_are_rejected(stages):
+    with pytest.raises(ValueError):
+        LoginBootstrap(stages=stages)
+
+
+def refused_login(**dependencies):
+    raise NotLoggedIn('The session is not logged in')
+
+
+@pytest.mark.parametrize('parallel', [True, False])
+def test_a_failed_login_request_stops_the_bootstrap(parallel):
+    calls = []
+    stages = login_stages(calls)
+    stages[1] = BootstrapStage(name='server_time', func=refused_login)
+    bootstrap = LoginBootstrap(stages=stages, parallel=parallel)
+
+    with pytest.raises(NotLoggedIn):
+        bootstrap.run()
+
+    # The stage built from the failed request never runs, its failure is still timed
+    assert 'premium' not in bootstrap.stage_timings
+    assert 'server_time' in bootstrap.stage_timings
+    assert bootstrap.total_time > 0
+
+
+def test_queued_requests_are_dropped_after_a_failed_login():
+    calls = []
+    stages = [BootstrapStage(name='character_variables', func=refused_login),
+              *login_stages(calls)[1:3]]
+
+    with pytest.raises(NotLoggedIn):
+        # A single worker : the other requests are queued behind the failed one
+        LoginBootstrap(stages=stages, parallel=True, max_workers=1).run()
+
+    assert calls == []
+
+
+def test_running_requests_finish_before_the_failure_is_raised():
+    started = threading.Event()
+    finished = []
+
+    def running_request():
+        started.set()
+        threading.Event().wait(0.05)
+        finished.append('items')
+
+    def failing_request():
+        started.wait(5)
+        refused_login()
+
+    stages = [BootstrapStage(name='items', func=running_request),
+              BootstrapStage(name='skills', func=failing_request)]
+
+    with pytest.raises(NotLoggedIn):
+        LoginBootstrap(stages=stages, parallel=True, max_workers=2).run()
+
+    assert finished == ['items']
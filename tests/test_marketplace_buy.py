@@ -0,0 +1,79 @@
+import asyncio
+import threading
+import time
+
+from the_west_inner.marketplace_buy import (iter_marketplace_offers, search_marketplace_item,
+                                            search_marketplace_item_async)
+
+
+class MarketSearchHandler:
+    """
+    Answers marketplace searches with `pages` pages of two offers, recording the payloads and the peak of
+    requests in flight.
+    """
+    def __init__(self, pages: int, failing_page: int | None = None):
+        self.pages = pages
+        self.failing_page = failing_page
+        self.payloads: list[dict] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def post(self, window, action, action_name="action", payload=None, use_h=False) -> dict:
+        with self._lock:
+            self.payloads.append(payload)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        page = int(payload["page"])
+        time.sleep(0.005)
+        with self._lock:
+            self.in_flight -= 1
+        if page == self.failing_page:
+            return {"error": True, "msg": "failed"}
+        return {"error": False,
+                "msg": {"search_result": [{"market_offer_id": page * 10 + offer, "item_cost": page}
+                                          for offer in range(2)],
+                        "next": page < self.pages}}
+
+
+class AsyncMarketSearchHandler(MarketSearchHandler):
+    async def post(self, window, action, action_name="action", payload=None, use_h=False) -> dict:
+        return MarketSearchHandler.post(self, window, action, action_name, payload, use_h)
+
+
+def test_search_reads_every_page_in_order():
+    handler = MarketSearchHandler(pages=3)
+
+    offers = search_marketplace_item(item_id=2000, handler=handler)
+
+    assert [offer["market_offer_id"] for offer in offers] == [10, 11, 20, 21, 30, 31]
+    assert [payload["page"] for payload in handler.payloads] == ["1", "2", "3"]
+    assert handler.max_in_flight == 1
+
+
+def test_async_search_sends_the_same_requests():
+    handler, async_handler = MarketSearchHandler(pages=3), AsyncMarketSearchHandler(pages=3)
+
+    offers = search_marketplace_item(item_id=None, handler=handler)
+    async_offers = asyncio.run(search_marketplace_item_async(item_id=None, handler=async_handler))
+
+    assert async_offers == offers
+    assert async_handler.payloads == handler.payloads
+    assert "item_id" not in handler.payloads[0]
+
+
+def test_failed_page_ends_the_search():
+    assert search_marketplace_item(item_id=2000, handler=MarketSearchHandler(pages=3, failing_page=1)) is None
+    assert asyncio.run(search_marketplace_item_async(item_id=2000,
+                                                     handler=AsyncMarketSearchHandler(pages=3, failing_page=2))) \
+        == [{"market_offer_id": 10, "item_cost": 1}, {"market_offer_id": 11, "item_cost": 1}]
+
+
+def test_offers_stop_at_most_one_page_after_the_stop():
+    handler = MarketSearchHandler(pages=10)
+
+    offers = list(iter_marketplace_offers(item_id=2000, handler=handler,
+                                          stop_when=lambda offer: offer.dict_offer["item_cost"] > 2))
+
+    assert len(offers) == 4
+    assert len(handler.payloads) <= 4
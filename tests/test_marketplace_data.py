@@ -0,0 +1,58 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import Session
+
+from automation_scripts.marketplace_scripts import marketplace_data
+from automation_scripts.marketplace_scripts.marketplace_data import DAY, HOUR, MarketplaceDataAnalyser
+from the_west_inner.marketplace_buy import Marketplace_offer
+
+
+def offer(offer_id, price, item_id=5, count=1):
+    return Marketplace_offer({'market_offer_id': offer_id, 'item_id': item_id, 'item_count': count,
+                              'max_price': price * count, 'seller_player_id': 1, 'market_town_id': 2})
+
+
+def rollups(analyser, item_id):
+    return [(rollup.granularity, rollup.bucket_start, rollup.offer_count, rollup.min_price, rollup.max_price,
+             round(rollup.average_price, 6), rollup.p10_price)
+            for granularity in (HOUR, DAY) for rollup in analyser.price_history(item_id, granularity)]
+
+
+@pytest.mark.parametrize("cache_size", [1, 1024])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_incremental_rollups_match_a_rebuild(tmp_path, monkeypatch, seed, cache_size):
+    # With a single bucket kept in memory, most batches read their buckets again
+    monkeypatch.setattr(marketplace_data, "PRICE_BUCKET_CACHE_SIZE", cache_size)
+    randomiser = random.Random(seed)
+    analyser = MarketplaceDataAnalyser(database_url=f"sqlite:///{tmp_path / 'market.db'}")
+    start = datetime(2026, 10, 1)
+    for batch in range(40):
+        timestamp = start + timedelta(minutes=randomiser.randrange(3 * 24 * 60))
+        offers = [offer(randomiser.randrange(60), randomiser.randrange(50, 500), item_id=randomiser.choice([5, 6]))
+                  for _ in range(randomiser.randrange(1, 12))]
+        analyser.save_offers_to_database(offers, timestamp=timestamp)
+
+    incremental = {item_id: rollups(analyser, item_id) for item_id in (5, 6)}
+    analyser.rebuild_rollups()
+    for item_id in (5, 6):
+        assert rollups(analyser, item_id) == incremental[item_id]
+
+
+
+def test_rolled_back_batch_leaves_no_price_in_memory(tmp_path, monkeypatch):
+    analyser = MarketplaceDataAnalyser(database_url=f"sqlite:///{tmp_path / 'market.db'}")
+    timestamp = datetime(2026, 10, 1, 12)
+    analyser.save_offers_to_database([offer(1, 100)], timestamp=timestamp)
+
+    def lose_connection(session):
+        raise RuntimeError("lost connection")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(Session, "commit", lose_connection)
+        with pytest.raises(RuntimeError):
+            analyser.save_offers_to_database([offer(2, 10)], timestamp=timestamp)
+    analyser.save_offers_to_database([offer(3, 300)], timestamp=timestamp)
+
+    assert [rollup.p10_price for rollup in analyser.price_history(5, HOUR)] == [100]
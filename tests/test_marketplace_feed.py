@@ -0,0 +1,219 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from automation_scripts.marketplace_scripts.marketplace_data import (MarketplaceDataAnalyser, MarketplaceOffer,
+                                                                     OfferSnapshotWriter)
+from automation_scripts.marketplace_scripts.marketplace_observer import MarketBuyTarget, MarketplaceProductObserver
+from the_west_inner.marketplace_buy import Marketplace_offer
+from the_west_inner.marketplace_feed import MarketplaceChangeFeed, OfferChangeType, diff_offers
+
+START = datetime(2026, 10, 1, 12)
+
+
+def offer(offer_id, price, item_id=5, count=1, current_bid=None):
+    return Marketplace_offer({'market_offer_id': offer_id, 'item_id': item_id, 'item_count': count,
+                              'max_price': price * count, 'current_bid': current_bid,
+                              'seller_player_id': 1, 'market_town_id': 2})
+
+
+def poll(minutes: int) -> datetime:
+    return START + timedelta(minutes=minutes)
+
+
+def test_diff_reports_added_removed_and_repriced_offers():
+    previous = {1: offer(1, 100), 2: offer(2, 200), 3: offer(3, 300)}
+    current = {1: offer(1, 100), 2: offer(2, 150), 4: offer(4, 400)}
+
+    diff = diff_offers(item_id=5, previous=previous, current=current, previous_seen_at={2: poll(0), 3: poll(5)})
+
+    assert [change.offer_id for change in diff.added] == [4]
+    assert [(change.offer_id, change.previous.item_price, change.last_seen) for change in diff.price_changed] == \
+        [(2, 200, poll(0))]
+    assert [(change.offer_id, change.last_seen) for change in diff.removed] == [(3, poll(5))]
+    assert [changed.offer_id for changed in diff.changed_offers] == [4, 2]
+    assert [(retired.item_price, last_seen) for retired, last_seen in diff.retired_offers] == \
+        [(200, poll(0)), (300, poll(5))]
+
+
+def test_a_new_bid_is_a_change():
+    diff = diff_offers(item_id=5, previous={1: offer(1, 100)}, current={1: offer(1, 100, current_bid=60)})
+
+    assert [change.change_type for change in diff.changes] == [OfferChangeType.PRICE_CHANGED]
+
+
+def test_an_unchanged_search_is_an_empty_diff():
+    feed = MarketplaceChangeFeed()
+    feed.update(item_id=5, offers=[offer(1, 100), offer(2, 200)], observed_at=poll(0))
+
+    diff = feed.update(item_id=5, offers=[offer(1, 100), offer(2, 200)], observed_at=poll(1))
+
+    assert not diff
+    assert diff.changed_offers == [] and diff.retired_offers == []
+
+
+def test_removed_offers_report_the_last_search_that_saw_them():
+    feed = MarketplaceChangeFeed()
+    feed.update(item_id=5, offers=[offer(1, 100), offer(2, 200)], observed_at=poll(0))
+    feed.update(item_id=5, offers=[offer(1, 100), offer(2, 200)], observed_at=poll(1))
+
+    diff = feed.update(item_id=5, offers=[offer(1, 100)], observed_at=poll(2))
+
+    assert [(change.offer_id, change.last_seen) for change in diff.removed] == [(2, poll(1))]
+    assert set(feed.snapshot(5)) == {1}
+
+
+def test_a_partial_search_reports_no_removal_and_keeps_the_unread_offers():
+    feed = MarketplaceChangeFeed()
+    feed.update(item_id=5, offers=[offer(1, 100), offer(2, 200)], observed_at=poll(0))
+
+    partial = feed.update(item_id=5, offers=[offer(1, 90)], complete=False, observed_at=poll(1))
+    complete = feed.update(item_id=5, offers=[], observed_at=poll(2))
+
+    assert [change.offer_id for change in partial.price_changed] == [1] and partial.removed == []
+    # The unread offer keeps the time it was really seen
+    assert {change.offer_id: change.last_seen for change in complete.removed} == {1: poll(1), 2: poll(0)}
+
+
+def test_subscribers_get_the_changes_they_asked_for():
+    feed = MarketplaceChangeFeed()
+    everything, removals, other_item = [], [], []
+    feed.subscribe(everything.extend)
+    feed.subscribe(removals.extend, change_types=[OfferChangeType.REMOVED])
+    feed.subscribe(other_item.extend, item_ids=[6])
+
+    feed.update(item_id=5, offers=[offer(1, 100), offer(2, 200)])
+    feed.update(item_id=5, offers=[offer(2, 250)])
+
+    assert [(change.change_type, change.offer_id) for change in everything] == [
+        (OfferChangeType.ADDED, 1), (OfferChangeType.ADDED, 2),
+        (OfferChangeType.PRICE_CHANGED, 2), (OfferChangeType.REMOVED, 1)]
+    assert [change.offer_id for change in removals] == [1]
+    assert other_item == []
+
+
+def test_a_failing_subscriber_is_isolated_and_counted():
+    feed = MarketplaceChangeFeed()
+    received = []
+
+    def failing(changes):
+        raise RuntimeError("subscriber bug")
+
+    feed.subscribe(failing)
+    subscription = feed.subscribe(received.extend)
+
+    diff = feed.update(item_id=5, offers=[offer(1, 100)])
+    subscription.unsubscribe()
+    feed.update(item_id=5, offers=[offer(2, 100)])
+
+    assert [change.offer_id for change in received] == [1]
+    assert len(diff.added) == 1
+    assert feed.stats() == {"updates": 2, "offers_seen": 2, "added": 2, "removed": 1, "price_changed": 0,
+                            "subscribers": 1, "subscriber_errors": 2}
+    assert isinstance(feed.last_subscriber_error, RuntimeError)
+
+
+def test_a_forgotten_item_reports_every_offer_as_added():
+    feed = MarketplaceChangeFeed()
+    feed.update(item_id=5, offers=[offer(1, 100)])
+
+    feed.forget(5)
+
+    assert feed.has_changed(item_id=5, offer=offer(1, 100))
+    assert [change.offer_id for change in feed.update(item_id=5, offers=[offer(1, 100)]).added] == [1]
+
+
+class BuyManager:
+    handler = None
+
+    def __init__(self):
+        self.offers = []
+
+    def iter_offers(self, item_id, stop_when=None, max_pages=None):
+        yield from self.offers
+
+
+class Currency:
+    total_money = 0
+
+
+class RecordingAnalyser(MarketplaceDataAnalyser):
+    def __init__(self, database_url):
+        super().__init__(database_url=database_url)
+        self.batches = []
+
+    def save_offers_to_database(self, offers_list, timestamp=None, retired_offers=()):
+        offers_list, retired_offers = list(offers_list), list(retired_offers)
+        self.batches.append((sorted(offer.offer_id for offer in offers_list),
+                             sorted(retired.offer_id for retired, _ in retired_offers)))
+        return super().save_offers_to_database(offers_list, timestamp=timestamp, retired_offers=retired_offers)
+
+    def stored_offers(self) -> list[tuple]:
+        with self.Session() as session:
+            return [tuple(row) for row in session.execute(
+                select(MarketplaceOffer.offer_id, MarketplaceOffer.item_price_per_unit, MarketplaceOffer.timestamp,
+                       MarketplaceOffer.last_seen)
+                .order_by(MarketplaceOffer.offer_id, MarketplaceOffer.timestamp))]
+
+
+@pytest.fixture(params=[False, True], ids=["direct", "snapshot_writer"])
+def market(tmp_path, request):
+    buy_manager = BuyManager()
+    analyser = RecordingAnalyser(database_url=f"sqlite:///{tmp_path / 'market.db'}")
+    snapshot_writer = OfferSnapshotWriter(marketplace_data_analyser=analyser) if request.param else None
+    observer = MarketplaceProductObserver(marketplace_buy_manager=buy_manager,
+                                          currency=Currency(),
+                                          items=None,
+                                          marketplace_data_analyser=analyser,
+                                          item_list=[MarketBuyTarget(item_id=5, item_price_per_unit=1)],
+                                          snapshot_writer=snapshot_writer,
+                                          change_feed=MarketplaceChangeFeed())
+    yield buy_manager, analyser, observer
+    observer.close()
+
+
+def search_at(observer, monkeypatch, minutes):
+    class Clock(datetime):
+        @classmethod
+        def utcnow(cls):
+            return poll(minutes)
+
+    monkeypatch.setattr("automation_scripts.marketplace_scripts.marketplace_observer.datetime", Clock)
+    result = observer.search_item(5)
+    if observer.snapshot_writer is not None:
+        observer.snapshot_writer.flush()
+    return result
+
+
+def test_an_observer_with_a_feed_only_writes_the_changes(market, monkeypatch):
+    buy_manager, analyser, observer = market
+
+    buy_manager.offers = [offer(1, 100), offer(2, 200), offer(3, 300)]
+    search_at(observer, monkeypatch, 0)
+    search_at(observer, monkeypatch, 1)
+    buy_manager.offers = [offer(1, 100), offer(2, 150)]
+    search_at(observer, monkeypatch, 2)
+    search_at(observer, monkeypatch, 3)
+
+    # The unchanged searches write nothing, the others only their changes
+    assert analyser.batches == [([1, 2, 3], []), ([2], [2, 3])]
+    assert analyser.stored_offers() == [
+        (1, 100.0, poll(0), poll(0)),
+        (2, 200.0, poll(0), poll(1)),
+        (2, 150.0, poll(2), poll(2)),
+        (3, 300.0, poll(0), poll(1)),
+    ]
+
+
+def test_an_offer_repriced_back_gets_its_last_seen_moved(market, monkeypatch):
+    buy_manager, analyser, observer = market
+
+    buy_manager.offers = [offer(1, 100)]
+    search_at(observer, monkeypatch, 0)
+    buy_manager.offers = [offer(1, 90)]
+    search_at(observer, monkeypatch, 1)
+    buy_manager.offers = [offer(1, 100)]
+    search_at(observer, monkeypatch, 2)
+
+    assert analyser.stored_offers() == [(1, 100.0, poll(0), poll(2)), (1, 90.0, poll(1), poll(1))]
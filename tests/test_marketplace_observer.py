@@ -0,0 +1,137 @@
+import threading
+import time
+
+import pytest
+
+from automation_scripts.marketplace_scripts.marketplace_data import OfferSnapshotWriter
+from automation_scripts.marketplace_scripts.marketplace_observer import MarketBuyTarget, MarketplaceProductObserver
+from automation_scripts.marketplace_scripts.marketplace_watcher import MarketplaceWatcher
+
+
+class Offer:
+    def __init__(self, offer_id, item_id, price):
+        self.offer_id = offer_id
+        self.item_id = item_id
+        self.item_price_per_unit = price
+        self.item_price = price
+        self.bought = False
+
+    def buy_instantly(self, handler):
+        self.bought = True
+        return {'money': 0, 'deposit': 0}
+
+
+class Currency:
+    def __init__(self, total_money):
+        self.total_money = total_money
+
+    def modify_money(self, new_cash, new_deposit):
+        pass
+
+
+class BuyManager:
+    handler = None
+
+    def __init__(self, offers, errors=None, delay=0.0):
+        self.offers = offers
+        self.errors = errors or {}
+        self.delay = delay
+        self.searches = []
+
+    def iter_offers(self, item_id, stop_when=None, max_pages=None):
+        self.searches.append(item_id)
+        time.sleep(self.delay)
+        if item_id in self.errors:
+            raise self.errors[item_id]
+        for offer in self.offers.get(item_id, []):
+            if stop_when is not None and stop_when(offer):
+                return
+            yield offer
+
+
+class SlowAnalyser:
+    def __init__(self):
+        self.batches = []
+
+    def save_offers_to_database(self, offers, timestamp=None, retired_offers=()):
+        time.sleep(0.05)
+        self.batches.append(list(offers))
+        return len(offers)
+
+
+def observer(buy_manager, targets, money=1000, snapshot_writer=None):
+    return MarketplaceProductObserver(marketplace_buy_manager=buy_manager,
+                                      currency=Currency(money),
+                                      items=None,
+                                      marketplace_data_analyser=SlowAnalyser(),
+                                      item_list=targets,
+                                      snapshot_writer=snapshot_writer)
+
+
+def test_matching_offers_are_bought_and_every_offer_is_saved():
+    offers = {1: [Offer(10, 1, 50), Offer(11, 1, 500), Offer(12, 1, 80)]}
+    product_observer = observer(BuyManager(offers), [MarketBuyTarget(item_id=1, item_price_per_unit=100)], money=60)
+
+    result = product_observer.search_item(1)
+
+    assert (result.matching, result.bought, result.unaffordable) == (2, 1, 1)
+    assert [offer.bought for offer in offers[1]] == [True, False, False]
+    assert product_observer.marketplace_data_analyser.batches == [offers[1]]
+
+
+def test_failed_search_does_not_stop_the_sweep_but_is_raised():
+    session_expired = PermissionError("session expired")
+    buy_manager = BuyManager({2: [Offer(20, 2, 10)]}, errors={1: session_expired})
+    targets = [MarketBuyTarget(item_id=1, item_price_per_unit=100, priority=2),
+               MarketBuyTarget(item_id=2, item_price_per_unit=100)]
+
+    report = observer(buy_manager, targets).search_all(max_workers=1)
+
+    assert buy_manager.searches == [1, 2]
+    assert report.bought == 1 and [result.item_id for result in report.errors] == [1]
+    with pytest.raises(PermissionError) as raised:
+        report.raise_errors()
+    assert raised.value is session_expired
+
+
+def test_search_all_returns_once_the_offers_are_written():
+    offers = {item_id: [Offer(item_id * 10, item_id, 500)] for item_id in range(1, 4)}
+    analyser = SlowAnalyser()
+    writer = OfferSnapshotWriter(marketplace_data_analyser=analyser)
+    targets = [MarketBuyTarget(item_id=item_id, item_price_per_unit=100) for item_id in offers]
+
+    with observer(BuyManager(offers), targets, snapshot_writer=writer) as product_observer:
+        report = product_observer.search_all()
+        assert len(analyser.batches) == 3 and report.errors == []
+
+    assert not writer._thread.is_alive()
+    writer.close()
+
+
+def test_watcher_searches_urgent_targets_more_often():
+    targets = [MarketBuyTarget(item_id=1, item_price_per_unit=100, priority=4.0),
+               MarketBuyTarget(item_id=2, item_price_per_unit=100, priority=1.0)]
+    buy_manager = BuyManager({1: [Offer(10, 1, 500)], 2: [Offer(20, 2, 500)]}, delay=0.01)
+    watcher = MarketplaceWatcher(observer(buy_manager, targets), max_workers=2,
+                                 base_interval=0.4, min_interval=0.05, max_interval=1.0)
+    results = []
+
+    watcher.run(duration=0.9, on_result=results.append)
+
+    stats = watcher.stats()
+    assert stats["items"][1]["searches"] > stats["items"][2]["searches"] >= 2
+    assert stats["searches"] == len(results) == len(buy_manager.searches)
+    assert watcher.interval(1) == pytest.approx(0.1) and watcher.interval(2) == pytest.approx(0.4)
+
+
+def test_watcher_stops_when_asked():
+    buy_manager = BuyManager({}, delay=0.01)
+    watcher = MarketplaceWatcher(observer(buy_manager, [MarketBuyTarget(item_id=1, item_price_per_unit=100)]),
+                                 base_interval=0.05, min_interval=0.05)
+    thread = threading.Thread(target=watcher.run)
+    thread.start()
+    time.sleep(0.2)
+    watcher.stop()
+    thread.join(timeout=2)
+
+    assert not thread.is_alive() and watcher.stats()["searches"] >= 2
@@ -0,0 +1,53 @@
+import asyncio
+import os
+
+from the_west_inner.minimap_cache import MinimapCache, MinimapKey
+
+KEY = MinimapKey(server="the-west.ro", world="ro1")
+MINIMAP = {"error": False, "counties": {"1": "county"}, "job_groups": {"5": [[100, 200]]}, "towns": {"1": "town"}}
+
+
+def test_async_minimap_is_downloaded_once(tmp_path):
+    cache = MinimapCache(directory=str(tmp_path))
+    downloads = []
+
+    async def loader():
+        downloads.append(1)
+        return MINIMAP
+
+    async def get_twice():
+        return await cache.get_async(KEY, loader), await cache.get_async(KEY, loader)
+
+    first, second = asyncio.run(get_twice())
+
+    assert first == second == MINIMAP
+    assert len(downloads) == 1
+    assert MinimapCache(directory=str(tmp_path)).get(KEY, lambda: {}) == MINIMAP
+
+
+def test_stale_async_minimap_is_refreshed_in_a_task(tmp_path):
+    cache = MinimapCache(directory=str(tmp_path), volatile_ttl=0)
+    cache.get(KEY, lambda: MINIMAP)
+    refreshed = {**MINIMAP, "towns": {"2": "new town"}}
+
+    async def loader():
+        return refreshed
+
+    async def get_stale_then_wait():
+        stale = await cache.get_async(KEY, loader)
+        await asyncio.gather(*cache._async_refreshes.values())
+        return stale
+
+    assert asyncio.run(get_stale_then_wait()) == MINIMAP
+    assert cache.background_refreshes == 1
+    assert cache.get(KEY, lambda: {})["towns"] == {"2": "new town"}
+
+
+def test_relative_directory_is_made_absolute(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    cache = MinimapCache(directory="minimaps")
+    cache.get(KEY, lambda: MINIMAP)
+
+    assert cache.directory == str(tmp_path / "minimaps")
+    assert len(os.listdir(tmp_path / "minimaps")) == 2
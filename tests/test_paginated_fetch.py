@@ -0,0 +1,65 @@
+import asyncio
+import threading
+
+from the_west_inner.paginated_fetch import PaginatedFetcher, gather_pages
+
+
+class PageServer:
+    """
+    Serves `total` pages that only tell whether a next page exists, recording the pages requested.
+    """
+    def __init__(self, total: int):
+        self.total = total
+        self.requested: list[int] = []
+        self._lock = threading.Lock()
+
+    def fetch_page(self, page: int) -> dict:
+        with self._lock:
+            self.requested.append(page)
+        return {"page": page, "next": page < self.total}
+
+
+def test_has_next_walk_requests_no_page_past_the_last_one():
+    server = PageServer(total=2)
+    fetcher = PaginatedFetcher(fetch_page=server.fetch_page, has_next=lambda page: page["next"], max_workers=4)
+
+    pages = fetcher.fetch_all()
+
+    assert [page["page"] for page in pages] == [1, 2]
+    assert sorted(server.requested) == [1, 2]
+
+
+def test_has_next_walk_stopped_early_requests_at_most_the_next_page():
+    server = PageServer(total=10)
+    fetcher = PaginatedFetcher(fetch_page=server.fetch_page, has_next=lambda page: page["next"], max_workers=4)
+
+    pages = list(fetcher.iter_pages(stop_condition=lambda page: page["page"] == 3))
+
+    assert [page["page"] for page in pages] == [1, 2, 3]
+    assert max(server.requested) <= 4
+
+
+def test_page_count_walk_reads_every_page_in_order():
+    server = PageServer(total=7)
+    fetcher = PaginatedFetcher(fetch_page=server.fetch_page, page_count=lambda page: 7, max_workers=3)
+
+    assert [page["page"] for page in fetcher.fetch_all()] == list(range(1, 8))
+    assert sorted(server.requested) == list(range(1, 8))
+
+
+def test_gather_pages_bounds_the_pages_in_flight():
+    in_flight = 0
+    peak = 0
+
+    async def fetch_page(page: int) -> int:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return page
+
+    pages = asyncio.run(gather_pages(fetch_page=fetch_page, page_numbers=range(2, 12), max_workers=3))
+
+    assert pages == list(range(2, 12))
+    assert peak == 3
@@ -0,0 +1,20 @@
+from benchmarks import parsing_benchmarks
+from the_west_inner.init_data import InitDataIndex
+from the_west_inner.reports import extract_job_xhtml_data, extract_job_xhtml_data_fast
+
+
+def test_both_job_report_parsers_read_the_fixture_alike():
+    assert (extract_job_xhtml_data_fast(parsing_benchmarks.JOB_REPORT_XHTML)
+            == extract_job_xhtml_data(parsing_benchmarks.JOB_REPORT_XHTML))
+
+
+def test_job_report_benchmarks_run():
+    assert set(parsing_benchmarks.benchmark_job_report_parsing(number=5, repeat=1)) == {'regex', 'beautifulsoup'}
+    assert set(parsing_benchmarks.benchmark_job_rewards(report_count=4, latency=0)) == {'sequential', 'batched'}
+
+
+def test_init_data_benchmark_reads_every_value():
+    init_data = InitDataIndex(parsing_benchmarks.initialization_page(size=10_000))
+    assert len(init_data.jobs) and len(init_data.bag) and init_data.cash['cash'] == 1500
+    assert init_data.wof_id_by_event_name('Octoberfest') == 21
+    assert set(parsing_benchmarks.benchmark_init_data(size=10_000, repeat=1)) == {'return_functions', 'shared_index'}
@@ -0,0 +1,31 @@
+import asyncio
+
+from the_west_inner.ranking import CategoryEnum, PlayerRatingManager
+
+
+class AsyncRankingHandler:
+    """
+    Serves `pages` pages of the experience ranking, one player per page, recording the pages requested.
+    """
+    def __init__(self, pages: int):
+        self.pages = pages
+        self.requested: list[int] = []
+
+    async def post(self, window, action, action_name="action", payload=None, use_h=False) -> dict:
+        page = payload['page']
+        self.requested.append(page)
+        await asyncio.sleep(0)
+        return {'pages': self.pages,
+                'ranking': [{'name': f'player_{page}', 'player_id': page, 'level': 100, 'counter': page + 1,
+                             CategoryEnum.EXPERIENCE: 1000 - page}]}
+
+
+def test_async_experience_rating_fetches_every_page_once():
+    handler = AsyncRankingHandler(pages=6)
+    manager = PlayerRatingManager(handler=None, max_workers=2)
+
+    rating = asyncio.run(manager.get_player_experience_rating_async(async_handler=handler))
+
+    assert sorted(handler.requested) == list(range(6))
+    assert sorted(quantity.player_place for quantity in rating.player_rating_data.values()) == list(range(1, 7))
+    assert manager.player_rating_data.player_pages == 6
@@ -0,0 +1,75 @@
+from report_fixtures import job_report_response
+from the_west_inner import report_store
+from the_west_inner.report_store import PersistentReports_manager, ReportStore
+
+
+class ReportsHandler:
+    base_url = "https://en1.the-west.net"
+    player = 7
+
+    def __init__(self):
+        self.report_ids = []
+        self.shown = []
+
+    def add_reports(self, *report_ids):
+        self.report_ids = sorted(self.report_ids + list(report_ids), reverse=True)
+
+    def post(self, window, action, action_name="action", payload=None, use_h=False):
+        if action == "get_reports":
+            return {"error": False, "count": 1, "reports": [
+                {"report_id": report_id, "data_id": report_id, "date_received": "18.10.2026", "hash": "hash",
+                 "popupData": "", "read": False, "title": f"Report {report_id}", "publish_mode": 0}
+                for report_id in self.report_ids]}
+        report_id = int(payload["report_id"])
+        self.shown.append(report_id)
+        response = job_report_response(report_id=report_id)
+        if report_id % 2:
+            response["reportType"] = "duel"
+        return response
+
+
+def test_reports_are_read_once_across_restarts(tmp_path):
+    store = ReportStore(database_url=f"sqlite:///{tmp_path / 'reports.db'}")
+    handler = ReportsHandler()
+    handler.add_reports(1)
+    PersistentReports_manager(handler=handler, report_store=store)
+    handler.add_reports(2, 3, 4)
+    manager = PersistentReports_manager(handler=handler, report_store=store, last_read_report_id=1)
+
+    rewards = manager._read_reports()
+
+    assert sorted(handler.shown) == [2, 3, 4]
+    assert rewards.job_duration == 2 * 3600
+    assert store.known_report_ids(manager.account_key, [1, 2, 3, 4]) == {2, 3, 4}
+    assert store.get_last_read_report_id(manager.account_key) == 4
+
+    # A crash before the high-water mark moved: the stored reports, job or not, aren't read again
+    store.set_last_read_report_id(manager.account_key, 1)
+    PersistentReports_manager(handler=handler, report_store=store)._read_reports()
+    assert sorted(handler.shown) == [2, 3, 4]
+
+
+def test_high_water_mark_is_read_once(tmp_path, monkeypatch):
+    store = ReportStore(database_url=f"sqlite:///{tmp_path / 'reports.db'}")
+    handler = ReportsHandler()
+    handler.add_reports(5)
+    calls = []
+    get_last_read_report_id = store.get_last_read_report_id
+    monkeypatch.setattr(store, "get_last_read_report_id",
+                        lambda account_key: calls.append(account_key) or get_last_read_report_id(account_key))
+
+    PersistentReports_manager(handler=handler, report_store=store)
+    PersistentReports_manager(handler=handler, report_store=store)
+
+    assert len(calls) == 2
+
+
+def test_default_database_is_in_the_cache_directory(tmp_path, monkeypatch):
+    monkeypatch.setattr(report_store, "DEFAULT_REPORT_DIRECTORY", str(tmp_path / "cache" / "reports"))
+    monkeypatch.chdir(tmp_path)
+
+    store = ReportStore()
+    store.set_last_read_report_id("en1:7", 3)
+
+    assert (tmp_path / "cache" / "reports" / "reports_data.db").exists()
+    assert not (tmp_path / "reports_data.db").exists()
@@ -0,0 +1,85 @@
+import asyncio
+import gc
+
+import pytest
+
+from the_west_inner import requests_rate_limiter
+from the_west_inner.requests_rate_limiter import TokenBucketRateLimiter, get_rate_limiter
+
+
+class FakeClock:
+    """
+    Stands for the `time` module of the limiter : sleeping moves the clock forward.
+    """
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps: list[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(requests_rate_limiter, "time", clock)
+    return clock
+
+
+def test_burst_is_available_at_once(clock):
+    limiter = TokenBucketRateLimiter(burst=3, refill_rate=0.5)
+
+    assert [limiter.try_acquire() for _ in range(4)] == [True, True, True, False]
+    assert clock.sleeps == []
+
+
+def test_tokens_refill_up_to_the_burst(clock):
+    limiter = TokenBucketRateLimiter(burst=3, refill_rate=0.5)
+    for _ in range(3):
+        limiter.acquire()
+
+    clock.now += 3
+    assert limiter.available_tokens == pytest.approx(1.5)
+    clock.now += 100
+    assert limiter.available_tokens == 3
+
+
+def test_empty_bucket_blocks_until_the_next_token(clock):
+    limiter = TokenBucketRateLimiter(burst=2, refill_rate=0.5)
+
+    waits = [limiter.acquire() for _ in range(4)]
+
+    # Every waiter reserves its own token : the third waits 2s, the fourth 2s more after it
+    assert waits == [0, 0, pytest.approx(2.0), pytest.approx(2.0)]
+    assert clock.sleeps == [pytest.approx(2.0), pytest.approx(2.0)]
+    assert limiter.stats() == {"total_requests": 4, "waited_requests": 2, "total_wait_time": pytest.approx(4.0)}
+
+
+def test_concurrent_waiters_are_spread_by_the_refill_rate(clock):
+    limiter = TokenBucketRateLimiter(burst=1, refill_rate=50)
+
+    async def acquire_many():
+        return await asyncio.gather(*(limiter.acquire_async() for _ in range(4)))
+
+    assert asyncio.run(acquire_many()) == [0, pytest.approx(0.02), pytest.approx(0.04), pytest.approx(0.06)]
+
+
+def test_registry_shares_a_limiter_per_account():
+    limiter = get_rate_limiter(base_url="https://en1.the-west.net", player=1, burst=5, refill_rate=1)
+
+    assert get_rate_limiter(base_url="https://en1.the-west.net", player=1, burst=5, refill_rate=1) is limiter
+    assert get_rate_limiter(base_url="https://en1.the-west.net", player=2, burst=5, refill_rate=1) is not limiter
+    with pytest.raises(ValueError):
+        get_rate_limiter(base_url="https://en1.the-west.net", player=1, burst=3, refill_rate=1)
+
+
+def test_registry_drops_unused_limiters():
+    get_rate_limiter(base_url="https://en2.the-west.net", player=1)
+    gc.collect()
+
+    assert ("https://en2.the-west.net", 1) not in requests_rate_limiter._rate_limiters
+    assert get_rate_limiter(base_url="https://en2.the-west.net", player=1, burst=9, refill_rate=2).burst == 9
@@ -0,0 +1,81 @@
+"""
+The vectorised `Job_reward_stats.simulate_jobs` against the drop rules of `simulate_job`, with seeded generators.
+"""
+import numpy as np
+import pytest
+
+from the_west_inner.items import Items
+from the_west_inner.simulation_data_library.simul_job import Item_drop_calculator, Job_reward_stats
+from the_west_inner.simulation_data_library.simul_work_relevant_bonuses import Work_bonuses
+
+JOB_COUNT = 20_000
+
+
+def catalogue() -> list[dict]:
+    return [{'item_id': (index + 1) * 1000, 'name': f'item_{index}', 'type': 'yield', 'sub_type': None,
+             'price': 10 * (index + 1), 'dropable': index % 3 != 2, 'craftitem': None, 'profession_id': None,
+             'speed': None, 'bonus': {'item': [], 'attributes': {}, 'skills': {}}}
+            for index in range(30)]
+
+
+@pytest.fixture
+def items() -> Items:
+    return Items(catalogue())
+
+
+@pytest.fixture
+def stats() -> Job_reward_stats:
+    return Job_reward_stats(wage=430, exp=215, inferior_luck=40, superior_luck=160, danger=5,
+                            product_rate={2000: 40}, job_id=7, is_silver=False)
+
+
+def test_a_seed_gives_the_same_summary(stats, items):
+    player_data = Work_bonuses(item_drop=5)
+    first = stats.simulate_jobs(600, items, player_data, JOB_COUNT, rng=np.random.default_rng(11))
+    second = stats.simulate_jobs(600, items, player_data, JOB_COUNT, rng=np.random.default_rng(11))
+
+    assert first == second
+
+
+def test_wage_and_exp_are_deterministic(stats, items):
+    summary = stats.simulate_jobs(600, items, Work_bonuses(item_drop=5), JOB_COUNT, rng=np.random.default_rng(3))
+    normalized = stats._normalize_by_time(600)
+
+    for distribution, value in ((summary.wage, normalized.wage), (summary.exp, normalized.exp)):
+        assert distribution.std == 0
+        assert distribution.minimum == distribution.maximum == distribution.mean == value
+        assert distribution.total == value * JOB_COUNT
+
+
+def test_the_drops_follow_the_drop_rules(stats, items):
+    player_data = Work_bonuses(item_drop=5)
+    summary = stats.simulate_jobs(600, items, player_data, JOB_COUNT, rng=np.random.default_rng(5))
+    coeficient = Item_drop_calculator.calculate_item_drop_coeficient(600, player_data.item_drop, stats.is_silver)
+    in_range = {item['item_id']: item['price'] for item in items.get_droppable_items_in_price_range(40, 160)}
+
+    # 45 % of jobs drop one item : 46 of the 101 possible draws are below 45
+    assert summary.items_dropped.mean == pytest.approx(46 / 101 + coeficient // 100, abs=0.02)
+    assert set(summary.item_drop_rates) <= set(in_range)
+    assert sum(summary.item_drop_rates.values()) == pytest.approx(summary.items_dropped.mean)
+    assert summary.item_value.total == pytest.approx(
+        sum(rate * JOB_COUNT * in_range[item_id] for item_id, rate in summary.item_drop_rates.items()))
+    assert summary.item_value.mean == pytest.approx(summary.items_dropped.mean * np.mean(list(in_range.values())),
+                                                    rel=0.05)
+
+
+def test_no_item_drops_outside_the_catalogue_prices(items):
+    stats = Job_reward_stats(wage=10, exp=10, inferior_luck=1000, superior_luck=2000, danger=0,
+                             product_rate={}, job_id=1, is_silver=True)
+    summary = stats.simulate_jobs(3600, items, Work_bonuses(item_drop=3), 1000, rng=np.random.default_rng(0))
+
+    assert summary.item_drop_rates == {}
+    assert summary.item_value.total == 0
+
+
+def test_the_droppable_price_array_is_built_once(stats, items):
+    price_array = items.droppable_price_array
+
+    stats.simulate_jobs(600, items, Work_bonuses(item_drop=5), 100, rng=np.random.default_rng(1))
+
+    assert items.droppable_price_array is price_array
+    assert price_array.tolist() == items.droppable_prices
@@ -0,0 +1,59 @@
+from the_west_inner.simulation_data_library.simul_skills import SKILL_LAYOUT, Skills
+
+
+def skills_from_range(start: int = 0) -> Skills:
+    return Skills.from_values(list(range(start, start + len(SKILL_LAYOUT))))
+
+
+def test_groups_follow_the_skills_vector():
+    skills = skills_from_range()
+    dexterity_skills = skills.dexterity_based_skills
+
+    skills += skills_from_range(100)
+    skills['shot'] = -1
+    skills.dexterity = 7
+
+    assert dexterity_skills.aim == skills['aim'] == 14 + 114
+    assert dexterity_skills.shot == -1
+    assert skills.attributes.dexterity == 7
+    assert skills.to_list()[SKILL_LAYOUT.index('dexterity')] == 7
+
+
+def test_writing_a_group_writes_the_skills():
+    skills = skills_from_range()
+
+    skills.charisma_based_skills.trade = 50
+    skills.attributes['flexibility'] = 9
+
+    assert skills['trade'] == 50
+    assert skills.mobility == 9
+
+
+def test_effective_skills_add_the_attribute_of_every_skill():
+    skills = skills_from_range()
+
+    effective = skills.effective_skills.to_list()
+
+    assert effective[:4] == [0, 0, 0, 0]
+    assert effective[SKILL_LAYOUT.index('build')] == 4 + 0
+    assert effective[SKILL_LAYOUT.index('aim')] == 14 + 2
+    assert effective[SKILL_LAYOUT.index('appearance')] == 23 + 3
+
+
+def test_sum_and_product_keep_the_layout():
+    first, second = skills_from_range(), skills_from_range(1)
+
+    assert (first + second).to_list() == [2 * index + 1 for index in range(len(SKILL_LAYOUT))]
+    assert sum([first, second]).to_list() == (first + second).to_list()
+    assert (first * 2).to_list() == [2 * index for index in range(len(SKILL_LAYOUT))]
+
+
+def test_effective_skills_and_vectors_are_copies():
+    skills = skills_from_range()
+    effective = skills.effective_skills
+    values = skills.to_list()
+
+    skills += skills_from_range(100)
+
+    assert effective['aim'] == 14 + 2
+    assert values == list(range(len(SKILL_LAYOUT)))
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from equipment_fixtures import every_rule_set, random_equipment_space
+from the_west_inner.simulation_data_library.calc_maxim import Brute_force_simulation_bonus_check
+from the_west_inner.simulation_data_library.simul_equip_rules import TotalSkillPointsRule, WeaponDamageSimulRule
+from the_west_inner.simulation_data_library.simul_vector_fitness import CompiledEquipmentSpace
+from the_west_inner.simulation_data_library.simul_branch_and_bound import BranchAndBoundEquipmentOptimiser
+from the_west_inner.simulation_data_library.simul_equip_fitnes import SimulFitnessRuleSet
+from the_west_inner.simulation_data_library.simul_genetic_islands import IslandModel
+from the_west_inner.simulation_data_library.simul_vector_fitness import VectorizedFitnessEvaluator
+
+RESULTS = np.array([[100.0, 9.0], [105.0, 1.0], [98.0, 20.0]])
+
+
+class ZeroRule:
+    def calculate(self, equipment_data):
+        return 0
+
+
+def evaluator(percent_coefficient):
+    rule_set = SimulFitnessRuleSet([ZeroRule(), ZeroRule()], percent_coefficient=percent_coefficient)
+    return VectorizedFitnessEvaluator(fitness_rule_set=rule_set, space=None)
+
+
+def sequential_best(evaluator, results):
+    best_index, best_result = None, evaluator.fitness_rule_set.generate_empty_result()
+    for index, row in enumerate(results):
+        if evaluator.to_fitness_result(row) > best_result:
+            best_index, best_result = index, evaluator.to_fitness_result(row)
+    return best_index
+
+
+@pytest.mark.parametrize("percent_coefficient, expected", [(0.0, 1), (0.1, 0)])
+def test_best_index_matches_a_sequential_scan(percent_coefficient, expected):
+    fitness_evaluator = evaluator(percent_coefficient)
+    assert fitness_evaluator.best_index(RESULTS) == sequential_best(fitness_evaluator, RESULTS) == expected
+
+
+def test_best_of_scans_in_order_with_a_percent_coefficient(monkeypatch):
+    fitness_evaluator = evaluator(0.1)
+    monkeypatch.setattr(fitness_evaluator, "evaluate", lambda choices: RESULTS[choices[:, 0]])
+    best_choice, best_result = fitness_evaluator.best_of([np.array([[1], [0]]), np.array([[2]])])
+    assert best_choice.tolist() == [1]
+    assert best_result.result == [105, 1]
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_vector_fitness_matches_the_equipment_simulation(seed):
+    item_model_list, item_set_list, equipment = random_equipment_space(seed=seed, items_per_slot=2, slots=7)
+    brute_force = Brute_force_simulation_bonus_check(equipment, item_model_list, item_set_list)
+    rule_set = every_rule_set()
+    space = brute_force.compile_space()
+    fitness_evaluator = VectorizedFitnessEvaluator(fitness_rule_set=rule_set, space=space)
+
+    permutations = list(brute_force.possible_equipment_generator())
+    legacy = np.array([rule_set.get_fitness_result(data).result for data in permutations])
+    vector = fitness_evaluator.evaluate(np.array([space.encode(data.permutation) for data in permutations]))
+
+    assert len(permutations) == 2 ** 7
+    np.testing.assert_allclose(vector, legacy)
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3, 4])
+@pytest.mark.parametrize("rule_set", [every_rule_set,
+                                      lambda: SimulFitnessRuleSet([WeaponDamageSimulRule(), TotalSkillPointsRule()])])
+def test_branch_and_bound_finds_the_exhaustive_optimum(seed, rule_set):
+    item_model_list, item_set_list, _ = random_equipment_space(seed=seed, items_per_slot=3, slots=7)
+    space = CompiledEquipmentSpace(item_model_list=item_model_list, item_set_list=item_set_list, player_level=37)
+    fitness_evaluator = VectorizedFitnessEvaluator(fitness_rule_set=rule_set(), space=space)
+
+    exhaustive_choice, exhaustive_result = fitness_evaluator.best_of(space.iter_choices())
+    improvements = list(BranchAndBoundEquipmentOptimiser(evaluator=fitness_evaluator).iter_improvements())
+
+    branch_and_bound_choice, branch_and_bound_result = improvements[-1]
+    assert branch_and_bound_result.result == exhaustive_result.result
+    assert branch_and_bound_choice.tolist() == exhaustive_choice.tolist()
+
+
+def test_branch_and_bound_refuses_a_percent_coefficient():
+    with pytest.raises(ValueError):
+        BranchAndBoundEquipmentOptimiser(evaluator=evaluator(0.1))
+
+
+def test_island_model_refuses_a_percent_coefficient():
+    with pytest.raises(ValueError):
+        IslandModel(evaluator=evaluator(0.1), population_size=10, generations=1, mutation_rate=0.1)
@@ -0,0 +1,59 @@
+import random
+import types
+
+import pytest
+
+from the_west_inner.map import Map_job_location
+from the_west_inner.simulation_data_library.simul_work_cycles.work_cycle_planner import WorkCyclePlanner
+from the_west_inner.simulation_data_library.simul_work_cycles.work_cycle_simul import (SimulatorWorkCycle,
+                                                                                       SimulUsableItem)
+from the_west_inner.simulation_data_library.simul_work_cycles.work_cycle_simul_data import (WorkCycleJobSimul,
+                                                                                            WorkCycleSimul)
+from the_west_inner.work_job_data import WorkData, WorkJobData
+
+JOB_COUNT = 8
+LOCATIONS_PER_JOB = 3
+
+
+def work_cycle_jobs(rng: random.Random) -> list[WorkCycleJobSimul]:
+    """
+    Returns LOCATIONS_PER_JOB locations of each of JOB_COUNT fifteen seconds jobs, the locations of a job
+    following each other.
+    """
+    jobs = []
+    for job_index in range(JOB_COUNT):
+        work_data = WorkJobData(work_id=job_index + 1, skill_points_required=0, work_points=0, motivation=100,
+                                item_drop_interval=(0, 0), stage=0, malus=0,
+                                timed_work_data={15: WorkData(cost=1, money=1, xp=rng.randint(5, 60), luck=1,
+                                                              duration=15, product_id_list=[])})
+        for _ in range(LOCATIONS_PER_JOB):
+            location = Map_job_location(1, job_index + 1, rng.randint(1, 5000), rng.randint(1, 2000),
+                                        rng.random() < 0.1)
+            jobs.append(WorkCycleJobSimul(location, work_data))
+    return jobs
+
+
+@pytest.mark.parametrize("usables", [{},
+                                     {"energy_usable": SimulUsableItem(0, 1.0)},
+                                     {"motivation_usable": SimulUsableItem(25, 0)},
+                                     {"energy_usable": SimulUsableItem(10, 0.5),
+                                      "motivation_usable": SimulUsableItem(50, 0.2)}])
+@pytest.mark.parametrize("time_limit, energy_max", [(300, 30), (3600, 100), (20000, 237)])
+def test_evaluate_route_matches_the_simulator(usables, time_limit, energy_max):
+    rng = random.Random(time_limit + energy_max + len(usables))
+    jobs = work_cycle_jobs(rng)
+    player_data = types.SimpleNamespace(game_data=types.SimpleNamespace(game_travel_speed=0.9),
+                                        character_movement=0.3, energy_max=energy_max)
+    simulator = SimulatorWorkCycle(player_data, time_limit=time_limit, **usables)
+    planner = WorkCyclePlanner(jobs, simulator)
+
+    for _ in range(40):
+        # A route visits one location of distinct jobs
+        job_indices = rng.sample(range(JOB_COUNT), rng.randint(1, JOB_COUNT))
+        route = tuple(job_index * LOCATIONS_PER_JOB + rng.randrange(LOCATIONS_PER_JOB) for job_index in job_indices)
+
+        evaluation = planner.evaluate_route(route)
+        simulated = simulator.simulate(WorkCycleSimul([jobs[index] for index in route]))
+
+        assert (evaluation.exp_gained, evaluation.elapsed_time, evaluation.energy_left) == \
+            (simulated.exp_gained, simulated.elapsed_time, simulated.energy)
@@ -0,0 +1,199 @@
+"""
+Asyncio counterpart of `requests_handler`.
+
+The sessions used by this library (plain requests, tor, proxy and opera sessions) are all
+synchronous, so the async handler drives the existing session from a bounded worker pool
+instead of replacing it with a different HTTP client. Every request still goes through the
+same per-account token bucket and the same retry logic as `requests_handler.post`.
+
+The worker pool and the limit of requests in flight belong to the host : every account
+playing on a world shares them, however many handlers are open.
+"""
+import asyncio
+import threading
+import typing
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from connection_sessions.standard_request_session import StandardRequestsSession
+
+from the_west_inner.requests_handler import requests_handler, request_game
+from the_west_inner.requests_rate_limiter import TokenBucketRateLimiter, get_rate_limiter
+
+
+DEFAULT_CONNECTIONS_PER_HOST = 10
+
+
+def mount_connection_pool(session: requests.Session | StandardRequestsSession, pool_size: int) -> None:
+    """
+    Make sure a plain `requests.Session` keeps enough keep-alive connections around for `pool_size`
+    concurrent requests. Custom sessions manage their own connections and are left untouched.
+    """
+    if not isinstance(session, requests.Session):
+        return
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+
+class HostConnections:
+    """
+    The worker threads and the limit of requests in flight shared by the handlers of one host.
+
+    Attributes:
+        size (int): The maximum number of requests in flight to the host.
+        executor (ThreadPoolExecutor): Runs the requests, `size` at a time.
+        handlers (int): The number of open handlers of the host.
+    """
+    def __init__(self, size: int):
+        self.size = size
+        self.executor = ThreadPoolExecutor(max_workers=size)
+        self.handlers = 0
+        # Semaphores are bound to a loop : one per loop the host is used from, dropped with the loop
+        self._semaphores: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def semaphore(self) -> asyncio.Semaphore:
+        """
+        Return the semaphore limiting the requests in flight to the host inside the running event loop.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphore = self._semaphores.get(loop)
+            if semaphore is None:
+                semaphore = asyncio.Semaphore(self.size)
+                self._semaphores[loop] = semaphore
+            return semaphore
+
+
+_host_connections: dict[str, HostConnections] = {}
+_host_connections_lock = threading.Lock()
+
+
+def open_host_connections(host: str, size: int) -> HostConnections:
+    """
+    Return the connections of the host, creating them for the first open handler.
+
+    Raises:
+        ValueError: If the open handlers of the host were created with another size.
+    """
+    with _host_connections_lock:
+        connections = _host_connections.get(host)
+        if connections is None:
+            connections = HostConnections(size=size)
+            _host_connections[host] = connections
+        elif connections.size != size:
+            raise ValueError(f"The handlers of {host} allow {connections.size} connections, got {size}")
+        connections.handlers += 1
+        return connections
+
+
+def close_host_connections(host: str) -> None:
+    """
+    Release the connections of the host, stopping its worker threads once its last handler is closed.
+    """
+    with _host_connections_lock:
+        connections = _host_connections[host]
+        connections.handlers -= 1
+        if connections.handlers == 0:
+            del _host_connections[host]
+            connections.executor.shutdown(wait=False)
+
+
+@dataclass
+class AsyncRequestsHandler:
+    """
+    Async wrapper class for making game requests.
+
+    Attributes:
+        session (requests.Session): The requests session to use.
+        base_url (str): The base URL of the game server.
+        h (str): The hash parameter for authentication.
+        player (typing.Hashable): Identifies the account the handler belongs to. Defaults to the hash parameter.
+        rate_limiter (TokenBucketRateLimiter): The limiter every request waits on.
+            Defaults to the one registered for (base_url, player), so it is shared with the sync handler.
+        max_connections_per_host (int): Maximum number of requests in flight to the host, shared by every
+            handler of the host (they must all use the same value).
+    """
+    session: requests.Session | StandardRequestsSession
+    base_url: str
+    h: str
+    player: typing.Hashable = None
+    rate_limiter: TokenBucketRateLimiter = field(default=None, repr=False, compare=False)
+    max_connections_per_host: int = DEFAULT_CONNECTIONS_PER_HOST
+    _connections: HostConnections | None = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.player is None:
+            self.player = self.h
+        if self.rate_limiter is None:
+            self.rate_limiter = get_rate_limiter(base_url=self.base_url, player=self.player)
+        mount_connection_pool(session=self.session, pool_size=self.max_connections_per_host)
+        self._connections = open_host_connections(host=self.host, size=self.max_connections_per_host)
+
+    @classmethod
+    def from_handler(cls,
+                     handler: requests_handler,
+                     max_connections_per_host: int = DEFAULT_CONNECTIONS_PER_HOST) -> typing.Self:
+        """
+        Build an async handler that shares the session and the rate limiter of an existing sync handler.
+        """
+        return cls(session=handler.session,
+                   base_url=handler.base_url,
+                   h=handler.h,
+                   player=handler.player,
+                   rate_limiter=handler.rate_limiter,
+                   max_connections_per_host=max_connections_per_host)
+
+    @property
+    def host(self) -> str:
+        return urlparse(self.base_url).netloc
+
+    async def post(self, window, action, action_name="action", payload=None, use_h=False):
+        """
+        Make a POST request to the game server without blocking the event loop.
+
+        Args:
+            window (str): The game window or context.
+            action (str): The specific action to perform in the game.
+            action_name (str): The name of the action parameter. Defaults to "action".
+            payload (dict): Optional payload data for the request. Defaults to None.
+            use_h (bool): Flag to include the hash parameter. Defaults to False.
+
+        Returns:
+            dict: JSON response from the game server.
+        """
+        await self.rate_limiter.acquire_async()
+        async with self._connections.semaphore():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._connections.executor,
+                partial(request_game,
+                        self.session,
+                        self.base_url,
+                        window,
+                        action,
+                        payload,
+                        self.h if use_h else None,
+                        action_name=action_name)
+            )
+
+    def close(self) -> None:
+        """
+        Release the connections of the host. Closing a closed handler does nothing.
+        """
+        if self._connections is not None:
+            self._connections = None
+            close_host_connections(host=self.host)
+
+    async def __aenter__(self) -> typing.Self:
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.close()
@@ -1,9 +1,22 @@
+import os
 import time
 from functools import wraps
 import threading
 
 import typing
 
+# Root of the disk caches, ~/.cache/the_west when not set
+CACHE_DIRECTORY_VARIABLE = "THE_WEST_CACHE_DIR"
+
+
+def cache_directory(name: str) -> str:
+    """
+    Returns the absolute directory of the disk cache `name`, under $THE_WEST_CACHE_DIR or ~/.cache/the_west.
+    """
+    root = os.environ.get(CACHE_DIRECTORY_VARIABLE) or os.path.join(os.path.expanduser("~"), ".cache", "the_west")
+    return os.path.abspath(os.path.join(root, name))
+
+
 
 def cache_function_results(seconds):
     cache = {}
@@ -6,7 +6,7 @@ from the_west_inner.currency import Currency
 
 from the_west_inner.current_events.current_events import CurrentEvent
 
-from the_west_inner.init_data import return_current_event_data,get_wof_id_by_event_name,return_current_fair_data
+from the_west_inner.init_data import InitDataIndex
 
 from the_west_inner.current_events.independence.build_independence_event import IndependenceEventBuilder
 from the_west_inner.current_events.oktoberfest.build_oktoberfest_event import OktoberfestEventBuilder
@@ -70,7 +70,8 @@ class CurrentEventLoader:
         return builder.build_event()
 def make_event_loader(game_html : str) -> CurrentEventLoader|None:
     
-    current_event_list  = return_current_event_data(initialization_html = game_html)
+    init_data = InitDataIndex(game_html)
+    current_event_list  = init_data.ses_data
     
     if current_event_list == []:
         return None
@@ -81,7 +82,7 @@ def make_event_loader(game_html : str) -> CurrentEventLoader|None:
             
             wof_event_key = event_name if event_name not in INCONSISTENT_NAMING else INCONSISTENT_NAMING.get(event_name)
             
-            wof_id = get_wof_id_by_event_name(initialization_html = game_html , event_name = wof_event_key)
+            wof_id = init_data.wof_id_by_event_name(event_name = wof_event_key)
             
             return CurrentEventLoader(
                 wof_id = wof_id,
@@ -93,12 +94,13 @@ def make_event_loader(game_html : str) -> CurrentEventLoader|None:
 
 def make_fair_event_loader(game_html : str ) -> CurrentEventLoader|None:
     
-    fair_event_data = return_current_fair_data(initialization_html= game_html)
+    init_data = InitDataIndex(game_html)
+    fair_event_data = init_data.wof_by_type('fairwof')
     
     if fair_event_data == {}:
         return None
     
-    wof_id = get_wof_id_by_event_name(initialization_html = game_html , event_name = fair_event_data.get('name'))
+    wof_id = init_data.wof_id_by_event_name(event_name = fair_event_data.get('name'))
     
     
     return CurrentEventLoader(wof_id = wof_id,
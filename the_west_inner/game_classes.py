@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from the_west_inner.requests_handler import requests_handler
 from the_west_inner.movement import Game_data
@@ -38,4 +38,5 @@ class Game_classes():
     consumable_handler : Consumable_handler
     equipment_manager : Equipment_manager
     currency : Currency
-    movement_manager : MovementManager
\ No newline at end of file
+    movement_manager : MovementManager
+    bootstrap_timings : dict[str, float] = field(default_factory=dict)
\ No newline at end of file
@@ -6,6 +6,7 @@ tiles_tw_gold: Divides the map into chunks based on the given number of chunks.
 parse_map_tw_gold: Parses data from the complete map and returns a list of dictionaries containing gold and silver data.
 """
 
+import asyncio
 import math
 import typing
 import concurrent.futures
@@ -14,6 +15,8 @@ import itertools
 import numpy as np
 
 from the_west_inner.requests_handler import requests_handler
+from the_west_inner.async_requests_handler import AsyncRequestsHandler
+from the_west_inner.minimap_cache import minimap_cache
 
 
 # Do not disturb , this function was written by someone else and I don't know how it works
@@ -34,12 +37,11 @@ def parse_map_data_for_gold_jobs(list_of_dynamic):
 # Based on data retrieved from the minimap functions this function sectiones the map in n parts where n is the number of chuncks in the function argument
 # Every single work location will be divided into tiles that are then separated into chunks
 def tiles_map_search_by_key_word(handler:requests_handler,key_word:str,chuncks = 4)-> typing.List[list]:
+    cautare_locatii_munci = minimap_cache.get_for_handler(handler = handler).get(key_word)
+    return split_locations_in_tile_chunks(cautare_locatii_munci, chuncks = chuncks)
+def split_locations_in_tile_chunks(cautare_locatii_munci : dict | list , chuncks = 4) -> typing.List[list]:
     tiles= []
     TILE_SIZE = 256
-    cautare_locatii_munci = handler.post(
-                                window="map",
-                                action="get_minimap",
-                                action_name= "ajax").get(key_word)
     if cautare_locatii_munci == []:
         return []
     for each in cautare_locatii_munci.values():
@@ -69,6 +71,20 @@ def parse_map_tw_gold(handler:requests_handler,num_chuncks:int = 4)-> typing.Lis
     solution = list([item for sublist in future for item in sublist if item["silver"] == True])
     return solution
 
+async def parse_map_tw_gold_async(handler:AsyncRequestsHandler,num_chuncks:int = 4)-> typing.List[dict]:
+    minimap = await minimap_cache.get_for_handler_async(handler = handler)
+    args = split_locations_in_tile_chunks(minimap.get("job_groups"), chuncks = num_chuncks)
+    tiles_data_list = await asyncio.gather(
+        *(handler.post(
+                        window="map",
+                        action="get_complete_data",
+                        action_name= "ajax",
+                        payload= {"tiles":f"{each}"}
+                        ) for each in args)
+    )
+    result = [tiles_data["dynamic"] for tiles_data in tiles_data_list]
+    return [item for sublist in map(parse_map_data_for_gold_jobs, result) for item in sublist if item["silver"] == True]
+
 def parse_map_data_for_employers(nested_dict,employer_list = None):
     if employer_list is None:
         employer_list = []
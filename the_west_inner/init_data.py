@@ -16,6 +16,10 @@ return_bag: Extracts the list of items in the player's bag from the initializati
 return_cooldown: Extracts the date of the next cooldown period from the initialization HTML.
 return_premium_data: Extracts premium bonus data from the initialization HTML.
 return_wear_data : Extracts equipment data from the initialization HTML
+
+InitDataIndex scans the initialization HTML once and decodes every JSON blob lazily, at most once.
+The functions above are thin wrappers around an index built for the page ; callers reading several values of
+the same page build one InitDataIndex and use it instead.
 """
 
 CORRESPONDING_EVENT_WOF = {
@@ -27,25 +31,130 @@ CORRESPONDING_EVENT_WOF = {
     'Heart' : 'heartswof'
 }
 
+JSON_BLOB_PATTERN = re.compile(r'\{.*\}')
+_UNDECODABLE = object()
+
+
+class InitDataIndex:
+    """
+    Index over the JSON blobs embedded in the game's initialization HTML.
+
+    The page is scanned once; every blob is decoded the first time it is needed and then cached.
+    The keyed accessors reproduce the lookup rules the `return_*` functions always used
+    (fixed positions for some blobs, first/last blob containing a key for others).
+    """
+    def __init__(self, initialization_html: str):
+        self.candidates: list[str] = JSON_BLOB_PATTERN.findall(str(initialization_html))
+        self._decoded: dict[int, typing.Any] = {}
+
+    def decode(self, position: int) -> typing.Any:
+        """
+        Returns the decoded blob at the given position, or None if it isn't valid JSON.
+        """
+        if position not in self._decoded:
+            try:
+                self._decoded[position] = json.loads(self.candidates[position])
+            except ValueError:
+                self._decoded[position] = _UNDECODABLE
+        value = self._decoded[position]
+        return None if value is _UNDECODABLE else value
+
+    def _positions_containing(self, text: str) -> typing.Generator[int, None, None]:
+        return (position for position, candidate in enumerate(self.candidates) if text in candidate)
+
+    def _decoded_dicts(self) -> typing.Generator[dict, None, None]:
+        for position in range(len(self.candidates)):
+            value = self.decode(position)
+            if isinstance(value, dict):
+                yield value
+
+    @property
+    def jobs(self) -> dict:
+        return self.decode(2)["jobs"]
+
+    @property
+    def ses_data(self) -> dict[str,str|int] | list[typing.Never]:
+        return self.decode(2)["sesData"]
+
+    @property
+    def bag(self) -> list[dict]:
+        bag_dict = self.decode(4)["bag"]
+        return [item for item_type in bag_dict for item in bag_dict[item_type]]
+
+    @property
+    def wear(self) -> dict:
+        return self.decode(4)["wear"]
+
+    @property
+    def premium_boni(self) -> dict:
+        return self.decode(5)["premiumBoni"]
+
+    @property
+    def itemuse_cooldown(self) -> datetime.datetime:
+        position = next(self._positions_containing("itemuseCooldown"), 16)
+        raw_time_data = self.decode(position)["itemuseCooldown"]
+        return datetime.datetime.strptime(time.ctime(float(raw_time_data)),"%c")
+
+    @property
+    def buffs(self) -> list:
+        positions = list(self._positions_containing('buffs'))
+        if not positions:
+            return []
+        return self.decode(positions[-1])['buffs']
+
+    @property
+    def cash(self) -> dict[str,int] | None:
+        search_dict = ['cash','deposit','upb','nuggets','veteranPoints']
+        position = next(self._positions_containing("cash"), None)
+        if position is None:
+            return None
+        json_player_data = self.decode(position)
+        return {key : json_player_data.get(key) for key in search_dict}
+
+    def wof_by_type(self, wof_type: str) -> dict:
+        """
+        Returns the first wheel of fortune blob of the given type, or an empty dict.
+        """
+        return next((blob for blob in self._decoded_dicts() if blob.get('type', None) == wof_type), {})
+
+    def wof_id_by_event_name(self, event_name: str) -> int | None:
+        wof_type = CORRESPONDING_EVENT_WOF.get(event_name, None)
+        if wof_type is None:
+            return None
+        for position, candidate in enumerate(self.candidates):
+            dict_data = self.decode(position)
+            if dict_data is not None:
+                if dict_data.get('type', None) == wof_type:
+                    return dict_data.get('id')
+                continue
+            # Several wof entries on one line are matched as a single "{...},{...}" candidate
+            try:
+                events = json.loads(f'[{candidate}]')
+            except ValueError:
+                continue
+            for event in events:
+                if isinstance(event, dict) and event.get('type', None) == wof_type:
+                    return event.get('id')
+        return None
+
+
+def build_init_data_index(initialization_html: str) -> InitDataIndex:
+    """
+    Returns a new index of the given initialization HTML. Nothing is kept between calls : the page and the
+    decoded blobs live as long as the returned index.
+    """
+    return InitDataIndex(initialization_html)
+
 
 def return_h(login_data):
     soup = BeautifulSoup(login_data.text, 'html.parser')
     return soup.find("body").find("script").contents[0].split("""Player.init({"h":""")[1].split(",")[0].replace("\"","")
 def return_work_list(initialization_html):
-    jsonStr_list = re.findall(r'\{.*\}', str(initialization_html))
-    json_item = json.loads(jsonStr_list[2])
-    return json_item["jobs"]
+    return build_init_data_index(str(initialization_html)).jobs
 def return_bag(initialization_html):
-    jsonStr_list = re.findall(r'\{.*\}', str(initialization_html))
-    json_item = json.loads(jsonStr_list[4])
-    bag_dict = json_item["bag"]
-    returnable= []
-    for item_type in bag_dict:
-        for item in bag_dict[item_type]:
-            returnable.append(item)
-    return returnable
+    return build_init_data_index(str(initialization_html)).bag
 def return_cooldown_when_everything_fails(initialization_html:str)->datetime.datetime:
-    jsonStr_list = re.findall(r'\{.*\}', str(initialization_html))
+    jsonStr_list = build_init_data_index(str(initialization_html)).candidates
     json_item = json.loads(jsonStr_list[16])
     raw_time_data = json_item["itemuseCooldown"]
     game_time = time.ctime(float(raw_time_data))
@@ -53,100 +162,27 @@ def return_cooldown_when_everything_fails(initialization_html:str)->datetime.dat
     return game_time
 
 def return_cooldown(initialization_html:str)->datetime.datetime:
-    jsonStr_list = re.findall(r'\{.*\}', str(initialization_html))
-    for string_found in jsonStr_list:
-        if "itemuseCooldown" in string_found:
-            json_item = json.loads(string_found)
-            raw_time_data = json_item["itemuseCooldown"]
-            game_time = time.ctime(float(raw_time_data))
-            game_time = datetime.datetime.strptime(game_time,"%c")
-            return game_time
-    return return_cooldown_when_everything_fails(initialization_html=initialization_html)
+    return build_init_data_index(str(initialization_html)).itemuse_cooldown
 def return_premium_data(initialization_html):
-    jsonStr_list = re.findall(r'\{.*\}', str(initialization_html))
-    json_item = json.loads(jsonStr_list[5])
-    return json_item["premiumBoni"]
+    return build_init_data_index(str(initialization_html)).premium_boni
 def return_wear_data(initialization_html):
-    jsonStr_list = re.findall(r'\{.*\}', str(initialization_html))
-    for string_found in jsonStr_list:
-        if "wear" in jsonStr_list:
-            json_item = json.loads(string_found)
-            raw_time_data = json_item["wear"]
-            game_time = time.ctime(float(raw_time_data))
-            game_time = datetime.datetime.strptime(game_time,"%c")
-            return game_time
-def return_wear_data(initialization_html):
-    jsonStr_list = re.findall(r'\{.*\}', str(initialization_html))
-    json_item = json.loads(jsonStr_list[4])
-    wear_list = json_item["wear"]
-    return wear_list
+    return build_init_data_index(str(initialization_html)).wear
 def return_buff_data(initialization_html):
-    jsonStr_list = re.findall(r'\{.*\}', str(initialization_html))
-    target_string ="{'buffs':[]}"
-    for string_found in jsonStr_list:
-        if 'buffs' in string_found:
-            target_string = string_found
-    json_item = json.loads(target_string)
-    
-    return json_item['buffs']
+    return build_init_data_index(str(initialization_html)).buffs
 def return_currency_data(initialization_html:str)->dict[str,int]:
-    search_dict = ['cash','deposit','upb','nuggets','veteranPoints']
-    jsonStr_list = re.findall(r'\{.*\}', str(initialization_html))
-    for string_found in jsonStr_list:
-        if "cash" in string_found:
-            json_player_data = json.loads(string_found)
-            return {key : json_player_data.get(key) for key in search_dict}
+    return build_init_data_index(str(initialization_html)).cash
 
 
 def return_current_fair_data(initialization_html : str) -> dict[str , str | int ]:
     
-    jsonStr_list = re.findall(r'\{.*\}', str(initialization_html))
-    for json_item in jsonStr_list:
-        
-        try:
-            
-            dict_data = json.loads(json_item)
-            
-            if dict_data.get('type', None) == 'fairwof' :
-                
-                return dict_data
-        
-        except :
-            pass
-    return {}
+    return build_init_data_index(str(initialization_html)).wof_by_type('fairwof')
                 
 
 def return_current_event_data(initialization_html : str) -> dict[str,str|int] | list[typing.Never]:
     
-    jsonStr_list = re.findall(r'\{.*\}', str(initialization_html))
-    json_item = json.loads(jsonStr_list[2])
-    
-    return json_item["sesData"]
+    return build_init_data_index(str(initialization_html)).ses_data
 
 
 def get_wof_id_by_event_name(initialization_html : str , event_name : str) -> dict[str,str|int]:
     
-    jsonStr_list = re.findall(r'\{.*\}', str(initialization_html))
-    wof_type = CORRESPONDING_EVENT_WOF.get(event_name, None)
-    for json_item in jsonStr_list:
-
-        try :
-            
-                
-            dict_data = json.loads(json_item)
-
-            if wof_type and dict_data.get('type', None) == wof_type:
-                return dict_data.get('id')
-        except Exception as e:
-            pass
-        
-        if json_item.startswith('{') and json_item.endswith('}'):
-            try :
-            
-                    
-                dict_data = json.loads(f'[{json_item}]')
-                for event in dict_data:
-                    if wof_type and event.get('type', None) == wof_type:
-                        return event.get('id')
-            except Exception as e:
-                pass
\ No newline at end of file
+    return build_init_data_index(str(initialization_html)).wof_id_by_event_name(event_name)
@@ -0,0 +1,196 @@
+"""
+This module contains the cache of the game's item catalogue (the response of the "data" window).
+
+The catalogue is the largest payload downloaded at login and it only depends on the game world and
+its language, so it is cached per (server, world, language):
+
+    - in memory, shared by every account of the process;
+    - on disk, as a versioned pickle file in the directory of its world (<server>/<world>/<language>.pickle),
+      so a restarted process doesn't download it again and two worlds never share a file.
+
+Both copies expire after `ttl` seconds. The disk copies are kept in an absolute directory, under
+$THE_WEST_CACHE_DIR (~/.cache/the_west by default), whatever the working directory of the process.
+A download that isn't a list of items is never cached.
+"""
+import os
+import pickle
+import tempfile
+import threading
+import time
+import typing
+from dataclasses import dataclass
+from urllib.parse import urlparse
+
+from the_west_inner.caching_decorators import cache_directory
+from the_west_inner.game_server import GameServer
+from the_west_inner.requests_handler import requests_handler
+
+CATALOGUE_FORMAT_VERSION = 1
+DEFAULT_CATALOGUE_TTL = 24 * 60 * 60
+DEFAULT_CATALOGUE_DIRECTORY = cache_directory("item_catalogue")
+
+
+@dataclass(frozen=True)
+class ItemCatalogueKey:
+    server: str
+    world: str
+    language: str
+
+    @property
+    def relative_path(self) -> str:
+        """
+        The path of the catalogue file under the cache directory : one directory per server and world.
+        """
+        server, world, language = (part.replace(os.sep, "_") or "_" for part in (self.server, self.world, self.language))
+        return os.path.join(server, world, f"{language}.pickle")
+
+    @classmethod
+    def from_handler(cls, handler: requests_handler, language: str | None = None) -> typing.Self:
+        """
+        Builds the key of the world the handler is connected to.
+        The world is the first label of the game host (ro1.the-west.ro -> ro1), the server the rest of it.
+        If no language is given, the locale of the matching `GameServer` is used.
+        """
+        host = urlparse(handler.base_url).hostname or ""
+        world, _, server = host.partition(".")
+        if language is None:
+            language = next((game_server.locale for game_server in GameServer
+                             if _is_host_of(urlparse(game_server.base_url).hostname, server)),
+                            "")
+        return cls(server=server, world=world, language=language)
+
+
+def _is_host_of(hostname: str | None, domain: str) -> bool:
+    """
+    Whether `hostname` is `domain` or one of its subdomains (www.the-west.net is one of the-west.net, not of west.net).
+    """
+    return hostname is not None and domain != "" and (hostname == domain or hostname.endswith("." + domain))
+
+
+def is_item_catalogue(items: typing.Any) -> bool:
+    """
+    Whether a "data" response (or a cached copy) is a catalogue : a non empty list of item dicts.
+    """
+    return (isinstance(items, list)
+            and len(items) > 0
+            and all(isinstance(item, dict) and "item_id" in item for item in items))
+
+
+def download_items(handler: requests_handler) -> list[dict]:
+    """
+    Downloads the item catalogue from the server.
+    """
+    return handler.post("data", "")
+
+
+class ItemCatalogueCache:
+    """
+    Thread-safe cache of item catalogues keyed by `ItemCatalogueKey`.
+
+    Attributes:
+        directory (str | None): Where the catalogues are persisted, made absolute. None disables the disk copy.
+        ttl (float): Seconds after which a catalogue is downloaded again.
+    """
+
+    def __init__(self, directory: str | None = DEFAULT_CATALOGUE_DIRECTORY, ttl: float = DEFAULT_CATALOGUE_TTL):
+        self.directory = None if directory is None else os.path.abspath(directory)
+        self.ttl = ttl
+        self._catalogues: dict[ItemCatalogueKey, tuple[list[dict], float]] = {}
+        self._lock = threading.Lock()
+        self._key_locks: dict[ItemCatalogueKey, threading.Lock] = {}
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _key_lock(self, key: ItemCatalogueKey) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _path(self, key: ItemCatalogueKey) -> str:
+        return os.path.join(self.directory, key.relative_path)
+
+    def _load_from_disk(self, key: ItemCatalogueKey) -> tuple[list[dict], float] | None:
+        if self.directory is None:
+            return None
+        try:
+            with open(self._path(key), "rb") as cache_file:
+                stored = pickle.load(cache_file)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+            return None
+        if not isinstance(stored, dict) or stored.get("format_version") != CATALOGUE_FORMAT_VERSION:
+            return None
+        if stored.get("key") != key or not is_item_catalogue(stored.get("items")):
+            return None
+        created_at = stored["created_at"]
+        if time.time() - created_at >= self.ttl:
+            return None
+        return stored["items"], created_at
+
+    def _save_to_disk(self, key: ItemCatalogueKey, items: list[dict], created_at: float) -> None:
+        if self.directory is None:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        stored = {
+            "format_version": CATALOGUE_FORMAT_VERSION,
+            "key": key,
+            "created_at": created_at,
+            "items": items
+        }
+        # Write to a temporary file first so concurrent readers never see a half written catalogue
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "wb") as cache_file:
+                pickle.dump(stored, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_path, path)
+        except BaseException:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+
+    def get(self,
+            key: ItemCatalogueKey,
+            loader: typing.Callable[[], list[dict]]) -> list[dict]:
+        """
+        Returns the catalogue of `key`, calling `loader` only if neither the memory nor the disk copy is fresh.
+        Concurrent callers asking for the same key wait for a single download.
+
+        Raises:
+            ValueError: The loader didn't return a catalogue (an error response), nothing is cached.
+        """
+        with self._key_lock(key):
+            cached = self._catalogues.get(key)
+            if cached is not None and time.time() - cached[1] < self.ttl:
+                self.hits += 1
+                return cached[0]
+
+            cached = self._load_from_disk(key)
+            if cached is not None:
+                self.disk_hits += 1
+                self._catalogues[key] = cached
+                return cached[0]
+
+            self.misses += 1
+            items = loader()
+            if not is_item_catalogue(items):
+                raise ValueError(f"The item catalogue of {key} is not a list of items : {str(items)[:200]}")
+            created_at = time.time()
+            self._catalogues[key] = (items, created_at)
+            self._save_to_disk(key, items, created_at)
+            return items
+
+    def get_for_handler(self, handler: requests_handler, language: str | None = None) -> list[dict]:
+        return self.get(key=ItemCatalogueKey.from_handler(handler=handler, language=language),
+                        loader=lambda: download_items(handler=handler))
+
+    def invalidate(self, key: ItemCatalogueKey) -> None:
+        with self._key_lock(key):
+            self._catalogues.pop(key, None)
+            if self.directory is not None and os.path.exists(self._path(key)):
+                os.remove(self._path(key))
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses}
+
+
+item_catalogue_cache = ItemCatalogueCache()
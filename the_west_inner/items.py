@@ -1,12 +1,16 @@
+import bisect
+import copy
 import math
 
 import typing
 
+import numpy as np
+
 from the_west_inner.requests_handler import requests_handler
 from the_west_inner.premium import Premium
 from the_west_inner.work_list import Work_list
 from the_west_inner.bag import Bag
-from the_west_inner.caching_decorators import cache_function_results
+from the_west_inner.item_catalogue_cache import item_catalogue_cache
 
 """
 This module contains utility functions and classes for handling items in a game. The return_items function returns a dictionary containing the items data from the server. The Items class represents a list of items and provides methods for finding an item by ID, checking if an item is craftable, and getting the name and price of an item. The isCraftable function returns True if an item is craftable, and nr_item returns the number of items in the bag. The has_automation function returns True if the player has automation premium, and get_corresponding_work_id returns the ID of the work corresponding to a given item ID.
@@ -24,18 +28,19 @@ def apply_func_to_numbers(data, func):
     return data
 
 
-@cache_function_results(seconds=3*60*60)
 def return_items(handler: requests_handler) -> dict:
     """
-    Return the items data from the server.
+    Return the items data of the handler's world.
+
+    The catalogue is shared by every account on the same (server, world, language) and persisted on disk,
+    so it is only downloaded when the cached copy is missing or expired.
 
     :param handler: A `requests_handler` object used to make requests to the server.
     :type handler: requests_handler
     :return: A dictionary containing the items data.
     :rtype: dict
     """
-    data = handler.post("data", "")
-    return data
+    return item_catalogue_cache.get_for_handler(handler=handler)
 class Items():
     def __init__(self, items):
         """
@@ -46,15 +51,62 @@ class Items():
         """
         self.items = {f'{x["item_id"]}': x for x in items}
         self.recipes = {x["item_id"]: x for x in items if x["type"] == "recipe"}
+        self._build_indexes()
+    def _build_indexes(self) -> None:
+        """
+        Builds the secondary indexes used by the lookup methods, so none of them has to scan the catalogue.
+        """
+        self._items_by_id : dict[int,dict] = {}
+        self._items_by_type : dict[str,list[dict]] = {}
+        self._items_by_sub_type : dict[str,list[dict]] = {}
+        self._recipes_by_craftitem : dict[int,dict] = {}
+        for item in self.items.values():
+            self._index_item(item_dict = item)
+        self._droppable_items : list[dict] | None = None
+        self._droppable_prices : list[int] | None = None
+        self._droppable_price_array : np.ndarray | None = None
+        self._droppable_items_by_price : list[dict] | None = None
+    def _index_item(self, item_dict : dict) -> None:
+        self._items_by_id.setdefault(item_dict["item_id"], item_dict)
+        self._items_by_type.setdefault(item_dict.get("type"), []).append(item_dict)
+        self._items_by_sub_type.setdefault(item_dict.get("sub_type"), []).append(item_dict)
+        if item_dict.get("craftitem") is not None:
+            self._recipes_by_craftitem.setdefault(item_dict["craftitem"], item_dict)
     def _add_to_items(self,item_id:str,item_dict:dict) -> None:
         self.items[item_id] = item_dict
+        self._index_item(item_dict = item_dict)
+        # The droppable views are rebuilt on their next use
+        self._droppable_items = None
+        self._droppable_prices = None
+        self._droppable_price_array = None
+        self._droppable_items_by_price = None
+    def _materialise_upgraded_item(self, item_id_string : str) -> None:
+        """
+        Creates (once) the upgraded "^n" variant of an item, whose id is the base item id with the last digit set to n.
+        """
+        if item_id_string[-1] != "0" and item_id_string not in self.items:
+            base_item_id_string = item_id_string[:-1] + "0"
+            if base_item_id_string not in self.items :
+                raise Exception(f"Could not find item in the item list! : {item_id_string}")
+            base_item_dict = self.items[base_item_id_string]
+            
+            new_item_dict = self._create_new_item(
+                                                item_dict= base_item_dict.copy(),
+                                                power = int(item_id_string[-1]),
+                                                new_id = item_id_string
+                                                )
+            self._add_to_items(
+                            item_id = item_id_string,
+                            item_dict = new_item_dict
+                            )
     def _create_new_item(self,item_dict:dict,power:int,new_id:str) ->dict:
         upgrade_func= lambda x : (1 + 0.1*power) * x
         if power > 5 :
             raise Exception("Too much of an upgrade !")
-        item_dict['speed'] = apply_func_to_numbers(data= item_dict['speed'],
+        # The nested bonus data is copied first : the base item belongs to the catalogue shared by every account
+        item_dict['speed'] = apply_func_to_numbers(data= copy.deepcopy(item_dict['speed']),
                                                    func = upgrade_func )
-        item_dict['bonus'] = apply_func_to_numbers(data= item_dict['bonus'],
+        item_dict['bonus'] = apply_func_to_numbers(data= copy.deepcopy(item_dict['bonus']),
                                                    func = upgrade_func )
         item_dict['name'] = f"{item_dict['name']}^{power}"
         item_dict['item_id'] = int(new_id)
@@ -68,9 +120,7 @@ class Items():
         :return: A dictionary containing information about the item with the specified ID.
         :rtype: dict
         """
-        for item in self.items.values():
-            if item["item_id"] == item_id:
-                return item
+        return self._items_by_id.get(item_id)
 #    def get_item(self, item_id: int) -> dict:
 #        """
 #        Gets an item with the given ID.
@@ -99,22 +149,7 @@ class Items():
     def get_item(self, item_id :int) -> dict:
         item_id_string = f"{item_id }"
         
-        if item_id_string[-1] != "0" and item_id_string not in self.items:
-            base_item_id_string = item_id_string[:-1] + "0"
-            if base_item_id_string not in self.items :
-                raise Exception(f"Could not find item in the item list! : {item_id_string}")
-            base_item_dict = self.items[base_item_id_string]
-            
-            new_item_dict = self._create_new_item(
-                                                item_dict= base_item_dict.copy(),
-                                                power = int(item_id_string[-1]),
-                                                new_id = item_id_string
-                                                )
-            self._add_to_items(
-                            item_id = item_id_string,
-                            item_dict = new_item_dict
-                            )
-            #print(f"created new item : {item_id_string}")
+        self._materialise_upgraded_item(item_id_string = item_id_string)
         return self.items[item_id_string]
             
     def is_craftable(self, item_id: int) -> bool:
@@ -126,10 +161,7 @@ class Items():
         :return: True if the item is craftable, False otherwise.
         :rtype: bool
         """
-        for item in self.items.values():
-            if "craftitem" in item and item["craftitem"] == item_id:
-                return True
-        return False
+        return item_id in self._recipes_by_craftitem
 
     def is_craftable_by_id(self, item_id: int) -> int:
         """
@@ -140,9 +172,29 @@ class Items():
         :return: The profession ID that can craft the item, or None if the item is not craftable.
         :rtype: int
         """
-        for item in self.items.values():
-            if item["craftitem"] == item_id:
-                return item["profession_id"]
+        recipe = self._recipes_by_craftitem.get(item_id)
+        if recipe is not None:
+            return recipe["profession_id"]
+    def get_recipe_for(self, item_id: int) -> dict | None:
+        """
+        Get the recipe that crafts the given item.
+
+        :param item_id: The ID of the crafted item.
+        :type item_id: int
+        :return: The recipe item dictionary, or None if the item is not craftable.
+        :rtype: dict | None
+        """
+        return self._recipes_by_craftitem.get(item_id)
+    def get_items_by_type(self, item_type: str) -> list[dict]:
+        """
+        Get every item of the given type (head, body, yield, recipe ...).
+        """
+        return list(self._items_by_type.get(item_type, []))
+    def get_items_by_sub_type(self, sub_type: str) -> list[dict]:
+        """
+        Get every item of the given sub type (for example the weapon kind).
+        """
+        return list(self._items_by_sub_type.get(sub_type, []))
     def is_consummable_item(self,item_id:int)->bool:
         """
         Check if an item is consummable and therefore can not be equipped
@@ -199,24 +251,58 @@ class Items():
         """
         item_id_string = f"{item_id }"
         
-        if item_id_string[-1] != "0" and item_id_string not in self.items:
-            base_item_id_string = item_id_string[:-1] + "0"
-            if base_item_id_string not in self.items :
-                raise Exception(f"Could not find item in the item list! : {item_id_string}")
-            base_item_dict = self.items[base_item_id_string]
-            
-            new_item_dict = self._create_new_item(
-                                                item_dict= base_item_dict.copy(),
-                                                power = int(item_id_string[-1]),
-                                                new_id = item_id_string
-                                                )
-            self._add_to_items(
-                            item_id = item_id_string,
-                            item_dict = new_item_dict
-                            )
+        self._materialise_upgraded_item(item_id_string = item_id_string)
         return item_id_string in self.items
+    def _build_droppable_index(self) -> None:
+        self._droppable_items = [x for x in self.items.values() if x['dropable']]
+        self._droppable_items_by_price = sorted(self._droppable_items, key = lambda x : x['price'])
+        self._droppable_prices = [x['price'] for x in self._droppable_items_by_price]
+        self._droppable_price_array = np.array(self._droppable_prices, dtype=np.float64)
     def get_droppable_items(self) -> list:
-        return [x for x in self.items.values() if x['dropable']]
+        if self._droppable_items is None:
+            self._build_droppable_index()
+        return list(self._droppable_items)
+    def get_droppable_items_in_price_range(self, min_price: int, max_price: int) -> list[dict]:
+        """
+        Get the droppable items whose price is in [min_price, max_price], using a binary search over the price sorted droppable items.
+
+        :return: The matching items, sorted by price.
+        :rtype: list[dict]
+        """
+        start, end = self.droppable_price_range_bounds(min_price = min_price, max_price = max_price)
+        return self._droppable_items_by_price[start:end]
+    def droppable_price_range_bounds(self, min_price: int, max_price: int) -> tuple[int,int]:
+        """
+        Get the [start, end) slice of `droppable_items_by_price` holding the items priced in [min_price, max_price].
+        """
+        if self._droppable_items is None:
+            self._build_droppable_index()
+        return (bisect.bisect_left(self._droppable_prices, min_price),
+                bisect.bisect_right(self._droppable_prices, max_price))
+    @property
+    def droppable_items_by_price(self) -> list[dict]:
+        """
+        The droppable items sorted by price.
+        """
+        if self._droppable_items is None:
+            self._build_droppable_index()
+        return self._droppable_items_by_price
+    @property
+    def droppable_prices(self) -> list[int]:
+        """
+        The prices of `droppable_items_by_price`, in the same order.
+        """
+        if self._droppable_items is None:
+            self._build_droppable_index()
+        return self._droppable_prices
+    @property
+    def droppable_price_array(self) -> np.ndarray:
+        """
+        `droppable_prices` as a float array, built once with the droppable index, for vectorised lookups.
+        """
+        if self._droppable_items is None:
+            self._build_droppable_index()
+        return self._droppable_price_array
 
 def isCraftable(id_item,item_list:Items):
     return item_list.is_craftable(id_item)
@@ -13,15 +13,7 @@ from the_west_inner.requests_handler import requests_handler
 
 from the_west_inner.movement import Game_data
 from the_west_inner.player_data import Player_data,ExpData
-from the_west_inner.init_data import (return_h,
-                       return_premium_data,
-                       return_bag,
-                       return_work_list,
-                       return_cooldown ,
-                       return_wear_data ,
-                       return_buff_data ,
-                       return_currency_data
-                       )
+from the_west_inner.init_data import return_h, InitDataIndex
 from the_west_inner.task_queue import TaskQueue
 from the_west_inner.premium import Premium
 from the_west_inner.misc_scripts import server_time
@@ -36,12 +28,16 @@ from the_west_inner.skills import read_skill
 from the_west_inner.equipment import create_initial_equipment , Equipment_manager
 from the_west_inner.buffs import build_buff_list
 from the_west_inner.currency import build_currency
+from the_west_inner.login_bootstrap import LoginBootstrap, BootstrapStage
 
 
 
-def game_classes_builder(active_world_url : str, game_requests_session: requests.Session , game_raw_data : requests.Response ,player_name : str , player_id : int) -> Game_classes :
+def game_classes_builder(active_world_url : str, game_requests_session: requests.Session , game_raw_data : requests.Response ,player_name : str , player_id : int , parallel_bootstrap : bool = True) -> Game_classes :
         # Create a "handler" object using the requests.Session object and the active_game_url
-        driver = requests_handler(game_requests_session ,active_world_url, return_h(game_raw_data))
+        driver = requests_handler(game_requests_session ,active_world_url, return_h(game_raw_data), player= player_id)
+
+        # Scan the initialization page once; the JSON data it embeds is decoded on first use
+        init_data = InitDataIndex(game_raw_data.text)
 
         # Create a Game_data object with a default game_travel_speed of 0.9
         game_data = Game_data(game_travel_speed=0.9)
@@ -64,14 +60,24 @@ def game_classes_builder(active_world_url : str, game_requests_session: requests
                     class_key= ''
                     )
 
-        # Update the character_movement attribute of the Player_data object using the "handler" object
-        player_data.update_character_movement(driver)
-
-        # Update the character variables (hp, energy, level, etc.) of the Player_data object using the "handler" object
-        player_data.update_character_variables(driver)
-
-        # Update the location of the Player_data object using the "handler" object
-        player_data.update_visible_variables(driver)
+        # The requests below don't depend on each other (the player_data updates touch different attributes),
+        # so the bootstrap runs them concurrently unless a sequential login was requested
+        bootstrap = LoginBootstrap(
+            stages = [
+                # Update the character_movement attribute of the Player_data object using the "handler" object
+                BootstrapStage(name = 'character_movement', func = lambda : player_data.update_character_movement(driver)),
+                # Update the character variables (hp, energy, level, etc.) of the Player_data object using the "handler" object
+                BootstrapStage(name = 'character_variables', func = lambda : player_data.update_character_variables(driver)),
+                # Update the location of the Player_data object using the "handler" object
+                BootstrapStage(name = 'visible_variables', func = lambda : player_data.update_visible_variables(driver)),
+                BootstrapStage(name = 'server_time', func = lambda : server_time(handler=driver)),
+                BootstrapStage(name = 'items', func = lambda : return_items(driver)),
+                # Read the player's skills using the "handler" object
+                BootstrapStage(name = 'skills', func = lambda : read_skill(handler= driver))
+            ],
+            parallel = parallel_bootstrap
+        )
+        bootstrap_results = bootstrap.run()
 
         # Create a TaskQueue object using the "handler" object and the Player_data object
         task_queue = TaskQueue(handler=driver,
@@ -79,13 +85,13 @@ def game_classes_builder(active_world_url : str, game_requests_session: requests
                             )
 
         # Create a Premium object using the data from the "game_raw_data" response and the server time from the "handler" object
-        premium = Premium(return_premium_data(game_raw_data.text),server_time(handler=driver))
+        premium = Premium(init_data.premium_boni,bootstrap_results['server_time'])
 
         # Create a Work_list object using the data from the "game_raw_data" response
-        work_list = Work_list(return_work_list(game_raw_data.text))
+        work_list = Work_list(init_data.jobs)
 
         # Create an Items object using the "handler" object
-        items = Items(return_items(driver))
+        items = Items(bootstrap_results['items'])
 
         # Create a Crafting_table object using the Items object
         crafting_table = Crafting_table(items)
@@ -97,10 +103,10 @@ def game_classes_builder(active_world_url : str, game_requests_session: requests
             player_crafting = None
 
         # Create a Bag object using the data from the "game_raw_data" response
-        bag = Bag(return_bag(game_raw_data.text))
+        bag = Bag(init_data.bag)
 
         # Create a Cooldown object using the data from the "game_raw_data" response and the "handler" object
-        cooldown = Cooldown(handler=driver,cooldown_date= return_cooldown(game_raw_data.text))
+        cooldown = Cooldown(handler=driver,cooldown_date= init_data.itemuse_cooldown)
 
         # Create a Consumable_handler object using the "handler" object, Bag object, and Cooldown object
         consumable_handler = Consumable_handler(
@@ -115,11 +121,10 @@ def game_classes_builder(active_world_url : str, game_requests_session: requests
                                     player_data = player_data
                                     )
 
-        # Read the player's skills using the "handler" object
-        skills = read_skill(handler= driver)
+        skills = bootstrap_results['skills']
 
         # Create a list of the player's current equipment using the data from the "game_raw_data" response and the Items object
-        current_equipment = create_initial_equipment( item_list= return_wear_data(game_raw_data.text) , items= items)
+        current_equipment = create_initial_equipment( item_list= init_data.wear , items= items)
 
         # Create an Equipment_manager object using the current equipment, Bag object, Items object, and skills
         equipment_manager = Equipment_manager(
@@ -129,12 +134,12 @@ def game_classes_builder(active_world_url : str, game_requests_session: requests
             skills= skills
         )                
         #Extract the dict associated with the player's buff(bonus effects)
-        buff_dict = return_buff_data(initialization_html = game_raw_data.text)
+        buff_dict = init_data.buffs
         #Create a Buff_list object to handle the player's buffs
         buff_list = build_buff_list(input_dict = buff_dict)
         
         #Extract the dict associated with the player's currency(money,oup etc.)
-        currency_dict = return_currency_data(initialization_html = game_raw_data.text)
+        currency_dict = init_data.cash
         #Create a Currency object to keep track of the player's currency
         currency = build_currency(input_dict = currency_dict)
         
@@ -164,8 +169,8 @@ def game_classes_builder(active_world_url : str, game_requests_session: requests
                         consumable_handler= consumable_handler ,
                         equipment_manager= equipment_manager ,
                         currency = currency,
-                        movement_manager = movement_manager
-                        
+                        movement_manager = movement_manager,
+                        bootstrap_timings = dict(bootstrap.stage_timings)
         )
         
         # Return the Game_classes object
@@ -258,7 +263,7 @@ class Game_login():
         
                 
         return game_state_response
-    def login(self ) -> Game_classes :
+    def login(self , parallel_bootstrap : bool = True) -> Game_classes :
         player_id , password_hash = self._login_account()
         game_raw_data = self._select_world(player_id=player_id,
                                            password_hash= password_hash
@@ -269,4 +274,5 @@ class Game_login():
             game_requests_session= self.session ,
             game_raw_data= game_raw_data ,
             player_name= self.player_name ,
-            player_id= player_id )
\ No newline at end of file
+            player_id= player_id ,
+            parallel_bootstrap= parallel_bootstrap )
\ No newline at end of file
@@ -0,0 +1,103 @@
+"""
+This module contains a small dependency-aware runner used to bootstrap a game session.
+
+Each stage is a callable plus the names of the stages it depends on. In parallel mode a stage is
+started as soon as all of its dependencies have finished, so independent network requests overlap;
+in sequential mode the stages run one after another in the order they were given.
+The duration of every stage is recorded in `stage_timings`.
+A stage that raises (a failed login request for instance) stops the run and the exception is re-raised.
+"""
+import time
+import typing
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+
+@dataclass
+class BootstrapStage:
+    name: str
+    func: typing.Callable[..., typing.Any]
+    depends_on: tuple[str, ...] = field(default_factory=tuple)
+
+
+class LoginBootstrap:
+    """
+    Runs a set of `BootstrapStage`s, respecting their dependencies.
+
+    A stage's callable receives the results of its dependencies as keyword arguments named after them.
+
+    Attributes:
+        stages (list[BootstrapStage]): The stages, in a valid sequential order.
+        parallel (bool): Whether independent stages may run at the same time.
+        max_workers (int): Maximum number of stages running at the same time in parallel mode.
+        stage_timings (dict[str, float]): Wall time in seconds of every finished stage.
+        total_time (float): Wall time in seconds of the whole run.
+    """
+
+    def __init__(self, stages: list[BootstrapStage], parallel: bool = True, max_workers: int = 6):
+        self.stages = stages
+        self.parallel = parallel
+        self.max_workers = max_workers
+        self.stage_timings: dict[str, float] = {}
+        self.total_time: float = 0.0
+        self._check_dependencies()
+
+    def _check_dependencies(self) -> None:
+        seen = set()
+        for stage in self.stages:
+            if stage.name in seen:
+                raise ValueError(f"Duplicate bootstrap stage : {stage.name}")
+            missing = [dependency for dependency in stage.depends_on if dependency not in seen]
+            if missing:
+                raise ValueError(f"Bootstrap stage {stage.name} depends on stages that do not run before it : {missing}")
+            seen.add(stage.name)
+
+    def _run_stage(self, stage: BootstrapStage, results: dict[str, typing.Any]) -> typing.Any:
+        start_time = time.perf_counter()
+        try:
+            return stage.func(**{dependency: results[dependency] for dependency in stage.depends_on})
+        finally:
+            self.stage_timings[stage.name] = time.perf_counter() - start_time
+
+    def _run_sequential(self) -> dict[str, typing.Any]:
+        results = {}
+        for stage in self.stages:
+            results[stage.name] = self._run_stage(stage=stage, results=results)
+        return results
+
+    def _run_parallel(self) -> dict[str, typing.Any]:
+        results = {}
+        waiting = list(self.stages)
+        running: dict[Future, BootstrapStage] = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            try:
+                while waiting or running:
+                    for stage in [stage for stage in waiting if all(dependency in results for dependency in stage.depends_on)]:
+                        waiting.remove(stage)
+                        running[executor.submit(self._run_stage, stage, dict(results))] = stage
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        stage = running.pop(future)
+                        results[stage.name] = future.result()
+            except BaseException:
+                # A failed stage (e.g. a request of a refused login) ends the bootstrap : the stages still queued
+                # are dropped instead of sending more requests, only the ones already running are waited for
+                executor.shutdown(wait=True, cancel_futures=True)
+                raise
+        return results
+
+    def run(self) -> dict[str, typing.Any]:
+        """
+        Runs every stage.
+
+        Returns:
+            dict[str, Any]: The result of every stage, by stage name.
+
+        Raises:
+            Exception: The first exception raised by a stage. No stage starts after it, in either mode.
+        """
+        start_time = time.perf_counter()
+        try:
+            return self._run_parallel() if self.parallel else self._run_sequential()
+        finally:
+            self.total_time = time.perf_counter() - start_time
@@ -15,11 +15,15 @@ Functions:
 import random
 import typing
 
+import numpy as np
+
 from the_west_inner.requests_handler import requests_handler
 from the_west_inner.work_list import Work_list
 from the_west_inner.towns import Town_list,Town
 from the_west_inner.player_data import Player_data
 from the_west_inner.gold_finder import parse_map_tw_gold
+from the_west_inner.map_index import MapLocationIndex, movement_coefficient
+from the_west_inner.minimap_cache import MinimapCache, download_minimap, minimap_cache
 
 class Map_job_location():
     def __init__(self,job_group_id:int,job_id:int,job_x:int,job_y:int,is_silver:bool) -> None:
@@ -55,6 +59,19 @@ class MapJobLocationData:
         self.map_job_location_dict : MapJobLocationDictType  = {(x.job_id,x.job_x,x.job_y) : x for x in map_job_location_list}
         
         self._loaded_silver_jobs = any([x.is_silver for x in map_job_location_list])
+        
+        self._index : MapLocationIndex[Map_job_location] | None = None
+    
+    @property
+    def index(self) -> MapLocationIndex[Map_job_location]:
+        """
+        The job locations grouped by job_id, built on first use.
+        """
+        if self._index is None:
+            self._index = MapLocationIndex(items = self.map_job_location_dict.values(),
+                                           position = lambda x : (x.job_x, x.job_y),
+                                           group = lambda x : x.job_id)
+        return self._index
     
     def complete_silver_jobs(self, handler: requests_handler ) -> None:
         
@@ -84,30 +101,27 @@ class MapJobLocationData:
         return self._loaded_silver_jobs
                     
         
-    def get_closest_job(self ,job_id : id , player_data : Player_data) -> Map_job_location:
+    def get_closest_job(self ,job_id : int , player_data : Player_data) -> Map_job_location | None:
         
-        minimum_job = None
-        min_distance = None
-        
-        job_list = [x for x in self.map_job_location_dict.values() if x.job_id == job_id]
-        
-        for job in job_list :
-            
-            distance = player_data.absolute_distance_to(final_position= (job.job_x, job.job_y)
-                                                        )
-            
-            if min_distance is None or distance < min_distance :
-                
-                min_distance = distance
-                minimum_job = job
+        return self.index.nearest(position = (player_data.x, player_data.y) , group = job_id)
+    
+    def get_closest_jobs(self , job_id : int , player_data : Player_data , number : int) -> list[Map_job_location]:
         
-        return minimum_job
+        return self.index.k_nearest(position = (player_data.x, player_data.y) , k = number , group = job_id)
     
     def get_random_job(self,job_id : int) -> Map_job_location:
         
-        return random.choice(
-            [x for x in self.map_job_location_dict.values() if x.job_id == job_id]
-        )
+        return random.choice(self.index.items(group = job_id))
+    
+    def travel_time_matrix(self ,
+                           job_ids : typing.Iterable[int] ,
+                           player_data : Player_data) -> tuple[list[Map_job_location], np.ndarray]:
+        """
+        Returns the locations of the jobs and the travel times between them at the player's current speed.
+        The matrix is cached until the speed changes.
+        """
+        return self.index.travel_time_matrix(movement_coefficient = movement_coefficient(player_data = player_data),
+                                             groups = job_ids)
 
 
 def create_job_group_jobs_dict(work_list:Work_list)-> dict:
@@ -254,18 +268,19 @@ class MapLoader:
     def __init__(self ,
                  handler: requests_handler ,
                  player_data : Player_data ,
-                 work_list : Work_list):
+                 work_list : Work_list ,
+                 minimap_cache : MinimapCache | None = minimap_cache):
         self.handler = handler
         self.player_data = player_data
         self.work_list = work_list
+        self.minimap_cache = minimap_cache
         
     def _init_map(self) -> dict:
-        response = self.handler.post(window = "map",
-                                     action_name="ajax",
-                                     action = "get_minimap")
-        if response['error'] == True :
-            raise Exception("Invalid minimap response")
-        return response
+        
+        if self.minimap_cache is None:
+            return download_minimap(handler = self.handler)
+        
+        return self.minimap_cache.get_for_handler(handler = self.handler)
     
     def _build_towns(self, minimap : dict) -> Town_list:
         
@@ -0,0 +1,294 @@
+"""
+This module contains the spatial index of the map : the job locations and the towns as NumPy coordinate arrays,
+bucketed in a grid, with nearest and k nearest queries and cached travel time matrices.
+
+Travel times follow `character_movement.calc_distanta` : the euclidean distance multiplied by the movement
+coefficient (game travel speed times character speed), rounded up.
+
+Classes:
+
+    GridIndex: A grid bucket index over an array of points.
+    MapLocationIndex: Map objects grouped by a key (the job id of a job location), one `GridIndex` per group.
+
+Functions:
+
+    movement_coefficient: The movement coefficient of a player.
+    travel_times_from: The travel times from one position to many points.
+    travel_time_matrix: The travel times between every pair of points.
+"""
+import math
+import random
+import typing
+
+import numpy as np
+
+from the_west_inner.player_data import Player_data
+
+T = typing.TypeVar('T')
+Position = tuple[float, float]
+
+# Below this number of points a query computes every distance, which is faster than walking the grid
+BRUTE_FORCE_SIZE = 64
+# The number of (query, point) distances computed at once by the vectorised queries
+QUERY_CHUNK_SIZE = 1_000_000
+
+
+def movement_coefficient(player_data: Player_data) -> float:
+    """
+    The seconds of travel per unit of distance of the player, as `character_movement` computes it.
+    """
+    return player_data.game_data.game_travel_speed * player_data.character_movement
+
+
+def _as_points(points: typing.Any) -> np.ndarray:
+    return np.asarray(points, dtype=np.float64).reshape(-1, 2)
+
+
+def _distances(points: np.ndarray, position: Position) -> np.ndarray:
+    delta_x = points[:, 0] - position[0]
+    delta_y = points[:, 1] - position[1]
+    return np.sqrt(delta_x * delta_x + delta_y * delta_y)
+
+
+def travel_times_from(position: Position, points: typing.Any, movement_coefficient: float) -> np.ndarray:
+    """
+    Returns the travel times from `position` to every point, as `character_movement.calc_distanta` does.
+    """
+    return np.ceil(_distances(_as_points(points), position) * movement_coefficient).astype(np.int64)
+
+
+def travel_time_matrix(points: typing.Any, movement_coefficient: float) -> np.ndarray:
+    """
+    Returns the (n, n) travel times between the points, as `character_movement.calc_distanta` does.
+    """
+    points = _as_points(points)
+    delta = points[:, np.newaxis, :] - points[np.newaxis, :, :]
+    distances = np.sqrt(delta[..., 0] * delta[..., 0] + delta[..., 1] * delta[..., 1])
+    return np.ceil(distances * movement_coefficient).astype(np.int64)
+
+
+class GridIndex:
+    """
+    Buckets points in square cells so that a nearest query only measures the points of the cells around it.
+
+    Ties between points at the same distance are broken by the lowest index, so the results do not depend
+    on the cell size.
+
+    Args:
+        points (array like): The (n, 2) coordinates.
+        cell_size (float | None): The side of a cell, by default about one point per cell.
+    """
+    def __init__(self, points: typing.Any, cell_size: float | None = None):
+        self.points = _as_points(points)
+        if len(self.points) == 0:
+            self.origin = np.zeros(2)
+            self.cell_size = 1.0 if cell_size is None else cell_size
+            self._cell_extent = (0, 0)
+            self._buckets: dict[tuple[int, int], np.ndarray] = {}
+            return
+
+        self.origin = self.points.min(axis=0)
+        if cell_size is None:
+            span = float((self.points.max(axis=0) - self.origin).max())
+            cell_size = max(1.0, span / math.sqrt(len(self.points)))
+        self.cell_size = cell_size
+
+        cells = np.floor((self.points - self.origin) / self.cell_size).astype(np.int64)
+        self._cell_extent = tuple(int(x) for x in cells.max(axis=0))
+        order = np.lexsort((cells[:, 1], cells[:, 0]))
+        sorted_cells = cells[order]
+        boundaries = np.flatnonzero(np.any(np.diff(sorted_cells, axis=0) != 0, axis=1)) + 1
+        self._buckets = {
+            (int(bucket_cells[0, 0]), int(bucket_cells[0, 1])): np.sort(bucket_indexes)
+            for bucket_cells, bucket_indexes in zip(np.split(sorted_cells, boundaries), np.split(order, boundaries))
+        }
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def distances(self, position: Position) -> np.ndarray:
+        """
+        Returns the distance from `position` to every point.
+        """
+        return _distances(self.points, position)
+
+    def _cell_of(self, position: Position) -> tuple[int, int]:
+        return (math.floor((position[0] - self.origin[0]) / self.cell_size),
+                math.floor((position[1] - self.origin[1]) / self.cell_size))
+
+    def _ring(self, cell: tuple[int, int], radius: int) -> typing.Generator[np.ndarray, None, None]:
+        """
+        Yields the buckets of the cells at Chebyshev distance `radius` from `cell`, inside the grid.
+        """
+        cell_x, cell_y = cell
+        max_x, max_y = self._cell_extent
+        for x in range(max(0, cell_x - radius), min(max_x, cell_x + radius) + 1):
+            if abs(x - cell_x) == radius:
+                ys = range(max(0, cell_y - radius), min(max_y, cell_y + radius) + 1)
+            else:
+                ys = [y for y in (cell_y - radius, cell_y + radius) if 0 <= y <= max_y]
+            for y in ys:
+                bucket = self._buckets.get((x, y))
+                if bucket is not None:
+                    yield bucket
+
+    def _sorted(self, indexes: np.ndarray, distances: np.ndarray, k: int) -> np.ndarray:
+        return indexes[np.lexsort((indexes, distances))[:k]]
+
+    def k_nearest(self, position: Position, k: int) -> np.ndarray:
+        """
+        Returns the indexes of the `k` points closest to `position`, the closest first.
+        """
+        k = min(k, len(self.points))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64)
+        if len(self.points) <= BRUTE_FORCE_SIZE:
+            return self._sorted(np.arange(len(self.points)), self.distances(position), k)
+
+        cell = self._cell_of(position)
+        max_x, max_y = self._cell_extent
+        # The rings closer than the grid are empty, the ones past max_radius are outside of it
+        radius = max(0, -cell[0], cell[0] - max_x, -cell[1], cell[1] - max_y)
+        max_radius = max(cell[0], max_x - cell[0], cell[1], max_y - cell[1], radius)
+        buckets: list[np.ndarray] = []
+        while True:
+            # Past as many cells as points (a cell size too small for the data) measuring every point is cheaper
+            if (2 * radius + 1) ** 2 > len(self.points):
+                return self._sorted(np.arange(len(self.points)), self.distances(position), k)
+            buckets.extend(self._ring(cell=cell, radius=radius))
+            count = sum(len(bucket) for bucket in buckets)
+            if count >= k or radius >= max_radius:
+                indexes = np.concatenate(buckets) if buckets else np.empty(0, dtype=np.int64)
+                distances = _distances(self.points[indexes], position)
+                # A point out of the rings searched is further than radius cells
+                if radius >= max_radius or np.partition(distances, k - 1)[k - 1] <= radius * self.cell_size:
+                    return self._sorted(indexes, distances, k)
+            radius += 1
+
+    def nearest(self, position: Position) -> int | None:
+        """
+        Returns the index of the point closest to `position`, None when there is none.
+        """
+        indexes = self.k_nearest(position, 1)
+        return int(indexes[0]) if len(indexes) else None
+
+    def nearest_many(self, positions: typing.Any) -> np.ndarray:
+        """
+        Returns the index of the closest point of every position (-1 when there is no point), computed in chunks.
+        """
+        positions = _as_points(positions)
+        result = np.full(len(positions), -1, dtype=np.int64)
+        if len(self.points) == 0:
+            return result
+        chunk = max(1, QUERY_CHUNK_SIZE // len(self.points))
+        for start in range(0, len(positions), chunk):
+            delta = positions[start:start + chunk, np.newaxis, :] - self.points[np.newaxis, :, :]
+            squared = delta[..., 0] * delta[..., 0] + delta[..., 1] * delta[..., 1]
+            result[start:start + chunk] = np.argmin(squared, axis=1)
+        return result
+
+
+class MapLocationIndex(typing.Generic[T]):
+    """
+    Indexes map objects by position, grouped by a key.
+
+    The objects of a group are kept in their original order : that order breaks the ties of every query.
+    The travel time matrices are cached for the movement coefficient they were computed with and dropped
+    as soon as a query uses another one (the character speed changed).
+
+    Args:
+        items (Iterable[T]): The objects.
+        position (Callable[[T], Position]): The coordinates of an object.
+        group (Callable[[T], Hashable] | None): The group of an object, every object is in the None group by default.
+        cell_size (float | None): The cell size of the grids.
+    """
+    def __init__(self,
+                 items: typing.Iterable[T],
+                 position: typing.Callable[[T], Position],
+                 group: typing.Callable[[T], typing.Hashable] | None = None,
+                 cell_size: float | None = None):
+        self._items: dict[typing.Hashable, list[T]] = {}
+        for item in items:
+            self._items.setdefault(None if group is None else group(item), []).append(item)
+        self._grids: dict[typing.Hashable, GridIndex] = {
+            key: GridIndex(points=[position(item) for item in group_items], cell_size=cell_size)
+            for key, group_items in self._items.items()
+        }
+        self._travel_time_coefficient: float | None = None
+        self._travel_time_matrices: dict[frozenset, tuple[list[T], np.ndarray]] = {}
+
+    def groups(self) -> list[typing.Hashable]:
+        return list(self._items)
+
+    def items(self, group: typing.Hashable = None) -> list[T]:
+        return self._items.get(group, [])
+
+    def coordinates(self, group: typing.Hashable = None) -> np.ndarray:
+        """
+        Returns the (n, 2) coordinates of the group, in the order of `items`.
+        """
+        grid = self._grids.get(group)
+        return grid.points if grid is not None else np.empty((0, 2))
+
+    def nearest(self, position: Position, group: typing.Hashable = None) -> T | None:
+        grid = self._grids.get(group)
+        index = grid.nearest(position) if grid is not None else None
+        return None if index is None else self._items[group][index]
+
+    def k_nearest(self, position: Position, k: int, group: typing.Hashable = None) -> list[T]:
+        grid = self._grids.get(group)
+        if grid is None:
+            return []
+        return [self._items[group][index] for index in grid.k_nearest(position, k)]
+
+    def nearest_many(self, positions: typing.Iterable[Position], group: typing.Hashable = None) -> list[T | None]:
+        """
+        Returns the closest object of every position.
+        """
+        positions = list(positions)
+        grid = self._grids.get(group)
+        if grid is None:
+            return [None] * len(positions)
+        return [self._items[group][index] if index >= 0 else None for index in grid.nearest_many(positions)]
+
+    def travel_times_from(self, position: Position, movement_coefficient: float, group: typing.Hashable = None) -> np.ndarray:
+        return travel_times_from(position=position, points=self.coordinates(group), movement_coefficient=movement_coefficient)
+
+    def by_travel_time(self, position: Position, movement_coefficient: float, group: typing.Hashable = None) -> list[T]:
+        """
+        Returns the objects of the group sorted by travel time from `position`, ties kept in the original order.
+        """
+        travel_times = self.travel_times_from(position=position, movement_coefficient=movement_coefficient, group=group)
+        return [self._items[group][index] for index in np.argsort(travel_times, kind='stable')]
+
+    def random(self, group: typing.Hashable = None, rng: random.Random | None = None) -> T:
+        """
+        Returns a random object of the group. Raises IndexError when the group is empty.
+        """
+        return (rng or random).choice(self.items(group))
+
+    def invalidate_travel_times(self) -> None:
+        self._travel_time_coefficient = None
+        self._travel_time_matrices.clear()
+
+    def travel_time_matrix(self,
+                           movement_coefficient: float,
+                           groups: typing.Iterable[typing.Hashable] | None = None) -> tuple[list[T], np.ndarray]:
+        """
+        Returns the objects of the groups (all of them by default) and the travel times between every pair of them.
+
+        The matrix takes n * n integers : restrict it to the groups you route over.
+        """
+        if movement_coefficient != self._travel_time_coefficient:
+            self.invalidate_travel_times()
+            self._travel_time_coefficient = movement_coefficient
+        key = frozenset(self._items if groups is None else groups)
+        cached = self._travel_time_matrices.get(key)
+        if cached is None:
+            ordered_groups = [group for group in self._items if group in key]
+            items = [item for group in ordered_groups for item in self._items[group]]
+            points = (np.concatenate([self.coordinates(group) for group in ordered_groups])
+                      if ordered_groups else np.empty((0, 2)))
+            cached = (items, travel_time_matrix(points=points, movement_coefficient=movement_coefficient))
+            self._travel_time_matrices[key] = cached
+        return cached
@@ -8,6 +8,10 @@ Functions:
 
 search_marketplace_category: Searches a given category of items in the marketplace using a provided request handler.
 search_marketplace_item: Searches for a specific item in the marketplace using a provided request handler.
+search_marketplace_page: Reads one result page of a marketplace search.
+search_marketplace_page_async: Async variant of search_marketplace_page.
+iter_marketplace_search_pages: Streams the result pages of a marketplace search, prefetching the next one.
+iter_marketplace_offers: Streams the offers of a marketplace search, with an early stop.
 """
 
 from enum import Enum
@@ -16,9 +20,11 @@ import time
 import datetime
 
 from the_west_inner.requests_handler import requests_handler
+from the_west_inner.async_requests_handler import AsyncRequestsHandler
 from the_west_inner.items import Items
 from the_west_inner.currency import Currency
 from the_west_inner.misc_scripts import server_time
+from the_west_inner.paginated_fetch import PaginatedFetcher
 
 
 class Marketplace_categories(Enum):
@@ -75,45 +81,108 @@ def search_marketplace_item(item_id:int,handler:requests_handler) :
     if result["error"] :
         return None
     return result["msg"]["search_result"]
-def search_marketplace_item(item_id: int | None, handler: requests_handler) :
+def search_marketplace_page(item_id: int | None, handler: requests_handler, page: int) -> dict | None:
     """
-    This function searches the given item in the marketplace using the given request handler.
+    This function reads one result page of a marketplace search.
 
     Args:
     item_id (Optional[int]): The id of the item to search in the marketplace. If None, the item_id part of the request is omitted.
     handler (requests_handler): The request handler to use for sending the request.
+    page (int): The page number, starting at 1.
 
+    Returns:
+    Optional[dict]: The page ('search_result' offers and the 'next' flag), or None if the page could not be read.
     """
-    def recursive_search(page):
-        payload = {
-            "page": str(page),
-            "nav": "first",
-            "sort": "bid",
-            "order": "asc"
-        }
+    result = handler.post(window="building_market", action="search",
+                          payload=_marketplace_search_payload(item_id=item_id, page=page), use_h=True)
+    return _marketplace_search_page(result)
 
-        if item_id is not None:
-            payload["item_id"] = str(item_id)
+async def search_marketplace_page_async(item_id: int | None, handler: AsyncRequestsHandler, page: int) -> dict | None:
+    """
+    Async variant of `search_marketplace_page`, sending the same request with an `AsyncRequestsHandler`.
+    """
+    result = await handler.post(window="building_market", action="search",
+                                payload=_marketplace_search_payload(item_id=item_id, page=page), use_h=True)
+    return _marketplace_search_page(result)
 
-        result = handler.post(window="building_market", action="search", payload=payload, use_h=True)
+def _marketplace_search_payload(item_id: int | None, page: int) -> dict:
+    payload = {
+        "page": str(page),
+        "nav": "first",
+        "sort": "bid",
+        "order": "asc"
+    }
+    if item_id is not None:
+        payload["item_id"] = str(item_id)
+    return payload
 
-        if result["error"]:
-            return None
+def _marketplace_search_page(result: dict) -> dict | None:
+    if result["error"]:
+        return None
+    return result["msg"]
 
-        search_result = result["msg"]["search_result"]
-        next_page = result["msg"]["next"]
+def iter_marketplace_search_pages(item_id: int | None,
+                                  handler: requests_handler,
+                                  max_pages: int | None = None) -> typing.Generator[dict | None, None, None]:
+    """
+    This function yields the result pages of a marketplace search in order, as they arrive.
+    The search only reports whether a next page exists, so its pages are requested one at a time : the next
+    page is requested, under the handler's rate limiter, as soon as a page reports that it exists, while that
+    page is being read. A page that could not be read is yielded as None and ends the search.
+    Searches of different items run concurrently in the marketplace observer and watcher.
 
-        if next_page:
-            time.sleep(1)
-            # Recursively fetch the next page
-            next_page_result = recursive_search(page + 1)
-            if next_page_result is not None:
-                search_result.extend(next_page_result)
+    Args:
+    item_id (Optional[int]): The id of the item to search in the marketplace. If None, every item is searched.
+    handler (requests_handler): The request handler to use for sending the requests.
+    max_pages (Optional[int]): The maximum number of pages to read.
+    """
+    fetcher = PaginatedFetcher(fetch_page=lambda page: search_marketplace_page(item_id=item_id, handler=handler, page=page),
+                               has_next=lambda page: page is not None and bool(page["next"]),
+                               max_workers=1)
+    return fetcher.iter_pages(max_pages=max_pages)
 
-        return search_result
+def search_marketplace_item(item_id: int | None, handler: requests_handler) :
+    """
+    This function searches the given item in the marketplace using the given request handler.
 
-    # Start the recursive search from page 1
-    return recursive_search(1)
+    Args:
+    item_id (Optional[int]): The id of the item to search in the marketplace. If None, the item_id part of the request is omitted.
+    handler (requests_handler): The request handler to use for sending the request.
+
+    Returns:
+    Optional[list[dict]]: The offers found on every page, or None if the first page could not be read.
+    """
+    search_result = None
+    for page in iter_marketplace_search_pages(item_id=item_id, handler=handler):
+        if page is None:
+            break
+        if search_result is None:
+            search_result = []
+        search_result.extend(page["search_result"])
+    return search_result
+
+async def search_marketplace_item_async(item_id: int | None, handler: AsyncRequestsHandler) -> list[dict] | None:
+    """
+    Async variant of `search_marketplace_item`, walking the result pages with an `AsyncRequestsHandler`.
+
+    Args:
+    item_id (Optional[int]): The id of the item to search in the marketplace. If None, the item_id part of the request is omitted.
+    handler (AsyncRequestsHandler): The async request handler to use for sending the requests.
+
+    Returns:
+    Optional[list[dict]]: The offers found on every page, or None if the first page could not be read.
+    """
+    search_result = []
+    page_number = 1
+    while True:
+        page = await search_marketplace_page_async(item_id=item_id, handler=handler, page=page_number)
+        if page is None:
+            return None if page_number == 1 else search_result
+
+        search_result.extend(page["search_result"])
+        if not page["next"]:
+            return search_result
+        page_number += 1
 class Marketplace_offer():
     """
     This class represents an offer on the marketplace.
@@ -279,6 +348,35 @@ class Marketplace_offer():
         
         return cancel_response
 
+def iter_marketplace_offers(item_id: int | None,
+                            handler: requests_handler,
+                            stop_when: typing.Callable[[Marketplace_offer], bool] | None = None,
+                            max_pages: int | None = None) -> typing.Generator[Marketplace_offer, None, None]:
+    """
+    This function yields the offers of a marketplace search as their pages arrive.
+
+    Args:
+    item_id (Optional[int]): The id of the item to search in the marketplace. If None, every item is searched.
+    handler (requests_handler): The request handler to use for sending the requests.
+    stop_when (Optional[Callable[[Marketplace_offer], bool]]): The search stops, without yielding it, at the first
+        offer for which it returns True (for example an offer above the price you are willing to pay).
+        At most the page after that one is requested, and no page past the last one.
+    max_pages (Optional[int]): The maximum number of pages to read.
+    """
+    pages = iter_marketplace_search_pages(item_id=item_id, handler=handler, max_pages=max_pages)
+    try:
+        for page in pages:
+            if page is None:
+                return
+            for offer_dict in page["search_result"]:
+                offer = Marketplace_offer(dict_offer=offer_dict)
+                if stop_when is not None and stop_when(offer):
+                    return
+                yield offer
+    finally:
+        # Cancels the pages requested ahead
+        pages.close()
+
 class NotEnoughMoneyException(Exception):
     pass
 class Marketplace_offer_list():
@@ -422,13 +520,27 @@ class Marketplace_buy_manager():
         item_type = self.items.get_item(item_id = item_id).get('type')
         return item_id in search_marketplace_category(category = item_type , handler = self.handler)
     
-    def _search_item(self,item_id:int) ->Marketplace_offer_list:
+    def iter_offers(self ,
+                    item_id : int | None ,
+                    stop_when : typing.Callable[[Marketplace_offer],bool] | None = None ,
+                    max_pages : int | None = None) -> typing.Generator[Marketplace_offer,None,None]:
+        
+        return iter_marketplace_offers(item_id = item_id ,
+                                       handler = self.handler ,
+                                       stop_when = stop_when ,
+                                       max_pages = max_pages)
+    
+    def _search_item(self,
+                     item_id:int ,
+                     stop_when : typing.Callable[[Marketplace_offer],bool] | None = None ,
+                     max_pages : int | None = None) ->Marketplace_offer_list:
         
-        raw_item_offer_list = search_marketplace_item(item_id = item_id , handler = self.handler)
-        return marketplace_buy_offer_builder(offer_dict_list = raw_item_offer_list,
-                                             handler=self.handler,
-                                             items=self.items
-                                             )
+        return Marketplace_offer_list(offer_list = list(self.iter_offers(item_id = item_id ,
+                                                                         stop_when = stop_when ,
+                                                                         max_pages = max_pages)),
+                                      handler=self.handler,
+                                      items=self.items
+                                      )
     
     def buy_cheapest_marketplace_item(self , item_id : int , max_price : int | None = None):
         offer_list = self._search_item(item_id = item_id)
@@ -0,0 +1,253 @@
+"""
+This module turns the repeated marketplace searches of an item into a feed of changes.
+
+The feed keeps the last offers seen for every item, keyed by their market offer id. Each new search of the
+item is compared with that snapshot : the offers that appeared, the ones that disappeared (sold, cancelled or
+expired) and the ones whose price or bid moved are sent to the subscribers, so that a consumer only handles
+what changed since the previous poll. The feed also remembers when every offer was last seen, so a removed or
+repriced offer reports until when it was listed unchanged.
+
+Classes:
+
+    OfferChangeType: The kinds of change.
+    OfferChange: One change of one offer.
+    OfferDiff: The changes of an item between two searches.
+    OfferSubscription: A subscriber of the feed.
+    MarketplaceChangeFeed: The snapshots and the subscribers.
+
+Functions:
+
+    diff_offers: Compares a search with a snapshot.
+"""
+import threading
+import typing
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+
+from the_west_inner.marketplace_buy import Marketplace_offer
+
+
+class OfferChangeType(Enum):
+    ADDED = "added"
+    REMOVED = "removed"
+    PRICE_CHANGED = "price_changed"
+
+
+@dataclass(frozen=True)
+class OfferChange:
+    """
+    Attributes:
+        offer (Marketplace_offer): The offer as last seen (for a removed offer, as it was before it disappeared).
+        previous (Marketplace_offer | None): The offer in the previous snapshot, for a price change.
+        last_seen (datetime | None): The last search that saw the offer unchanged, for a removal or a price change
+            (None when the feed didn't record it).
+    """
+    change_type: OfferChangeType
+    item_id: int
+    offer_id: int
+    offer: Marketplace_offer
+    previous: Marketplace_offer | None = None
+    last_seen: datetime | None = None
+
+
+@dataclass
+class OfferDiff:
+    item_id: int
+    added: list[OfferChange] = field(default_factory=list)
+    removed: list[OfferChange] = field(default_factory=list)
+    price_changed: list[OfferChange] = field(default_factory=list)
+
+    @property
+    def changes(self) -> list[OfferChange]:
+        return self.added + self.price_changed + self.removed
+
+    @property
+    def changed_offers(self) -> list[Marketplace_offer]:
+        """
+        The offers that are new or have a new price, the ones worth evaluating again.
+        """
+        return [change.offer for change in self.added + self.price_changed]
+
+    @property
+    def retired_offers(self) -> list[tuple[Marketplace_offer, datetime | None]]:
+        """
+        The offers no longer listed as they were (removed, or replaced by a new price), with the last time they were seen.
+        """
+        return ([(change.previous, change.last_seen) for change in self.price_changed]
+                + [(change.offer, change.last_seen) for change in self.removed])
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.price_changed)
+
+
+def _price_signature(offer: Marketplace_offer) -> tuple:
+    return (offer.dict_offer.get("max_price"), offer.dict_offer.get("current_bid"), offer.dict_offer.get("item_count"))
+
+
+def diff_offers(item_id: int,
+                previous: dict[int, Marketplace_offer],
+                current: dict[int, Marketplace_offer],
+                complete: bool = True,
+                previous_seen_at: dict[int, datetime] | None = None) -> OfferDiff:
+    """
+    Compares the offers of a search with the previous snapshot of the item, both keyed by offer id.
+
+    Args:
+        complete (bool): Whether the search read every page. A partial search (an early stop or a page limit)
+            can't tell a removed offer from an unread one, so no removal is reported.
+        previous_seen_at (dict[int, datetime] | None): When the offers of the snapshot were last seen, by offer id.
+    """
+    previous_seen_at = previous_seen_at or {}
+    diff = OfferDiff(item_id=item_id)
+    for offer_id, offer in current.items():
+        previous_offer = previous.get(offer_id)
+        if previous_offer is None:
+            diff.added.append(OfferChange(OfferChangeType.ADDED, item_id, offer_id, offer))
+        elif _price_signature(previous_offer) != _price_signature(offer):
+            diff.price_changed.append(OfferChange(OfferChangeType.PRICE_CHANGED, item_id, offer_id, offer, previous_offer,
+                                                  previous_seen_at.get(offer_id)))
+    if complete:
+        diff.removed = [OfferChange(OfferChangeType.REMOVED, item_id, offer_id, offer,
+                                    last_seen=previous_seen_at.get(offer_id))
+                        for offer_id, offer in previous.items() if offer_id not in current]
+    return diff
+
+
+@dataclass(eq=False)
+class OfferSubscription:
+    """
+    Attributes:
+        callback (Callable[[list[OfferChange]], None]): Receives the matching changes of a search, when there are some.
+        change_types (frozenset[OfferChangeType] | None): The kinds of change wanted, all by default.
+        item_ids (frozenset[int] | None): The items wanted, all by default.
+    """
+    callback: typing.Callable[[list[OfferChange]], None]
+    change_types: frozenset[OfferChangeType] | None = None
+    item_ids: frozenset[int] | None = None
+    feed: "MarketplaceChangeFeed | None" = field(default=None, repr=False)
+
+    def wants(self, change: OfferChange) -> bool:
+        return ((self.change_types is None or change.change_type in self.change_types)
+                and (self.item_ids is None or change.item_id in self.item_ids))
+
+    def unsubscribe(self) -> None:
+        if self.feed is not None:
+            self.feed.unsubscribe(self)
+
+
+class MarketplaceChangeFeed:
+    """
+    Thread-safe snapshots of the offers of every item, and the subscribers of their changes.
+
+    The subscribers are called in the thread that reports the search, after the snapshot is updated. An exception
+    raised by a subscriber is recorded and doesn't reach the other subscribers nor the caller.
+    """
+    def __init__(self):
+        self._snapshots: dict[int, dict[int, Marketplace_offer]] = {}
+        # When the offers of every snapshot were last seen, by item and offer id
+        self._seen_at: dict[int, dict[int, datetime]] = {}
+        self._subscriptions: list[OfferSubscription] = []
+        self._lock = threading.Lock()
+        self.updates = 0
+        self.offers_seen = 0
+        self.events = {change_type: 0 for change_type in OfferChangeType}
+        self.subscriber_errors = 0
+        self.last_subscriber_error: BaseException | None = None
+
+    def subscribe(self,
+                  callback: typing.Callable[[list[OfferChange]], None],
+                  change_types: typing.Iterable[OfferChangeType] | None = None,
+                  item_ids: typing.Iterable[int] | None = None) -> OfferSubscription:
+        subscription = OfferSubscription(callback=callback,
+                                         change_types=None if change_types is None else frozenset(change_types),
+                                         item_ids=None if item_ids is None else frozenset(item_ids),
+                                         feed=self)
+        with self._lock:
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: OfferSubscription) -> None:
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+    def snapshot(self, item_id: int) -> dict[int, Marketplace_offer]:
+        """
+        Returns a copy of the last offers seen for the item, keyed by offer id.
+        """
+        with self._lock:
+            return dict(self._snapshots.get(item_id, {}))
+
+    def has_changed(self, item_id: int, offer: Marketplace_offer) -> bool:
+        """
+        Whether the offer is new or has another price than in the snapshot of its item.
+        """
+        with self._lock:
+            previous = self._snapshots.get(item_id, {}).get(offer.offer_id)
+        return previous is None or _price_signature(previous) != _price_signature(offer)
+
+    def update(self,
+               item_id: int,
+               offers: typing.Iterable[Marketplace_offer],
+               complete: bool = True,
+               observed_at: datetime | None = None) -> OfferDiff:
+        """
+        Records a search of the item, notifies the subscribers and returns the changes.
+
+        Args:
+            complete (bool): Whether the search read every page. After a partial search the offers that were
+                not read stay in the snapshot and no removal is reported.
+            observed_at (datetime | None): When the search was made, now by default.
+        """
+        observed_at = observed_at or datetime.utcnow()
+        current = {offer.offer_id: offer for offer in offers}
+        current_seen_at = dict.fromkeys(current, observed_at)
+        with self._lock:
+            previous = self._snapshots.get(item_id, {})
+            previous_seen_at = self._seen_at.get(item_id, {})
+            diff = diff_offers(item_id=item_id, previous=previous, current=current, complete=complete,
+                               previous_seen_at=previous_seen_at)
+            self._snapshots[item_id] = current if complete else {**previous, **current}
+            self._seen_at[item_id] = current_seen_at if complete else {**previous_seen_at, **current_seen_at}
+            self.updates += 1
+            self.offers_seen += len(current)
+            for change_type, changes in ((OfferChangeType.ADDED, diff.added),
+                                         (OfferChangeType.REMOVED, diff.removed),
+                                         (OfferChangeType.PRICE_CHANGED, diff.price_changed)):
+                self.events[change_type] += len(changes)
+            subscriptions = list(self._subscriptions)
+
+        if diff:
+            self._notify(subscriptions=subscriptions, changes=diff.changes)
+        return diff
+
+    def _notify(self, subscriptions: list[OfferSubscription], changes: list[OfferChange]) -> None:
+        for subscription in subscriptions:
+            wanted = [change for change in changes if subscription.wants(change)]
+            if not wanted:
+                continue
+            try:
+                subscription.callback(wanted)
+            except Exception as error:
+                with self._lock:
+                    self.subscriber_errors += 1
+                    self.last_subscriber_error = error
+
+    def forget(self, item_id: int) -> None:
+        """
+        Drops the snapshot of the item : its next search reports every offer as added.
+        """
+        with self._lock:
+            self._snapshots.pop(item_id, None)
+            self._seen_at.pop(item_id, None)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"updates": self.updates,
+                    "offers_seen": self.offers_seen,
+                    "added": self.events[OfferChangeType.ADDED],
+                    "removed": self.events[OfferChangeType.REMOVED],
+                    "price_changed": self.events[OfferChangeType.PRICE_CHANGED],
+                    "subscribers": len(self._subscriptions),
+                    "subscriber_errors": self.subscriber_errors}
@@ -0,0 +1,350 @@
+"""
+This module contains the cache of the game's minimap (the response of the "get_minimap" map request).
+
+The minimap is a large payload that only depends on the game world, so it is cached per (server, world)
+and shared by every account of that world, in memory and on disk. It is split in two parts :
+
+    - the static layout (counties and job groups), which only changes with the game version;
+    - the volatile data (towns, fairs and the rest of the response), which changes during the day.
+
+Each part has its own versioned pickle file and TTL. Once the volatile part expired the cache keeps
+returning it (up to `max_volatile_age`) while a background thread downloads a fresh minimap, so building
+a map never waits on the server unless the cache is empty or too old. The async variant (`get_async`) does
+the same with an `AsyncRequestsHandler`, refreshing in a task of the running event loop.
+
+The disk copies are kept in an absolute directory, under $THE_WEST_CACHE_DIR (~/.cache/the_west by default),
+whatever the working directory of the process.
+
+The returned minimap is shared : treat it as read only.
+"""
+import asyncio
+import os
+import pickle
+import tempfile
+import threading
+import time
+import typing
+from dataclasses import dataclass
+from urllib.parse import urlparse
+
+from the_west_inner.async_requests_handler import AsyncRequestsHandler
+from the_west_inner.caching_decorators import cache_directory
+from the_west_inner.requests_handler import requests_handler
+
+MINIMAP_FORMAT_VERSION = 1
+DEFAULT_STATIC_TTL = 7 * 24 * 60 * 60
+DEFAULT_VOLATILE_TTL = 10 * 60
+DEFAULT_MAX_VOLATILE_AGE = 24 * 60 * 60
+DEFAULT_MINIMAP_DIRECTORY = cache_directory("minimap")
+
+STATIC_MINIMAP_KEYS = ("counties", "job_groups")
+
+
+@dataclass(frozen=True)
+class MinimapKey:
+    server: str
+    world: str
+
+    def file_name(self, part: str) -> str:
+        return f"{self.server}_{self.world}_{part}.pickle".replace(os.sep, "_")
+
+    @classmethod
+    def from_handler(cls, handler: requests_handler | AsyncRequestsHandler) -> typing.Self:
+        """
+        Builds the key of the world the handler is connected to (ro1.the-west.ro -> server the-west.ro, world ro1).
+        """
+        world, _, server = (urlparse(handler.base_url).hostname or "").partition(".")
+        return cls(server=server, world=world)
+
+
+@dataclass(frozen=True)
+class MinimapPart:
+    data: dict
+    created_at: float
+
+    def age(self) -> float:
+        return time.time() - self.created_at
+
+
+def split_minimap(minimap: dict) -> tuple[dict, dict]:
+    """
+    Splits a minimap response in its static layout and its volatile data.
+    """
+    static = {key: value for key, value in minimap.items() if key in STATIC_MINIMAP_KEYS}
+    volatile = {key: value for key, value in minimap.items() if key not in STATIC_MINIMAP_KEYS}
+    return static, volatile
+
+
+def download_minimap(handler: requests_handler) -> dict:
+    """
+    Downloads the minimap from the server.
+    """
+    response = handler.post(window="map",
+                            action_name="ajax",
+                            action="get_minimap")
+    if response['error'] == True:
+        raise Exception("Invalid minimap response")
+    return response
+
+
+async def download_minimap_async(handler: AsyncRequestsHandler) -> dict:
+    """
+    Async variant of `download_minimap`.
+    """
+    response = await handler.post(window="map",
+                                  action_name="ajax",
+                                  action="get_minimap")
+    if response['error'] == True:
+        raise Exception("Invalid minimap response")
+    return response
+
+
+class MinimapCache:
+    """
+    Thread-safe cache of minimaps keyed by `MinimapKey`.
+
+    Attributes:
+        directory (str | None): Where the minimaps are persisted, made absolute. None disables the disk copy.
+        static_ttl (float): Seconds after which the static layout is downloaded again.
+        volatile_ttl (float): Seconds after which the volatile data is refreshed in the background.
+        max_volatile_age (float): Seconds after which stale volatile data is no longer returned.
+    """
+
+    def __init__(self,
+                 directory: str | None = DEFAULT_MINIMAP_DIRECTORY,
+                 static_ttl: float = DEFAULT_STATIC_TTL,
+                 volatile_ttl: float = DEFAULT_VOLATILE_TTL,
+                 max_volatile_age: float = DEFAULT_MAX_VOLATILE_AGE):
+        self.directory = None if directory is None else os.path.abspath(directory)
+        self.static_ttl = static_ttl
+        self.volatile_ttl = volatile_ttl
+        self.max_volatile_age = max_volatile_age
+        self._parts: dict[tuple[MinimapKey, str], MinimapPart] = {}
+        self._disk_mtimes: dict[tuple[MinimapKey, str], float] = {}
+        self._lock = threading.Lock()
+        self._key_locks: dict[MinimapKey, threading.Lock] = {}
+        self._refreshes: dict[MinimapKey, threading.Thread] = {}
+        self._async_refreshes: dict[MinimapKey, asyncio.Task] = {}
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.background_refreshes = 0
+        self.refresh_errors = 0
+        self.last_refresh_error: BaseException | None = None
+
+    def _key_lock(self, key: MinimapKey) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _path(self, key: MinimapKey, part: str) -> str:
+        return os.path.join(self.directory, key.file_name(part))
+
+    def _changed_on_disk(self, key: MinimapKey, part: str) -> bool:
+        """
+        Whether another cache (another process of the same world) saved the part since this one read or wrote it.
+        """
+        if self.directory is None:
+            return False
+        try:
+            return os.path.getmtime(self._path(key, part)) != self._disk_mtimes.get((key, part))
+        except OSError:
+            return False
+
+    def _load_from_disk(self, key: MinimapKey, part: str) -> MinimapPart | None:
+        if self.directory is None:
+            return None
+        try:
+            modified_at = os.path.getmtime(self._path(key, part))
+            with open(self._path(key, part), "rb") as cache_file:
+                stored = pickle.load(cache_file)
+            self._disk_mtimes[(key, part)] = modified_at
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+            return None
+        if not isinstance(stored, dict) or stored.get("format_version") != MINIMAP_FORMAT_VERSION:
+            return None
+        if stored.get("key") != key or stored.get("part") != part:
+            return None
+        return MinimapPart(data=stored["data"], created_at=stored["created_at"])
+
+    def _save_to_disk(self, key: MinimapKey, part: str, minimap_part: MinimapPart) -> None:
+        if self.directory is None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        stored = {
+            "format_version": MINIMAP_FORMAT_VERSION,
+            "key": key,
+            "part": part,
+            "created_at": minimap_part.created_at,
+            "data": minimap_part.data
+        }
+        # Write to a temporary file first so other processes of the same world never read a half written part
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "wb") as cache_file:
+                pickle.dump(stored, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_path, self._path(key, part))
+            self._disk_mtimes[(key, part)] = os.path.getmtime(self._path(key, part))
+        except BaseException:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+
+    def _part(self, key: MinimapKey, part: str) -> MinimapPart | None:
+        """
+        Returns the memory copy of a part, or the disk copy when the memory one is missing or older.
+        """
+        cached = self._parts.get((key, part))
+        if cached is not None and cached.age() < (self.static_ttl if part == "static" else self.volatile_ttl):
+            return cached
+        if cached is not None and not self._changed_on_disk(key, part):
+            return cached
+        stored = self._load_from_disk(key, part)
+        if stored is not None and (cached is None or stored.created_at > cached.created_at):
+            self.disk_hits += 1
+            self._parts[(key, part)] = stored
+            return stored
+        return cached
+
+    def _store(self, key: MinimapKey, minimap: dict) -> tuple[MinimapPart, MinimapPart]:
+        created_at = time.time()
+        static, volatile = (MinimapPart(data=data, created_at=created_at) for data in split_minimap(minimap))
+        for part, minimap_part in (("static", static), ("volatile", volatile)):
+            self._parts[(key, part)] = minimap_part
+            self._save_to_disk(key, part, minimap_part)
+        return static, volatile
+
+    def _background_refresh(self, key: MinimapKey, loader: typing.Callable[[], dict]) -> None:
+        try:
+            minimap = loader()
+            with self._key_lock(key):
+                self._store(key, minimap)
+                self.background_refreshes += 1
+        except Exception as error:
+            # The stale copy stays in use, the next `get` tries again
+            self.refresh_errors += 1
+            self.last_refresh_error = error
+        finally:
+            with self._lock:
+                self._refreshes.pop(key, None)
+
+    def _schedule_refresh(self, key: MinimapKey, loader: typing.Callable[[], dict]) -> None:
+        with self._lock:
+            if key in self._refreshes or key in self._async_refreshes:
+                return
+            thread = threading.Thread(target=self._background_refresh, args=(key, loader), daemon=True)
+            self._refreshes[key] = thread
+        thread.start()
+
+    def _lookup(self, key: MinimapKey) -> tuple[dict | None, bool]:
+        """
+        Returns the cached minimap of `key` (None when it has to be downloaded right away) and whether
+        its volatile data should be refreshed. Called under the key lock.
+        """
+        static = self._part(key, "static")
+        volatile = self._part(key, "volatile")
+        if (static is None or static.age() >= self.static_ttl
+                or volatile is None or volatile.age() >= self.max_volatile_age):
+            return None, False
+        self.hits += 1
+        return {**volatile.data, **static.data}, volatile.age() >= self.volatile_ttl
+
+    def get(self,
+            key: MinimapKey,
+            loader: typing.Callable[[], dict]) -> dict:
+        """
+        Returns the minimap of `key`, as the server sends it.
+
+        `loader` is called right away only when the static layout is stale or the volatile data is older
+        than `max_volatile_age`. Volatile data older than `volatile_ttl` is returned as is and refreshed
+        in the background. Concurrent callers asking for the same key wait for a single download.
+        """
+        with self._key_lock(key):
+            minimap, stale = self._lookup(key)
+            if minimap is None:
+                self.misses += 1
+                static, volatile = self._store(key, loader())
+                return {**volatile.data, **static.data}
+            if stale:
+                self._schedule_refresh(key, loader)
+            return minimap
+
+    async def _background_refresh_async(self,
+                                        key: MinimapKey,
+                                        loader: typing.Callable[[], typing.Awaitable[dict]]) -> None:
+        try:
+            minimap = await loader()
+            with self._key_lock(key):
+                self._store(key, minimap)
+                self.background_refreshes += 1
+        except Exception as error:
+            self.refresh_errors += 1
+            self.last_refresh_error = error
+        finally:
+            with self._lock:
+                self._async_refreshes.pop(key, None)
+
+    async def get_async(self,
+                        key: MinimapKey,
+                        loader: typing.Callable[[], typing.Awaitable[dict]]) -> dict:
+        """
+        Async variant of `get`, `loader` being awaited. Stale volatile data is refreshed in a task of the
+        running event loop. The key lock is never held while awaiting, so concurrent coroutines missing the
+        same key may each download it.
+        """
+        with self._key_lock(key):
+            minimap, stale = self._lookup(key)
+        if minimap is None:
+            downloaded = await loader()
+            with self._key_lock(key):
+                self.misses += 1
+                static, volatile = self._store(key, downloaded)
+            return {**volatile.data, **static.data}
+        if stale:
+            with self._lock:
+                if key not in self._refreshes and key not in self._async_refreshes:
+                    self._async_refreshes[key] = asyncio.get_running_loop().create_task(
+                        self._background_refresh_async(key, loader))
+        return minimap
+
+    def get_for_handler(self, handler: requests_handler) -> dict:
+        return self.get(key=MinimapKey.from_handler(handler=handler),
+                        loader=lambda: download_minimap(handler=handler))
+
+    async def get_for_handler_async(self, handler: AsyncRequestsHandler) -> dict:
+        return await self.get_async(key=MinimapKey.from_handler(handler=handler),
+                                    loader=lambda: download_minimap_async(handler=handler))
+
+    def refresh(self, key: MinimapKey, loader: typing.Callable[[], dict]) -> dict:
+        """
+        Downloads the minimap of `key` now and returns it.
+        """
+        with self._key_lock(key):
+            self.misses += 1
+            static, volatile = self._store(key, loader())
+            return {**volatile.data, **static.data}
+
+    def wait_for_refreshes(self, timeout: float | None = None) -> None:
+        """
+        Waits for the background refreshes in progress.
+        """
+        with self._lock:
+            threads = list(self._refreshes.values())
+        for thread in threads:
+            thread.join(timeout)
+
+    def invalidate(self, key: MinimapKey) -> None:
+        with self._key_lock(key):
+            for part in ("static", "volatile"):
+                self._parts.pop((key, part), None)
+                if self.directory is not None and os.path.exists(self._path(key, part)):
+                    os.remove(self._path(key, part))
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "background_refreshes": self.background_refreshes,
+                "refresh_errors": self.refresh_errors}
+
+
+minimap_cache = MinimapCache()
@@ -18,6 +18,7 @@ import threading
 from concurrent.futures import ThreadPoolExecutor, Future
 
 from the_west_inner.requests_handler import requests_handler
+from the_west_inner.minimap_cache import minimap_cache
 def server_time(handler:requests_handler) -> datetime:
     """
     This function returns the server time.
@@ -187,8 +188,8 @@ def get_closest_viable_town(handler:requests_handler, player_data):
         A list containing the ID, x coordinate, and y coordinate of the town with a level 5 hotel,
         or None if no such town exists.
     """
-    # Make an API call to get the minimap data.
-    response = handler.post("map", "get_minimap", action_name="ajax")
+    # Get the minimap data, shared by the accounts of the world.
+    response = minimap_cache.get_for_handler(handler)
     
     # Extract the dictionary of towns from the response.
     towns = response["towns"]
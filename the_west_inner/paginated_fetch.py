@@ -0,0 +1,139 @@
+"""
+This module contains a generic engine for reading paginated game windows (reports, telegrams, rankings).
+
+The first page is fetched on its own to learn the number of pages, after which the remaining pages
+are requested by a bounded pool of workers. Pages are always handed back in page order, and the
+caller can stop the walk early once the page it was looking for shows up. The request rate itself
+is still governed by the rate limiter of the handler used inside `fetch_page`.
+
+Windows that only tell whether a next page exists (the marketplace search) can't be requested ahead :
+a page is requested once the previous one reported a next page, while the caller reads that previous
+one, and the walk ends at the first page without a next one. No page past the last one is requested.
+
+Async readers use `gather_pages`, which requests known page numbers from the running event loop with the
+same bound on the pages in flight.
+"""
+import asyncio
+import itertools
+import typing
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+PageType = typing.TypeVar("PageType")
+
+DEFAULT_MAX_WORKERS = 4
+
+
+class PaginatedFetcher(typing.Generic[PageType]):
+    """
+    Fetches the pages of a paginated window concurrently while preserving their order.
+
+    Attributes:
+        fetch_page (Callable[[int], PageType]): Fetches and parses one page given its number.
+        page_count (Callable[[PageType], int] | None): Extracts the total number of pages from a fetched page.
+        has_next (Callable[[PageType], bool] | None): Tells whether a page is followed by another one,
+            for windows that don't report their number of pages. One of page_count and has_next is required.
+        first_page (int): The number of the first page (1 for reports and telegrams, 0 for rankings).
+        max_workers (int): Maximum number of pages requested at the same time. With has_next a single page
+            is requested at a time.
+    """
+
+    def __init__(self,
+                 fetch_page: typing.Callable[[int], PageType],
+                 page_count: typing.Callable[[PageType], int] | None = None,
+                 first_page: int = 1,
+                 max_workers: int = DEFAULT_MAX_WORKERS,
+                 has_next: typing.Callable[[PageType], bool] | None = None):
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be at least 1, got {max_workers}")
+        if page_count is None and has_next is None:
+            raise ValueError("Either page_count or has_next is required")
+        self.fetch_page = fetch_page
+        self.page_count = page_count
+        self.has_next = has_next
+        self.first_page = first_page
+        self.max_workers = max_workers
+
+    def iter_pages(self,
+                   stop_condition: typing.Callable[[PageType], bool] | None = None,
+                   max_pages: int | None = None) -> typing.Generator[PageType, None, None]:
+        """
+        Yields the pages in order.
+
+        Args:
+            stop_condition (Callable[[PageType], bool] | None): When it returns True for a page, that page is
+                yielded and no further pages are requested.
+            max_pages (int | None): Upper limit of pages to read, regardless of how many the server reports.
+
+        Yields:
+            PageType: The fetched pages, in page order.
+        """
+        first_page_data = self.fetch_page(self.first_page)
+        yield first_page_data
+        if stop_condition is not None and stop_condition(first_page_data):
+            return
+
+        if self.page_count is not None:
+            number_of_pages = self.page_count(first_page_data)
+            if max_pages is not None:
+                number_of_pages = min(number_of_pages, max_pages)
+            remaining_pages = iter(range(self.first_page + 1, self.first_page + number_of_pages))
+        elif not self.has_next(first_page_data):
+            return
+        elif max_pages is not None:
+            remaining_pages = iter(range(self.first_page + 1, self.first_page + max_pages))
+        else:
+            remaining_pages = itertools.count(self.first_page + 1)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending: deque[Future] = deque()
+
+            def schedule_next() -> None:
+                page_number = next(remaining_pages, None)
+                if page_number is not None:
+                    pending.append(executor.submit(self.fetch_page, page_number))
+
+            # Without a page count only the page after the last one read is known to exist
+            for _ in range(self.max_workers if self.page_count is not None else 1):
+                schedule_next()
+
+            try:
+                while pending:
+                    page_data = pending.popleft().result()
+                    if self.page_count is not None or self.has_next(page_data):
+                        schedule_next()
+                    yield page_data
+                    if stop_condition is not None and stop_condition(page_data):
+                        return
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def fetch_all(self, max_pages: int | None = None) -> list[PageType]:
+        """
+        Fetches every page.
+
+        Returns:
+            list[PageType]: The pages, in page order.
+        """
+        return list(self.iter_pages(max_pages=max_pages))
+
+
+async def gather_pages(fetch_page: typing.Callable[[int], typing.Awaitable[PageType]],
+                       page_numbers: typing.Iterable[int],
+                       max_workers: int = DEFAULT_MAX_WORKERS) -> list[PageType]:
+    """
+    Fetches the given pages from the running event loop, at most `max_workers` at the same time.
+
+    Returns:
+        list[PageType]: The pages, in the order of `page_numbers`.
+    """
+    if max_workers < 1:
+        raise ValueError(f"max_workers must be at least 1, got {max_workers}")
+    semaphore = asyncio.Semaphore(max_workers)
+
+    async def fetch_bounded(page_number: int) -> PageType:
+        async with semaphore:
+            return await fetch_page(page_number)
+
+    return await asyncio.gather(*(fetch_bounded(page_number) for page_number in page_numbers))
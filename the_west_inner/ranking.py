@@ -4,6 +4,8 @@ from enum import StrEnum
 
 from the_west_inner.player_data import ClassTypeEnum
 from the_west_inner.requests_handler import requests_handler
+from the_west_inner.async_requests_handler import AsyncRequestsHandler
+from the_west_inner.paginated_fetch import PaginatedFetcher, DEFAULT_MAX_WORKERS, gather_pages
 
 
 
@@ -151,24 +153,49 @@ class PlayerRatingHandler:
             raise ValueError("Failed to retrieve page numbers from the response.")
         return response
 
+class AsyncPlayerRatingHandler:
+    def __init__(self, requests_handler: AsyncRequestsHandler):
+        self.requests_handler = requests_handler
+
+    async def get_page_normal(self, category: str, page: int = 0) -> dict:
+        response = await self.requests_handler.post(
+            window='ranking',
+            action='get_data',
+            action_name='mode',
+            payload={
+                'page': page,
+                'tab': category
+            }
+        )
+        if response.get('error'):
+            raise ValueError("Failed to retrieve page numbers from the response.")
+        return response
+
 
 class PlayerRatingManager():
     
-    def __init__(self , handler : requests_handler):
+    def __init__(self , handler : requests_handler , max_workers : int = DEFAULT_MAX_WORKERS):
         
         self.handler = handler
         self.rating_handler = PlayerRatingHandler(requests_handler = handler)
         self.player_rating_data = PlayerRatingData()
+        self.max_workers = max_workers
     
     
     def _load_player_pages(self):
         result = self.rating_handler.get_page_normal(category=CategoryEnum.EXPERIENCE)
-            
+        self._record_player_pages(result)
+    
+    def _record_player_pages(self, result: dict) -> int:
+        """
+        Stores the number of pages a page of the experience ranking reports and returns it.
+        """
         pages = result.get('pages', 0)
         if pages < 1:
             raise ValueError("No pages found for the specified category.")
         
         self.player_rating_data.set_player_pages(player_pages=pages)
+        return pages
         
     @property
     def player_pages(self) -> int:
@@ -218,8 +245,14 @@ class PlayerRatingManager():
             
         category_data = PlayerCategoryRating(rating_category= CategoryEnum.EXPERIENCE)
         
-        for page in range(self.player_pages):
-            result = self.rating_handler.get_page_normal(category= CategoryEnum.EXPERIENCE , page=page)
+        page_fetcher = PaginatedFetcher(
+            fetch_page= lambda page: self.rating_handler.get_page_normal(category= CategoryEnum.EXPERIENCE , page=page),
+            page_count= self._record_player_pages,
+            first_page= 0,
+            max_workers= self.max_workers
+        )
+        
+        for result in page_fetcher.iter_pages():
             self.process_player_data(
                 ranking_data= result.get('ranking'),
                 category_data= category_data,
@@ -243,4 +276,27 @@ class PlayerRatingManager():
             category= 'skill_level'
         )
         
-        return skill_category_data
\ No newline at end of file
+        return skill_category_data
+    
+    async def get_player_experience_rating_async(self, async_handler : AsyncRequestsHandler) -> PlayerCategoryRating:
+        
+        async_rating_handler = AsyncPlayerRatingHandler(requests_handler= async_handler)
+        category_data = PlayerCategoryRating(rating_category= CategoryEnum.EXPERIENCE)
+        
+        first_page = await async_rating_handler.get_page_normal(category= CategoryEnum.EXPERIENCE)
+        pages = self._record_player_pages(first_page)
+        
+        results = [first_page] + await gather_pages(
+            fetch_page= lambda page: async_rating_handler.get_page_normal(category= CategoryEnum.EXPERIENCE,
+                                                                          page= page),
+            page_numbers= range(1, pages),
+            max_workers= self.max_workers
+        )
+        for result in results:
+            self.process_player_data(
+                ranking_data= result.get('ranking'),
+                category_data= category_data,
+                category= CategoryEnum.EXPERIENCE
+            )
+        
+        return category_data
@@ -0,0 +1,313 @@
+"""
+This module contains a SQLite backed store for job reports.
+
+It remembers, per account, the id of the newest report that was read (the high-water mark), every report
+that was read (job or not) and the parsed rewards of every job report, so that `Reports_manager` only has to
+read and decrypt reports it has never seen, even after a restart. Aggregations over the stored rewards are
+done in SQL. By default the database is kept in the `reports` disk cache (`~/.cache/the_west/reports`).
+
+Classes:
+
+    StoredReport: A report that was read, of any type.
+    StoredJobReport: A parsed job report.
+    StoredJobReportItemDrop: An item dropped by a stored job report.
+    ReportHighWaterMark: The newest report id read for an account.
+    JobRewardRate: The per hour rewards of a job, as computed by `ReportStore.job_reward_rates`.
+    ReportStore: Reads and writes the tables above.
+    PersistentReports_manager: A `Reports_manager` that only reads reports missing from a `ReportStore`.
+"""
+import os
+import time
+import typing
+from dataclasses import dataclass
+from datetime import datetime
+from urllib.parse import urlparse
+
+from sqlalchemy import (create_engine, Column, Integer, String, DateTime, ForeignKeyConstraint, Index, func, select,
+                        union)
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+from the_west_inner.caching_decorators import cache_directory
+from the_west_inner.reports import Job_report_reward_data, Reports_list, Reports_manager
+from the_west_inner.requests_handler import requests_handler
+
+DEFAULT_REPORT_DIRECTORY = cache_directory("reports")
+DEFAULT_REPORT_DATABASE = "reports_data.db"
+
+Base = declarative_base()
+
+
+class StoredReport(Base):
+    __tablename__ = 'read_reports'
+
+    account_key = Column(String, primary_key=True)
+    report_id = Column(Integer, primary_key=True)
+    title = Column(String)
+    date_received = Column(String)
+    stored_at = Column(DateTime, default=datetime.utcnow)
+
+
+class StoredJobReport(Base):
+    __tablename__ = 'job_reports'
+
+    account_key = Column(String, primary_key=True)
+    report_id = Column(Integer, primary_key=True)
+    title = Column(String)
+    date_received = Column(String)
+    job_duration = Column(Integer, nullable=False)
+    experience = Column(Integer, nullable=False)
+    dollars = Column(Integer, nullable=False)
+    luck = Column(Integer, nullable=False)
+    oup = Column(Integer, nullable=False)
+    stored_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (Index('ix_job_reports_account_title', 'account_key', 'title'),)
+
+
+class StoredJobReportItemDrop(Base):
+    __tablename__ = 'job_report_item_drops'
+
+    account_key = Column(String, primary_key=True)
+    report_id = Column(Integer, primary_key=True)
+    item_id = Column(Integer, primary_key=True)
+    item_count = Column(Integer, nullable=False)
+
+    __table_args__ = (ForeignKeyConstraint(['account_key', 'report_id'], ['job_reports.account_key', 'job_reports.report_id']),)
+
+
+class ReportHighWaterMark(Base):
+    __tablename__ = 'report_high_water_marks'
+
+    account_key = Column(String, primary_key=True)
+    last_read_report_id = Column(Integer, nullable=False)
+
+
+@dataclass
+class JobRewardRate:
+    title: str
+    jobs: int
+    experience_per_hour: float
+    dollars_per_hour: float
+    luck_per_hour: float
+    oup_per_hour: float
+    item_drops_per_hour: dict[int, float]
+
+
+def report_store_key(handler: requests_handler) -> str:
+    """
+    Builds the key identifying an account in the store : the world host and the player.
+    """
+    return f"{urlparse(handler.base_url).netloc}:{handler.player}"
+
+
+class ReportStore:
+    def __init__(self, database_url: str | None = None):
+        """
+        Args:
+            database_url (str | None): The SQLAlchemy url of the database. None keeps a SQLite database in
+                DEFAULT_REPORT_DIRECTORY, whatever the working directory.
+        """
+        if database_url is None:
+            os.makedirs(DEFAULT_REPORT_DIRECTORY, exist_ok=True)
+            database_url = f"sqlite:///{os.path.join(DEFAULT_REPORT_DIRECTORY, DEFAULT_REPORT_DATABASE)}"
+        self.engine = create_engine(database_url)
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+
+    def get_last_read_report_id(self, account_key: str) -> int | None:
+        with self.Session() as session:
+            high_water_mark = session.get(ReportHighWaterMark, account_key)
+            return None if high_water_mark is None else high_water_mark.last_read_report_id
+
+    def set_last_read_report_id(self, account_key: str, report_id: int) -> None:
+        with self.Session() as session:
+            session.merge(ReportHighWaterMark(account_key=account_key, last_read_report_id=report_id))
+            session.commit()
+
+    def known_report_ids(self, account_key: str, report_ids: typing.Iterable[int]) -> set[int]:
+        """
+        Returns the subset of `report_ids` that is already stored for the account, job reports or not.
+        """
+        report_ids = list(report_ids)
+        if not report_ids:
+            return set()
+        with self.Session() as session:
+            # Stores written before the read reports were kept only know their job reports
+            return set(session.scalars(union(
+                select(StoredReport.report_id).where(
+                    StoredReport.account_key == account_key,
+                    StoredReport.report_id.in_(report_ids)
+                ),
+                select(StoredJobReport.report_id).where(
+                    StoredJobReport.account_key == account_key,
+                    StoredJobReport.report_id.in_(report_ids)
+                )
+            )))
+
+    def save_job_rewards(self,
+                         account_key: str,
+                         rewards: dict[int, tuple[str, str, Job_report_reward_data]],
+                         last_read_report_id: int | None = None,
+                         other_reports: dict[int, tuple[str, str]] | None = None) -> None:
+        """
+        Stores parsed job reports and the other reports read and, in the same transaction, moves the high-water mark.
+
+        Args:
+            account_key (str): The account the reports belong to.
+            rewards (dict[int, tuple[str, str, Job_report_reward_data]]): report_id -> (title, date_received, rewards).
+            last_read_report_id (int | None): The new high-water mark, if it should be updated.
+            other_reports (dict[int, tuple[str, str]] | None): report_id -> (title, date_received) of the reports
+                read that are not job reports.
+        """
+        with self.Session() as session:
+            for report_id, (title, date_received) in (other_reports or {}).items():
+                session.merge(StoredReport(account_key=account_key, report_id=report_id, title=title, date_received=date_received))
+            for report_id, (title, date_received, reward) in rewards.items():
+                session.merge(StoredReport(account_key=account_key, report_id=report_id, title=title, date_received=date_received))
+                session.merge(StoredJobReport(
+                    report_id=report_id,
+                    account_key=account_key,
+                    title=title,
+                    date_received=date_received,
+                    job_duration=reward.job_duration,
+                    experience=reward.experience,
+                    dollars=reward.dollars,
+                    luck=reward.luck,
+                    oup=reward.oup
+                ))
+                for item_id, item_count in reward.item_drop.items():
+                    session.merge(StoredJobReportItemDrop(account_key=account_key, report_id=report_id, item_id=item_id, item_count=item_count))
+            if last_read_report_id is not None:
+                session.merge(ReportHighWaterMark(account_key=account_key, last_read_report_id=last_read_report_id))
+            session.commit()
+
+    def total_rewards(self, account_key: str) -> Job_report_reward_data:
+        with self.Session() as session:
+            job_duration, experience, dollars, luck, oup = session.execute(
+                select(
+                    func.coalesce(func.sum(StoredJobReport.job_duration), 0),
+                    func.coalesce(func.sum(StoredJobReport.experience), 0),
+                    func.coalesce(func.sum(StoredJobReport.dollars), 0),
+                    func.coalesce(func.sum(StoredJobReport.luck), 0),
+                    func.coalesce(func.sum(StoredJobReport.oup), 0)
+                ).where(StoredJobReport.account_key == account_key)
+            ).one()
+            item_drop = dict(session.execute(
+                select(StoredJobReportItemDrop.item_id, func.sum(StoredJobReportItemDrop.item_count))
+                .where(StoredJobReportItemDrop.account_key == account_key)
+                .group_by(StoredJobReportItemDrop.item_id)
+            ).all())
+        return Job_report_reward_data(
+            job_duration=job_duration,
+            experience=experience,
+            dollars=dollars,
+            luck=luck,
+            oup=oup,
+            item_drop=item_drop
+        )
+
+    def job_reward_rates(self, account_key: str) -> list[JobRewardRate]:
+        """
+        Computes the experience, dollars, luck, oup and item drops per hour of every job (grouped by report title).
+        """
+        hours = func.sum(StoredJobReport.job_duration) / 3600.0
+        with self.Session() as session:
+            rates = session.execute(
+                select(
+                    StoredJobReport.title,
+                    func.count(StoredJobReport.report_id),
+                    func.sum(StoredJobReport.experience) / hours,
+                    func.sum(StoredJobReport.dollars) / hours,
+                    func.sum(StoredJobReport.luck) / hours,
+                    func.sum(StoredJobReport.oup) / hours
+                )
+                .where(StoredJobReport.account_key == account_key)
+                .group_by(StoredJobReport.title)
+            ).all()
+            durations = (
+                select(StoredJobReport.title, (func.sum(StoredJobReport.job_duration) / 3600.0).label('hours'))
+                .where(StoredJobReport.account_key == account_key)
+                .group_by(StoredJobReport.title)
+                .subquery()
+            )
+            drops = session.execute(
+                select(
+                    StoredJobReport.title,
+                    StoredJobReportItemDrop.item_id,
+                    func.sum(StoredJobReportItemDrop.item_count) / func.max(durations.c.hours)
+                )
+                .join(StoredJobReport, (StoredJobReport.account_key == StoredJobReportItemDrop.account_key)
+                      & (StoredJobReport.report_id == StoredJobReportItemDrop.report_id))
+                .join(durations, durations.c.title == StoredJobReport.title)
+                .where(StoredJobReport.account_key == account_key)
+                .group_by(StoredJobReport.title, StoredJobReportItemDrop.item_id)
+            ).all()
+
+        drops_by_title: dict[str, dict[int, float]] = {}
+        for title, item_id, drops_per_hour in drops:
+            drops_by_title.setdefault(title, {})[item_id] = drops_per_hour
+
+        return [
+            JobRewardRate(
+                title=title,
+                jobs=jobs,
+                experience_per_hour=experience,
+                dollars_per_hour=dollars,
+                luck_per_hour=luck,
+                oup_per_hour=oup,
+                item_drops_per_hour=drops_by_title.get(title, {})
+            )
+            for title, jobs, experience, dollars, luck, oup in rates
+        ]
+
+
+class PersistentReports_manager(Reports_manager):
+    """
+    `Reports_manager` that keeps its high-water mark and the parsed job rewards in a `ReportStore`.
+
+    After a restart it continues from the stored high-water mark, and reports that are already in the
+    store are never read or decrypted again.
+    """
+    def __init__(self, handler: requests_handler, report_store: ReportStore, last_read_report_id: int = None):
+        self.report_store = report_store
+        self.account_key = report_store_key(handler=handler)
+        stored_report_id = report_store.get_last_read_report_id(account_key=self.account_key)
+        super().__init__(handler=handler,
+                         last_read_report_id=stored_report_id if last_read_report_id is None else last_read_report_id)
+        if stored_report_id is None:
+            report_store.set_last_read_report_id(account_key=self.account_key, report_id=self.last_read_report_id)
+
+    def _read_reports(self, retry_times: int = 0) -> Job_report_reward_data:
+        new_data = self.reader.read_pages_until_id(self.last_read_report_id)
+
+        while retry_times > 0 and len(new_data) == 0:
+            time.sleep(1)
+            new_data = self.reader.read_pages_until_id(self.last_read_report_id)
+            retry_times -= 1
+
+        if len(new_data) != 0:
+            known_report_ids = self.report_store.known_report_ids(
+                account_key=self.account_key,
+                report_ids=[report.report_id for report in new_data]
+            )
+            unseen_reports = Reports_list([report for report in new_data if report.report_id not in known_report_ids])
+            new_rewards = unseen_reports.job_rewards_by_report(handler=self.handler)
+            report_info = {report.report_id: report for report in unseen_reports}
+
+            self.report_store.save_job_rewards(
+                account_key=self.account_key,
+                rewards={
+                    report_id: (report_info[report_id].title, report_info[report_id].date_received, reward)
+                    for report_id, reward in new_rewards.items()
+                },
+                last_read_report_id=new_data[0].report_id,
+                other_reports={
+                    report.report_id: (report.title, report.date_received)
+                    for report in unseen_reports if report.report_id not in new_rewards
+                }
+            )
+            self._set_last_read_report_id(report_id=new_data[0].report_id)
+            for reward in new_rewards.values():
+                self.rewards += reward
+
+        return self.rewards
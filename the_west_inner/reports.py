@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 import re
 import time
 import typing
@@ -7,6 +8,8 @@ import os
 
 from the_west_inner.items import Items
 from the_west_inner.requests_handler import requests_handler
+from the_west_inner.async_requests_handler import AsyncRequestsHandler
+from the_west_inner.paginated_fetch import PaginatedFetcher, DEFAULT_MAX_WORKERS, gather_pages
 
 
 def extract_items(input_js_string:str) -> typing.Dict[int,int]:
@@ -75,6 +78,38 @@ def extract_job_xhtml_data(input_xhtml:str)->typing.Dict[str,int]:
         
     # Return the dictionary with the extracted data
     return data
+JOB_XHTML_ROW_PATTERN = re.compile(r'class="[^"]*\brp_row_jobdata\b[^"]*"')
+JOB_XHTML_ICON_PATTERN = re.compile(r'class="[^"]*\brp_jobdata_label_icon\b[^"]*"[^>]*>.*?<img[^>]*?\ssrc="([^"]*)"', re.DOTALL)
+JOB_XHTML_TEXT_PATTERN = re.compile(r'class="[^"]*\brp_jobdata_text\b[^"]*"[^>]*>(.*?)</div>', re.DOTALL)
+HTML_TAG_PATTERN = re.compile(r'<[^>]*>')
+REQUIRED_JOB_XHTML_KEYS = ('clock', 'star', 'dollar', 'luck', 'upb')
+def extract_job_xhtml_data_fast(input_xhtml:str)->typing.Optional[typing.Dict[str,str]]:
+    """
+    Regex based version of `extract_job_xhtml_data` that does not build a BeautifulSoup tree.
+    
+    Parameters:
+    - input_xhtml (str): The input xhtml string containing the job data to be extracted.
+    
+    Returns:
+    - data (dict): The same dictionary `extract_job_xhtml_data` returns, or None if the markup is not in the
+      expected shape (a required key is missing), in which case the caller should fall back to `extract_job_xhtml_data`.
+    """
+    cleaned_html = re.sub(r'[^\w\s<>\/="]', '', input_xhtml)
+    
+    data = {}
+    # Every chunk after a split starts right after the class attribute of one job data row
+    for row in JOB_XHTML_ROW_PATTERN.split(cleaned_html)[1:]:
+        icon_match = JOB_XHTML_ICON_PATTERN.search(row)
+        text_match = JOB_XHTML_TEXT_PATTERN.search(row)
+        # A nested div would end the lazy text match too early
+        if icon_match is None or text_match is None or '<div' in text_match.group(1):
+            return None
+        icon_name = os.path.basename(icon_match.group(1)).replace("png","")
+        data[icon_name] = HTML_TAG_PATTERN.sub('', text_match.group(1))
+    
+    if any(key not in data for key in REQUIRED_JOB_XHTML_KEYS):
+        return None
+    return data
 @dataclass
 class Job_report_reward_data():
     """
@@ -252,8 +287,10 @@ class Job_report_data(Report_data):
         # Extract data from the 'js' field using the 'extract_items' function
         job_data_item_reward_dict = extract_items(input_js_string=self.js)
         
-        # Extract data from the 'xhtml' field using the 'extract_job_xhtml_data' function
-        job_reward_dict = extract_job_xhtml_data(input_xhtml=self.xhtml)
+        # Extract data from the 'xhtml' field, using BeautifulSoup only if the regex parser can't handle the markup
+        job_reward_dict = extract_job_xhtml_data_fast(input_xhtml=self.xhtml)
+        if job_reward_dict is None:
+            job_reward_dict = extract_job_xhtml_data(input_xhtml=self.xhtml)
         
         # Check if the 'clock', 'star', 'dollar', 'luck', and 'upb' keys are present in the extracted data
         if 'clock' not in job_reward_dict:
@@ -370,6 +407,56 @@ class Report():
                     xhtml = response['xhtml'],
                     reportInfo = response['reportInfo'],
                 )
+class Job_rewards_batch_extractor():
+    """
+    Reads and decrypts job reports with a bounded pool of workers.
+    
+    Every worker both requests the report body and parses it, so the parsing happens off the calling thread.
+    The number of requests per second is still bounded by the rate limiter of the handler.
+    """
+    def __init__(self, handler: requests_handler, max_workers: int = DEFAULT_MAX_WORKERS):
+        """
+        Args:
+        - handler: an object that can send HTTP requests.
+        - max_workers: the maximum number of reports read at the same time.
+        """
+        self.handler = handler
+        self.max_workers = max_workers
+    
+    def _read_job_reward(self, report: "Report") -> typing.Optional[Job_report_reward_data]:
+        read_report = report.read_report(handler=self.handler)
+        if isinstance(read_report, Job_report_data):
+            return read_report.decrypt_job_data()
+        return None
+    
+    def rewards_by_report(self, reports: typing.Iterable["Report"]) -> typing.Dict[int, Job_report_reward_data]:
+        """
+        Returns the rewards of every job report, keyed by report ID, in the order of the given reports.
+        Reports that are not job reports are skipped.
+        """
+        reports = list(reports)
+        if len(reports) == 0:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(reports))) as executor:
+            rewards = executor.map(self._read_job_reward, reports)
+            return {report.report_id : reward for report, reward in zip(reports, rewards) if reward is not None}
+    
+    def rewards(self, reports: typing.Iterable["Report"]) -> Job_report_reward_data:
+        """
+        Returns the combined rewards of all the job reports.
+        """
+        reward = Job_report_reward_data(
+            job_duration=0,
+            experience=0,
+            dollars=0,
+            luck=0,
+            oup=0,
+            item_drop={},
+        )
+        for report_reward in self.rewards_by_report(reports=reports).values():
+            reward += report_reward
+        return reward
+
 class Reports_list():
     """
     Class representing a list of reports.
@@ -466,37 +553,67 @@ class Reports_list():
             return self.reports[index]
         elif isinstance(index, slice):
             return Reports_list(self.reports[index])
-    def job_rewards(self, handler: requests_handler) -> Job_report_reward_data:
+    def job_rewards(self, handler: requests_handler, max_workers: int = DEFAULT_MAX_WORKERS) -> Job_report_reward_data:
         """
         Returns the combined rewards from all job reports in the list.
         
         Args:
         - handler: a `requests_handler` object to use for making HTTP requests.
+        - max_workers: the maximum number of reports read at the same time.
         
         Returns:
         - a `Job_report_reward_data` object containing the combined rewards from all job reports in the list.
         """
-        # Create a new `Job_report_reward_data` object to store the combined rewards.
-        reward = Job_report_reward_data(
-            job_duration=0,
-            experience=0,
-            dollars=0,
-            luck=0,
-            oup=0,
-            item_drop={},
-        )
+        return Job_rewards_batch_extractor(handler=handler, max_workers=max_workers).rewards(reports=self.reports)
+    def job_rewards_by_report(self, handler: requests_handler, max_workers: int = DEFAULT_MAX_WORKERS) -> typing.Dict[int, Job_report_reward_data]:
+        """
+        Returns the rewards of every job report in the list, keyed by report ID.
         
-        # Iterate through the `Report` objects in the list.
-        for report in self.reports:
-            # Read the report using the provided `handler`.
-            read_report = report.read_report(handler=handler)
-            
-            # If the report is a job report, decrypt the report data and add the rewards to the `reward` object.
-            if isinstance(read_report, Job_report_data):
-                reward += read_report.decrypt_job_data()
+        Args:
+        - handler: a `requests_handler` object to use for making HTTP requests.
+        - max_workers: the maximum number of reports read at the same time.
         
-        # Return the `reward` object.
-        return reward
+        Returns:
+        - a dictionary mapping the IDs of the job reports to their `Job_report_reward_data`. Reports that are not job reports are skipped.
+        """
+        return Job_rewards_batch_extractor(handler=handler, max_workers=max_workers).rewards_by_report(reports=self.reports)
+
+
+def build_reports_page(response: dict, page_number: int) -> typing.Dict[str, typing.Union[int, Reports_list]]:
+    """Builds the page dictionary returned by the reports readers from a `get_reports` response.
+
+    Args:
+        response: The JSON response of the `get_reports` request.
+        page_number: The page number the response belongs to.
+
+    Returns:
+        A dictionary containing the total number of pages and a list of reports data for the given page number.
+
+    Raises:
+        Exception: If the response signals an error.
+    """
+    # Raise an exception if there is an error getting the reports data for the given page number
+    if response["error"]:
+        raise Exception(
+            f"Getting the reports data for the page number {page_number} did not work!"
+        )
+
+    # Create a list of Report instances using the reports data from the response
+    reports_list = []
+    for report in response["reports"]:
+        report = Report(
+            report_id = report['report_id'],
+            data_id = report['data_id'],
+            date_received = report['date_received'],
+            hash = report['hash'],
+            popup_data = report['popupData'],
+            read = report['read'],
+            title = report['title'],
+            publish_mode = report['publish_mode']
+        )
+        reports_list.append(report)
+    # Return the total number of pages and the list of Report instances
+    return {"num_max_pages": response["count"], "reports_list": Reports_list(reports_list)}
 
 
 class Reports_data_reader():
@@ -510,14 +627,23 @@ class Reports_data_reader():
         get_data_by_page: Gets reports data for a given page number.
         get_data: Gets all reports data (optionally reading all pages).
     """
-    def __init__(self, handler: requests_handler) :
+    def __init__(self, handler: requests_handler, max_workers: int = DEFAULT_MAX_WORKERS) :
         """Initializes the Reports_data_reader instance.
 
         Args:
             handler: An instance of the requests_handler class.
+            max_workers: Maximum number of pages requested at the same time.
         """
 
         self.handler = handler
+        self.max_workers = max_workers
+    def _page_fetcher(self) -> PaginatedFetcher:
+        return PaginatedFetcher(
+            fetch_page = lambda page_number: self.get_data_by_page(page_number=page_number),
+            page_count = lambda page_response: page_response["num_max_pages"],
+            first_page = 1,
+            max_workers = self.max_workers
+        )
     def get_data_by_page(self, page_number: int) -> typing.Dict[str, typing.Union[int, Reports_list]]:
         """Gets reports data for a given page number.
         Args:
@@ -541,28 +667,7 @@ class Reports_data_reader():
             use_h=True,
         )
 
-        # Raise an exception if there is an error getting the reports data for the given page number
-        if response["error"]:
-            raise Exception(
-                f"Getting the reports data for the page number {page_number} did not work!"
-            )
-
-        # Create a list of Report instances using the reports data from the response
-        reports_list = []
-        for report in response["reports"]:
-            report = Report(
-                report_id = report['report_id'],
-                data_id = report['data_id'],
-                date_received = report['date_received'],
-                hash = report['hash'],
-                popup_data = report['popupData'],
-                read = report['read'],
-                title = report['title'],
-                publish_mode = report['publish_mode']
-            )
-            reports_list.append(report)
-        # Return the total number of pages and the list of Report instances
-        return {"num_max_pages": response["count"], "reports_list": Reports_list(reports_list)}
+        return build_reports_page(response=response, page_number=page_number)
     def get_data(self, read_all_pages: bool = False):
         """Gets all reports data (optionally reading all pages).
         Args:
@@ -572,17 +677,13 @@ class Reports_data_reader():
             A list of reports data.
         """
 
-        # Get the reports data for the first page
-        first_page_response = self.get_data_by_page(page_number=1)
+        # Read only the first page, or every page concurrently (merged back in page order)
+        page_responses = self._page_fetcher().iter_pages(max_pages=None if read_all_pages else 1)
 
-        # Initialize the reports_list with the reports data from the first page
-        reports_list = first_page_response["reports_list"]
-
-        # If read_all_pages is True, get the reports data for all pages and append it to the reports_list
-        if read_all_pages:
-            for i in range(2, first_page_response["num_max_pages"] + 1):
-                page_response = self.get_data_by_page(page_number=i)
-                reports_list += page_response["reports_list"]
+        # Initialize the reports_list and append the reports data of every page to it
+        reports_list = Reports_list([])
+        for page_response in page_responses:
+            reports_list += page_response["reports_list"]
 
         # Return the reports_list
         return reports_list
@@ -596,19 +697,15 @@ class Reports_data_reader():
         Returns:
         - a `Reports_list` object containing all of the reports read up until the report with the given report ID is found.
         """
-        # Initialize the page number, num_max_pages, and reports_list
-        page_number = 1
-        num_max_pages = 1
         reports_list = Reports_list([])
         
+        # Stop requesting new pages as soon as a page containing the given report ID arrives
+        page_responses = self._page_fetcher().iter_pages(
+            stop_condition = lambda page_response: any(report.report_id == report_id for report in page_response["reports_list"])
+        )
+        
         # Keep reading pages until the report with the given report ID is found or all pages have been read
-        while page_number <= num_max_pages:
-            # Get the reports data for the current page
-            page_response = self.get_data_by_page(page_number=page_number)
-            
-            # Update the num_max_pages
-            num_max_pages = page_response["num_max_pages"]
-            
+        for page_response in page_responses:
             # Iterate through the reports in the current page
             for report in page_response["reports_list"]:
                 # If the report has the given report ID, return the reports_list
@@ -617,13 +714,67 @@ class Reports_data_reader():
                 # Otherwise, add the report to the reports_list
                 else:
                     reports_list += report
-            
-            # Increment the page number
-            page_number += 1
         
         # If the report with the given report ID is not found, return the reports_list
         return reports_list
 
+class AsyncReports_data_reader():
+    """Async counterpart of `Reports_data_reader`, driven by an `AsyncRequestsHandler`.
+
+    Attributes:
+        handler: An instance of the AsyncRequestsHandler class.
+        max_workers: Maximum number of pages requested at the same time.
+    """
+    def __init__(self, handler: AsyncRequestsHandler, max_workers: int = DEFAULT_MAX_WORKERS):
+        self.handler = handler
+        self.max_workers = max_workers
+
+    async def get_data_by_page(self, page_number: int) -> typing.Dict[str, typing.Union[int, Reports_list]]:
+        """Gets reports data for a given page number.
+
+        Args:
+            page_number: An integer representing the page number to get reports data for.
+
+        Returns:
+            A dictionary containing the total number of pages and a list of reports data for the given page number.
+        """
+        response = await self.handler.post(
+            window="reports",
+            action="get_reports",
+            payload={
+                "page": f"{page_number}",
+                "folder": "all",
+            },
+            use_h=True,
+        )
+        return build_reports_page(response=response, page_number=page_number)
+
+    async def get_data(self, read_all_pages: bool = False) -> Reports_list:
+        """Gets all reports data (optionally reading all pages).
+
+        The pages after the first one are requested concurrently, at most `max_workers` at a time,
+        and merged in page order.
+
+        Args:
+            read_all_pages: A boolean indicating whether to read all pages of reports data (defaults to False).
+
+        Returns:
+            A list of reports data.
+        """
+        first_page_response = await self.get_data_by_page(page_number=1)
+        reports_list = first_page_response["reports_list"]
+
+        if read_all_pages:
+            page_responses = await gather_pages(
+                fetch_page=lambda page_number: self.get_data_by_page(page_number=page_number),
+                page_numbers=range(2, first_page_response["num_max_pages"] + 1),
+                max_workers=self.max_workers,
+            )
+            for page_response in page_responses:
+                reports_list += page_response["reports_list"]
+
+        return reports_list
+
 class Reports_manager():
     """
     Class representing a manager for reading reports.
@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+import typing
 import requests
 from urllib.parse import urlparse
 import datetime
@@ -14,7 +15,7 @@ from functools import wraps
 
 from connection_sessions.standard_request_session import StandardRequestsSession
 
-from the_west_inner.requests_rate_limiter import rate_limited
+from the_west_inner.requests_rate_limiter import TokenBucketRateLimiter, get_rate_limiter
 
 def requests_url_decorator(funct):
     def inner(*args,**kwargs):
@@ -122,12 +123,23 @@ class requests_handler:
         session (requests.Session): The requests session to use.
         base_url (str): The base URL of the game server.
         h (str): The hash parameter for authentication.
+        player (typing.Hashable): Identifies the account the handler belongs to. Together with base_url
+            it selects the shared rate limiter. Defaults to the hash parameter.
+        rate_limiter (TokenBucketRateLimiter): The limiter every request waits on.
+            Defaults to the one registered for (base_url, player).
     """
     session: requests.Session | StandardRequestsSession
     base_url: str
     h: str
+    player: typing.Hashable = None
+    rate_limiter: TokenBucketRateLimiter = field(default=None, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.player is None:
+            self.player = self.h
+        if self.rate_limiter is None:
+            self.rate_limiter = get_rate_limiter(base_url=self.base_url, player=self.player)
 
-    @rate_limited(limit=3, duration=4)
     def post(self, window, action, action_name="action", payload=None, use_h=False):
         """
         Make a POST request to the game server.
@@ -142,5 +154,6 @@ class requests_handler:
         Returns:
             dict: JSON response from the game server.
         """
+        self.rate_limiter.acquire()
         return request_game(self.session, self.base_url, window, action, payload,
                             self.h if use_h else None, action_name=action_name)
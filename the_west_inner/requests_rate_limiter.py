@@ -1,29 +1,151 @@
+import asyncio
 import time
+import threading
+import typing
+import weakref
 from functools import wraps
 
-# Define the rate_limited decorator
-def rate_limited(limit: int, duration: int):
-    def decorator(func):
-        timestamps = {}
+DEFAULT_BURST = 3
+DEFAULT_REFILL_RATE = 3 / 4
 
+
+class TokenBucketRateLimiter:
+    """
+    Thread-safe token bucket.
+
+    The bucket holds at most `burst` tokens and regains `refill_rate` tokens per second.
+    Every request consumes one token; when the bucket is empty `acquire` sleeps until a token
+    becomes available.
+
+    Attributes:
+        burst (int): Maximum number of tokens (requests that can be made back to back).
+        refill_rate (float): Tokens added per second.
+        waited_requests (int): Number of acquisitions that had to wait for a token.
+        total_wait_time (float): Total time in seconds spent waiting for tokens.
+    """
+
+    def __init__(self, burst: int = DEFAULT_BURST, refill_rate: float = DEFAULT_REFILL_RATE):
+        if burst < 1:
+            raise ValueError(f"Burst must be at least 1, got {burst}")
+        if refill_rate <= 0:
+            raise ValueError(f"Refill rate must be positive, got {refill_rate}")
+        self.burst = burst
+        self.refill_rate = refill_rate
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+        self.total_requests = 0
+        self.waited_requests = 0
+        self.total_wait_time = 0.0
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._last_refill
+        if elapsed > 0:
+            self._tokens = min(self.burst, self._tokens + elapsed * self.refill_rate)
+            self._last_refill = now
+
+    def _reserve(self) -> float:
+        """
+        Take a token (possibly going into debt) and return how long the caller has to wait for it.
+        Reserving under the lock keeps concurrent waiters ordered instead of all waking at once.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= 1
+            self.total_requests += 1
+            if self._tokens >= 0:
+                return 0.0
+            wait_time = -self._tokens / self.refill_rate
+            self.waited_requests += 1
+            self.total_wait_time += wait_time
+            return wait_time
+
+    def try_acquire(self) -> bool:
+        """
+        Take a token without blocking.
+
+        Returns:
+            bool: True if a token was available, False otherwise.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            self.total_requests += 1
+            return True
+
+    def acquire(self) -> float:
+        """
+        Take a token, sleeping until one is available.
+
+        Returns:
+            float: The time in seconds the caller waited.
+        """
+        wait_time = self._reserve()
+        if wait_time > 0:
+            time.sleep(wait_time)
+        return wait_time
+
+    async def acquire_async(self) -> float:
+        """
+        Take a token, awaiting (without blocking the event loop) until one is available.
+
+        Returns:
+            float: The time in seconds the caller waited.
+        """
+        wait_time = self._reserve()
+        if wait_time > 0:
+            await asyncio.sleep(wait_time)
+        return wait_time
+
+    @property
+    def available_tokens(self) -> float:
+        with self._lock:
+            self._refill(time.monotonic())
+            return max(0.0, self._tokens)
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            return {
+                "total_requests": self.total_requests,
+                "waited_requests": self.waited_requests,
+                "total_wait_time": self.total_wait_time
+            }
+
+    def __call__(self, func: typing.Callable) -> typing.Callable:
         @wraps(func)
         def wrapper(*args, **kwargs):
-            current_time = time.time()
-            key = func.__name__
+            self.acquire()
+            return func(*args, **kwargs)
+        return wrapper
 
-            if key not in timestamps:
-                timestamps[key] = [current_time]
-            else:
-                timestamps[key] = [t for t in timestamps[key] if current_time - t <= duration]
-                timestamps[key].append(current_time)
 
-            if len(timestamps[key]) > limit:
-                remaining_time = duration - (current_time - timestamps[key][0])
-                sleep_time = max(0, remaining_time)
-                time.sleep(sleep_time)
+# Only the limiters of live handlers are kept : a limiter is dropped with the last handler using it
+_rate_limiters: weakref.WeakValueDictionary[typing.Hashable, TokenBucketRateLimiter] = weakref.WeakValueDictionary()
+_rate_limiters_lock = threading.Lock()
 
-            return func(*args, **kwargs)
 
-        return wrapper
+def get_rate_limiter(base_url: str,
+                     player: typing.Hashable,
+                     burst: int = DEFAULT_BURST,
+                     refill_rate: float = DEFAULT_REFILL_RATE) -> TokenBucketRateLimiter:
+    """
+    Return the limiter registered for (base_url, player), creating it on first use.
+
+    Handlers built for the same player on the same world share one budget, while
+    different accounts no longer throttle each other.
 
-    return decorator
\ No newline at end of file
+    Raises:
+        ValueError: If the limiter of (base_url, player) in use has another burst or refill rate.
+    """
+    key = (base_url, player)
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(key)
+        if limiter is None:
+            limiter = TokenBucketRateLimiter(burst=burst, refill_rate=refill_rate)
+            _rate_limiters[key] = limiter
+        elif limiter.burst != burst or limiter.refill_rate != refill_rate:
+            raise ValueError(f"The rate limiter of {key} has burst {limiter.burst} and refill rate "
+                             f"{limiter.refill_rate}, got burst {burst} and refill rate {refill_rate}")
+        return limiter
@@ -7,13 +7,15 @@ from the_west_inner.game_classes import Game_classes
 from the_west_inner.item_set_general import get_item_sets
 
 from the_west_inner.simulation_data_library.simul_items import Item_model_list,create_item_list_from_model,Item_model
-from the_west_inner.simulation_data_library.simul_equipment import Equipment_simul
+from the_west_inner.simulation_data_library.simul_equipment import Equipment_simul, EQUIPMENT_SLOTS
 from the_west_inner.simulation_data_library.simul_sets import Item_set_list
 from the_west_inner.simulation_data_library.simul_equip_fitnes import SimulFitnessRuleSet
 from the_west_inner.simulation_data_library.load_items_script import get_simul_items,get_simul_sets
 from the_west_inner.simulation_data_library.simul_equipment import _game_data_to_current_equipment
 from the_west_inner.simulation_data_library.simul_permutation_data import EquipmentPermutationData
-
+from the_west_inner.simulation_data_library.simul_vector_fitness import CompiledEquipmentSpace, VectorizedFitnessEvaluator, DEFAULT_BATCH_SIZE
+from the_west_inner.simulation_data_library.simul_branch_and_bound import BranchAndBoundEquipmentOptimiser, BranchAndBoundStats
+from the_west_inner.simulation_data_library.simul_leveled_stats import leveled_stats_cache, LeveledStatsCacheStats
 
 class Equipment_permutation_generator():
     def __init__(self,equipment_dictionary: dict[str,int]) -> None:
@@ -37,14 +39,22 @@ class Equipment_permutation_generator():
                     self.equipment_dict.keys()
                     )
         values = [self.equipment_dict[key] for key in keys]
-        permutations = list(itertools.product(*values))
-        for perm in permutations:
+        # Streamed : the product of every slot does not fit in memory for a full bag
+        for perm in itertools.product(*values):
             yield {keys[i]: perm[i] for i in range(len(keys))}
 class Brute_force_simulation_bonus_check():
     def __init__(self,equipment_reader:Equipment_simul,item_model_list:Item_model_list,set_model_list:Item_set_list):
         self.equipment_reader = equipment_reader
         self.item_model_list = item_model_list
         self.set_model_list = set_model_list
+        self.last_search_stats : BranchAndBoundStats | None = None
+    
+    @property
+    def leveled_stats_cache_stats(self) -> LeveledStatsCacheStats:
+        """
+        The size and hit rate of the leveled item cache shared by every simulator.
+        """
+        return leveled_stats_cache.stats()
     
     def possible_equipment_generator(self) -> typing.Generator[EquipmentPermutationData,None,None]:
         item_type_dict = self.item_model_list.get_item_dict()
@@ -61,7 +71,44 @@ class Brute_force_simulation_bonus_check():
                 **self.equipment_reader.create_status_dict(),
                    **{"permutation" : equipment_permutation})
 
-    def maximum_equipment_value_brute_force(self,simul_rule_set : SimulFitnessRuleSet) -> EquipmentPermutationData|None :
+    def compile_space(self) -> CompiledEquipmentSpace:
+        
+        return CompiledEquipmentSpace(
+            item_model_list = self.item_model_list,
+            item_set_list = self.equipment_reader.item_set_list,
+            player_level = self.equipment_reader.player_level,
+            fixed_items = {slot : self.equipment_reader.get_by_key(key = slot) for slot in EQUIPMENT_SLOTS}
+        )
+    
+    def maximum_equipment_value_vectorized(self,simul_rule_set : SimulFitnessRuleSet , batch_size : int = DEFAULT_BATCH_SIZE) -> EquipmentPermutationData|None :
+        
+        space = self.compile_space()
+        evaluator = VectorizedFitnessEvaluator(fitness_rule_set = simul_rule_set , space = space)
+        best_choice , _ = evaluator.best_of(space.iter_choices(batch_size = batch_size))
+        
+        if best_choice is None:
+            return None
+        return space.permutation_data(choice = best_choice)
+    
+    def maximum_equipment_value_branch_and_bound(self,simul_rule_set : SimulFitnessRuleSet) -> EquipmentPermutationData|None :
+        
+        optimiser = BranchAndBoundEquipmentOptimiser(
+            evaluator = VectorizedFitnessEvaluator(fitness_rule_set = simul_rule_set , space = self.compile_space())
+        )
+        result = optimiser.optimise()
+        self.last_search_stats = optimiser.stats
+        return result
+    
+    def maximum_equipment_value_brute_force(self,
+                                            simul_rule_set : SimulFitnessRuleSet ,
+                                            vectorized : bool = True ,
+                                            branch_and_bound : bool = True) -> EquipmentPermutationData|None :
+        
+        # The bounds only hold for lexicographic comparisons, without a percent coefficient
+        if vectorized and branch_and_bound and simul_rule_set.percent_coefficient == 0:
+            return self.maximum_equipment_value_branch_and_bound(simul_rule_set = simul_rule_set)
+        if vectorized:
+            return self.maximum_equipment_value_vectorized(simul_rule_set = simul_rule_set)
         
         maximum = simul_rule_set.generate_empty_result()
         result_permutation = None
@@ -80,13 +127,14 @@ class Brute_force_simulation_bonus_check():
     def _get_max_item(self,simul_rule_set : SimulFitnessRuleSet ,item_list : list[Item_model]) -> Item_model:
         
         equipment = self.equipment_reader.copy()
+        equipment.empty()
         maximum = simul_rule_set.generate_empty_result()
         max_item = None
         for item in item_list:
-            equipment.empty()
-            equipment.replace_item(replacement_item = item)
             
-            result = simul_rule_set.get_fitness_result(equipment_data = equipment)
+            result = simul_rule_set.get_fitness_result(
+                equipment_data = equipment.evaluate_swap(slot = item.item_type , item = item)
+                )
             if result >= maximum :
                 maximum = result
                 max_item = item
@@ -1,19 +1,52 @@
 import random
+import typing
+
+import numpy as np
 
 from the_west_inner.game_classes import Game_classes
 
 from the_west_inner.simulation_data_library.simul_items import Item_model_list
 from the_west_inner.simulation_data_library.simul_equipment import Equipment_simul
 from the_west_inner.simulation_data_library.simul_sets import Item_set_list
-from the_west_inner.simulation_data_library.simul_equip_fitnes import SimulFitnessRuleSet
+from the_west_inner.simulation_data_library.simul_equip_fitnes import SimulFitnessRuleSet, SimulResultFitness
 from the_west_inner.simulation_data_library.simul_permutation_data import EquipmentPermutationData
 from the_west_inner.simulation_data_library.simul_data_loader import Simulation_data_loader
+from the_west_inner.simulation_data_library.simul_vector_fitness import CompiledEquipmentSpace, VectorizedFitnessEvaluator
+from the_west_inner.simulation_data_library.simul_genetic_islands import IslandModel, GenerationStats, DEFAULT_FITNESS_CACHE_SIZE
+from the_west_inner.simulation_data_library.simul_leveled_stats import leveled_stats_cache, LeveledStatsCacheStats
 
 
 
 
 class GeneticAlgorithm:
-    def __init__(self, item_model_list: Item_model_list, set_model_list: Item_set_list, equipment_simul: Equipment_simul, fitness_rule_set: SimulFitnessRuleSet, population_size=50, generations=100, mutation_rate=0.01):
+    """
+    Genetic search of the best equipment.
+
+    When vectorized, the population evolves as an `IslandModel` : `islands` sub-populations evolving in
+    parallel processes, exchanging their best individuals every `migration_interval` generations, with
+    memoised fitness, a reproducible `seed`, early stopping after `stagnation_generations` generations
+    without improvement and a `stats_callback` receiving a `GenerationStats` per generation.
+    The non vectorized search runs the single population on `equipment_simul`. A rule set with a percent
+    coefficient can't be compared as fitness tuples : its vectorized search runs the single population too,
+    scored in batches and compared as `SimulResultFitness`.
+    """
+    def __init__(self,
+                 item_model_list: Item_model_list,
+                 set_model_list: Item_set_list,
+                 equipment_simul: Equipment_simul,
+                 fitness_rule_set: SimulFitnessRuleSet,
+                 population_size=50,
+                 generations=100,
+                 mutation_rate=0.01,
+                 vectorized=True,
+                 islands=1,
+                 migration_interval=10,
+                 migration_size=2,
+                 max_workers=None,
+                 seed=None,
+                 stagnation_generations=None,
+                 stats_callback: typing.Callable[[GenerationStats], None] | None = None,
+                 fitness_cache_size=DEFAULT_FITNESS_CACHE_SIZE):
         self.item_model_list = item_model_list
         self.set_model_list = set_model_list
         self.equipment_simul = equipment_simul
@@ -21,13 +54,32 @@ class GeneticAlgorithm:
         self.population_size = population_size
         self.generations = generations
         self.mutation_rate = mutation_rate
+        self.vectorized = vectorized
+        self.evaluator : VectorizedFitnessEvaluator | None = None
+        self.islands = islands
+        self.migration_interval = migration_interval
+        self.migration_size = migration_size
+        self.max_workers = max_workers
+        self.seed = seed
+        self.stagnation_generations = stagnation_generations
+        self.stats_callback = stats_callback
+        self.fitness_cache_size = fitness_cache_size
+        self.rng = random.Random(seed)
+        self.island_model : IslandModel | None = None
+
+    @property
+    def leveled_stats_cache_stats(self) -> LeveledStatsCacheStats:
+        """
+        The size and hit rate of the leveled item cache shared by every simulator.
+        """
+        return leveled_stats_cache.stats()
 
     def initialize_population(self):
         population = []
         item_type_dict = self.item_model_list.get_item_dict()
         item_types = list(item_type_dict.keys())
         for _ in range(self.population_size):
-            individual = {item_type: random.choice(item_type_dict[item_type]) for item_type in item_types}
+            individual = {item_type: self.rng.choice(item_type_dict[item_type]) for item_type in item_types}
             population.append(individual)
         return population
 
@@ -41,11 +93,31 @@ class GeneticAlgorithm:
         )
         return self.fitness_rule_set.get_fitness_result(equipment_data)
     
+    def _compile_evaluator(self) -> VectorizedFitnessEvaluator:
+        if self.evaluator is None:
+            space = CompiledEquipmentSpace(
+                item_model_list = self.item_model_list,
+                item_set_list = self.equipment_simul.item_set_list,
+                player_level = self.equipment_simul.player_level
+            )
+            self.evaluator = VectorizedFitnessEvaluator(fitness_rule_set = self.fitness_rule_set, space = space)
+        return self.evaluator
+
+    def population_fitness(self, population) -> list[SimulResultFitness]:
+        """
+        Scores a whole population, as one batch when the algorithm is vectorized.
+        """
+        if not self.vectorized:
+            return [self.fitness(individual) for individual in population]
+        evaluator = self._compile_evaluator()
+        choices = np.array([evaluator.space.encode(individual) for individual in population], dtype=np.int64)
+        return evaluator.fitness_results(choices)
+
 
     def select(self, population, fitnesses):
         selected = []
         for _ in range(len(population)):
-            index1, index2 = random.sample(range(len(population)), 2)
+            index1, index2 = self.rng.sample(range(len(population)), 2)
             fitness1 = fitnesses[index1]
             fitness2 = fitnesses[index2]
             selected.append(population[index1] if fitness1 > fitness2 else population[index2])
@@ -56,23 +128,48 @@ class GeneticAlgorithm:
     def crossover(self, parent1, parent2):
         child = {}
         for key in parent1.keys():
-            child[key] = random.choice([parent1[key], parent2[key]])
+            child[key] = self.rng.choice([parent1[key], parent2[key]])
         return child
 
     def mutate(self, individual):
-        if random.random() < self.mutation_rate:
+        if self.rng.random() < self.mutation_rate:
             item_type_dict = self.item_model_list.get_item_dict()
-            item_type = random.choice(list(individual.keys()))
-            individual[item_type] = random.choice(item_type_dict[item_type])
+            item_type = self.rng.choice(list(individual.keys()))
+            individual[item_type] = self.rng.choice(item_type_dict[item_type])
         return individual
 
+    def run_islands(self) -> EquipmentPermutationData | None:
+        
+        evaluator = self._compile_evaluator()
+        self.island_model = IslandModel(
+            evaluator = evaluator,
+            population_size = self.population_size,
+            generations = self.generations,
+            mutation_rate = self.mutation_rate,
+            islands = self.islands,
+            migration_interval = self.migration_interval,
+            migration_size = self.migration_size,
+            max_workers = self.max_workers,
+            seed = self.seed,
+            stagnation_generations = self.stagnation_generations,
+            stats_callback = self.stats_callback,
+            fitness_cache_size = self.fitness_cache_size
+        )
+        best_individual, best_fitness = self.island_model.run()
+        if best_individual is None or not evaluator.to_fitness_result(best_fitness) > self.fitness_rule_set.generate_empty_result():
+            return None
+        return evaluator.space.permutation_data(choice = np.array(best_individual, dtype=np.int64))
+
     def run(self):
+        if self.vectorized and self.fitness_rule_set.percent_coefficient == 0:
+            return self.run_islands()
         population = self.initialize_population()
         best_individual = None
         best_fitness = self.fitness_rule_set.generate_empty_result()
+        # Every population is scored once : its fitnesses find the best individual and drive the next selection
+        fitnesses = self.population_fitness(population)
 
         for generation in range(self.generations):
-            fitnesses = [self.fitness(individual) for individual in population]
             population = self.select(population, fitnesses)
             next_population = []
             for i in range(0, len(population), 2):
@@ -82,20 +179,22 @@ class GeneticAlgorithm:
                 child2 = self.crossover(parent1, parent2)
                 next_population.extend([self.mutate(child1), self.mutate(child2)])
             population = next_population
+            fitnesses = self.population_fitness(population)
 
-            for individual in population:
-                current_fitness = self.fitness(individual)
+            for individual, current_fitness in zip(population, fitnesses):
                 if current_fitness > best_fitness:
                     best_fitness = current_fitness
                     best_individual = individual
 
+        if self.vectorized and best_individual is not None:
+            return self.evaluator.space.permutation_data(choice = self.evaluator.space.encode(best_individual))
         return EquipmentPermutationData(
             **self.equipment_simul.create_status_dict(),
             **{"permutation": best_individual}#, "fitness": best_fitness}
         )
 
 # Example usage
-def run_genetic_algorithm_simulation(game_data : Game_classes , fitness_rule_set : SimulFitnessRuleSet):
+def run_genetic_algorithm_simulation(game_data : Game_classes , fitness_rule_set : SimulFitnessRuleSet , islands : int = 1):
     loader = Simulation_data_loader(game_data)
     item_model_list = loader.assemble_item_model_list_from_game_data()
     item_model_list = item_model_list.filter_mapdrop_items(
@@ -115,7 +214,9 @@ def run_genetic_algorithm_simulation(game_data : Game_classes , fitness_rule_set
         fitness_rule_set=fitness_rule_set,
         population_size=500,
         generations=100,
-        mutation_rate=0.03
+        mutation_rate=0.03,
+        islands=islands,
+        stagnation_generations=30
     )
 
     best_equipment = ga.run()
@@ -0,0 +1,223 @@
+"""
+This module contains an exact branch-and-bound search for the best equipment permutation.
+
+The search assigns the slots of a `CompiledEquipmentSpace` one after another (depth first, trying
+the most promising items of a slot first) and abandons a partial equipment as soon as an upper bound
+of its fitness can not beat the best complete equipment found so far. For every rule the bound is:
+
+    the contribution of the items already chosen
+    + the best contribution of every slot left to choose
+    + for every set, the best bonus reachable from the pieces already chosen
+      and the remaining slots that still have an item of that set.
+
+The bounds come from the rules' `linear_weights()` (or `upper_bound_weights()` for rules that are only
+bounded by a linear function); a rule that has neither is never used to prune. Complete equipments are
+scored exactly by a `VectorizedFitnessEvaluator`, one batch per last slot, so the result is the same
+permutation the brute force returns : the first one, in Cartesian product order, with the highest
+`SimulResultFitness`.
+
+Classes:
+
+    BranchAndBoundStats: Counters of a search.
+    BranchAndBoundEquipmentOptimiser: The search.
+"""
+import time
+import typing
+from dataclasses import dataclass
+
+import numpy as np
+
+from the_west_inner.simulation_data_library.simul_equip_fitnes import SimulResultFitness
+from the_west_inner.simulation_data_library.simul_permutation_data import EquipmentPermutationData
+from the_west_inner.simulation_data_library.simul_vector_fitness import (FEATURE_COUNT,
+                                                                         FEATURE_INDEX,
+                                                                         VectorizedFitnessEvaluator)
+
+# Relative tolerance under which a bound and the best result are considered equal
+BOUND_TOLERANCE = 1e-9
+
+
+@dataclass
+class BranchAndBoundStats:
+    nodes_visited: int = 0
+    nodes_pruned: int = 0
+    permutations_pruned: int = 0
+    leaves_evaluated: int = 0
+    improvements: int = 0
+    elapsed_time: float = 0.0
+
+    @property
+    def permutations_total(self) -> int:
+        return self.permutations_pruned + self.leaves_evaluated
+
+
+class BranchAndBoundEquipmentOptimiser():
+    """
+    Finds the best permutation of `evaluator.space` under `evaluator.fitness_rule_set`.
+
+    Attributes:
+        evaluator (VectorizedFitnessEvaluator): Scores complete permutations.
+        stats (BranchAndBoundStats): Counters of the last search.
+    """
+    def __init__(self, evaluator: VectorizedFitnessEvaluator):
+        if not evaluator.lexicographic:
+            raise ValueError("The bounds order the results lexicographically, the rule set can't have a percent coefficient, "
+                             f"got {evaluator.fitness_rule_set.percent_coefficient}")
+        self.evaluator = evaluator
+        self.space = evaluator.space
+        self.stats = BranchAndBoundStats()
+        rules = evaluator.fitness_rule_set.fitness_rule_list
+        self.rule_count = len(rules)
+
+        bound_weights = np.zeros((FEATURE_COUNT, self.rule_count), dtype=np.float64)
+        self.unbounded_rules = np.ones(self.rule_count, dtype=bool)
+        for rule_index, rule in enumerate(rules):
+            if hasattr(rule, 'linear_weights'):
+                weights = rule.linear_weights()
+                # The weapon damage features are not a plain sum of the item vectors
+                if any(weights.get(name, 0) for name in ('weapon_min_damage', 'weapon_max_damage', 'has_weapon')):
+                    continue
+            elif hasattr(rule, 'upper_bound_weights'):
+                weights = rule.upper_bound_weights()
+            else:
+                continue
+            for name, weight in weights.items():
+                bound_weights[FEATURE_INDEX[name], rule_index] += weight
+            self.unbounded_rules[rule_index] = False
+        self._raw_weights = bound_weights
+
+        self.item_scores = [matrix @ bound_weights for matrix in self.space.slot_matrices]
+        slot_count = len(self.space.slots)
+        self.suffix_best = np.zeros((slot_count + 1, self.rule_count), dtype=np.float64)
+        for depth in range(slot_count - 1, -1, -1):
+            scores = self.item_scores[depth]
+            self.suffix_best[depth] = self.suffix_best[depth + 1] + (scores.max(axis=0) if len(scores) else 0)
+
+        set_count = len(self.space.set_ids)
+        self.remaining_set_slots = np.zeros((slot_count + 1, set_count), dtype=np.int64)
+        for depth in range(slot_count - 1, -1, -1):
+            has_set = np.zeros(set_count, dtype=np.int64)
+            set_indices = self.space.slot_set_indices[depth]
+            has_set[np.unique(set_indices[set_indices >= 0])] = 1
+            self.remaining_set_slots[depth] = self.remaining_set_slots[depth + 1] + has_set
+        self.set_window_best = self._compile_set_window_best()
+
+        # Best first : inside a slot, items are tried by decreasing bound, rule by rule
+        self.item_orders = [
+            np.lexsort(tuple(-scores[:, rule_index] for rule_index in range(self.rule_count - 1, -1, -1)))
+            if self.rule_count else np.arange(len(scores))
+            for scores in self.item_scores
+        ]
+
+    def _compile_set_window_best(self) -> np.ndarray:
+        """
+        Returns the (sets, pieces + 1, pieces + 1, rules) table of the best set bonus reachable with
+        `pieces` already equipped and up to `remaining` more pieces.
+        """
+        set_scores = self.space.set_bonus_tensor @ self._raw_weights
+        max_pieces = set_scores.shape[1] - 1 if set_scores.ndim == 3 else 0
+        table = np.zeros((len(self.space.set_ids), max_pieces + 1, max_pieces + 1, self.rule_count), dtype=np.float64)
+        for pieces in range(max_pieces + 1):
+            running = set_scores[:, pieces, :].copy()
+            for remaining in range(max_pieces + 1):
+                if pieces + remaining <= max_pieces:
+                    running = np.maximum(running, set_scores[:, pieces + remaining, :])
+                table[:, pieces, remaining, :] = running
+        return table
+
+    def _upper_bound(self, depth: int, partial_scores: np.ndarray, set_counts: np.ndarray) -> np.ndarray:
+        bound = partial_scores + self.suffix_best[depth]
+        if len(self.space.set_ids):
+            bound = bound + self.set_window_best[np.arange(len(self.space.set_ids)),
+                                                 set_counts,
+                                                 self.remaining_set_slots[depth]].sum(axis=0)
+        bound[self.unbounded_rules] = np.inf
+        return bound
+
+    def _can_prune(self, bound: np.ndarray, prefix: list[int]) -> bool:
+        if self._best_row is None:
+            return False
+        for bound_value, best_value in zip(bound, self._best_row):
+            tolerance = BOUND_TOLERANCE * max(1.0, abs(best_value))
+            if bound_value < best_value - tolerance:
+                return True
+            if bound_value > best_value + tolerance:
+                return False
+        # The node can at best tie with the incumbent : it only matters if it comes first in product order
+        return tuple(prefix) > tuple(int(x) for x in self._best_choice[:len(prefix)])
+
+    def _visit(self,
+               depth: int,
+               prefix: list[int],
+               partial_scores: np.ndarray,
+               set_counts: np.ndarray) -> typing.Generator[tuple[np.ndarray, SimulResultFitness], None, None]:
+        self.stats.nodes_visited += 1
+        slot_count = len(self.space.slots)
+        if depth == slot_count - 1:
+            yield from self._evaluate_last_slot(prefix=prefix)
+            return
+        set_indices = self.space.slot_set_indices[depth]
+        for item_index in self.item_orders[depth]:
+            item_index = int(item_index)
+            child_prefix = prefix + [item_index]
+            child_scores = partial_scores + self.item_scores[depth][item_index]
+            child_counts = set_counts
+            if set_indices[item_index] >= 0:
+                child_counts = set_counts.copy()
+                child_counts[set_indices[item_index]] += 1
+            if self._can_prune(self._upper_bound(depth + 1, child_scores, child_counts), child_prefix):
+                self.stats.nodes_pruned += 1
+                self.stats.permutations_pruned += int(np.prod(self.space.slot_sizes[depth + 1:]))
+                continue
+            yield from self._visit(depth=depth + 1, prefix=child_prefix, partial_scores=child_scores, set_counts=child_counts)
+
+    def _evaluate_last_slot(self, prefix: list[int]) -> typing.Generator[tuple[np.ndarray, SimulResultFitness], None, None]:
+        last_slot_size = self.space.slot_sizes[-1]
+        choices = np.empty((last_slot_size, len(self.space.slots)), dtype=np.int64)
+        choices[:, :-1] = prefix
+        choices[:, -1] = np.arange(last_slot_size)
+        results = self.evaluator.evaluate(choices)
+        self.stats.leaves_evaluated += last_slot_size
+        index = self.evaluator.best_index(results)
+        if index is None:
+            return
+        result = self.evaluator.to_fitness_result(results[index])
+        if (self._best_row is None
+                or result > self._best_result
+                or (result == self._best_result and tuple(int(x) for x in choices[index]) < tuple(int(x) for x in self._best_choice))):
+            self._best_row = results[index]
+            self._best_result = result
+            self._best_choice = choices[index]
+            self.stats.improvements += 1
+            yield choices[index], result
+
+    def iter_improvements(self) -> typing.Generator[tuple[np.ndarray, SimulResultFitness], None, None]:
+        """
+        Runs the search, yielding every new best (choice row, result) as it is found.
+        The last yielded candidate is the optimum.
+        """
+        self.stats = BranchAndBoundStats()
+        self._best_row = None
+        self._best_result = self.evaluator.fitness_rule_set.generate_empty_result()
+        self._best_choice = None
+        if not self.space.slots or 0 in self.space.slot_sizes:
+            return
+        start_time = time.perf_counter()
+        try:
+            yield from self._visit(depth=0,
+                                   prefix=[],
+                                   partial_scores=np.zeros(self.rule_count, dtype=np.float64),
+                                   set_counts=np.zeros(len(self.space.set_ids), dtype=np.int64))
+        finally:
+            self.stats.elapsed_time = time.perf_counter() - start_time
+
+    def optimise(self) -> EquipmentPermutationData | None:
+        """
+        Returns the best permutation, or None if no permutation beats the empty result.
+        """
+        best_choice = None
+        for best_choice, _ in self.iter_improvements():
+            pass
+        if best_choice is None:
+            return None
+        return self.space.permutation_data(choice=best_choice)
@@ -9,6 +9,15 @@ class SimulFitnessRule(Protocol):
     def calculate(self,equipment_data:EquipmentPermutationData) -> int:
         pass
 
+class LinearSimulFitnessRule(SimulFitnessRule, Protocol):
+    """
+    A rule whose result is a weighted sum of equipment features.
+    `linear_weights` maps feature names of `simul_vector_fitness.FEATURE_NAMES` to their weight,
+    which lets `VectorizedFitnessEvaluator` score whole populations at once.
+    """
+    def linear_weights(self) -> dict[str,float]:
+        pass
+
 
 class SimulResultFitness:
     def __init__(self, percent_coefficient=0.0):
@@ -73,14 +82,19 @@ class SimulResultFitness:
 
 class SimulFitnessRuleSet():
     
-    def __init__(self , fitness_rule_list : list[SimulFitnessRule]|None):
-        
+    def __init__(self , fitness_rule_list : list[SimulFitnessRule]|None, percent_coefficient : float = 0.0):
+        """
+        Args:
+            percent_coefficient: The `SimulResultFitness.percent_coefficient` of the results of the rule set.
+                Only 0 compares the results lexicographically.
+        """
         self.fitness_rule_list = fitness_rule_list
         if fitness_rule_list is None:
             self.fitness_rule_list = []
+        self.percent_coefficient = percent_coefficient
     def generate_empty_result(self) -> SimulResultFitness:
         
-        result_fitness = SimulResultFitness()
+        result_fitness = SimulResultFitness(percent_coefficient = self.percent_coefficient)
         
         for _ in self.fitness_rule_list:
             
@@ -95,7 +109,7 @@ class SimulFitnessRuleSet():
         )
     def get_fitness_result(self,equipment_data : EquipmentPermutationData ) -> SimulResultFitness:
         
-        result = SimulResultFitness()
+        result = SimulResultFitness(percent_coefficient = self.percent_coefficient)
         
         for rule in self.fitness_rule_list:
             
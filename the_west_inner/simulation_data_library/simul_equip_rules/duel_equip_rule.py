@@ -24,5 +24,14 @@ class AimShootAttackSimulRule:
             )
         
         return value
+    def linear_weights(self) -> dict[str,float]:
+        
+        return {
+            'aim' : AIM_ATTACK_VALUE_DICT.get('aim'),
+            'shot' : AIM_ATTACK_VALUE_DICT.get('shot'),
+            'dodge' : AIM_ATTACK_VALUE_DICT.get('dodge'),
+            'appearance' : AIM_ATTACK_VALUE_DICT.get('aspect'),
+            'health' : AIM_ATTACK_VALUE_DICT.get('hp')
+        }
         
         
\ No newline at end of file
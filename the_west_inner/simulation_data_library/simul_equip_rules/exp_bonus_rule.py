@@ -8,4 +8,7 @@ class ExpSimulRule:
         pass
     def calculate(self, equipment_data : EquipmentPermutationData) -> int:
         
-        return equipment_data.exp_bonus
\ No newline at end of file
+        return equipment_data.exp_bonus
+    def linear_weights(self) -> dict[str,float]:
+        
+        return {'exp_bonus' : 1}
\ No newline at end of file
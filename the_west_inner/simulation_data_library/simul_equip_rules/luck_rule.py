@@ -8,6 +8,9 @@ class LuckSimulRule:
     def calculate(self, equipment_data : EquipmentPermutationData) -> int:
         
         return equipment_data.item_drop
+    def linear_weights(self) -> dict[str,float]:
+        
+        return {'item_drop' : 1}
 
 class ProductDropSimulRule :
     
@@ -16,4 +19,8 @@ class ProductDropSimulRule :
     
     def calculate(self , equipment_data : EquipmentPermutationData) -> int:
         
-        return equipment_data.product_drop
\ No newline at end of file
+        return equipment_data.product_drop
+    
+    def linear_weights(self) -> dict[str,float]:
+        
+        return {'product_drop' : 1}
\ No newline at end of file
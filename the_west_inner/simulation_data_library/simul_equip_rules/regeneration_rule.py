@@ -7,4 +7,7 @@ class RegenerationSimulRule:
         pass
     def calculate(self, equipment_data : EquipmentPermutationData) -> int:
         
-        return equipment_data.regeneration
\ No newline at end of file
+        return equipment_data.regeneration
+    def linear_weights(self) -> dict[str,float]:
+        
+        return {'regeneration' : 1}
\ No newline at end of file
@@ -1,5 +1,6 @@
 from the_west_inner.skills import CharacterSkillsEnum
 from the_west_inner.simulation_data_library.calc_maxim import EquipmentPermutationData
+from the_west_inner.simulation_data_library.simul_vector_fitness import effective_skill_weights
 
 class TotalSkillPointsRule:
             
@@ -9,4 +10,9 @@ class TotalSkillPointsRule:
         
         return sum(
             (equipment_skills[x]  for x in skill_names)
+        )
+    def linear_weights(self) -> dict[str,float]:
+        
+        return effective_skill_weights(
+            {x : 1 for x in CharacterSkillsEnum.get_all_skills()}
         )
\ No newline at end of file
@@ -6,4 +6,14 @@ class WeaponDamageSimulRule:
         pass
     def calculate(self, equipment_data : EquipmentPermutationData) -> int:
         
-        return equipment_data.weapon_damage.average()
\ No newline at end of file
+        return equipment_data.weapon_damage.average()
+    def upper_bound_weights(self) -> dict[str,float]:
+        """
+        The average weapon damage, which the truncated average never exceeds.
+        The damage bonus only counts with a weapon equipped, so this bound relies on damage bonuses not being negative.
+        """
+        return {
+            'weapon_min_damage' : 0.5,
+            'weapon_max_damage' : 0.5,
+            'damage' : 1
+        }
\ No newline at end of file
@@ -2,6 +2,7 @@ from the_west_inner.work_list import Work_list
 
 from the_west_inner.skills import CharacterSkillsEnum
 from the_west_inner.simulation_data_library.calc_maxim import EquipmentPermutationData
+from the_west_inner.simulation_data_library.simul_vector_fitness import effective_skill_weights
 
 class WorkSkillDictSimulRule:
     
@@ -19,6 +20,12 @@ class WorkSkillDictSimulRule:
             total_skill_numbers  += respective_equipment_skills * skill_number
         
         return total_skill_numbers + equipment_data.workpoints
+    
+    def linear_weights(self) -> dict[str,float]:
+        
+        weights = effective_skill_weights(self.skill_dict)
+        weights['workpoints'] = weights.get('workpoints', 0) + 1
+        return weights
 
 class WorkSkillPointsRule:
     def __init__(self , work_id : int , work_job_data : Work_list):
@@ -36,4 +43,10 @@ class WorkSkillPointsRule:
             respective_equipment_skills = equipment_skills[skill]
             total_skill_numbers  += respective_equipment_skills * skill_number
         
-        return total_skill_numbers
\ No newline at end of file
+        return total_skill_numbers
+    
+    def linear_weights(self) -> dict[str,float]:
+        
+        return effective_skill_weights(
+            self.work_job_data.get_work_skill_dict( work_id= self.work_id)
+        )
\ No newline at end of file
@@ -1,5 +1,6 @@
 import copy
 
+import numpy as np
 
 from simul_items import (Item,
                          Animal,
@@ -16,16 +17,28 @@ from simul_items import (Item,
                          create_item_list_from_model,
                          Item_model_list,
                          create_item_list_from_model,
-                         Weapon_damage_range
+                         Item_list,
+                         Weapon_damage_range,
+                         EQUIPMENT_SLOTS
                          )
-from simul_sets import Item_set,create_set_instance_list,Item_set_list
+from simul_sets import Item_set,create_set_instance_list,Item_set_list,Item_set_equipment_list
 from simul_skills import Skills
 from simul_work_relevant_bonuses import Work_bonuses
 from the_west_inner.item_set_general import get_item_sets
 from the_west_inner.simulation_data_library.load_items_script import get_simul_items, get_simul_sets
+from the_west_inner.simulation_data_library.simul_vector_fitness import (FEATURE_COUNT,
+                                                                         FEATURE_INDEX,
+                                                                         apply_weapon_damage,
+                                                                         feature_number,
+                                                                         features_to_status_dict,
+                                                                         item_vector,
+                                                                         set_bonus_vector,
+                                                                         vector_to_skills)
+from the_west_inner.simulation_data_library.simul_leveled_stats import leveled_stats_cache
 
 #from ..equipment import Equipment
 from the_west_inner.equipment import Equipment
+from the_west_inner.simulation_data_library.simul_permutation_data import EquipmentPermutationData
 
 class Equipment_analysis_tool():
     def __init__(self, player_level:int,item_list:list[Item_model],item_set_list:Item_set_list):
@@ -57,15 +70,21 @@ class Equipment_analysis_tool():
             return True
         return False
     def _initialise_analysis_tools(self) -> None:
-        self.analysis_item_tool = create_item_list_from_model(
-                                                        item_model_list= self.item_list ,
-                                                        player_level = self.player_level
-                                                    )
-        self.analysis_set_tool = create_set_instance_list(
-                                                        item_set_list = self.item_set_list,
-                                                        number_set_dict = self.set_list,
-                                                        player_level= self.player_level
-                                                            )
+        # The leveled items and set bonuses come from the shared cache instead of new Item instances
+        self.analysis_item_tool = Item_list(
+                                            items = {x.item_id : {"item" : leveled_stats_cache.item_stats(item_model = x,
+                                                                                                          player_level = self.player_level),
+                                                                  "item_model" : x}
+                                                     for x in self.item_list},
+                                            player_level = self.player_level
+                                            )
+        self.analysis_set_tool = Item_set_equipment_list(
+                                            equipment_item_list = [leveled_stats_cache.set_stats(item_set = self.item_set_list.get(set_key),
+                                                                                                 pieces = item_number,
+                                                                                                 player_level = self.player_level)
+                                                                   for set_key , item_number in self.set_list.items()],
+                                            player_level = self.player_level
+                                            )
     @property
     def item_drop(self):
         if not self._initialised_analysis_tools():
@@ -122,7 +141,16 @@ class Equipment_analysis_tool():
         self.set_list = self.calc_sets()
         self.analysis_item_tool = None
         self.analysis_set_tool = None
+
 class Equipment_simul():
+    """
+    A simulated equipment.
+
+    It keeps running totals of the equipped items (as feature vectors of `simul_vector_fitness`) and of the
+    number of pieces of every set, so changing one slot only subtracts the old item and adds the new one, and
+    `evaluate_swap` previews a change without touching the equipment. The `Equipment_analysis_tool` of the
+    equipment is only built when asked for.
+    """
     def __init__(self,
                  weapon:Weapon,
                  headgear:Headgear,
@@ -149,43 +177,99 @@ class Equipment_simul():
         self.fort_weapon = fort_weapon
         self.animal = animal
         self.produs = produs 
-        self.analysis_tool = Equipment_analysis_tool(
-                                                    player_level = self.player_level,
-                                                    item_list = [self.weapon,
-                                                                      self.headgear,
-                                                                      self.clothes,
-                                                                      self.pants,
-                                                                      self.boots,
-                                                                      self.belt,
-                                                                      self.necklace,
-                                                                      self.fort_weapon,
-                                                                      self.animal,
-                                                                      self.produs],
-                                                    item_set_list = self.item_set_list
-                                                    )
+        self._reset_totals()
+
+    @property
+    def analysis_tool(self) -> Equipment_analysis_tool:
+        return Equipment_analysis_tool(player_level = self.player_level,
+                                       item_list = [getattr(self, slot) for slot in EQUIPMENT_SLOTS],
+                                       item_set_list = self.item_set_list)
+    def _item_vector(self, item : Item_model) -> np.ndarray:
+        return item_vector(item_model = item, player_level = self.player_level)
+    def _set_bonus(self, set_id : str, pieces : int) -> np.ndarray:
+        return set_bonus_vector(item_set = self.item_set_list.get(set_id),
+                                pieces = pieces,
+                                player_level = self.player_level)
+    def _reset_totals(self) -> None:
+        self._item_totals = np.zeros(FEATURE_COUNT, dtype=np.float64)
+        self._set_counts : dict[str,int] = {}
+        self._totals_level = self.player_level
+        for slot in EQUIPMENT_SLOTS:
+            self._add_to_totals(getattr(self, slot), 1)
+    def _add_to_totals(self, item : Item_model, sign : int) -> None:
+        if item is None:
+            return
+        self._item_totals += sign * self._item_vector(item)
+        if item.item_set:
+            self._set_counts[item.item_set] = self._set_counts.get(item.item_set, 0) + sign
+    def _features(self, item_totals : np.ndarray, set_counts : dict[str,int]) -> np.ndarray:
+        features = item_totals.copy()
+        for set_id, pieces in set_counts.items():
+            if pieces > 0:
+                features += self._set_bonus(set_id = set_id, pieces = pieces)
+        return apply_weapon_damage(features)
+    def _current_features(self) -> np.ndarray:
+        if self._totals_level != self.player_level:
+            self._reset_totals()
+        return self._features(item_totals = self._item_totals, set_counts = self._set_counts)
+    def _set_slot(self, slot : str, item : Item_model) -> None:
+        if self._totals_level != self.player_level:
+            self._reset_totals()
+        self._add_to_totals(getattr(self, slot), -1)
+        setattr(self, slot, item)
+        self._add_to_totals(item, 1)
+    def evaluate_swap(self, slot : str, item : Item_model) -> EquipmentPermutationData:
+        """
+        Previews the equipment with `item` (None to unequip) in `slot`, without changing it.
+
+        Returns:
+            EquipmentPermutationData: The status of the previewed equipment, its permutation holding every equipped slot.
+        """
+        if slot not in EQUIPMENT_SLOTS:
+            raise ValueError(f"Unknown equipment slot : {slot}")
+        if item is not None and item.item_type != slot:
+            raise ValueError("The equipment swap is not a valid one! ")
+        if self._totals_level != self.player_level:
+            self._reset_totals()
+        item_totals = self._item_totals.copy()
+        set_counts = dict(self._set_counts)
+        for changed_item, sign in ((getattr(self, slot), -1), (item, 1)):
+            if changed_item is None:
+                continue
+            item_totals += sign * self._item_vector(changed_item)
+            if changed_item.item_set:
+                set_counts[changed_item.item_set] = set_counts.get(changed_item.item_set, 0) + sign
+        permutation = {x : getattr(self, x) for x in EQUIPMENT_SLOTS if getattr(self, x) is not None}
+        permutation[slot] = item
+        if item is None:
+            del permutation[slot]
+        return EquipmentPermutationData(
+            **features_to_status_dict(self._features(item_totals = item_totals, set_counts = set_counts)),
+            permutation = permutation
+        )
 
 
     @property
     def item_drop(self):
-        return self.analysis_tool.item_drop
+        return feature_number(self._current_features()[FEATURE_INDEX['item_drop']])
     @property
     def workpoints(self):
-        return self.analysis_tool.workpoints
+        return feature_number(self._current_features()[FEATURE_INDEX['workpoints']])
     @property
     def product_drop(self):
-        return self.analysis_tool.product_drop
+        return feature_number(self._current_features()[FEATURE_INDEX['product_drop']])
     @property
     def regeneration(self):
-        return self.analysis_tool.regeneration
+        return feature_number(self._current_features()[FEATURE_INDEX['regeneration']])
     @property
     def damage(self):
-        return self.analysis_tool.damage
+        return feature_number(self._current_features()[FEATURE_INDEX['damage']])
     @property
     def speed(self):
-        return self.analysis_tool.speed
+        return feature_number(self._current_features()[FEATURE_INDEX['speed']])
     @property
     def exp_bonus(self):
-        return self.analysis_tool.exp_bonus
+        return feature_number(self._current_features()[FEATURE_INDEX['exp_bonus']])
     @property   
     def weapon_damage(self):
         if self.weapon is None:
@@ -195,7 +279,7 @@ class Equipment_simul():
         return self.weapon.weapon_damage + self.damage
     @property
     def status(self):
-        return self.analysis_tool.status
+        return vector_to_skills(self._current_features())
     def get_by_key(self,key:str) -> Item_model:
         item_dict = {"weapon":self.weapon,
                      "headgear":self.headgear,
@@ -228,26 +312,16 @@ class Equipment_simul():
         if value1 is not None:
             for item_type in item_dict:
                 if isinstance(value1,item_type):
-                    setattr(self, item_dict[item_type],value2)
+                    self._set_slot(item_dict[item_type],value2)
         else:
             for item_type in item_dict:
                 if isinstance(value2,item_type):
-                    setattr(self, item_dict[item_type],value2)
+                    self._set_slot(item_dict[item_type],value2)
     def replace_item(self,replaced_item:Item = None, replacement_item:Item = None) -> None:
         if replaced_item is not None and replacement_item is not None and type(replacement_item) != type(replaced_item):
             raise ValueError("The equipment swap is not a valid one! ")
         
         self._swap_items(value1= replaced_item,value2= replacement_item)
-        self.analysis_tool.update_item_list(new_item_list = [self.weapon,
-                                                                      self.headgear,
-                                                                      self.clothes,
-                                                                      self.pants,
-                                                                      self.boots,
-                                                                      self.belt,
-                                                                      self.necklace,
-                                                                      self.fort_weapon,
-                                                                      self.animal,
-                                                                      self.produs])
     def copy(self):
         return copy.deepcopy(self)
     def pretty_print(self) -> str:
@@ -273,27 +347,10 @@ class Equipment_simul():
         self.fort_weapon = None
         self.animal = None
         self.produs = None
-        self.analysis_tool.update_item_list(new_item_list = [self.weapon,
-                                                                      self.headgear,
-                                                                      self.clothes,
-                                                                      self.pants,
-                                                                      self.boots,
-                                                                      self.belt,
-                                                                      self.necklace,
-                                                                      self.fort_weapon,
-                                                                      self.animal,
-                                                                      self.produs])
+        self._reset_totals()
 
     def create_status_dict(self) -> dict:
-        return {
-            'item_drop' : self.item_drop,
-            'exp_bonus' : self.exp_bonus,
-            'workpoints' : self.workpoints,
-            'weapon_damage' : self.weapon_damage,
-            'product_drop' : self.product_drop,
-            'regeneration' : self.regeneration,
-            'status' : self.status
-        }
+        return features_to_status_dict(self._current_features())
 def create_simul_equipment_by_current_equipment(current_equipment : Equipment,
                                                 player_level : int,
                                                 item_set_list : list[Item_set],
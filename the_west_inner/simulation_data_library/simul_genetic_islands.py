@@ -0,0 +1,345 @@
+"""
+This module contains the island model used by `GeneticAlgorithm` to evolve equipment permutations.
+
+The population is split into islands that evolve independently (in a process pool when more than one
+worker is allowed) and, every `migration_interval` generations, every island sends copies of its best
+individuals to the next island of the ring, where they replace the worst ones.
+
+Individuals are tuples of item indices of a `CompiledEquipmentSpace` and their fitness is the tuple of
+rule results, which compares like a `SimulResultFitness` without a percent coefficient (the only rule sets
+the model accepts). Fitness values are memoised per individual
+in an LRU cache living in each worker process. Each island owns its `random.Random`, whose state
+travels with the island, so a run with a given seed is reproducible whatever the scheduling.
+
+Classes:
+
+    FitnessMemo: LRU cache of fitness tuples.
+    IslandState: The population and random state of one island.
+    GenerationStats: What happened during one generation, handed to the stats callback.
+    IslandModel: Runs the islands.
+"""
+import os
+import random
+import time
+import typing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from the_west_inner.simulation_data_library.simul_vector_fitness import VectorizedFitnessEvaluator
+
+DEFAULT_FITNESS_CACHE_SIZE = 65536
+
+Individual = tuple[int, ...]
+Fitness = tuple[float, ...]
+
+
+class FitnessMemo():
+    """
+    Least recently used cache of individual -> fitness.
+    """
+    def __init__(self, max_size: int = DEFAULT_FITNESS_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: OrderedDict[Individual, Fitness] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, individual: Individual) -> Fitness | None:
+        fitness = self._entries.get(individual)
+        if fitness is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(individual)
+        self.hits += 1
+        return fitness
+
+    def put(self, individual: Individual, fitness: Fitness) -> None:
+        self._entries[individual] = fitness
+        self._entries.move_to_end(individual)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+@dataclass
+class IslandState:
+    index: int
+    population: list[Individual]
+    random_state: tuple
+    best_individual: Individual | None = None
+    best_fitness: Fitness | None = None
+    final_fitnesses: list[Fitness] = field(default_factory=list)
+    generation_bests: list[Fitness] = field(default_factory=list)
+    generation_means: list[float] = field(default_factory=list)
+    cache_hits: int = 0
+    cache_misses: int = 0
+
+
+@dataclass
+class GenerationStats:
+    """
+    The fitness memo counters are cumulative over the run and are updated at every migration.
+    """
+    generation: int
+    best_fitness: Fitness
+    island_best_fitnesses: list[Fitness]
+    mean_primary_fitness: float
+    cache_hits: int
+    cache_misses: int
+    elapsed_time: float
+
+    @property
+    def cache_hit_rate(self) -> float:
+        lookups = self.cache_hits + self.cache_misses
+        return self.cache_hits / lookups if lookups else 0.0
+
+
+# State of the current process (a pool worker, or the main process when running in process)
+_worker_evaluator: VectorizedFitnessEvaluator | None = None
+_worker_memo: FitnessMemo | None = None
+
+
+def _init_worker(evaluator: VectorizedFitnessEvaluator, fitness_cache_size: int) -> None:
+    global _worker_evaluator, _worker_memo
+    _worker_evaluator = evaluator
+    _worker_memo = FitnessMemo(max_size=fitness_cache_size)
+
+
+def _population_fitness(population: list[Individual]) -> list[Fitness]:
+    fitnesses: list[Fitness | None] = [_worker_memo.get(individual) for individual in population]
+    missing = list(dict.fromkeys(individual for individual, fitness in zip(population, fitnesses) if fitness is None))
+    if missing:
+        results = _worker_evaluator.evaluate(np.array(missing, dtype=np.int64))
+        computed = {individual: tuple(float(x) for x in row) for individual, row in zip(missing, results)}
+        for individual, fitness in computed.items():
+            _worker_memo.put(individual, fitness)
+        fitnesses = [computed[individual] if fitness is None else fitness for individual, fitness in zip(population, fitnesses)]
+    return fitnesses
+
+
+def _select(rng: random.Random, population: list[Individual], fitnesses: list[Fitness]) -> list[Individual]:
+    selected = []
+    for _ in range(len(population)):
+        index1, index2 = rng.sample(range(len(population)), 2)
+        selected.append(population[index1] if fitnesses[index1] > fitnesses[index2] else population[index2])
+    return selected
+
+
+def _crossover(rng: random.Random, parent1: Individual, parent2: Individual) -> Individual:
+    return tuple(rng.choice((gene1, gene2)) for gene1, gene2 in zip(parent1, parent2))
+
+
+def _mutate(rng: random.Random, individual: Individual, slot_sizes: list[int], mutation_rate: float) -> Individual:
+    if rng.random() < mutation_rate:
+        slot = rng.randrange(len(individual))
+        individual = individual[:slot] + (rng.randrange(slot_sizes[slot]),) + individual[slot + 1:]
+    return individual
+
+
+def _evolve_island(island: IslandState, generations: int, mutation_rate: float) -> IslandState:
+    """
+    Evolves one island for `generations` generations. Runs inside a pool worker.
+    """
+    rng = random.Random()
+    rng.setstate(island.random_state)
+    slot_sizes = _worker_evaluator.space.slot_sizes
+    hits, misses = _worker_memo.hits, _worker_memo.misses
+    population = island.population
+    fitnesses = _population_fitness(population)
+    island.generation_bests = []
+    island.generation_means = []
+
+    for _ in range(generations):
+        population = _select(rng, population, fitnesses)
+        next_population = []
+        for index in range(0, len(population), 2):
+            parent1 = population[index]
+            parent2 = population[(index + 1) % len(population)]
+            next_population.append(_mutate(rng, _crossover(rng, parent1, parent2), slot_sizes, mutation_rate))
+            next_population.append(_mutate(rng, _crossover(rng, parent1, parent2), slot_sizes, mutation_rate))
+        population = next_population
+        # Evaluated once : the same fitnesses serve the best individual scan and the next selection
+        fitnesses = _population_fitness(population)
+        for individual, fitness in zip(population, fitnesses):
+            if island.best_fitness is None or fitness > island.best_fitness:
+                island.best_fitness = fitness
+                island.best_individual = individual
+        island.generation_bests.append(island.best_fitness)
+        island.generation_means.append(float(np.mean([fitness[0] for fitness in fitnesses])) if fitnesses and fitnesses[0] else 0.0)
+
+    island.population = population
+    island.final_fitnesses = fitnesses
+    island.random_state = rng.getstate()
+    island.cache_hits = _worker_memo.hits - hits
+    island.cache_misses = _worker_memo.misses - misses
+    return island
+
+
+class IslandModel():
+    """
+    Evolves `islands` sub-populations of `VectorizedFitnessEvaluator.space` permutations.
+
+    Attributes:
+        evaluator (VectorizedFitnessEvaluator): Scores the individuals.
+        population_size (int): Total number of individuals, shared between the islands.
+        generations (int): Maximum number of generations.
+        mutation_rate (float): Probability of a child getting one random slot changed.
+        islands (int): Number of sub-populations.
+        migration_interval (int): Generations between two migrations.
+        migration_size (int): Individuals sent by every island at each migration.
+        max_workers (int | None): Size of the process pool. 1 runs everything in the current process,
+            None uses one process per island, up to the number of CPUs.
+        seed (int | None): Seed of the run; None gives a different run every time.
+        stagnation_generations (int | None): Stop once the best fitness didn't improve for this many
+            generations (checked at every migration). None always runs `generations` generations.
+        stats_callback (Callable[[GenerationStats], None] | None): Called once per generation, in order.
+        fitness_cache_size (int): Size of the fitness memo of every worker.
+    """
+    def __init__(self,
+                 evaluator: VectorizedFitnessEvaluator,
+                 population_size: int,
+                 generations: int,
+                 mutation_rate: float,
+                 islands: int = 1,
+                 migration_interval: int = 10,
+                 migration_size: int = 2,
+                 max_workers: int | None = None,
+                 seed: int | None = None,
+                 stagnation_generations: int | None = None,
+                 stats_callback: typing.Callable[[GenerationStats], None] | None = None,
+                 fitness_cache_size: int = DEFAULT_FITNESS_CACHE_SIZE):
+        if islands < 1:
+            raise ValueError(f"islands must be at least 1, got {islands}")
+        if migration_interval < 1:
+            raise ValueError(f"migration_interval must be at least 1, got {migration_interval}")
+        if not evaluator.lexicographic:
+            raise ValueError("The fitness tuples compare lexicographically, the rule set can't have a percent coefficient, "
+                             f"got {evaluator.fitness_rule_set.percent_coefficient}")
+        self.evaluator = evaluator
+        self.population_size = population_size
+        self.generations = generations
+        self.mutation_rate = mutation_rate
+        self.islands = islands
+        self.migration_interval = migration_interval
+        self.migration_size = migration_size
+        self.max_workers = max_workers
+        self.seed = seed
+        self.stagnation_generations = stagnation_generations
+        self.stats_callback = stats_callback
+        self.fitness_cache_size = fitness_cache_size
+        self.history: list[GenerationStats] = []
+        self.best_individual: Individual | None = None
+        self.best_fitness: Fitness | None = None
+        self.generations_run = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def _initial_islands(self) -> list[IslandState]:
+        master_rng = random.Random(self.seed)
+        island_size = max(2, self.population_size // self.islands)
+        slot_sizes = self.evaluator.space.slot_sizes
+        islands = []
+        for index in range(self.islands):
+            rng = random.Random(master_rng.getrandbits(64))
+            population = [tuple(rng.randrange(size) for size in slot_sizes) for _ in range(island_size)]
+            islands.append(IslandState(index=index, population=population, random_state=rng.getstate()))
+        return islands
+
+    def _migrate(self, islands: list[IslandState]) -> None:
+        if len(islands) < 2 or self.migration_size < 1:
+            return
+        emigrants = []
+        for island in islands:
+            ranked = sorted(range(len(island.population)), key=lambda index: island.final_fitnesses[index], reverse=True)
+            emigrants.append([(island.population[index], island.final_fitnesses[index]) for index in ranked[:self.migration_size]])
+        for index, island in enumerate(islands):
+            incoming = emigrants[index - 1]
+            worst_first = sorted(range(len(island.population)), key=lambda position: island.final_fitnesses[position])
+            for position, (individual, fitness) in zip(worst_first, incoming):
+                island.population[position] = individual
+                island.final_fitnesses[position] = fitness
+
+    def _record_epoch(self, islands: list[IslandState], generations: int, start_time: float) -> int:
+        """
+        Publishes the stats of an epoch and updates the best individual.
+        Returns the number of generations since the last improvement at the end of the epoch.
+        """
+        for island in islands:
+            if island.best_fitness is not None and (self.best_fitness is None or island.best_fitness > self.best_fitness):
+                self.best_fitness = island.best_fitness
+                self.best_individual = island.best_individual
+        self.cache_hits += sum(island.cache_hits for island in islands)
+        self.cache_misses += sum(island.cache_misses for island in islands)
+        for offset in range(generations):
+            island_bests = [island.generation_bests[offset] for island in islands]
+            stats = GenerationStats(
+                generation=self.generations_run + offset + 1,
+                best_fitness=max(island_bests),
+                island_best_fitnesses=island_bests,
+                mean_primary_fitness=float(np.mean([island.generation_means[offset] for island in islands])),
+                cache_hits=self.cache_hits,
+                cache_misses=self.cache_misses,
+                elapsed_time=time.perf_counter() - start_time
+            )
+            self.history.append(stats)
+            if self.stats_callback is not None:
+                self.stats_callback(stats)
+        self.generations_run += generations
+
+        stagnant = 0
+        for stats in reversed(self.history):
+            if stats.best_fitness < self.best_fitness:
+                break
+            stagnant += 1
+        # The generation that reached the best does not count as stagnant
+        return stagnant - 1
+
+    def run(self) -> tuple[Individual | None, Fitness | None]:
+        """
+        Evolves the islands.
+
+        Returns:
+            tuple[Individual | None, Fitness | None]: The best individual ever seen and its fitness.
+        """
+        self.history = []
+        self.best_individual = None
+        self.best_fitness = None
+        self.generations_run = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        start_time = time.perf_counter()
+        islands = self._initial_islands()
+
+        max_workers = self.max_workers
+        if max_workers is None:
+            max_workers = min(self.islands, os.cpu_count() or 1)
+        executor = None
+        if max_workers > 1:
+            executor = ProcessPoolExecutor(max_workers=max_workers,
+                                           initializer=_init_worker,
+                                           initargs=(self.evaluator, self.fitness_cache_size))
+        else:
+            _init_worker(self.evaluator, self.fitness_cache_size)
+
+        try:
+            while self.generations_run < self.generations:
+                epoch_generations = min(self.migration_interval, self.generations - self.generations_run)
+                if executor is None:
+                    islands = [_evolve_island(island, epoch_generations, self.mutation_rate) for island in islands]
+                else:
+                    islands = list(executor.map(_evolve_island,
+                                                islands,
+                                                [epoch_generations] * len(islands),
+                                                [self.mutation_rate] * len(islands)))
+                stagnant_generations = self._record_epoch(islands, epoch_generations, start_time)
+                if self.stagnation_generations is not None and stagnant_generations >= self.stagnation_generations:
+                    break
+                self._migrate(islands)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        return self.best_individual, self.best_fitness
@@ -3,6 +3,9 @@ import typing
 
 from simul_skills import Skills
 
+# The equipment slots, in the order every equipment search lays them out
+EQUIPMENT_SLOTS = ('weapon','headgear','clothes','pants','boots','belt','necklace','fort_weapon','animal','produs')
+
 class Item_update_table():
     """A class to store the update information for an item.
 
@@ -742,8 +745,10 @@ class Item_model_list():
         raise Exception(f"Item model id not found {item_id} in {[x.item_id for x in self.item_model_list]}")
     def get_item_dict(self) -> dict[str, Item_model]:
         item_dict = {}
-        # Create a set of unique item types
-        item_types = set(item_model.item_type for item_model in self.item_model_list)
+        # The item types in EQUIPMENT_SLOTS order (other types after them, by name) : iterating a set would make
+        # the order depend on the string hash seed of the process
+        item_types = sorted(set(item_model.item_type for item_model in self.item_model_list),
+                            key=lambda item_type: (EQUIPMENT_SLOTS.index(item_type) if item_type in EQUIPMENT_SLOTS else len(EQUIPMENT_SLOTS), item_type))
         
         # Iterate over each item type and filter the item_model_list for that type
         for item_type in item_types:
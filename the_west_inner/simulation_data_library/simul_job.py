@@ -1,13 +1,14 @@
 from dataclasses import dataclass
 import typing
-import js2py
 import math
 import random
 from functools import partial
 from collections import defaultdict
 
+import numpy as np
 
 from simul_work_relevant_bonuses import Work_bonuses
+from the_west_inner.simulation_data_library.simul_job_formulas import hourly_rates
 from ..items import Items
 
 
@@ -37,10 +38,55 @@ class Job_reward_data:
                                 damage_taken = self.damage_taken + other.damage_taken,
                                 oup = self.oup + other.oup
                             )
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+
+@dataclass
+class Distribution_summary:
+    '''
+    This class reprezents the distribution of a simulated quantity over many jobs.
+    '''
+    mean : float
+    std : float
+    minimum : float
+    maximum : float
+    percentiles : dict[float,float]
+    total : float
+    @staticmethod
+    def from_samples(samples:np.ndarray,percentiles:typing.Sequence[float] = DEFAULT_PERCENTILES) -> typing.Self:
+        samples = np.asarray(samples, dtype=np.float64)
+        if samples.size == 0:
+            return Distribution_summary(mean = 0.0, std = 0.0, minimum = 0.0, maximum = 0.0,
+                                        percentiles = {x : 0.0 for x in percentiles}, total = 0.0)
+        return Distribution_summary(
+                                mean = float(samples.mean()),
+                                std = float(samples.std()),
+                                minimum = float(samples.min()),
+                                maximum = float(samples.max()),
+                                percentiles = dict(zip(percentiles, (float(x) for x in np.percentile(samples, percentiles)))),
+                                total = float(samples.sum())
+                                )
+
+@dataclass
+class Job_simulation_summary:
+    '''
+    This class reprezents the rewards of many simulated jobs : the distribution of the wage, the experience, the
+    number and value of the dropped items and of every dropped product, per job, and the expected number of
+    every item dropped per job. The wage and the experience don't vary between jobs : their distributions hold a
+    single value.
+    '''
+    job_id : int
+    job_count : int
+    wage : Distribution_summary
+    exp : Distribution_summary
+    items_dropped : Distribution_summary
+    item_value : Distribution_summary
+    item_drop_rates : dict[int,float]
+    products_dropped : dict[int,Distribution_summary]
+
 class Item_drop_calculator():
     @staticmethod
     def calculate_number_of_items_dropped(player_luck_coeficient:int) -> int:
-        number_of_item_dropped = player_luck_coeficient // 100
+        number_of_item_dropped = int(player_luck_coeficient // 100)
         chance = random.randint(0, 100)
     
         if chance < player_luck_coeficient % 100 :
@@ -50,7 +96,7 @@ class Item_drop_calculator():
     @staticmethod
     def get_item_drop_dict(player_luck_coeficient:int,drop_range:tuple[int,int],items:Items) -> dict[int, int]:
         number_of_items = Item_drop_calculator.calculate_number_of_items_dropped(player_luck_coeficient = player_luck_coeficient)
-        droppable_items = [x for x in items.get_droppable_items() if drop_range[0] <= x['price'] <= drop_range[1]]
+        droppable_items = items.get_droppable_items_in_price_range(min_price = drop_range[0], max_price = drop_range[1])
         return_dict = defaultdict(int)
     
         for _ in range(number_of_items):
@@ -60,8 +106,33 @@ class Item_drop_calculator():
     
         return dict(return_dict)
     @staticmethod
+    def sample_number_of_items_dropped(player_luck_coeficient:float,job_count:int,rng:np.random.Generator) -> np.ndarray:
+        """
+        Draws, for `job_count` jobs at once, the number of items dropped (same rule as calculate_number_of_items_dropped).
+        """
+        chances = rng.integers(0, 101, size = job_count)
+        return int(player_luck_coeficient // 100) + (chances < player_luck_coeficient % 100)
+    @staticmethod
+    def sample_item_drops(number_of_items:np.ndarray,drop_range:tuple[int,int],items:Items,rng:np.random.Generator) -> tuple[np.ndarray,np.ndarray]:
+        """
+        Draws the dropped items of many jobs at once, uniformly among the droppable items priced in `drop_range`.
+
+        Args:
+            number_of_items (np.ndarray): The number of items dropped by every job.
+
+        Returns:
+            tuple[np.ndarray,np.ndarray]: The index of every dropped item in `items.droppable_items_by_price`
+                and the index of the job that dropped it. Nothing drops when no item is in the price range.
+        """
+        start, end = items.droppable_price_range_bounds(min_price = drop_range[0], max_price = drop_range[1])
+        if end <= start:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        item_indices = rng.integers(start, end, size = int(number_of_items.sum()))
+        job_indices = np.repeat(np.arange(len(number_of_items)), number_of_items)
+        return item_indices, job_indices
+    @staticmethod
     def calculate_item_drop_coeficient(job_duration:typing.Literal[15,600,3600],player_drop:int,job_is_silver:bool) ->int:
-        base_chance = {1:0.03,600:0.09,3600:0.27}[job_duration]
+        base_chance = {15:0.03,600:0.09,3600:0.27}[job_duration]
         if job_is_silver:
                 base_chance = base_chance * 1.5
         return base_chance * player_drop * 100
@@ -89,7 +160,7 @@ class Job_reward_stats():
                                 danger = self.danger ,
                                 product_rate = {
                                                 product_id: math.ceil( indiv_prod_rate / TIME_CONSTANT_DICT[time]) 
-                                                                    for product_id,indiv_prod_rate in self.product_rate} ,
+                                                                    for product_id,indiv_prod_rate in self.product_rate.items()} ,
                                 job_id = self.job_id,
                                 is_silver = self.is_silver
                                 )
@@ -115,10 +186,78 @@ class Job_reward_stats():
                                                             ),
                                 product_dropped = {
                                                 product_id:player_product_drop_coeficient_funct(player_drop = base_rate)
-                                                                for product_id,base_rate in self.product_rate} ,
+                                                                for product_id,base_rate in self.product_rate.items()} ,
                                 damage_taken = 0 ,
                                 oup = 0
                                 )
+    def simulate_jobs(self,
+                      time:typing.Literal[15,600,3600],
+                      items:Items,
+                      player_data: Work_bonuses,
+                      job_count:int,
+                      rng:np.random.Generator | None = None,
+                      percentiles:typing.Sequence[float] = DEFAULT_PERCENTILES) -> Job_simulation_summary:
+        """
+        Simulates `job_count` jobs at once and summarises the distribution of their rewards.
+
+        Every job drops items like `simulate_job` (each product is dropped the same way, with its product
+        drop coefficient), the value of the dropped items being their catalogue price. The number and value of
+        the dropped items are sampled; the wage and the experience are deterministic, the same for every job as
+        in `simulate_job`, so their summaries have a zero spread.
+
+        Args:
+            rng (np.random.Generator | None): The random generator, a new unseeded one when None.
+            percentiles (Sequence[float]): The percentiles of the distribution summaries.
+        """
+        rng = np.random.default_rng() if rng is None else rng
+        normalized = self._normalize_by_time(time=time)
+        player_luck_coeficient = Item_drop_calculator.calculate_item_drop_coeficient(
+                                                                                    job_duration = time,
+                                                                                    player_drop = player_data.item_drop ,
+                                                                                    job_is_silver = normalized.is_silver
+                                                                                    )
+        number_of_items = Item_drop_calculator.sample_number_of_items_dropped(player_luck_coeficient = player_luck_coeficient,
+                                                                              job_count = job_count,
+                                                                              rng = rng)
+        item_indices, job_indices = Item_drop_calculator.sample_item_drops(number_of_items = number_of_items,
+                                                                           drop_range = (normalized.inferior_luck,normalized.superior_luck),
+                                                                           items = items,
+                                                                           rng = rng)
+        item_values = np.bincount(job_indices,
+                                  weights = items.droppable_price_array[item_indices],
+                                  minlength = job_count)
+        droppable_items = items.droppable_items_by_price
+        dropped_counts = np.bincount(item_indices) if len(item_indices) else np.zeros(0, dtype=np.int64)
+        item_drop_rates = defaultdict(float)
+        for index in np.flatnonzero(dropped_counts):
+            item_drop_rates[droppable_items[index]['item_id']] += dropped_counts[index] / job_count
+
+        products_dropped = {}
+        for product_id, base_rate in normalized.product_rate.items():
+            product_coeficient = Item_drop_calculator.calculate_item_drop_coeficient(job_duration = 15,
+                                                                                     player_drop = base_rate,
+                                                                                     job_is_silver = normalized.is_silver)
+            products_dropped[product_id] = Distribution_summary.from_samples(
+                Item_drop_calculator.sample_number_of_items_dropped(player_luck_coeficient = product_coeficient,
+                                                                    job_count = job_count,
+                                                                    rng = rng),
+                percentiles = percentiles)
+
+        return Job_simulation_summary(
+                                job_id = self.job_id,
+                                job_count = job_count,
+                                wage = Distribution_summary.from_samples(np.full(job_count, normalized.wage), percentiles = percentiles),
+                                exp = Distribution_summary.from_samples(np.full(job_count, normalized.exp), percentiles = percentiles),
+                                items_dropped = Distribution_summary.from_samples(number_of_items, percentiles = percentiles),
+                                item_value = Distribution_summary.from_samples(item_values, percentiles = percentiles),
+                                item_drop_rates = dict(item_drop_rates),
+                                products_dropped = products_dropped
+                                )
+def _reward_number(value) -> int | float:
+    value = float(value)
+    # Negative work points give NaN rewards, as in the game client
+    return value if math.isnan(value) else int(value)
+
 @dataclass
 class Job_raw_data():
     '''
@@ -131,57 +270,28 @@ class Job_raw_data():
     danger : int
     job_id : int
     work_points : int
-    product_rate : int
+    product_rate : dict[int,int]
     requirements : int
     is_silver : bool
     
     def get_hourly_rate(self) -> Job_reward_stats:
-        functext = f"""
-        function calc(r1, r2, formula, points, malus, magic, mot, factor, freezeBronze) {{
-		var step = Math.ceil((malus+1)/5), stars = Math.min(Math.floor(points/step), 15), dmot = Math.ceil(mot/25)*0.25;
-		return points < 5*step || points <= malus
-				? Math[r1](({{0:1,1:2,2:3,3:4,4:5,5:6.25}})[freezeBronze ? 0 : stars] * magic * dmot * factor)
-				: Math[r2](formula(points - malus, stars) * magic * dmot * factor)
-	    }};
-        function calcWage(pts, mal, magic, mot, fac){{
-		return calc('ceil', 'round', function(lp){{ return 6.25*Math.pow(lp, 0.05) }}, pts, mal, magic, mot, fac);
-	    }};
-	    function calcExp(pts, mal, magic, mot, fac){{
-		return calc('ceil', 'ceil', function(lp){{ return 6.25 }}, pts, mal, magic, mot, fac);
-	    }};
-	    function calcLuck(pts, mal, magic, mot, fac){{
-		return calc('floor', 'floor', function(lp){{ return 6.25*Math.pow(lp, 0.2) }}, pts, mal, (0.9*magic + 5)/1.25, 100, fac);
-	    }};
-	    function calcProductRate(pts, mal, magic, mot, fac){{
-		return calc('round', 'round', function(lp, stars){{ return stars < 15 ? 6.25 : 9.375 }}, pts, mal, magic, 100, fac);
-	    }};
-	    function calcDanger(pts, mal, magic, mot, fac){{
-		return calc('round', 'round', function(lp){{ return Math.pow(lp, -0.2) }}, pts, mal, magic, 100, fac, true);
-	    }};
-        mot = Math.min(Math.max({self.motivation} || 0, 0), 100);
-		var sp = {self.work_points};
-        function() {{ 
-            wage = calcWage(sp, {self.requirements}, {self.dollar}, mot, 1)
-            exp = calcExp(sp, {self.requirements}, {self.experience}, mot, 1)
-            luck_inferior  = calcLuck(sp, {self.requirements}, {self.luck}, mot, 1)
-            luck_superior  = calcLuck(sp, {self.requirements}, {self.luck}, mot, 3)
-            danger = calcDanger(sp, {self.requirements}, {self.danger}, mot, 1)
-            product_rate = {{}};
-            var temp = {self.product_rate};
-            for (var elem in temp) {{
-                product_rate[elem] = calcProductRate(sp, {self.requirements}, temp[elem], mot, 1)
-            }}
-        return {{"wage":wage,"exp":exp,"luck_inferior":luck_inferior,"luck_superior":luck_superior,"danger":danger,"product_rate":product_rate}}
-        }} """
-        res1 = js2py.eval_js(functext)
-        job_data_dict  = res1()
+        rates = hourly_rates(
+                            work_points = self.work_points,
+                            malus = self.requirements,
+                            motivation = self.motivation,
+                            dollar = self.dollar,
+                            experience = self.experience,
+                            luck = self.luck,
+                            danger = self.danger,
+                            product_rate = self.product_rate
+                            )
         return Job_reward_stats(
-                                wage = job_data_dict['wage'],
-                                exp = job_data_dict['exp'] ,
-                                inferior_luck = job_data_dict['luck_inferior'],
-                                superior_luck = job_data_dict['luck_superior'],
-                                danger = job_data_dict['danger'],
-                                product_rate = job_data_dict['product_rate'],
+                                wage = _reward_number(rates['wage']),
+                                exp = _reward_number(rates['exp']) ,
+                                inferior_luck = _reward_number(rates['luck_inferior']),
+                                superior_luck = _reward_number(rates['luck_superior']),
+                                danger = _reward_number(rates['danger']),
+                                product_rate = {product_id : _reward_number(rate) for product_id , rate in rates['product_rate'].items()},
                                 job_id = self.job_id,
                                 is_silver = self.is_silver
                                 )
@@ -193,3 +303,9 @@ class Job_rewards_simulator():
         self.player_data = player_data
     def simulate_job(self,time:typing.Literal[15,600,3600]):
         return self.job_raw_data.get_hourly_rate().simulate_job(time = time,items=self.items,player_data=self.player_data)
+    def simulate_jobs(self,time:typing.Literal[15,600,3600],job_count:int,rng:np.random.Generator | None = None) -> Job_simulation_summary:
+        return self.job_raw_data.get_hourly_rate().simulate_jobs(time = time,
+                                                                 items = self.items,
+                                                                 player_data = self.player_data,
+                                                                 job_count = job_count,
+                                                                 rng = rng)
@@ -0,0 +1,147 @@
+"""
+This module contains the job reward formulas of the game client, ported to NumPy.
+
+Every function takes the work points, the job malus, the magic number of the reward and the motivation
+as scalars or arrays (broadcast together) and returns the rounded reward, so a whole grid of jobs or
+of skill levels is computed in one call.
+
+The rounding follows JavaScript : `Math.round` rounds halves up, unlike Python's `round`.
+
+Functions:
+
+    calc: The reward formula every job reward is built on.
+    calc_wage, calc_exp, calc_luck, calc_product_rate, calc_danger: The job rewards.
+    hourly_rates: Every reward of one or more jobs.
+"""
+import typing
+
+import numpy as np
+
+ArrayLike = typing.Union[int, float, np.ndarray, typing.Sequence[float]]
+
+# Multiplier of a job done with fewer work points than needed for bronze, by number of stars
+LOW_STARS_MULTIPLIER = np.array([1, 2, 3, 4, 5, 6.25], dtype=np.float64)
+MAX_STARS = 15
+
+
+def js_round(values: np.ndarray) -> np.ndarray:
+    """
+    JavaScript `Math.round` : the closest integer, halves rounded up.
+    """
+    floor = np.floor(values)
+    return floor + (values - floor >= 0.5)
+
+
+ROUNDING_FUNCTIONS : dict[str, typing.Callable[[np.ndarray], np.ndarray]] = {
+    'ceil': np.ceil,
+    'floor': np.floor,
+    'round': js_round
+}
+
+
+def clamp_motivation(motivation: ArrayLike) -> np.ndarray:
+    """
+    The motivation bounded to [0, 100], missing (NaN) values counting as 0.
+    """
+    return np.clip(np.nan_to_num(np.asarray(motivation, dtype=np.float64), nan=0.0), 0, 100)
+
+
+def calc(low_rounding: str,
+         high_rounding: str,
+         formula: typing.Callable[[np.ndarray, np.ndarray], np.ndarray],
+         points: ArrayLike,
+         malus: ArrayLike,
+         magic: ArrayLike,
+         motivation: ArrayLike,
+         factor: ArrayLike = 1,
+         freeze_bronze: bool = False) -> np.ndarray:
+    """
+    Computes a job reward.
+
+    Below bronze (fewer than 5 steps of work points, or not more points than the malus) the reward only
+    depends on the number of stars; above it `formula(points - malus, stars)` gives the multiplier.
+
+    Args:
+        low_rounding (str): 'ceil', 'floor' or 'round', used below bronze.
+        high_rounding (str): The rounding used above bronze.
+        formula (Callable[[np.ndarray, np.ndarray], np.ndarray]): The multiplier of the extra points and stars.
+        points, malus, magic, motivation, factor: The inputs, broadcast together.
+        freeze_bronze (bool): Use the no star multiplier below bronze, whatever the stars.
+
+    Returns:
+        np.ndarray: The rewards, as floats holding integers (NaN for negative work points, as in the client).
+    """
+    points, malus, magic, motivation, factor = np.broadcast_arrays(*(np.asarray(x, dtype=np.float64)
+                                                                     for x in (points, malus, magic, motivation, factor)))
+    step = np.ceil((malus + 1) / 5)
+    stars = np.minimum(np.floor(points / step), MAX_STARS)
+    motivation_multiplier = np.ceil(motivation / 25) * 0.25
+
+    low = points < 5 * step
+    low |= points <= malus
+    high = ~low
+
+    result = np.empty(points.shape, dtype=np.float64)
+    low_stars = np.zeros(np.count_nonzero(low)) if freeze_bronze else stars[low]
+    # Below bronze there are at most 4 stars, unless the work points are negative : the client then gets NaN
+    low_multiplier = np.full(low_stars.shape, np.nan)
+    known_stars = (low_stars >= 0) & (low_stars < len(LOW_STARS_MULTIPLIER))
+    low_multiplier[known_stars] = LOW_STARS_MULTIPLIER[low_stars[known_stars].astype(np.int64)]
+    # Multiplied in the client's order, for the same floating point results
+    result[low] = ROUNDING_FUNCTIONS[low_rounding](low_multiplier * magic[low] * motivation_multiplier[low] * factor[low])
+    result[high] = ROUNDING_FUNCTIONS[high_rounding](formula(points[high] - malus[high], stars[high])
+                                                     * magic[high] * motivation_multiplier[high] * factor[high])
+    return result
+
+
+def calc_wage(points: ArrayLike, malus: ArrayLike, magic: ArrayLike, motivation: ArrayLike, factor: ArrayLike = 1) -> np.ndarray:
+    return calc('ceil', 'round', lambda extra_points, stars: 6.25 * np.power(extra_points, 0.05),
+                points, malus, magic, motivation, factor)
+
+
+def calc_exp(points: ArrayLike, malus: ArrayLike, magic: ArrayLike, motivation: ArrayLike, factor: ArrayLike = 1) -> np.ndarray:
+    return calc('ceil', 'ceil', lambda extra_points, stars: np.full(extra_points.shape, 6.25),
+                points, malus, magic, motivation, factor)
+
+
+def calc_luck(points: ArrayLike, malus: ArrayLike, magic: ArrayLike, motivation: ArrayLike = 100, factor: ArrayLike = 1) -> np.ndarray:
+    # The luck does not depend on the motivation
+    return calc('floor', 'floor', lambda extra_points, stars: 6.25 * np.power(extra_points, 0.2),
+                points, malus, (0.9 * np.asarray(magic, dtype=np.float64) + 5) / 1.25, 100, factor)
+
+
+def calc_product_rate(points: ArrayLike, malus: ArrayLike, magic: ArrayLike, motivation: ArrayLike = 100, factor: ArrayLike = 1) -> np.ndarray:
+    return calc('round', 'round', lambda extra_points, stars: np.where(stars < MAX_STARS, 6.25, 9.375),
+                points, malus, magic, 100, factor)
+
+
+def calc_danger(points: ArrayLike, malus: ArrayLike, magic: ArrayLike, motivation: ArrayLike = 100, factor: ArrayLike = 1) -> np.ndarray:
+    return calc('round', 'round', lambda extra_points, stars: np.power(extra_points, -0.2),
+                points, malus, magic, 100, factor, freeze_bronze=True)
+
+
+def hourly_rates(work_points: ArrayLike,
+                 malus: ArrayLike,
+                 motivation: ArrayLike,
+                 dollar: ArrayLike,
+                 experience: ArrayLike,
+                 luck: ArrayLike,
+                 danger: ArrayLike,
+                 product_rate: dict[int, ArrayLike] | None = None) -> dict[str, typing.Any]:
+    """
+    Computes the hourly rewards of jobs, the inputs being broadcast together.
+
+    Returns:
+        dict: 'wage', 'exp', 'luck_inferior', 'luck_superior' and 'danger' arrays, and 'product_rate',
+            the rate array of every product id.
+    """
+    motivation = clamp_motivation(motivation)
+    return {
+        'wage': calc_wage(work_points, malus, dollar, motivation, 1),
+        'exp': calc_exp(work_points, malus, experience, motivation, 1),
+        'luck_inferior': calc_luck(work_points, malus, luck, motivation, 1),
+        'luck_superior': calc_luck(work_points, malus, luck, motivation, 3),
+        'danger': calc_danger(work_points, malus, danger, motivation, 1),
+        'product_rate': {product_id: calc_product_rate(work_points, malus, rate, motivation, 1)
+                         for product_id, rate in (product_rate or {}).items()}
+    }
@@ -0,0 +1,196 @@
+"""
+This module contains the leveled statistics of items and item sets, and the cache every simulator shares for them.
+
+Wrapping an `Item_model` in an `Item` recomputes its skills and bonuses for a player level, and the
+simulators used to do it again for every equipment they evaluated. A `LeveledItemStats` is the result
+of that computation, frozen : it is computed once per (item_id, player_level), or once per
+(set_id, piece_count, player_level) for the bonus of a set, and then shared.
+
+The module also defines the feature layout of the vectorized simulators : a leveled item is a fixed
+length vector of the 24 skills and attributes, followed by the work, drop, damage and speed bonuses
+and the weapon damage.
+
+Classes:
+
+    LeveledItemStats: The immutable statistics of an item or of a set bonus at a player level.
+    LeveledStatsCacheStats: The size and hit rate of a `LeveledStatsCache`.
+    LeveledStatsCache: The memoised `LeveledItemStats`.
+
+Attributes:
+
+    leveled_stats_cache (LeveledStatsCache): The cache shared by every simulator.
+"""
+import typing
+from dataclasses import dataclass
+
+import numpy as np
+
+from the_west_inner.simulation_data_library.simul_items import Item, Item_model, Weapon_damage_range
+from the_west_inner.simulation_data_library.simul_sets import Item_set, Item_set_item
+from the_west_inner.simulation_data_library.simul_skills import SKILL_LAYOUT, Skills
+
+SKILL_FEATURES = list(SKILL_LAYOUT)
+BONUS_FEATURES = ['item_drop', 'product_drop', 'workpoints', 'regeneration', 'damage', 'speed', 'exp_bonus']
+WEAPON_FEATURES = ['weapon_min_damage', 'weapon_max_damage', 'has_weapon']
+FEATURE_NAMES = SKILL_FEATURES + BONUS_FEATURES + WEAPON_FEATURES
+FEATURE_INDEX = {name: index for index, name in enumerate(FEATURE_NAMES)}
+FEATURE_COUNT = len(FEATURE_NAMES)
+
+
+def skills_to_vector(skills: Skills) -> np.ndarray:
+    # The skills vector and the skill features share the CharacterSkillsEnum layout
+    return skills.as_array()
+
+
+def vector_to_skills(vector: np.ndarray) -> Skills:
+    return Skills.from_values([feature_number(x) for x in vector[:len(SKILL_FEATURES)]])
+
+
+def feature_number(value: float) -> int | float:
+    """
+    Converts a feature (a float) back to the int the item classes use whenever it is integral.
+    """
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+class LeveledItemStats():
+    """
+    The statistics of an item, or of the bonus of a set, at a player level.
+
+    Instances are shared through `leveled_stats_cache` and can not be modified. `item_skills` is built
+    once as well : treat it as read only (`skills += stats.item_skills` is fine, the opposite changes the cache).
+
+    Attributes:
+        vector (np.ndarray): The read only feature vector, in the layout of FEATURE_NAMES.
+        item_skills (Skills): The skills and attributes.
+        item_drop, product_drop, workpoints, regeneration, damage, speed, exp_bonus: The bonuses.
+    """
+    __slots__ = ('vector', 'item_skills', 'item_drop', 'product_drop', 'workpoints',
+                 'regeneration', 'damage', 'speed', 'exp_bonus')
+
+    def __init__(self, vector: np.ndarray):
+        vector = np.array(vector, dtype=np.float64)
+        vector.flags.writeable = False
+        object.__setattr__(self, 'vector', vector)
+        object.__setattr__(self, 'item_skills', vector_to_skills(vector))
+        for name in BONUS_FEATURES:
+            object.__setattr__(self, name, feature_number(vector[FEATURE_INDEX[name]]))
+
+    def __setattr__(self, name: str, value: typing.Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    # Immutable, so copies share the instance and pickling rebuilds it from the vector
+    def __copy__(self) -> typing.Self:
+        return self
+
+    def __deepcopy__(self, memo: dict) -> typing.Self:
+        return self
+
+    def __reduce__(self) -> tuple:
+        return (type(self), (np.array(self.vector),))
+
+    def __repr__(self) -> str:
+        bonuses = ', '.join(f'{name}={getattr(self, name)}' for name in BONUS_FEATURES)
+        return f"{type(self).__name__}({bonuses})"
+
+    @classmethod
+    def from_item(cls, leveled_item: Item, weapon_damage: Weapon_damage_range | None = None) -> typing.Self:
+        """
+        Freezes an `Item` (or an `Item_set_item`). A weapon also gets its damage range.
+        """
+        vector = np.zeros(FEATURE_COUNT, dtype=np.float64)
+        vector[:len(SKILL_FEATURES)] = skills_to_vector(leveled_item.item_skills)
+        for name in BONUS_FEATURES:
+            vector[FEATURE_INDEX[name]] = getattr(leveled_item, name)
+        if weapon_damage is not None:
+            vector[FEATURE_INDEX['weapon_min_damage']] = weapon_damage.min_damage
+            vector[FEATURE_INDEX['weapon_max_damage']] = weapon_damage.max_damage
+            vector[FEATURE_INDEX['has_weapon']] = 1
+        return cls(vector=vector)
+
+
+@dataclass(frozen=True)
+class LeveledStatsCacheStats:
+    item_entries: int
+    set_entries: int
+    hits: int
+    misses: int
+
+    @property
+    def size(self) -> int:
+        return self.item_entries + self.set_entries
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class LeveledStatsCache():
+    """
+    Memoises `LeveledItemStats` by (item_id, player_level) and by (set_id, piece_count, player_level).
+
+    An item id identifies the item model (upgraded items have their own id), so two models with the same
+    id are expected to have the same statistics.
+    """
+    def __init__(self):
+        self._item_stats: dict[tuple[int, int], LeveledItemStats] = {}
+        self._set_stats: dict[tuple[str, int, int], LeveledItemStats] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def item_stats(self, item_model: Item_model, player_level: int) -> LeveledItemStats:
+        """
+        Returns the statistics of an item at the given player level.
+        """
+        key = (item_model.item_id, player_level)
+        stats = self._item_stats.get(key)
+        if stats is not None:
+            self.hits += 1
+            return stats
+        self.misses += 1
+        weapon_damage = item_model.weapon_damage if item_model.item_type == 'weapon' else None
+        stats = LeveledItemStats.from_item(leveled_item=Item(item_model=item_model, player_level=player_level),
+                                           weapon_damage=weapon_damage)
+        self._item_stats[key] = stats
+        return stats
+
+    def set_stats(self, item_set: Item_set, pieces: int, player_level: int) -> LeveledItemStats:
+        """
+        Returns the bonus given by `pieces` equipped items of a set : the sum of every stage up to `pieces`.
+        Same rule as Equipment_analysis_tool.calc_sets : a piece count without its own stage gives nothing.
+        """
+        key = (item_set.set_id, pieces, player_level)
+        stats = self._set_stats.get(key)
+        if stats is not None:
+            self.hits += 1
+            return stats
+        self.misses += 1
+        vector = np.zeros(FEATURE_COUNT, dtype=np.float64)
+        if isinstance(item_set.bonuses_dict_by_number, dict) and str(pieces) in item_set.bonuses_dict_by_number:
+            for stage in item_set.yield_bonuses(number=pieces):
+                vector += LeveledItemStats.from_item(
+                    leveled_item=Item_set_item(item_set_item_model=stage, player_level=player_level)
+                ).vector
+        stats = LeveledItemStats(vector=vector)
+        self._set_stats[key] = stats
+        return stats
+
+    def stats(self) -> LeveledStatsCacheStats:
+        return LeveledStatsCacheStats(item_entries=len(self._item_stats),
+                                      set_entries=len(self._set_stats),
+                                      hits=self.hits,
+                                      misses=self.misses)
+
+    def clear(self) -> None:
+        self._item_stats.clear()
+        self._set_stats.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+leveled_stats_cache = LeveledStatsCache()
@@ -1,7 +1,10 @@
 import math
+import operator
 import typing
 from enum import Enum, auto
 
+import numpy as np
+
 class CharacterSkillsEnum(Enum):
     # Attributes
     STRENGTH = auto()
@@ -47,34 +50,97 @@ class CharacterSkillsEnum(Enum):
     def get_all_attributes(cls):
         attributes = {'STRENGTH', 'MOBILITY', 'DEXTERITY', 'CHARISMA'}
         return [attribute.name.lower() for attribute in cls if attribute.name in attributes]
-class Attributes():
+
+# Order of the values of `Skills.to_list` and `Skills.from_values` : the attributes, then the skills of every attribute,
+# in CharacterSkillsEnum order. The values themselves are stored by the attribute groups, not in a vector.
+SKILL_LAYOUT = [str(skill) for skill in CharacterSkillsEnum]
+SKILL_INDEX = {name: index for index, name in enumerate(SKILL_LAYOUT)}
+SKILL_COUNT = len(SKILL_LAYOUT)
+ATTRIBUTE_COUNT = 4
+SKILLS_PER_ATTRIBUTE = 5
+
+class Skill_group():
+    """
+    Base of Attributes and of the skills of an attribute : every value is a slot named after it, so reading
+    `group.aim` is a plain attribute read. Every group sets its slots from a sequence of values in `_load`.
+
+    The values are read by name (`group.aim`, `group["aim"]`) or by 1 based position (`group[1]`), an unknown
+    key giving "Error".
+    """
+    __slots__ = ()
+    _names : tuple[str, ...] = ()
+    _aliases : dict[str, str] = {}
+    _key_names : dict[typing.Union[str, int], str] = {}
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._key_names = {}
+        for index, name in enumerate(cls._names):
+            cls._key_names[index + 1] = name
+            cls._key_names[name] = name
+        for alias, name in cls._aliases.items():
+            cls._key_names[alias] = name
+    def _load(self, values : typing.Iterable[int]) -> None:
+        raise NotImplementedError
+    def _slot_values(self) -> tuple[int, ...]:
+        raise NotImplementedError
+    @classmethod
+    def _from_values(cls, values : typing.Iterable[int]) -> typing.Self:
+        group = cls.__new__(cls)
+        group._load(values)
+        return group
+    def __len__(self) -> int:
+        return len(self._names)
+    def __getitem__(self, number : typing.Union[str, int]) -> int:
+        name = self._key_names.get(number)
+        if name is None:
+            return "Error"
+        return getattr(self, name)
+    def __setitem__(self, number : typing.Union[str, int], value : int):
+        name = self._key_names.get(number)
+        if name is None:
+            return "Error"
+        setattr(self, name, value)
+    def __iter__(self) -> typing.Iterator[int]:
+        return iter(self._slot_values())
+    def __mul__(self, other : int) -> typing.Self:
+        return self._from_values([x * other for x in self])
+    def __rmul__(self, other : int) -> typing.Self:
+        return self._from_values([x * other for x in self])
+    def __round__(self, n : str) -> typing.Self:
+        return self._from_values(_round_values(self, n))
+
+def _round_values(values : typing.Iterable[int], n : str) -> list[int]:
+    if n == "ceil":
+        return [math.ceil(x) for x in values]
+    elif n == "floor":
+        return [math.floor(x) for x in values]
+    else:
+        return [round(x) for x in values]
+
+class Attributes(Skill_group):
+    __slots__ = ('strength', 'mobility', 'dexterity', 'charisma')
+    _names = __slots__
+    _aliases = {'flexibility': 'mobility'}
     def __init__(self,strength:int,mobility:int,dexterity:int,charisma:int):
         self.strength = strength
         self.mobility = mobility
         self.dexterity = dexterity
         self.charisma = charisma
-    def __getitem__(self,number:int) -> int:
-        if number == 1 or number == "strength":
-            return self.strength
-        elif number == 2    or number == "mobility" or number == "flexibility":
-            return self.mobility
-        elif number == 3   or number == "dexterity":
-            return self.dexterity
-        elif number == 4 or number == "charisma":
-            return self.charisma
-        else:
-            return "Error"
-    def __setitem__(self,number:typing.Union[str,int],value:int):
-        if number == 1 or number == "strength":
-            self.strength = value
-        elif number == 2    or number == "mobility" or number == "flexibility":
-            self.mobility = value
-        elif number == 3   or number == "dexterity":
-            self.dexterity = value
-        elif number == 4 or number == "charisma":
-            self.charisma = value
-        else:
-            return "Error"
+    def _load(self, values : typing.Iterable[int]) -> None:
+        self.strength, self.mobility, self.dexterity, self.charisma = values
+    def _slot_values(self) -> tuple[int, ...]:
+        return (self.strength, self.mobility, self.dexterity, self.charisma)
+    def __add__(self, other : typing.Self) -> typing.Self:
+        return Attributes(self.strength + other.strength,
+                          self.mobility + other.mobility,
+                          self.dexterity + other.dexterity,
+                          self.charisma + other.charisma)
+    def __iadd__(self, other : typing.Self) -> typing.Self:
+        self.strength += other.strength
+        self.mobility += other.mobility
+        self.dexterity += other.dexterity
+        self.charisma += other.charisma
+        return self
     def __str__(self) -> str:
         return (
             f'strength: {self.strength} '
@@ -82,301 +148,136 @@ class Attributes():
             f'dexterity: {self.dexterity} '
             f'charisma: {self.charisma} '
         )
-    def __add__(self,other:typing.Self) -> typing.Self:
-        return Attributes(
-                    self.strength + other.strength,
-                    self.mobility + other.mobility,
-                    self.dexterity + other.dexterity,
-                    self.charisma + other.charisma
-                    )
-    def __mul__(self,other:int) -> typing.Self:
-        return Attributes(
-                    self.strength * other,
-                    self.mobility * other,
-                    self.dexterity * other,
-                    self.charisma * other
-                    )
-    def __rmul__(self,other:int) -> typing.Self:
-        return Attributes(
-                    self.strength * other,
-                    self.mobility * other,
-                    self.dexterity * other,
-                    self.charisma * other
-                    )
-    def __iter__(self):
-        self.numarator = 1
-        return self
-    def __next__(self):
-        if self.numarator <= 4:
-            returnabil = self[self.numarator]
-            self.numarator += 1
-            return returnabil
-        else:
-            raise StopIteration
-    def __round__(self,n:str) -> typing.Self:
-        if n == "ceil":
-            return Attributes(
-                    math.ceil(self.strength),
-                    math.ceil(self.mobility),
-                    math.ceil(self.dexterity),
-                    math.ceil(self.charisma)
-                    )
-        elif n == "floor":
-            return Attributes(
-                    math.floor(self.strength),
-                    math.floor(self.mobility),
-                    math.floor(self.dexterity),
-                    math.floor(self.charisma)
-                    )
-        else:
-            return Attributes(
-                    round(self.strength),
-                    round(self.mobility),
-                    round(self.dexterity),
-                    round(self.charisma)
-                    )
     @staticmethod
     def null_attributes() -> typing.Self:
         return Attributes(0,0,0,0)
-class Strength_based_skills():
+class Strength_based_skills(Skill_group):
+    __slots__ = ('build', 'punch', 'tough', 'endurance', 'health')
+    _names = __slots__
     def __init__(self,build:int ,punch:int ,tough:int ,endurance:int ,health:int ):
         self.build = build
         self.punch = punch
         self.tough = tough
         self.endurance = endurance
         self.health = health
-    def __getitem__(self,number) -> int:
-        if number == 1 or number == "build":
-            return self.build
-        elif number == 2 or number == "punch":
-            return self.punch
-        elif number == 3 or number == "tough":
-            return self.tough
-        elif number == 4 or number == "endurance":
-            return self.endurance
-        elif number == 5 or number == "health":
-            return self.health
-        else:
-            return "Error"
-    def __setitem__(self,number:typing.Union[str,int],value:int):
-        if number == 1 or number == "build":
-            self.build = value
-        elif number == 2 or number == "punch":
-            self.punch = value
-        elif number == 3 or number == "tough":
-            self.tough = value
-        elif number == 4 or number == "endurance":
-            self.endurance = value
-        elif number == 5 or number == "health":
-            self.health = value
-        else:
-            return "Error"
+    def _load(self, values : typing.Iterable[int]) -> None:
+        self.build, self.punch, self.tough, self.endurance, self.health = values
+    def _slot_values(self) -> tuple[int, ...]:
+        return (self.build, self.punch, self.tough, self.endurance, self.health)
+    def __add__(self, other : typing.Self) -> typing.Self:
+        return Strength_based_skills(self.build + other.build,
+                                     self.punch + other.punch,
+                                     self.tough + other.tough,
+                                     self.endurance + other.endurance,
+                                     self.health + other.health)
+    def __iadd__(self, other : typing.Self) -> typing.Self:
+        self.build += other.build
+        self.punch += other.punch
+        self.tough += other.tough
+        self.endurance += other.endurance
+        self.health += other.health
+        return self
+    def _plus(self, value : int) -> typing.Self:
+        """
+        Every skill with `value` (its attribute) added.
+        """
+        return Strength_based_skills(self.build + value,
+                                     self.punch + value,
+                                     self.tough + value,
+                                     self.endurance + value,
+                                     self.health + value)
     def __str__(self):
         return (
-            f'build: {self.build} ' 
-            f'punch: {self.punch} ' 
-            f'tough: {self.tough} ' 
-            f'endurance: {self.endurance} ' 
+            f'build: {self.build} '
+            f'punch: {self.punch} '
+            f'tough: {self.tough} '
+            f'endurance: {self.endurance} '
             f'health: {self.health} '
         )
-    def __add__(self,other: typing.Self) -> typing.Self:
-        return Strength_based_skills(
-                        self.build + other.build,
-                        self.punch + other.punch,
-                        self.tough + other.tough,
-                        self.endurance + other.endurance,
-                        self.health + other.health
-                        )
-    def __mul__(self,other:int) -> typing.Self:
-        return Strength_based_skills(
-                        self.build * other,
-                        self.punch * other,
-                        self.tough * other,
-                        self.endurance * other,
-                        self.health * other
-                        )
-    def __rmul__(self,other:int) -> typing.Self:
-        return Strength_based_skills(
-                        self.build * other,
-                        self.punch * other,
-                        self.tough * other,
-                        self.endurance * other,
-                        self.health * other
-                        )
-    def __iter__(self):
-        self.numarator = 1
-        return self
-    def __next__(self):
-        if self.numarator <= 5:
-            returnabil = self[self.numarator]
-            self.numarator += 1
-            return returnabil
-        else:
-            raise StopIteration
-    def __round__(self,n:str) -> typing.Self:
-        if n == "ceil":
-            return Strength_based_skills(
-                        math.ceil(self.build),
-                        math.ceil(self.punch),
-                        math.ceil(self.tough),
-                        math.ceil(self.endurance),
-                        math.ceil(self.health)
-                        )
-        elif n == "floor":
-            return Strength_based_skills(
-                        math.floor(self.build),
-                        math.floor(self.punch),
-                        math.floor(self.tough),
-                        math.floor(self.endurance),
-                        math.floor(self.health)
-                        )
-        else:
-            return Strength_based_skills(
-                        round(self.build),
-                        round(self.punch),
-                        round(self.tough),
-                        round(self.endurance),
-                        round(self.health)
-                        )
     @staticmethod
     def null_skills() -> typing.Self:
         return Strength_based_skills(0,0,0,0,0)
-class Mobility_based_skills():
+class Mobility_based_skills(Skill_group):
+    __slots__ = ('ride', 'reflex', 'dodge', 'hide', 'swim')
+    _names = __slots__
     def __init__(self,ride:int ,reflex:int ,dodge:int ,hide:int ,swim:int ):
         self.ride = ride
         self.reflex = reflex
         self.dodge = dodge
         self.hide = hide
         self.swim = swim
-    def __getitem__(self,number:int) -> int:
-        if number == 1 or number == "ride":
-            return self.ride
-        elif number == 2 or number == "reflex":
-            return self.reflex
-        elif number == 3 or number == "dodge":
-            return self.dodge
-        elif number == 4 or number == "hide":
-            return self.hide
-        elif number == 5 or number == "swim":
-            return self.swim
-        else:
-            return "Error"
-    def __setitem__(self,number:typing.Union[str,int],value:int):
-        if number == 1 or number == "ride":
-            self.ride = value
-        elif number == 2 or number == "reflex":
-            self.reflex = value
-        elif number == 3 or number == "dodge":
-            self.dodge = value
-        elif number == 4 or number == "hide":
-            self.hide = value
-        elif number == 5 or number == "swim":
-            self.swim = value
-        else:
-            return "Error"
+    def _load(self, values : typing.Iterable[int]) -> None:
+        self.ride, self.reflex, self.dodge, self.hide, self.swim = values
+    def _slot_values(self) -> tuple[int, ...]:
+        return (self.ride, self.reflex, self.dodge, self.hide, self.swim)
+    def __add__(self, other : typing.Self) -> typing.Self:
+        return Mobility_based_skills(self.ride + other.ride,
+                                     self.reflex + other.reflex,
+                                     self.dodge + other.dodge,
+                                     self.hide + other.hide,
+                                     self.swim + other.swim)
+    def __iadd__(self, other : typing.Self) -> typing.Self:
+        self.ride += other.ride
+        self.reflex += other.reflex
+        self.dodge += other.dodge
+        self.hide += other.hide
+        self.swim += other.swim
+        return self
+    def _plus(self, value : int) -> typing.Self:
+        """
+        Every skill with `value` (its attribute) added.
+        """
+        return Mobility_based_skills(self.ride + value,
+                                     self.reflex + value,
+                                     self.dodge + value,
+                                     self.hide + value,
+                                     self.swim + value)
     def __str__(self):
         return (
-            f'ride: {self.ride},  ' 
-            f'reflex: {self.reflex},  ' 
-            f'dodge: {self.dodge},  ' 
-            f'hide: {self.hide},  ' 
-            f'swim: {self.swim} ' 
+            f'ride: {self.ride},  '
+            f'reflex: {self.reflex},  '
+            f'dodge: {self.dodge},  '
+            f'hide: {self.hide},  '
+            f'swim: {self.swim} '
             )
-    def __add__(self,other:typing.Self) -> typing.Self:
-        return Mobility_based_skills(
-                    self.ride + other.ride,
-                    self.reflex + other.reflex,
-                    self.dodge + other.dodge,
-                    self.hide + other.hide,
-                    self.swim + other.swim
-                    )
-    def __mul__(self,other:int) -> typing.Self:
-        return Mobility_based_skills(
-                    self.ride * other,
-                    self.reflex * other,
-                    self.dodge * other,
-                    self.hide * other,
-                    self.swim * other
-                    )
-    def __rmul__(self,other:int) -> typing.Self:
-        return Mobility_based_skills(
-                    self.ride * other,
-                    self.reflex * other,
-                    self.dodge * other,
-                    self.hide * other,
-                    self.swim * other
-                    )
-    def __iter__(self):
-        self.numarator = 1
-        return self
-    def __next__(self):
-        if self.numarator <= 5:
-            returnabil = self[self.numarator]
-            self.numarator += 1
-            return returnabil
-        else:
-            raise StopIteration
-    def __round__(self,n:str) -> typing.Self:
-        if n == "ceil":
-            return Mobility_based_skills(
-                        math.ceil(self.ride),
-                        math.ceil(self.reflex),
-                        math.ceil(self.dodge),
-                        math.ceil(self.hide),
-                        math.ceil(self.swim)
-                        )
-        elif n == "floor":
-            return Mobility_based_skills(
-                        math.floor(self.ride),
-                        math.floor(self.reflex),
-                        math.floor(self.dodge),
-                        math.floor(self.hide),
-                        math.floor(self.swim)
-                        )
-        else:
-            return Mobility_based_skills(
-                        round(self.ride),
-                        round(self.reflex),
-                        round(self.dodge),
-                        round(self.hide),
-                        round(self.swim)
-                        )
     @staticmethod
     def null_skills() -> typing.Self:
         return Mobility_based_skills(0,0,0,0,0)
-class Dexterity_based_skills():
+class Dexterity_based_skills(Skill_group):
+    __slots__ = ('aim', 'shot', 'pitfall', 'finger_dexterity', 'repair')
+    _names = __slots__
     def __init__(self,aim:int ,shot:int ,pitfall:int ,finger_dexterity:int ,repair:int ):
         self.aim = aim
         self.shot = shot
         self.pitfall = pitfall
         self.finger_dexterity = finger_dexterity
         self.repair = repair
-    def __getitem__(self,number:int) -> int:
-        if number == 1 or number == "aim":
-            return self.aim
-        elif number == 2    or number == "shot":
-            return self.shot
-        elif number == 3   or number == "pitfall":
-            return self.pitfall
-        elif number == 4 or number == "finger_dexterity":
-            return self.finger_dexterity
-        elif number == 5 or number == "repair":
-            return self.repair
-        else:
-            return "Error"
-    def __setitem__(self,number:int,value:int):
-        if number == 1 or number == "aim":
-            self.aim = value
-        elif number == 2 or number == "shot":
-            self.shot = value
-        elif number == 3 or number == "pitfall":
-            self.pitfall = value
-        elif number == 4 or number == "finger_dexterity":
-            self.finger_dexterity = value
-        elif number == 5 or number == "repair":
-            self.repair = value
-        else:
-            return "Error"
+    def _load(self, values : typing.Iterable[int]) -> None:
+        self.aim, self.shot, self.pitfall, self.finger_dexterity, self.repair = values
+    def _slot_values(self) -> tuple[int, ...]:
+        return (self.aim, self.shot, self.pitfall, self.finger_dexterity, self.repair)
+    def __add__(self, other : typing.Self) -> typing.Self:
+        return Dexterity_based_skills(self.aim + other.aim,
+                                      self.shot + other.shot,
+                                      self.pitfall + other.pitfall,
+                                      self.finger_dexterity + other.finger_dexterity,
+                                      self.repair + other.repair)
+    def __iadd__(self, other : typing.Self) -> typing.Self:
+        self.aim += other.aim
+        self.shot += other.shot
+        self.pitfall += other.pitfall
+        self.finger_dexterity += other.finger_dexterity
+        self.repair += other.repair
+        return self
+    def _plus(self, value : int) -> typing.Self:
+        """
+        Every skill with `value` (its attribute) added.
+        """
+        return Dexterity_based_skills(self.aim + value,
+                                      self.shot + value,
+                                      self.pitfall + value,
+                                      self.finger_dexterity + value,
+                                      self.repair + value)
     def __str__(self):
         return (
                 f'aim: {self.aim},  '
@@ -385,101 +286,44 @@ class Dexterity_based_skills():
                 f'finger_dexterity: {self.finger_dexterity},  '
                 f'repair: {self.repair} '
                 )
-    def __add__(self,other:typing.Self) -> typing.Self:
-        return Dexterity_based_skills(
-                    self.aim + other.aim,
-                    self.shot + other.shot,
-                    self.pitfall + other.pitfall,
-                    self.finger_dexterity + other.finger_dexterity,
-                    self.repair + other.repair
-                    )
-    def __mul__(self,other:int) -> typing.Self:
-        return Dexterity_based_skills(
-                    self.aim * other,
-                    self.shot * other,
-                    self.pitfall * other,
-                    self.finger_dexterity * other,
-                    self.repair * other
-                    )
-    def __rmul__(self,other:int) -> typing.Self:
-        return Dexterity_based_skills(
-                    self.aim * other,
-                    self.shot * other,
-                    self.pitfall * other,
-                    self.finger_dexterity * other,
-                    self.repair * other
-                    )
-    def __iter__(self):
-        self.numarator = 1
-        return self
-    def __next__(self):
-        if self.numarator <= 5:
-            returnabil = self[self.numarator]
-            self.numarator += 1
-            return returnabil
-        else:
-            raise StopIteration
-    def __round__(self,n:str) -> typing.Self:
-        if n == "ceil":
-            return Dexterity_based_skills(
-                    math.ceil(self.aim),
-                    math.ceil(self.shot),
-                    math.ceil(self.pitfall),
-                    math.ceil(self.finger_dexterity),
-                    math.ceil(self.repair)
-                    )
-        elif n == "floor":
-            return Dexterity_based_skills(
-                    math.floor(self.aim),
-                    math.floor(self.shot),
-                    math.floor(self.pitfall),
-                    math.floor(self.finger_dexterity),
-                    math.floor(self.repair)
-                    )
-        else:
-            return Dexterity_based_skills(
-                    round(self.aim),
-                    round(self.shot),
-                    round(self.pitfall),
-                    round(self.finger_dexterity),
-                    round(self.repair)
-                    )
     @staticmethod
     def null_skills() -> typing.Self:
         return Dexterity_based_skills(0,0,0,0,0)
-class Charisma_based_skills():
+class Charisma_based_skills(Skill_group):
+    __slots__ = ('leadership', 'tactic', 'trade', 'animal', 'appearance')
+    _names = __slots__
     def __init__(self,leadership:int,tactic:int,trade:int,animal:int,appearance:int):
         self.leadership = leadership
         self.tactic = tactic
         self.trade = trade
         self.animal = animal
         self.appearance = appearance
-    def __getitem__(self,number:int) -> int:
-        if number == 1 or number == "leadership":
-            return self.leadership
-        elif number == 2 or number == "tactic":
-            return self.tactic
-        elif number == 3 or number == "trade":
-            return self.trade
-        elif number == 4 or number == "animal":
-            return self.animal
-        elif number == 5 or number == "appearance":
-            return self.appearance
-        else:
-            return "Error"
-    def __setitem__(self,number:int,value:int):
-        if number == 1 or number == "leadership":
-            self.leadership = value
-        elif number == 2 or number == "tactic":
-            self.tactic = value
-        elif number == 3 or number == "trade":
-            self.trade = value
-        elif number == 4 or number == "animal":
-            self.animal = value
-        elif number == 5 or number == "appearance":
-            self.appearance = value
-        else:
-            return "Error"
+    def _load(self, values : typing.Iterable[int]) -> None:
+        self.leadership, self.tactic, self.trade, self.animal, self.appearance = values
+    def _slot_values(self) -> tuple[int, ...]:
+        return (self.leadership, self.tactic, self.trade, self.animal, self.appearance)
+    def __add__(self, other : typing.Self) -> typing.Self:
+        return Charisma_based_skills(self.leadership + other.leadership,
+                                     self.tactic + other.tactic,
+                                     self.trade + other.trade,
+                                     self.animal + other.animal,
+                                     self.appearance + other.appearance)
+    def __iadd__(self, other : typing.Self) -> typing.Self:
+        self.leadership += other.leadership
+        self.tactic += other.tactic
+        self.trade += other.trade
+        self.animal += other.animal
+        self.appearance += other.appearance
+        return self
+    def _plus(self, value : int) -> typing.Self:
+        """
+        Every skill with `value` (its attribute) added.
+        """
+        return Charisma_based_skills(self.leadership + value,
+                                     self.tactic + value,
+                                     self.trade + value,
+                                     self.animal + value,
+                                     self.appearance + value)
     def __str__(self):
         return (
                 f'leadership: {self.leadership},'
@@ -488,98 +332,131 @@ class Charisma_based_skills():
                 f' animal: {self.animal}, '
                 f' appearance: {self.appearance}'
                 )
-    def __add__(self,other:typing.Self) -> typing.Self:
-        return Charisma_based_skills(
-                    self.leadership + other.leadership,
-                    self.tactic + other.tactic,
-                    self.trade + other.trade,
-                    self.animal + other.animal,
-                    self.appearance + other.appearance
-                    )
-    def __mul__(self,other:int) -> typing.Self:
-        return Charisma_based_skills(
-                    self.leadership * other,
-                    self.tactic * other,
-                    self.trade * other,
-                    self.animal * other,
-                    self.appearance * other
-                    )
-    def __rmul__(self,other:int) -> typing.Self:
-        return Charisma_based_skills(
-                    self.leadership * other,
-                    self.tactic * other,
-                    self.trade * other,
-                    self.animal * other,
-                    self.appearance * other
-                    )
-    def __iter__(self):
-        self.numarator = 1
-        return self
-    def __next__(self):
-        if self.numarator <= 5:
-            returnabil = self[self.numarator]
-            self.numarator += 1
-            return returnabil
-        else:
-            raise StopIteration
-    def __round__(self,n:str) -> typing.Self:
-        if n == "ceil":
-            return Charisma_based_skills(
-                    math.ceil(self.leadership),
-                    math.ceil(self.tactic),
-                    math.ceil(self.trade),
-                    math.ceil(self.animal),
-                    math.ceil(self.appearance)
-                    )
-        elif n == "floor":
-            return Charisma_based_skills(
-                    math.floor(self.leadership),
-                    math.floor(self.tactic),
-                    math.floor(self.trade),
-                    math.floor(self.animal),
-                    math.floor(self.appearance)
-                    )
-        else:
-            return Charisma_based_skills(
-                    round(self.leadership),
-                    round(self.tactic),
-                    round(self.trade),
-                    round(self.animal),
-                    round(self.appearance)
-                    )
     @staticmethod
     def null_skills() -> typing.Self:
         return Charisma_based_skills(0,0,0,0,0)
+
+# Keys of Skills.__getitem__ : every name, the "flexibility" alias, the attributes by position and, as before, 5 for health
+_SKILLS_KEY_INDEX : dict[typing.Union[str, int, CharacterSkillsEnum], int] = {
+    **SKILL_INDEX,
+    **{skill: SKILL_INDEX[str(skill)] for skill in CharacterSkillsEnum},
+    'flexibility': SKILL_INDEX['mobility'],
+    1: 0, 2: 1, 3: 2, 4: 3,
+    5: SKILL_INDEX['health']
+}
+
+# The groups of a `Skills`, in SKILL_LAYOUT order
+_SKILL_GROUPS : tuple[tuple[str, type[Skill_group]], ...] = (
+    ('attributes', Attributes),
+    ('strength_based_skills', Strength_based_skills),
+    ('mobility_based_skills', Mobility_based_skills),
+    ('dexterity_based_skills', Dexterity_based_skills),
+    ('charisma_based_skills', Charisma_based_skills)
+)
+# The (group, name) of every position of the skills vector
+_SKILL_PATHS : list[tuple[str, str]] = [(group_name, name)
+                                        for group_name, group_class in _SKILL_GROUPS
+                                        for name in group_class._names]
+# Reads one value of a `Skills` by key, through its group
+_SKILLS_KEY_GETTERS : dict[typing.Union[str, int, CharacterSkillsEnum], typing.Callable[["Skills"], int]] = {
+    key: operator.attrgetter('.'.join(_SKILL_PATHS[index])) for key, index in _SKILLS_KEY_INDEX.items()
+}
+
 class Skills():
+    """
+    The skills and attributes of a character or an item, held by the attribute groups (`attributes`,
+    `strength_based_skills` ...) as slotted attributes. There is no backing vector : `to_list` and `as_array`
+    return a copy of the values in SKILL_LAYOUT (CharacterSkillsEnum) order and `from_values` builds the
+    groups from such a sequence.
+
+    `+=` accumulates in place (into the same group objects). `effective_skills` builds new groups and is not
+    a view : writing to the skills afterwards doesn't change it. The attribute values passed to the
+    constructor are copied.
+    """
+    __slots__ = ('attributes',
+                 'strength_based_skills',
+                 'mobility_based_skills',
+                 'dexterity_based_skills',
+                 'charisma_based_skills')
     def __init__(self,
                  strength_skills:Strength_based_skills,
                  mobility_skills:Mobility_based_skills,
                  dexterity_skills:Dexterity_based_skills,
                  charisma_skills:Charisma_based_skills,
                  attributes:Attributes ):
-        self.attributes = attributes
-        self.strength = attributes.strength
-        self.mobility = attributes.mobility
-        self.dexterity = attributes.dexterity
-        self.charisma =  attributes.charisma
-        self.strength_based_skills = strength_skills
-        self.mobility_based_skills = mobility_skills
-        self.dexterity_based_skills = dexterity_skills
-        self.charisma_based_skills = charisma_skills
+        self.attributes = Attributes._from_values(tuple(attributes))
+        self.strength_based_skills = Strength_based_skills._from_values(tuple(strength_skills))
+        self.mobility_based_skills = Mobility_based_skills._from_values(tuple(mobility_skills))
+        self.dexterity_based_skills = Dexterity_based_skills._from_values(tuple(dexterity_skills))
+        self.charisma_based_skills = Charisma_based_skills._from_values(tuple(charisma_skills))
+    @classmethod
+    def from_values(cls, values : typing.Sequence[int]) -> typing.Self:
+        """
+        Builds skills from `values`, a sequence of SKILL_COUNT numbers in SKILL_LAYOUT order.
+        """
+        if len(values) != SKILL_COUNT:
+            raise ValueError(f"A skills vector has {SKILL_COUNT} values, not {len(values)}")
+        skills = cls.__new__(cls)
+        skills.attributes = Attributes._from_values(values[0:4])
+        skills.strength_based_skills = Strength_based_skills._from_values(values[4:9])
+        skills.mobility_based_skills = Mobility_based_skills._from_values(values[9:14])
+        skills.dexterity_based_skills = Dexterity_based_skills._from_values(values[14:19])
+        skills.charisma_based_skills = Charisma_based_skills._from_values(values[19:24])
+        return skills
+    def _load(self, values : typing.Sequence[int]) -> None:
+        """
+        Writes a vector of SKILL_COUNT values into the existing groups.
+        """
+        self.attributes._load(values[0:4])
+        self.strength_based_skills._load(values[4:9])
+        self.mobility_based_skills._load(values[9:14])
+        self.dexterity_based_skills._load(values[14:19])
+        self.charisma_based_skills._load(values[19:24])
+    def to_list(self) -> list[int]:
+        return [*self.attributes._slot_values(),
+                *self.strength_based_skills._slot_values(),
+                *self.mobility_based_skills._slot_values(),
+                *self.dexterity_based_skills._slot_values(),
+                *self.charisma_based_skills._slot_values()]
+    def as_array(self) -> np.ndarray:
+        return np.array(self.to_list(), dtype=np.float64)
+    @property
+    def strength(self) -> int:
+        return self.attributes.strength
+    @strength.setter
+    def strength(self, value : int):
+        self.attributes.strength = value
+    @property
+    def mobility(self) -> int:
+        return self.attributes.mobility
+    @mobility.setter
+    def mobility(self, value : int):
+        self.attributes.mobility = value
+    @property
+    def dexterity(self) -> int:
+        return self.attributes.dexterity
+    @dexterity.setter
+    def dexterity(self, value : int):
+        self.attributes.dexterity = value
+    @property
+    def charisma(self) -> int:
+        return self.attributes.charisma
+    @charisma.setter
+    def charisma(self, value : int):
+        self.attributes.charisma = value
     @property
     def effective_skills(self) -> typing.Self:
-        effective_strenght_skills = self.strength_based_skills + Strength_based_skills(*[self.strength for _ in range(5)])
-        effective_mobility_skills = self.mobility_based_skills + Mobility_based_skills(*[self.mobility for _ in range(5)])
-        effective_dexterity_skills = self.dexterity_based_skills + Dexterity_based_skills(*[self.dexterity for _ in range(5)])
-        effective_charisma_skills = self.charisma_based_skills + Charisma_based_skills(*[self.charisma for _ in range(5)])
-        effective_attributes = Attributes(*[0 for _ in range(4)])
-        return Skills(
-                strength_skills = effective_strenght_skills,
-                mobility_skills = effective_mobility_skills,
-                dexterity_skills = effective_dexterity_skills,
-                charisma_skills = effective_charisma_skills,
-                attributes = effective_attributes
-                )
+        """
+        A new `Skills` holding the skills with their attribute added, every attribute being 0.
+        """
+        attributes = self.attributes
+        skills = Skills.__new__(Skills)
+        skills.attributes = Attributes(0, 0, 0, 0)
+        skills.strength_based_skills = self.strength_based_skills._plus(attributes.strength)
+        skills.mobility_based_skills = self.mobility_based_skills._plus(attributes.mobility)
+        skills.dexterity_based_skills = self.dexterity_based_skills._plus(attributes.dexterity)
+        skills.charisma_based_skills = self.charisma_based_skills._plus(attributes.charisma)
+        return skills
     def __str__(self):
         return (
             f'attributes:{{ {self.attributes} }},'
@@ -588,104 +465,46 @@ class Skills():
             f'dexterity based skills: {{{self.dexterity_based_skills}}},'
             f'charisma based skills: {{{self.charisma_based_skills}}}'
         )
+    def __len__(self) -> int:
+        return SKILL_COUNT
     def __add__(self,other:typing.Self) -> typing.Self:
-        new_attributes = self.attributes + other.attributes
-        return Skills(
-                strength_skills = self.strength_based_skills + other.strength_based_skills,
-                mobility_skills = self.mobility_based_skills + other.mobility_based_skills,
-                dexterity_skills = self.dexterity_based_skills + other.dexterity_based_skills,
-                charisma_skills = self.charisma_based_skills + other.charisma_based_skills,
-                attributes = new_attributes
-                )
+        skills = Skills.__new__(Skills)
+        skills.attributes = self.attributes + other.attributes
+        skills.strength_based_skills = self.strength_based_skills + other.strength_based_skills
+        skills.mobility_based_skills = self.mobility_based_skills + other.mobility_based_skills
+        skills.dexterity_based_skills = self.dexterity_based_skills + other.dexterity_based_skills
+        skills.charisma_based_skills = self.charisma_based_skills + other.charisma_based_skills
+        return skills
     def __radd__(self,other:typing.Self) -> typing.Self:
         if other == 0:
             return self
-        new_attributes = self.attributes + other.attributes
-        return Skills(
-                strength_skills = self.strength_based_skills + other.strength_based_skills,
-                mobility_skills = self.mobility_based_skills + other.mobility_based_skills,
-                dexterity_skills = self.dexterity_based_skills + other.dexterity_based_skills,
-                charisma_skills = self.charisma_based_skills + other.charisma_based_skills,
-                attributes = new_attributes
-                )
+        return self.__add__(other)
+    def __iadd__(self,other:typing.Self) -> typing.Self:
+        self.attributes += other.attributes
+        self.strength_based_skills += other.strength_based_skills
+        self.mobility_based_skills += other.mobility_based_skills
+        self.dexterity_based_skills += other.dexterity_based_skills
+        self.charisma_based_skills += other.charisma_based_skills
+        return self
     def __mul__(self,other:int) -> typing.Self:
-        new_attributes = self.attributes * other
-        return Skills(
-                strength_skills = self.strength_based_skills * other,
-                mobility_skills = self.mobility_based_skills * other,
-                dexterity_skills = self.dexterity_based_skills * other,
-                charisma_skills = self.charisma_based_skills * other,
-                attributes = new_attributes
-                )
+        return Skills.from_values([x * other for x in self.to_list()])
     def __rmul__(self,other:int) -> typing.Self:
-        new_attributes = self.attributes * other
-        return Skills(
-                strength_skills = self.strength_based_skills * other,
-                mobility_skills = self.mobility_based_skills * other,
-                dexterity_skills = self.dexterity_based_skills * other,
-                charisma_skills = self.charisma_based_skills * other,
-                attributes = new_attributes
-                )
+        return Skills.from_values([x * other for x in self.to_list()])
     def __getitem__(self,numar:int) -> int:
-        if self.attributes[numar] != "Error":
-            return self.attributes[numar]
-        elif self.strength_based_skills[numar] != "Error":
-            return self.strength_based_skills[numar]
-        elif self.mobility_based_skills[numar] != "Error":
-            return self.mobility_based_skills[numar]
-        elif self.dexterity_based_skills[numar] != "Error":
-            return self.dexterity_based_skills[numar]
-        elif self.charisma_based_skills[numar] != "Error":
-            return self.charisma_based_skills[numar]
-        else:
+        getter = _SKILLS_KEY_GETTERS.get(numar)
+        if getter is None:
             return "Error"
+        return getter(self)
     def __setitem__(self,numar:int,value:int):
-        if self.attributes[numar] != "Error":
-            self.attributes[numar] = value
-        elif self.strength_based_skills[numar] != "Error":
-            self.strength_based_skills[numar] = value
-        elif self.mobility_based_skills[numar] != "Error":
-            self.mobility_based_skills[numar] = value
-        elif self.dexterity_based_skills[numar] != "Error":
-            self.dexterity_based_skills[numar] = value
-        elif self.charisma_based_skills[numar] != "Error":
-            self.charisma_based_skills[numar] = value
-        else:
+        index = _SKILLS_KEY_INDEX.get(numar)
+        if index is None:
             return "Error"
-    def __iter__(self):
-        self.item_dict = {1:self.attributes,
-                          2:self.strength_based_skills,
-                          3:self.mobility_based_skills,
-                          4:self.dexterity_based_skills,
-                          5:self.charisma_based_skills}
-        self.class_iterator = 1
-        self.additional_iterator = 1
-        return self
-    def __next__(self):
-        if self.class_iterator <= 5:
-            returnabil =  self.item_dict[self.class_iterator][self.additional_iterator]
-            if self.additional_iterator == 5:
-                self.class_iterator += 1
-                self.additional_iterator = 1
-            else:
-                self.additional_iterator += 1
-            return returnabil
-        else:
-            raise StopIteration
+        group_name, name = _SKILL_PATHS[index]
+        setattr(getattr(self, group_name), name, value)
+    def __iter__(self) -> typing.Iterator[int]:
+        return iter(self.to_list())
     def __round__(self,n:str) -> typing.Self:
-        new_attributes = self.attributes.__round__(n)
-        return Skills(
-            strength_skills = self.strength_based_skills.__round__(n),
-            mobility_skills = self.mobility_based_skills.__round__(n),
-            dexterity_skills = self.dexterity_based_skills.__round__(n),
-            charisma_skills = self.charisma_based_skills.__round__(n),
-            attributes = new_attributes)
+        return Skills.from_values(_round_values(self.to_list(), n))
     @staticmethod
     def null_skill() -> typing.Self:
-        return Skills(
-                    strength_skills= Strength_based_skills.null_skills(),
-                    mobility_skills= Mobility_based_skills.null_skills(),
-                    dexterity_skills= Dexterity_based_skills.null_skills(),
-                    charisma_skills= Charisma_based_skills.null_skills(),
-                    attributes= Attributes.null_attributes()
-                    )
\ No newline at end of file
+        return Skills.from_values([0] * SKILL_COUNT)
@@ -0,0 +1,347 @@
+"""
+This module contains a compiled, NumPy based representation of the equipment search space.
+
+Every `Item_model` is turned, once for a given player level, into a fixed length feature vector
+(the 24 skills and attributes followed by the work, drop, damage and speed bonuses, taken from the
+shared `simul_leveled_stats.leveled_stats_cache`), and every item
+set into a lookup table indexed by the number of equipped pieces. An equipment permutation is then a
+row of item indices (one per slot), and a whole population of permutations is scored with a few
+array operations instead of rebuilding `Equipment_analysis_tool`, `Item_list` and `Skills` objects
+for each candidate.
+
+Rules that expose `linear_weights()` are compiled into a weight matrix; any other `SimulFitnessRule`
+still works through its `calculate` method, called on an `EquipmentPermutationData` rebuilt from
+the feature vector.
+
+Classes:
+
+    CompiledEquipmentSpace: The item matrices and set bonus tensor of an item model list.
+    VectorizedFitnessEvaluator: Scores permutations of a `CompiledEquipmentSpace` with a `SimulFitnessRuleSet`.
+"""
+import itertools
+import typing
+
+import numpy as np
+
+from the_west_inner.simulation_data_library.simul_items import Item_model, Item_model_list, Weapon_damage_range
+from the_west_inner.simulation_data_library.simul_sets import Item_set, Item_set_list
+from the_west_inner.simulation_data_library.simul_skills import CharacterSkillsEnum
+from the_west_inner.simulation_data_library.simul_equip_fitnes import SimulFitnessRuleSet, SimulResultFitness
+from the_west_inner.simulation_data_library.simul_permutation_data import EquipmentPermutationData
+from the_west_inner.simulation_data_library.simul_leveled_stats import (FEATURE_COUNT,
+                                                                        FEATURE_INDEX,
+                                                                        feature_number,
+                                                                        leveled_stats_cache,
+                                                                        vector_to_skills)
+
+DEFAULT_BATCH_SIZE = 4096
+
+ATTRIBUTE_BY_SKILL = {
+    skill: attribute
+    for attribute, skills in zip(CharacterSkillsEnum.get_all_attributes(),
+                                 [CharacterSkillsEnum.get_all_skills()[index:index + 5] for index in range(0, 20, 5)])
+    for skill in skills
+}
+
+
+def effective_skill_weights(skill_weights: dict[str, float]) -> dict[str, float]:
+    """
+    Translates weights over `Skills.effective_skills` into weights over the raw features.
+
+    An effective skill is the skill plus its attribute, and the effective value of an attribute is 0.
+    """
+    weights: dict[str, float] = {}
+    for skill, weight in skill_weights.items():
+        skill = str(skill)
+        if skill not in ATTRIBUTE_BY_SKILL:
+            continue
+        weights[skill] = weights.get(skill, 0) + weight
+        attribute = ATTRIBUTE_BY_SKILL[skill]
+        weights[attribute] = weights.get(attribute, 0) + weight
+    return weights
+
+
+def item_vector(item_model: Item_model, player_level: int) -> np.ndarray:
+    """
+    Returns the (read only) feature vector of an item at the given player level.
+    """
+    return leveled_stats_cache.item_stats(item_model=item_model, player_level=player_level).vector
+
+
+def set_bonus_vector(item_set: Item_set, pieces: int, player_level: int) -> np.ndarray:
+    """
+    Returns the (read only) feature vector of the bonus given by `pieces` equipped items of a set.
+    """
+    return leveled_stats_cache.set_stats(item_set=item_set, pieces=pieces, player_level=player_level).vector
+
+
+def apply_weapon_damage(features: np.ndarray) -> np.ndarray:
+    """
+    Adds, in place, the damage bonus to the weapon damage of summed feature vectors (one vector or a matrix of them).
+    Like Equipment_simul.weapon_damage, the damage bonus only counts when a weapon is equipped.
+    """
+    damage = features[..., FEATURE_INDEX['damage']] * (features[..., FEATURE_INDEX['has_weapon']] > 0)
+    features[..., FEATURE_INDEX['weapon_min_damage']] += damage
+    features[..., FEATURE_INDEX['weapon_max_damage']] += damage
+    return features
+
+
+def features_to_status_dict(features: np.ndarray) -> dict:
+    """
+    Converts a feature vector into the dictionary of `Equipment_simul.create_status_dict`.
+    """
+    value = lambda name: feature_number(features[FEATURE_INDEX[name]])
+    return {
+        'item_drop': value('item_drop'),
+        'exp_bonus': value('exp_bonus'),
+        'workpoints': value('workpoints'),
+        'weapon_damage': Weapon_damage_range(min_damage=value('weapon_min_damage'),
+                                             max_damage=value('weapon_max_damage')),
+        'product_drop': value('product_drop'),
+        'regeneration': value('regeneration'),
+        'status': vector_to_skills(features)
+    }
+
+
+class CompiledEquipmentSpace():
+    """
+    The search space of an equipment optimisation, compiled to arrays.
+
+    Attributes:
+        slots (list[str]): The item types, in column order of the choice arrays.
+        slot_items (list[list[Item_model]]): The candidate items of every slot.
+        slot_matrices (list[np.ndarray]): Per slot, the (items, FEATURE_COUNT) matrix of item vectors.
+        slot_set_indices (list[np.ndarray]): Per slot, the set index of every item (-1 for no set).
+        set_ids (list[str]): The sets that at least one candidate belongs to.
+        set_bonus_tensor (np.ndarray): (sets, pieces + 1, FEATURE_COUNT) bonuses by number of equipped pieces.
+    """
+    def __init__(self,
+                 item_model_list: Item_model_list,
+                 item_set_list: Item_set_list,
+                 player_level: int,
+                 fixed_items: dict[str, Item_model] | None = None):
+        """
+        Args:
+            item_model_list (Item_model_list): The candidate items, grouped by item type into slots.
+            item_set_list (Item_set_list): The item sets.
+            player_level (int): The level the items and set bonuses are computed at.
+            fixed_items (dict[str, Item_model] | None): Items of slots without candidates that stay equipped
+                (for example the rest of the current equipment). They are single choice slots.
+        """
+        self.item_set_list = item_set_list
+        self.player_level = player_level
+        slot_dict = item_model_list.get_item_dict()
+        self.fixed_slots = []
+        for slot, item_model in (fixed_items or {}).items():
+            if item_model is not None and slot not in slot_dict:
+                slot_dict[slot] = [item_model]
+                self.fixed_slots.append(slot)
+        self.slots = list(slot_dict.keys())
+        self.slot_items = [list(slot_dict[slot]) for slot in self.slots]
+        self._item_positions = [{id(x): index for index, x in enumerate(items)} for items in self.slot_items]
+
+        self.set_ids: list[str] = []
+        set_position: dict[str, int] = {}
+        for items in self.slot_items:
+            for item_model in items:
+                if item_model.item_set and item_model.item_set not in set_position:
+                    set_position[item_model.item_set] = len(self.set_ids)
+                    self.set_ids.append(item_model.item_set)
+
+        self.slot_matrices = [
+            np.array([item_vector(item_model=x, player_level=player_level) for x in items], dtype=np.float64).reshape(-1, FEATURE_COUNT)
+            for items in self.slot_items
+        ]
+        self.slot_set_indices = [
+            np.array([set_position[x.item_set] if x.item_set else -1 for x in items], dtype=np.int64)
+            for items in self.slot_items
+        ]
+        self.set_bonus_tensor = self._compile_set_bonuses()
+
+    def _compile_set_bonuses(self) -> np.ndarray:
+        max_pieces = len(self.slots)
+        tensor = np.zeros((len(self.set_ids), max_pieces + 1, FEATURE_COUNT), dtype=np.float64)
+        for set_index, set_id in enumerate(self.set_ids):
+            item_set = self.item_set_list.get(set_id)
+            for pieces in range(1, max_pieces + 1):
+                tensor[set_index, pieces] = set_bonus_vector(item_set=item_set, pieces=pieces, player_level=self.player_level)
+        return tensor
+
+    @property
+    def slot_sizes(self) -> list[int]:
+        return [len(items) for items in self.slot_items]
+
+    def encode(self, permutation: dict[str, Item_model]) -> np.ndarray:
+        """
+        Converts a {slot : item model} permutation into a row of item indices. Fixed slots may be left out.
+        """
+        choice = np.zeros(len(self.slots), dtype=np.int64)
+        for column, slot in enumerate(self.slots):
+            if slot not in permutation:
+                continue
+            item_model = permutation[slot]
+            position = self._item_positions[column].get(id(item_model))
+            choice[column] = position if position is not None else self.slot_items[column].index(item_model)
+        return choice
+
+    def decode(self, choice: np.ndarray) -> dict[str, Item_model]:
+        """
+        Converts a row of item indices into a {slot : item model} permutation of the candidate (not fixed) slots.
+        """
+        return {slot: self.slot_items[column][int(choice[column])]
+                for column, slot in enumerate(self.slots) if slot not in self.fixed_slots}
+
+    def iter_choices(self, batch_size: int = DEFAULT_BATCH_SIZE) -> typing.Generator[np.ndarray, None, None]:
+        """
+        Yields every permutation of the space (the Cartesian product of the slots), as (batch, slots) arrays.
+        """
+        product = itertools.product(*[range(size) for size in self.slot_sizes])
+        while True:
+            batch = list(itertools.islice(product, batch_size))
+            if not batch:
+                return
+            yield np.array(batch, dtype=np.int64).reshape(len(batch), len(self.slots))
+
+    def set_piece_counts(self, choices: np.ndarray) -> np.ndarray:
+        """
+        Returns the (population, sets) number of equipped pieces of every set.
+        """
+        choices = np.atleast_2d(choices)
+        counts = np.zeros((choices.shape[0], len(self.set_ids)), dtype=np.int64)
+        rows = np.arange(choices.shape[0])
+        for column, set_indices in enumerate(self.slot_set_indices):
+            chosen_sets = set_indices[choices[:, column]]
+            has_set = chosen_sets >= 0
+            np.add.at(counts, (rows[has_set], chosen_sets[has_set]), 1)
+        return counts
+
+    def features(self, choices: np.ndarray) -> np.ndarray:
+        """
+        Computes the (population, FEATURE_COUNT) feature matrix of a population of permutations.
+
+        Args:
+            choices (np.ndarray): (population, slots) item indices, or a single row.
+        """
+        choices = np.atleast_2d(np.asarray(choices, dtype=np.int64))
+        features = np.zeros((choices.shape[0], FEATURE_COUNT), dtype=np.float64)
+        for column, matrix in enumerate(self.slot_matrices):
+            features += matrix[choices[:, column]]
+        if self.set_ids:
+            counts = self.set_piece_counts(choices)
+            features += self.set_bonus_tensor[np.arange(len(self.set_ids)), counts].sum(axis=1)
+        return apply_weapon_damage(features)
+
+    def permutation_data(self, choice: np.ndarray, features: np.ndarray | None = None) -> EquipmentPermutationData:
+        """
+        Builds the `EquipmentPermutationData` of a single permutation.
+        """
+        if features is None:
+            features = self.features(choice)[0]
+        return EquipmentPermutationData(
+            **features_to_status_dict(features),
+            permutation=self.decode(choice)
+        )
+
+
+class VectorizedFitnessEvaluator():
+    """
+    Scores permutations of a `CompiledEquipmentSpace` with the rules of a `SimulFitnessRuleSet`.
+
+    Rules implementing `linear_weights()` are evaluated as one matrix product; the others fall back to
+    `calculate`, one permutation at a time.
+    """
+    def __init__(self, fitness_rule_set: SimulFitnessRuleSet, space: CompiledEquipmentSpace):
+        self.fitness_rule_set = fitness_rule_set
+        self.space = space
+        rules = fitness_rule_set.fitness_rule_list
+        self.linear_rule_indices = [index for index, rule in enumerate(rules) if hasattr(rule, 'linear_weights')]
+        self.fallback_rule_indices = [index for index in range(len(rules)) if index not in self.linear_rule_indices]
+        self.weight_matrix = np.zeros((FEATURE_COUNT, len(self.linear_rule_indices)), dtype=np.float64)
+        for column, rule_index in enumerate(self.linear_rule_indices):
+            for name, weight in rules[rule_index].linear_weights().items():
+                self.weight_matrix[FEATURE_INDEX[name], column] += weight
+
+    def evaluate(self, choices: np.ndarray) -> np.ndarray:
+        """
+        Returns the (population, rules) matrix of rule results.
+        """
+        choices = np.atleast_2d(np.asarray(choices, dtype=np.int64))
+        features = self.space.features(choices)
+        results = np.zeros((choices.shape[0], len(self.fitness_rule_set.fitness_rule_list)), dtype=np.float64)
+        if self.linear_rule_indices:
+            results[:, self.linear_rule_indices] = features @ self.weight_matrix
+        if self.fallback_rule_indices:
+            rules = self.fitness_rule_set.fitness_rule_list
+            for row, choice in enumerate(choices):
+                equipment_data = self.space.permutation_data(choice=choice, features=features[row])
+                for rule_index in self.fallback_rule_indices:
+                    results[row, rule_index] = rules[rule_index].calculate(equipment_data=equipment_data)
+        return results
+
+    @property
+    def lexicographic(self) -> bool:
+        """
+        Whether the results compare lexicographically, as tuples of rule results do : only without a percent coefficient.
+        """
+        return self.fitness_rule_set.percent_coefficient == 0
+
+    def to_fitness_result(self, result_row: np.ndarray) -> SimulResultFitness:
+        result = SimulResultFitness(percent_coefficient=self.fitness_rule_set.percent_coefficient)
+        for value in result_row:
+            result.append_result(result=feature_number(value))
+        return result
+
+    def fitness_results(self, choices: np.ndarray) -> list[SimulResultFitness]:
+        return [self.to_fitness_result(row) for row in self.evaluate(choices)]
+
+    def best_index(self, results: np.ndarray) -> int | None:
+        """
+        Returns the first row of `results` that compares the highest under `SimulResultFitness` ordering,
+        or None if no row beats the empty result (the same outcome as a sequential `>` scan).
+
+        Without a percent coefficient the rows are sorted lexicographically, with one they are scanned in order.
+        """
+        if results.shape[0] == 0 or results.shape[1] == 0:
+            return None
+        if not self.lexicographic:
+            best_index = None
+            best_result = self.fitness_rule_set.generate_empty_result()
+            for index, row in enumerate(results):
+                result = self.to_fitness_result(row)
+                if result > best_result:
+                    best_index, best_result = index, result
+            return best_index
+        # Without a percent coefficient SimulResultFitness compares lexicographically
+        order = np.lexsort(results.T[::-1])
+        best_row = results[order[-1]]
+        best_index = int(np.flatnonzero((results == best_row).all(axis=1))[0])
+        if not self.to_fitness_result(best_row) > self.fitness_rule_set.generate_empty_result():
+            return None
+        return best_index
+
+    def best_of(self, choice_batches: typing.Iterable[np.ndarray]) -> tuple[np.ndarray | None, SimulResultFitness]:
+        """
+        Finds the best permutation of a stream of (batch, slots) arrays.
+
+        Returns:
+            tuple[np.ndarray | None, SimulResultFitness]: The best choice row (None if nothing beats the empty result) and its result.
+        """
+        best_choice = None
+        best_result = self.fitness_rule_set.generate_empty_result()
+        for choices in choice_batches:
+            results = self.evaluate(choices)
+            if not self.lexicographic:
+                # The comparison with a percent coefficient isn't transitive, only a sequential scan gives its result
+                for choice, row in zip(choices, results):
+                    result = self.to_fitness_result(row)
+                    if result > best_result:
+                        best_result, best_choice = result, choice
+                continue
+            index = self.best_index(results)
+            if index is None:
+                continue
+            batch_result = self.to_fitness_result(results[index])
+            if batch_result > best_result:
+                best_result = batch_result
+                best_choice = choices[index]
+        return best_choice, best_result
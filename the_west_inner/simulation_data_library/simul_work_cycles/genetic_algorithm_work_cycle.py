@@ -1,7 +1,7 @@
 import random
 from typing import List, Optional
 
-from the_west_inner.simulation_data_library.simul_work_cycles.work_cycle_simul import SimulatorWorkCycle
+from the_west_inner.simulation_data_library.simul_work_cycles.work_cycle_simul import SimulatorWorkCycle, work_cycle_fitness
 from the_west_inner.simulation_data_library.simul_work_cycles.work_cycle_simul_data import WorkCycleJobSimul, WorkCycleSimul
 
 class WorkCycleGeneticAlgorithm:
@@ -34,16 +34,15 @@ class WorkCycleGeneticAlgorithm:
         return WorkCycleSimul(work_data_list=selected_jobs)
 
     def evaluate_fitness(self, individual: WorkCycleSimul) -> float:
-        simulation = self.simulator.simulate(individual)
-        if simulation.elapsed_time == 0:  # Prevent division by zero
-            return 0
-        return simulation.exp_gained / simulation.elapsed_time
+        return work_cycle_fitness(self.simulator.simulate(individual))
 
     def select_parents(self, population: List[WorkCycleSimul], fitness_scores: List[float]) -> List[WorkCycleSimul]:
         selected = random.choices(population, weights=fitness_scores, k=2)
         return selected
 
     def crossover(self, parent1: WorkCycleSimul, parent2: WorkCycleSimul) -> WorkCycleSimul:
+        if min(len(parent1.work_data_list), len(parent2.work_data_list)) < 2:  # No split point
+            return WorkCycleSimul(work_data_list=list(parent1.work_data_list))
         split_point = random.randint(1, min(len(parent1.work_data_list), len(parent2.work_data_list)) - 1)
         child_work_data = parent1.work_data_list[:split_point] + parent2.work_data_list[split_point:]
         child = WorkCycleSimul(work_data_list=child_work_data)
@@ -0,0 +1,333 @@
+"""
+This module contains a deterministic planner of work cycles, the alternative to `WorkCycleGeneticAlgorithm`.
+
+The planner treats a work cycle as a route over job locations : the travel times between every pair of
+locations are computed once, and the route is grown one location at a time by a beam search over the
+states (locations visited, first location, last location). Every state is evaluated by replaying the rules
+of `SimulatorWorkCycle` on the travel time matrix (motivation and energy budgets, consumables and their
+cooldown, time limit), which gives the same experience and elapsed time as `SimulatorWorkCycle.simulate`
+without building a `WorkCycleSimulation`.
+
+Classes:
+
+    WorkCycleEvaluation: The experience, elapsed time and energy left of a planned cycle.
+    WorkCyclePlanner: Plans the work cycle with the best objective.
+    WorkCycleMethodResult: The cycle found by one method and its simulated score.
+    WorkCyclePlannerComparison: The results of the planner and of the genetic algorithm on the same inputs.
+
+Functions:
+
+    travel_time_matrix: The travel times between every pair of locations.
+    compare_with_genetic_algorithm: Runs the planner and `WorkCycleGeneticAlgorithm` on the same inputs.
+"""
+import math
+import random
+import time
+import typing
+from dataclasses import dataclass
+
+import numpy as np
+
+from the_west_inner import map_index
+from the_west_inner.simulation_data_library.simul_work_cycles.genetic_algorithm_work_cycle import WorkCycleGeneticAlgorithm
+from the_west_inner.simulation_data_library.simul_work_cycles.work_cycle_simul import (SIMUL_COOLDOWN_DURATION,
+                                                                                      SimulationLocationData,
+                                                                                      SimulatorWorkCycle,
+                                                                                      work_cycle_fitness)
+from the_west_inner.simulation_data_library.simul_work_cycles.work_cycle_simul_data import WorkCycleJobSimul, WorkCycleSimul
+
+# Every location can be worked until its motivation falls to this value
+MOTIVATION_FLOOR = 75
+MAX_MOTIVATION = 100
+
+
+def travel_time_matrix(locations: list[SimulationLocationData], movement_coefficient: float) -> np.ndarray:
+    """
+    Returns the (n, n) travel times between the locations, rounded up as `character_movement.calc_distanta` does.
+    """
+    return map_index.travel_time_matrix(points=[(location.x, location.y) for location in locations],
+                                        movement_coefficient=movement_coefficient)
+
+
+@dataclass(frozen=True)
+class WorkCycleEvaluation:
+    exp_gained: int
+    elapsed_time: int
+    energy_left: int
+
+    @property
+    def fitness(self) -> float:
+        """
+        The experience per second, as `work_cycle_fitness` computes it.
+        """
+        if self.elapsed_time == 0:
+            return 0
+        return self.exp_gained / self.elapsed_time
+
+
+def exp_per_second(evaluation: WorkCycleEvaluation) -> float:
+    """
+    The objective of `WorkCycleGeneticAlgorithm`.
+    """
+    return evaluation.fitness
+
+
+def total_exp(evaluation: WorkCycleEvaluation) -> float:
+    """
+    The experience gained before the time limit.
+    """
+    return evaluation.exp_gained
+
+
+class WorkCyclePlanner:
+    """
+    Plans a work cycle with a beam search over routes of job locations.
+
+    A state is a route (an ordered tuple of location indexes, one location per job). Each step extends every
+    state of the beam with every location whose job is not on the route yet. Of the routes over the same
+    locations with the same first and last location only the best is kept, then the `beam_width` best states
+    form the next beam. The search stops once `patience` steps in a row did not improve the best route.
+    With `beam_width=None` and `patience=None` only the dominance rule prunes the search, which is still
+    exponential in the number of locations. The rule is a heuristic : the order of the locations in between
+    changes how the motivation and the energy run out, so the best route can be one it discarded.
+
+    States are ranked by `objective(evaluation)`, then by more experience, less elapsed time and the route
+    itself, so the plan only depends on the inputs.
+
+    Args:
+        work_cycle_jobs (list[WorkCycleJobSimul]): The candidate locations.
+        simulator (SimulatorWorkCycle): The simulation rules (time limit, energy, consumables).
+        beam_width (int | None): The number of states kept at each step.
+        max_works (int | None): The maximum number of locations of the cycle.
+        patience (int | None): The number of steps without improvement before the search stops.
+        objective (Callable[[WorkCycleEvaluation], float]): The score to maximise, the genetic algorithm's by default.
+    """
+    def __init__(self,
+                 work_cycle_jobs: list[WorkCycleJobSimul],
+                 simulator: SimulatorWorkCycle,
+                 beam_width: int | None = 64,
+                 max_works: int | None = None,
+                 patience: int | None = 2,
+                 objective: typing.Callable[[WorkCycleEvaluation], float] = exp_per_second):
+        self.work_cycle_jobs = work_cycle_jobs
+        self.simulator = simulator
+        self.beam_width = beam_width
+        self.max_works = max_works
+        self.patience = patience
+        self.objective = objective
+
+        self.locations = [SimulationLocationData.load_from_work_cycle_job_simul(work_cycle_job_simul=job,
+                                                                                work_time=simulator.work_duration)
+                          for job in work_cycle_jobs]
+        self.coordinates = [(location.x, location.y) for location in self.locations]
+        self.exp = [location.exp for location in self.locations]
+        self.work_ids = [job.job_data.work_id for job in work_cycle_jobs]
+        self.travel_times = travel_time_matrix(locations=self.locations,
+                                               movement_coefficient=map_index.movement_coefficient(simulator.player_data)).tolist()
+        self._evaluations: dict[tuple[int, ...], WorkCycleEvaluation] = {}
+
+    def _consumable_wait(self, last_use: int | None, elapsed_time: int) -> int:
+        if last_use is None:
+            return 0
+        return max(0, last_use + SIMUL_COOLDOWN_DURATION - elapsed_time)
+
+    def evaluate_route(self, route: tuple[int, ...]) -> WorkCycleEvaluation:
+        """
+        Replays `SimulatorWorkCycle.simulate` on a route of location indexes.
+        """
+        evaluation = self._evaluations.get(route)
+        if evaluation is not None:
+            return evaluation
+
+        simulator = self.simulator
+        time_limit = simulator.time_limit
+        max_energy = simulator.energy_max
+        energy = max_energy
+        motivation = [MAX_MOTIVATION] * len(route)
+        position = (0, 0)
+        current = None
+        last_use = None
+        elapsed_time = 0
+        exp_gained = 0
+
+        def use_consumable(consumable) -> None:
+            nonlocal energy, elapsed_time, last_use
+            elapsed_time += self._consumable_wait(last_use=last_use, elapsed_time=elapsed_time)
+            energy += int(max_energy * consumable.energy_recharge_percent)
+            for index in range(len(motivation)):
+                motivation[index] = min(MAX_MOTIVATION, max(0, motivation[index] + consumable.motivation_recharge))
+            last_use = elapsed_time
+
+        while elapsed_time < time_limit:
+            if energy == 0:
+                if simulator.energy_usable is None:
+                    break
+                use_consumable(simulator.energy_usable)
+
+            actions_possible = energy
+            for step, location in enumerate(route):
+                work_number = min(motivation[step] - MOTIVATION_FLOOR, actions_possible)
+                if work_number != 0:
+                    # The first move of the simulation is free
+                    if position != (0, 0):
+                        elapsed_time += self.travel_times[current][location]
+                    position, current = self.coordinates[location], location
+                    exp_gained += work_number * self.exp[location]
+                    motivation[step] -= work_number
+                    energy -= work_number
+                    actions_possible -= work_number
+                    if elapsed_time > time_limit:
+                        break
+                if actions_possible == 0:
+                    break
+            if elapsed_time > time_limit:
+                break
+
+            if energy > 0 and all(value <= MOTIVATION_FLOOR for value in motivation):
+                if simulator.motivation_usable is None:
+                    break
+                use_consumable(simulator.motivation_usable)
+
+        evaluation = WorkCycleEvaluation(exp_gained=exp_gained, elapsed_time=elapsed_time, energy_left=energy)
+        self._evaluations[route] = evaluation
+        return evaluation
+
+    def _rank(self, route: tuple[int, ...]) -> tuple:
+        evaluation = self.evaluate_route(route)
+        return (-self.objective(evaluation), -evaluation.exp_gained, evaluation.elapsed_time, route)
+
+    def _extend(self, beam: list[tuple[int, ...]]) -> list[tuple[int, ...]]:
+        best_by_state: dict[tuple[frozenset[int], int, int], tuple[int, ...]] = {}
+        for route in beam:
+            route_work_ids = {self.work_ids[index] for index in route}
+            locations = frozenset(route)
+            for index in range(len(self.locations)):
+                if self.work_ids[index] in route_work_ids:
+                    continue
+                extended = route + (index,)
+                state = (locations | {index}, extended[0], index)
+                kept = best_by_state.get(state)
+                if kept is None or self._rank(extended) < self._rank(kept):
+                    best_by_state[state] = extended
+        return sorted(best_by_state.values(), key=self._rank)[:self.beam_width]
+
+    def plan_route(self) -> tuple[int, ...]:
+        """
+        Returns the best route found, as location indexes.
+        """
+        max_works = len(set(self.work_ids))
+        if self.max_works is not None:
+            max_works = min(max_works, self.max_works)
+        if max_works == 0:
+            return ()
+
+        beam = sorted(((index,) for index in range(len(self.locations))), key=self._rank)[:self.beam_width]
+        best = beam[0]
+        steps_without_improvement = 0
+        for _ in range(max_works - 1):
+            beam = self._extend(beam)
+            if not beam:
+                break
+            if self._rank(beam[0]) < self._rank(best):
+                best = beam[0]
+                steps_without_improvement = 0
+            else:
+                steps_without_improvement += 1
+                if self.patience is not None and steps_without_improvement >= self.patience:
+                    break
+        return best
+
+    def plan(self) -> WorkCycleSimul:
+        """
+        Returns the best work cycle found.
+        """
+        return WorkCycleSimul(work_data_list=[self.work_cycle_jobs[index] for index in self.plan_route()])
+
+    @property
+    def evaluated_routes(self) -> int:
+        return len(self._evaluations)
+
+
+@dataclass
+class WorkCycleMethodResult:
+    method: str
+    work_cycle: WorkCycleSimul | None
+    exp_gained: int
+    elapsed_time: int
+    fitness: float
+    runtime: float
+
+
+@dataclass
+class WorkCyclePlannerComparison:
+    planner: WorkCycleMethodResult
+    genetic_algorithm: WorkCycleMethodResult
+
+    @property
+    def fitness_ratio(self) -> float:
+        """
+        The planner's fitness divided by the genetic algorithm's (inf when only the planner scores).
+        """
+        if self.genetic_algorithm.fitness == 0:
+            return math.inf if self.planner.fitness > 0 else 1.0
+        return self.planner.fitness / self.genetic_algorithm.fitness
+
+    @property
+    def speedup(self) -> float:
+        """
+        The genetic algorithm's runtime divided by the planner's.
+        """
+        return self.genetic_algorithm.runtime / self.planner.runtime if self.planner.runtime else math.inf
+
+
+def _method_result(method: str,
+                   work_cycle: WorkCycleSimul | None,
+                   simulator: SimulatorWorkCycle,
+                   runtime: float) -> WorkCycleMethodResult:
+    if work_cycle is None or not work_cycle.work_data_list:
+        return WorkCycleMethodResult(method=method, work_cycle=work_cycle, exp_gained=0, elapsed_time=0,
+                                     fitness=0, runtime=runtime)
+    simulation = simulator.simulate(work_cycle)
+    return WorkCycleMethodResult(method=method,
+                                 work_cycle=work_cycle,
+                                 exp_gained=simulation.exp_gained,
+                                 elapsed_time=simulation.elapsed_time,
+                                 fitness=work_cycle_fitness(simulation),
+                                 runtime=runtime)
+
+
+def compare_with_genetic_algorithm(work_cycle_jobs: list[WorkCycleJobSimul],
+                                   simulator: SimulatorWorkCycle,
+                                   planner_options: dict | None = None,
+                                   genetic_algorithm_options: dict | None = None,
+                                   seed: int | None = None) -> WorkCyclePlannerComparison:
+    """
+    Runs `WorkCyclePlanner` and `WorkCycleGeneticAlgorithm` on the same jobs and simulator, and scores both
+    cycles with `SimulatorWorkCycle.simulate`.
+
+    Args:
+        work_cycle_jobs (list[WorkCycleJobSimul]): The candidate locations.
+        simulator (SimulatorWorkCycle): The simulation rules.
+        planner_options (dict | None): Extra arguments of `WorkCyclePlanner`.
+        genetic_algorithm_options (dict | None): Extra arguments of `WorkCycleGeneticAlgorithm`.
+        seed (int | None): Seeds the `random` module before the genetic algorithm runs.
+
+    Returns:
+        WorkCyclePlannerComparison: The cycle, experience, elapsed time, fitness and runtime of both methods.
+    """
+    start = time.perf_counter()
+    planner = WorkCyclePlanner(work_cycle_jobs=work_cycle_jobs, simulator=simulator, **(planner_options or {}))
+    planned_cycle = planner.plan()
+    planner_result = _method_result(method='planner', work_cycle=planned_cycle, simulator=simulator,
+                                    runtime=time.perf_counter() - start)
+
+    if seed is not None:
+        random.seed(seed)
+    start = time.perf_counter()
+    genetic_algorithm = WorkCycleGeneticAlgorithm(work_cycle_jobs=work_cycle_jobs, simulator=simulator,
+                                                  **(genetic_algorithm_options or {}))
+    evolved_cycle = genetic_algorithm.run()
+    genetic_algorithm_result = _method_result(method='genetic_algorithm', work_cycle=evolved_cycle,
+                                              simulator=simulator, runtime=time.perf_counter() - start)
+
+    return WorkCyclePlannerComparison(planner=planner_result, genetic_algorithm=genetic_algorithm_result)
@@ -159,7 +159,7 @@ class WorkCycleSimulation:
         
         travel_time = self.position.calculate_distance_to(final_position = (move_x, move_y))
         self.elapsed_time += travel_time
-        self.position.x , self.position.y = (move_x,
+        self.position.character_position = (move_x,
                                             move_y)
     
     def can_afford_motivation_wise(self) -> bool:
@@ -283,4 +283,13 @@ class SimulatorWorkCycle():
                 if not used:
                     break
         
-        return simulation
\ No newline at end of file
+        return simulation
+
+
+def work_cycle_fitness(simulation : WorkCycleSimulation) -> float:
+    """
+    The experience gained per second of a simulated work cycle, 0 when no time elapsed.
+    """
+    if simulation.elapsed_time == 0:  # Prevent division by zero
+        return 0
+    return simulation.exp_gained / simulation.elapsed_time
@@ -2,6 +2,7 @@ from dataclasses import dataclass
 import typing
 
 from the_west_inner.requests_handler import requests_handler
+from the_west_inner.paginated_fetch import PaginatedFetcher, DEFAULT_MAX_WORKERS
 
 @dataclass
 class Telegram_message_post():
@@ -287,14 +288,16 @@ class Telegram_data_reader():
         get_data_by_page: Gets telegram data for a given page number.
         get_data: Gets all telegram data (optionally reading all pages).
     """
-    def __init__(self, handler: requests_handler) -> None:
+    def __init__(self, handler: requests_handler, max_workers: int = DEFAULT_MAX_WORKERS) -> None:
         """Initializes the Telegram_data_reader instance.
 
         Args:
             handler: An instance of the requests_handler class.
+            max_workers: Maximum number of pages requested at the same time.
         """
 
         self.handler = handler
+        self.max_workers = max_workers
 
     def get_data_by_page(self, page_number: int) -> typing.Dict[str, typing.Union[int, Telegram_list]]:
         """Gets telegram data for a given page number.
@@ -352,17 +355,18 @@ class Telegram_data_reader():
             A list of telegram data.
         """
 
-        # Get the telegram data for the first page
-        first_page_response = self.get_data_by_page(page_number=1)
-
-        # Initialize the telegram_list with the telegram data from the first page
-        telegram_list = first_page_response["telegram_list"]
+        # Read only the first page, or every page concurrently (merged back in page order)
+        page_fetcher = PaginatedFetcher(
+            fetch_page = lambda page_number: self.get_data_by_page(page_number=page_number),
+            page_count = lambda page_response: page_response["num_max_pages"],
+            first_page = 1,
+            max_workers = self.max_workers
+        )
 
-        # If read_all_pages is True, get the telegram data for all pages and append it to the telegram_list
-        if read_all_pages:
-            for i in range(2, first_page_response["num_max_pages"] + 1):
-                page_response = self.get_data_by_page(page_number=i)
-                telegram_list += page_response["telegram_list"]
+        # Initialize the telegram_list and append the telegram data of every page to it
+        telegram_list = Telegram_list([])
+        for page_response in page_fetcher.iter_pages(max_pages=None if read_all_pages else 1):
+            telegram_list += page_response["telegram_list"]
 
         # Return the telegram_list
         return telegram_list
\ No newline at end of file
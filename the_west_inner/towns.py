@@ -3,6 +3,7 @@ import typing
 
 from the_west_inner.requests_handler import requests_handler
 from the_west_inner.player_data import Player_data
+from the_west_inner.map_index import MapLocationIndex, movement_coefficient
 from the_west_inner.work_manager import Work_manager
 from the_west_inner.town_buildings import Town_buildings,load_town_buildings,CityNotFoundError
 
@@ -52,6 +53,7 @@ class Town():
 class Town_list():
     def __init__(self,town_list : dict[int,Town]):
         self.town_list = town_list
+        self._populated_index : MapLocationIndex[Town] | None = None
     def __getitem__(self,key ):
         return self.town_list[key]
     def __iter__(self):
@@ -60,14 +62,24 @@ class Town_list():
         return Town_list(
                         town_list = {town_id:town for town_id,town in self.town_list.items() if town.member_count > 0}
                         )
+    @property
+    def populated_index(self) -> MapLocationIndex[Town]:
+        """
+        The spatial index of the populated towns, built on first use.
+        """
+        if self._populated_index is None:
+            self._populated_index = MapLocationIndex(
+                items = [town for town in self.town_list.values() if town.member_count > 0],
+                position = lambda town : (town.x, town.y)
+            )
+        return self._populated_index
     def get_towns_generator(self, player_data : Player_data) -> typing.Generator[Town,None,None]:
-        populated_towns = [town for town in self.town_list.values() if town.member_count > 0]
+        populated_towns = self.populated_index.by_travel_time(position = (player_data.x, player_data.y),
+                                                              movement_coefficient = movement_coefficient(player_data = player_data))
 
         if not populated_towns:
             # No populated towns available
             return None
-        distance_key = lambda town : player_data.absolute_distance_to((town.x, town.y))
-        populated_towns.sort(key= distance_key)
 
         return (x for x in populated_towns) 
         
@@ -82,21 +94,7 @@ class Town_list():
         Returns:
             Town: The closest populated town to the player.
         """
-        populated_towns = [town for town in self.town_list.values() if town.member_count > 0]
-
-        if not populated_towns:
-            # No populated towns available
-            return None
-        # Calculate distances to all populated towns
-        distances = {
-            town: player_data.absolute_distance_to((town.x, town.y))
-            for town in populated_towns
-        }
-
-        # Find the town with the minimum distance
-        closest_town = min(distances, key=distances.get)
-
-        return closest_town
+        return self.populated_index.nearest(position = (player_data.x, player_data.y))
 
     def get_closest_town(self, player_data: Player_data, key: typing.Optional[typing.Callable[[Town], bool]] = None) -> typing.Optional[Town]:
         """